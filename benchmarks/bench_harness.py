@@ -0,0 +1,79 @@
+"""
+End-to-end throughput of GeminiVertexTester.test_question against the fake
+genai client: the 5 sample contracts (every question against every contract)
+and a synthetic 510-contract corpus, with and without simulated latency,
+streaming and 429 rate limiting.
+"""
+
+from pathlib import Path
+
+from suite import benchmark
+
+from lawstronaut.contract_store import ContractStore
+from lawstronaut.fake_genai import FakeGenaiClient
+from lawstronaut.questions import DEFAULT_QUESTIONS
+from lawstronaut.runner import TokenBucketLimiter, run_in_order
+from lawstronaut.token_budget import TokenEstimator
+from test_gemini_vertex import GeminiVertexTester
+
+
+def make_tester(context, data_dir: Path, stream: bool = False, **fake_options) -> GeminiVertexTester:
+    """Offline tester reading `data_dir`, with every cache kept inside the benchmark workspace."""
+    tester = GeminiVertexTester(
+        client=FakeGenaiClient(**fake_options),
+        estimator=TokenEstimator(path=None, calibration_path=None),
+        stream_dir=context.path(f'streams_{data_dir.name}') if stream else None,
+    )
+    tester.data_dir = data_dir
+    tester._store = ContractStore.open_or_build(data_dir, store_dir=context.workspace / f'store_{data_dir.name}')
+    return tester
+
+
+def sample_pairs(context):
+    """Every default question against every sample contract (30 pairs)."""
+    return [dict(question, contract_file=path.name)
+            for path in context.sample_contracts() for question in DEFAULT_QUESTIONS]
+
+
+def synthetic_pairs(context):
+    """One question per synthetic contract, cycling through the default questions."""
+    paths = sorted(context.synthetic_dir().glob('*.txt'))
+    return [dict(DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)], contract_file=path.name)
+            for i, path in enumerate(paths)]
+
+
+def throughput(tester, pairs, concurrency: int, requests_per_minute: float = None):
+    """Callable running all pairs through the concurrent runner; returns pairs completed."""
+    def run():
+        limiter = TokenBucketLimiter(requests_per_minute=requests_per_minute) if requests_per_minute else None
+        results = run_in_order(lambda pair: tester.test_question(pair['contract_file'], pair), pairs,
+                               concurrency=concurrency, limiter=limiter)
+        failed = [r for r in results if (r.get('response') or {}).get('error')]
+        if failed:
+            raise RuntimeError(f"{len(failed)} pair(s) failed: {failed[0]['response']['error']}")
+        return len(results)
+    return run
+
+
+@benchmark('e2e.sample.blocking')
+def sample_blocking(context):
+    # No simulated latency: the harness's own per-pair overhead
+    return throughput(make_tester(context, context.sample_dir), sample_pairs(context), concurrency=1)
+
+
+@benchmark('e2e.sample.streaming_latency', repeat=3)
+def sample_streaming(context):
+    tester = make_tester(context, context.sample_dir, stream=True, latency_seconds=0.05, seconds_per_chunk=0.002)
+    return throughput(tester, sample_pairs(context), concurrency=8)
+
+
+@benchmark('e2e.sample.rate_limited', repeat=3)
+def sample_rate_limited(context):
+    # Every 7th call is a 429; the runner backs off through the limiter and retries
+    tester = make_tester(context, context.sample_dir, latency_seconds=0.01, rate_limit_every=7)
+    return throughput(tester, sample_pairs(context), concurrency=8, requests_per_minute=60_000)
+
+
+@benchmark('e2e.synthetic_510', repeat=3)
+def synthetic(context):
+    return throughput(make_tester(context, context.synthetic_dir()), synthetic_pairs(context), concurrency=8)
@@ -0,0 +1,175 @@
+"""
+Local hot paths: contract loading, prompt assembly, chunking, caching and
+result serialization. No model calls.
+"""
+
+import itertools
+import json
+
+from suite import benchmark
+
+from lawstronaut.batch import JsonlCheckpoint
+from lawstronaut.chunking import chunk_contract
+from lawstronaut.contract_store import ContractStore, pack_contracts
+from lawstronaut.prompts import build_prompt_parts
+from lawstronaut.questions import DEFAULT_QUESTIONS
+from lawstronaut.response_cache import ResponseCache
+from lawstronaut.result_sink import ResultSink, iter_results
+from lawstronaut.retrieval import select_sections
+from lawstronaut.token_budget import TokenEstimator
+from test_llm_apis import LawstronautTester
+
+
+def _texts(context):
+    return [path.read_text(encoding='utf-8', errors='ignore') for path in context.sample_contracts()]
+
+
+def _sample_results(context):
+    """Realistic result records: one offline harness pass over the sample pairs."""
+    from bench_harness import make_tester, sample_pairs
+
+    tester = make_tester(context, context.sample_dir)
+    return [tester.test_question(pair['contract_file'], pair) for pair in sample_pairs(context)]
+
+
+@benchmark('contracts.read_files')
+def read_files(context):
+    tester = LawstronautTester()
+    tester.data_dir = context.sample_dir
+    tester._store = False  # Direct file reads
+    names = [path.name for path in context.sample_contracts()]
+
+    def run():
+        for name in names:
+            tester.read_contract(name)
+        return len(names)
+    return run
+
+
+@benchmark('contracts.read_store')
+def read_store(context):
+    tester = LawstronautTester()
+    tester.data_dir = context.sample_dir
+    tester._store = ContractStore.open_or_build(context.sample_dir, store_dir=context.path('store_sample'))
+    names = [path.name for path in context.sample_contracts()]
+
+    def run():
+        for name in names:
+            tester.read_contract(name)
+        return len(names)
+    return run
+
+
+@benchmark('contracts.pack_510', repeat=3, warmup=False)
+def pack_synthetic(context):
+    data_dir = context.synthetic_dir()
+    counter = itertools.count()
+
+    def run():
+        return pack_contracts(data_dir, context.path(f'store_pack_{next(counter)}'))
+    return run
+
+
+@benchmark('prompt.build_parts')
+def prompt_build(context):
+    texts = _texts(context)
+    questions = [q['question_text'] for q in DEFAULT_QUESTIONS]
+
+    def run():
+        for text in texts:
+            for question in questions:
+                build_prompt_parts(text, question)
+        return len(texts) * len(questions)
+    return run
+
+
+@benchmark('prompt.token_estimate_cold')
+def token_estimate(context):
+    texts = _texts(context)
+
+    def run():
+        # A fresh estimator has no cached estimates
+        estimator = TokenEstimator(path=None, calibration_path=None)
+        for text in texts:
+            estimator.raw_tokens(text)
+        return len(texts)
+    return run
+
+
+@benchmark('chunking.chunk_contract')
+def chunking(context):
+    texts = _texts(context)
+
+    def run():
+        for text in texts:
+            chunk_contract(text)
+        return len(texts)
+    return run
+
+
+@benchmark('retrieval.select_sections')
+def retrieval(context):
+    chunked = [chunk_contract(text) for text in _texts(context)]
+
+    def run():
+        for chunks in chunked:
+            for question in DEFAULT_QUESTIONS:
+                select_sections(chunks, question['question_text'], question['regulation_focus'])
+        return len(chunked) * len(DEFAULT_QUESTIONS)
+    return run
+
+
+@benchmark('cache.response_put_get')
+def response_cache(context):
+    responses = [result['response'] for result in _sample_results(context)]
+    cache = ResponseCache(path=context.path('responses.sqlite3'), mode='write')
+    counter = itertools.count()
+
+    def run():
+        keys = []
+        for response in responses:
+            key = ResponseCache.make_key('bench', 'system', f"prompt {next(counter)}", {})
+            cache.put(key, response)
+            keys.append(key)
+        for key in keys:
+            cache.get(key)
+        return len(keys)
+    return run
+
+
+@benchmark('serialize.results_json')
+def results_json(context):
+    results = _sample_results(context)
+    output = {'test_type': 'benchmark', 'total_questions': len(results), 'results': results}
+
+    def run():
+        json.dumps(output, indent=2, ensure_ascii=False)
+        return len(results)
+    return run
+
+
+@benchmark('serialize.checkpoint_append')
+def checkpoint_append(context):
+    results = _sample_results(context)
+    counter = itertools.count()
+
+    def run():
+        checkpoint = JsonlCheckpoint(context.path(f'checkpoint_{next(counter)}.jsonl'), resume=False)
+        for result in results:
+            checkpoint.append(result, result)
+        checkpoint.close()
+        return len(results)
+    return run
+
+
+@benchmark('serialize.result_sink')
+def result_sink(context):
+    results = _sample_results(context)
+    counter = itertools.count()
+
+    def run():
+        directory = context.path(f'sink_{next(counter)}')
+        with ResultSink(directory, compression='gzip', metadata={'test_type': 'benchmark'}) as sink:
+            sink.write_all(results)
+        return sum(1 for _ in iter_results(directory))
+    return run
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Run the Lawstronaut benchmark suite
+
+Measures the harness's local hot paths (bench_local.py) and end-to-end
+test_question throughput against the fake genai client (bench_harness.py).
+No credentials or network are needed.
+
+Results are appended to a history file keyed by git commit; each run is
+compared with the latest earlier commit measured on the same machine (or
+--baseline REF), and the exit status is 1 if any benchmark's median is slower
+than its threshold in thresholds.json allows.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # run all, compare, record
+    python benchmarks/run_benchmarks.py -k e2e             # only matching benchmarks
+    python benchmarks/run_benchmarks.py --baseline HEAD~5 --no-save
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import io
+import sys
+from pathlib import Path
+
+import suite
+import bench_harness  # noqa: F401 (registers benchmarks)
+import bench_local  # noqa: F401 (registers benchmarks)
+
+from lawstronaut.paths import CACHE_DIR
+
+DEFAULT_HISTORY = CACHE_DIR / 'benchmarks.jsonl'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Lawstronaut benchmark suite')
+    parser.add_argument('-k', '--select', action='append',
+                        help='Run benchmarks whose name contains this (or matches this glob); repeatable')
+    parser.add_argument('--repeat', type=int, help='Timed calls per benchmark (default: per benchmark)')
+    parser.add_argument('--quick', action='store_true', help='One timed call per benchmark, no history entry')
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY,
+                        help=f'Benchmark history file (default: {DEFAULT_HISTORY})')
+    parser.add_argument('--baseline', help='Compare against the latest run at this git ref')
+    parser.add_argument('--no-save', action='store_true', help='Do not append this run to the history')
+    parser.add_argument('--thresholds', type=Path, default=suite.THRESHOLDS_PATH,
+                        help='Allowed slowdown ratios (default: benchmarks/thresholds.json)')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    args = parser.parse_args()
+
+    selected = [bench for bench in suite.REGISTRY
+                if not args.select or any(pattern in bench.name or fnmatch.fnmatch(bench.name, pattern)
+                                          for pattern in args.select)]
+    if args.list or not selected:
+        for bench in selected or suite.REGISTRY:
+            print(bench.name)
+        return 0 if selected else 1
+
+    context = suite.Context()
+    results = {}
+    print(f"{'benchmark':<34} {'median':>10} {'min':>10} {'items/s':>10}")
+    try:
+        for bench in selected:
+            # test_question and the runner print progress; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = suite.measure(bench, context, 1 if args.quick else args.repeat)
+            results[bench.name] = result
+            rate = f"{result['items_per_second']:>10,.1f}" if result['items_per_second'] else f"{'-':>10}"
+            print(f"{bench.name:<34} {result['median'] * 1000:>8.1f}ms {result['min'] * 1000:>8.1f}ms {rate}")
+    finally:
+        context.close()
+
+    entry = suite.history_entry(results)
+    history = suite.load_history(args.history)
+    baseline = suite.find_baseline(history, entry, args.baseline)
+    regressions = []
+    if baseline:
+        print(f"\nCompared with {(baseline.get('commit') or '?')[:10]}"
+              f"{' (dirty)' if baseline.get('dirty') else ''} from {baseline['date']}:")
+        comparison = suite.compare(results, baseline['results'], suite.load_thresholds(args.thresholds))
+        for name, row in comparison.items():
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f"  {name:<32} {row['ratio']:>6.2f}x (limit {row['threshold']:.2f}x) {flag}")
+            if row['regression']:
+                regressions.append(name)
+    elif args.baseline:
+        print(f"\nNo recorded run for {args.baseline} in {args.history}")
+
+    if not (args.no_save or args.quick):
+        suite.append_history(args.history, entry)
+        print(f"\nRecorded in {args.history} ({(entry['commit'] or 'no commit')[:10]}"
+              f"{', dirty tree' if entry['dirty'] else ''})")
+
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Minimal benchmark framework for the Lawstronaut harness
+
+Benchmarks are registered with @benchmark in the bench_*.py modules. Each
+one is a setup function taking the shared Context and returning a zero-argument
+callable; the callable does one unit of work and returns the number of items
+it processed (pairs, contracts, results), which gives items/sec.
+
+Every run is appended to a history file with the git commit it measured, so
+later runs compare against an earlier commit and flag regressions beyond the
+thresholds in thresholds.json.
+"""
+
+import fnmatch
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_DIR = REPO_ROOT / 'data' / 'test_contracts'
+THRESHOLDS_PATH = Path(__file__).resolve().parent / 'thresholds.json'
+
+sys.path.insert(0, str(REPO_ROOT / 'src'))
+sys.path.insert(0, str(REPO_ROOT / 'tests'))
+
+# CUAD v1 has 510 contracts
+SYNTHETIC_CONTRACTS = 510
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[['Context'], Callable[[], Optional[int]]]
+    repeat: int = 5
+    warmup: bool = True
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, repeat: int = 5, warmup: bool = True):
+    """Register a setup function as a named benchmark."""
+    def register(setup):
+        REGISTRY.append(Benchmark(name, setup, repeat, warmup))
+        return setup
+    return register
+
+
+class Context:
+    """Shared fixtures: a scratch workspace, the sample contracts and a synthetic corpus."""
+
+    def __init__(self, workspace: Optional[Path] = None):
+        self._temp = None
+        if workspace is None:
+            self._temp = tempfile.mkdtemp(prefix='lawstronaut-bench-')
+            workspace = Path(self._temp)
+        self.workspace = Path(workspace)
+        self.workspace.mkdir(parents=True, exist_ok=True)
+        self.sample_dir = SAMPLE_DIR
+        self._synthetic: Dict[int, Path] = {}
+
+    def path(self, name: str) -> Path:
+        """A fresh path inside the workspace."""
+        path = self.workspace / name
+        if path.exists():
+            shutil.rmtree(path) if path.is_dir() else path.unlink()
+        return path
+
+    def sample_contracts(self) -> List[Path]:
+        return sorted(self.sample_dir.glob('*.txt'))
+
+    def synthetic_dir(self, count: int = SYNTHETIC_CONTRACTS) -> Path:
+        """Directory of `count` synthetic contracts (generated once per context)."""
+        if count not in self._synthetic:
+            self._synthetic[count] = synthetic_corpus(self.workspace / f'synthetic_{count}',
+                                                      self.sample_contracts(), count)
+        return self._synthetic[count]
+
+    def close(self) -> None:
+        if self._temp:
+            shutil.rmtree(self._temp, ignore_errors=True)
+
+
+def synthetic_corpus(directory: Path, samples: List[Path], count: int, seed: int = 0) -> Path:
+    """
+    Write `count` contracts built from the sample contracts.
+
+    Each contract keeps a sample's opening paragraphs, shuffles the rest and is
+    shrunk or padded with paragraphs of another sample (0.25x-2x), so sizes and
+    section layouts vary the way CUAD's do while staying deterministic.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    texts = [path.read_text(encoding='utf-8', errors='ignore').split('\n\n') for path in samples]
+    for i in range(count):
+        rng = random.Random(seed * 100_003 + i)
+        base = texts[i % len(texts)]
+        head, body = base[:3], base[3:]
+        rng.shuffle(body)
+        scale = rng.choice((0.25, 0.5, 1.0, 1.0, 1.5, 2.0))
+        if scale < 1:
+            body = body[:max(1, int(len(body) * scale))]
+        else:
+            other = texts[(i + 1 + rng.randrange(len(texts) - 1)) % len(texts)]
+            body = body + rng.sample(other, min(len(other), int(len(base) * (scale - 1))))
+        name = f"synthetic_{i:04d}_{samples[i % len(samples)].stem[:40]}.txt"
+        text = f"SYNTHETIC CONTRACT {i:04d}\n\n" + '\n\n'.join(head + body)
+        (directory / name).write_text(text, encoding='utf-8')
+    return directory
+
+
+def measure(bench: Benchmark, context: Context, repeat: Optional[int] = None) -> Dict:
+    """Run one benchmark: setup, optional warmup call, then `repeat` timed calls."""
+    run = bench.setup(context)
+    if bench.warmup:
+        run()
+    times, items = [], None
+    for _ in range(repeat or bench.repeat):
+        start = time.perf_counter()
+        items = run()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {
+        'median': median,
+        'min': min(times),
+        'max': max(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'repeat': len(times),
+        'items': items,
+        'items_per_second': items / median if items and median else None,
+    }
+
+
+def git_commit() -> Dict:
+    """Current commit and whether the working tree differs from it."""
+    def git(*args) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True)
+
+    head = git('rev-parse', 'HEAD')
+    if head.returncode:
+        return {'commit': None, 'dirty': None}
+    return {'commit': head.stdout.strip(), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no').stdout)}
+
+
+def resolve_commit(ref: str) -> Optional[str]:
+    result = subprocess.run(['git', 'rev-parse', ref], cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def load_history(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: Path, entry: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def history_entry(results: Dict[str, Dict]) -> Dict:
+    return {
+        **git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({platform.node()})",
+        'results': results,
+    }
+
+
+def find_baseline(history: List[Dict], current: Dict, ref: Optional[str] = None) -> Optional[Dict]:
+    """
+    Entry to compare against: the latest one for `ref` if given, otherwise the
+    latest entry from the same machine measured at another commit, or at this
+    commit with a clean tree when the current tree has local changes.
+    """
+    if ref:
+        commit = resolve_commit(ref) or ref
+        matches = [entry for entry in history if (entry.get('commit') or '').startswith(commit)]
+        return matches[-1] if matches else None
+    for entry in reversed(history):
+        if entry.get('machine') != current.get('machine'):
+            continue
+        if entry.get('commit') != current.get('commit') or (current.get('dirty') and not entry.get('dirty')):
+            return entry
+    return None
+
+
+def load_thresholds(path: Path = THRESHOLDS_PATH) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def threshold_for(name: str, thresholds: Dict) -> float:
+    """Allowed median ratio (current / baseline) for a benchmark; longest matching pattern wins."""
+    patterns = [p for p in thresholds.get('benchmarks', {}) if fnmatch.fnmatch(name, p)]
+    if patterns:
+        return thresholds['benchmarks'][max(patterns, key=len)]
+    return thresholds.get('default', 1.25)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], thresholds: Dict) -> Dict[str, Dict]:
+    """Ratio of current to baseline median per benchmark, with a regression flag."""
+    comparison = {}
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('median'):
+            continue
+        ratio = result['median'] / previous['median']
+        limit = threshold_for(name, thresholds)
+        comparison[name] = {'ratio': ratio, 'threshold': limit, 'regression': ratio > limit}
+    return comparison
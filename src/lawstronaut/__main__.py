@@ -0,0 +1,38 @@
+"""
+Command-line entry point: python -m lawstronaut <command> [options]
+"""
+
+import importlib
+import sys
+
+# command -> module providing main(argv); imported lazily so optional
+# dependencies of one command never affect the others
+COMMANDS = {
+    'clauses': 'lawstronaut.clauses',
+    'compare': 'lawstronaut.compare',
+    'corpus': 'lawstronaut.regulation_corpus',
+    'exposure': 'lawstronaut.exposure',
+    'ingest': 'lawstronaut.ingest',
+    'metrics': 'lawstronaut.metrics',
+    'pack': 'lawstronaut.contract_store',
+    'results': 'lawstronaut.result_sink',
+    'score': 'lawstronaut.citations',
+    'search': 'lawstronaut.search_index',
+    'sources': 'lawstronaut.grounding',
+    'structured': 'lawstronaut.structured',
+    'vectors': 'lawstronaut.vector_index',
+}
+
+
+def main() -> int:
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print("Usage: python -m lawstronaut <command> [options]")
+        print(f"Commands: {', '.join(sorted(COMMANDS))}")
+        return 1
+
+    module = importlib.import_module(COMMANDS[sys.argv[1]])
+    return module.main(sys.argv[2:]) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Batch evaluation over a question x contract matrix
+
+Loads the test matrix from a file (docs/questions.xlsx, CSV, JSON, JSONL or
+YAML), expands it into (question, contract) pairs, splits the pairs into
+stable shards so several machines can share a sweep, and streams every result
+to a JSONL checkpoint the moment it completes. Re-running with the same
+checkpoint skips pairs that already finished successfully.
+"""
+
+import csv
+import json
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Spreadsheet / CSV headers -> question dict keys used by the harnesses
+COLUMN_ALIASES = {
+    'qa_id': 'qa_id',
+    'question_id': 'question_id',
+    'contract_file': 'contract_file',
+    'contract_files': 'contract_files',
+    'question_type': 'question_type',
+    'regulation_focus': 'regulation_focus',
+    'question_text': 'question_text',
+    'question': 'question_text',
+    'expected_answer': 'expected_answer',
+    'expected_answer_summary': 'expected_answer',
+    'expected_citation': 'expected_citation',
+    'expected_regulation_citation': 'expected_citation',
+}
+
+REQUIRED_FIELDS = ('qa_id', 'question_text')
+
+
+def _normalize_row(row: Dict) -> Dict:
+    """Map spreadsheet-style headers to harness keys, dropping empty cells."""
+    question = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if value is None or (isinstance(value, float) and value != value):  # NaN from pandas
+            continue
+        normalized = str(key).strip().lower().replace(' ', '_').replace('-', '_')
+        question[COLUMN_ALIASES.get(normalized, normalized)] = value.strip() if isinstance(value, str) else value
+    return question
+
+
+def _read_rows(path: Path) -> Tuple[List[Dict], List[str]]:
+    """Read raw rows (and an optional shared contract list) from a matrix file."""
+    suffix = path.suffix.lower()
+
+    if suffix in ('.xlsx', '.xls'):
+        import pandas as pd  # openpyxl is needed for .xlsx
+        frame = pd.read_excel(path, dtype=str)
+        frame = frame.loc[:, ~frame.columns.astype(str).str.startswith('Unnamed')]
+        return frame.to_dict(orient='records'), []
+
+    if suffix == '.csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f)), []
+
+    if suffix == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()], []
+
+    if suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Reading YAML matrices requires PyYAML: pip install pyyaml")
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+    elif suffix == '.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        raise ValueError(f"Unsupported matrix format: {path.suffix} (use .xlsx, .csv, .json, .jsonl or .yaml)")
+
+    if isinstance(data, list):
+        return data, []
+    return data.get('questions', []), data.get('contracts', [])
+
+
+def load_matrix(path: Path) -> List[Dict]:
+    """
+    Load a question x contract matrix and expand it into pairs.
+
+    Each row is a question dict in the harness format (qa_id, question_type,
+    regulation_focus, question_text, expected_answer, expected_citation).
+    A row is paired with its `contract_file`, with every entry of a
+    `contract_files` list, or, when it names no contract, with every entry of
+    the file-level `contracts` list (JSON/YAML mappings only).
+
+    Args:
+        path: Matrix file (.xlsx, .csv, .json, .jsonl, .yaml)
+
+    Returns:
+        One question dict per (question, contract) pair, with contract_file set
+
+    Raises:
+        ValueError: If a row lacks required fields or any contract
+    """
+    path = Path(path)
+    rows, shared_contracts = _read_rows(path)
+
+    pairs = []
+    for number, row in enumerate(rows, 1):
+        question = _normalize_row(row)
+        missing = [field for field in REQUIRED_FIELDS if not question.get(field)]
+        if missing:
+            raise ValueError(f"{path.name} row {number}: missing {', '.join(missing)}")
+
+        contracts = question.pop('contract_files', None) or []
+        if isinstance(contracts, str):
+            contracts = [c.strip() for c in contracts.split(';') if c.strip()]
+        if question.get('contract_file'):
+            contracts = [question['contract_file']] + list(contracts)
+        if not contracts:
+            contracts = shared_contracts
+        if not contracts:
+            raise ValueError(f"{path.name} row {number} ({question['qa_id']}): no contract_file")
+
+        question.setdefault('question_type', '')
+        question.setdefault('regulation_focus', '')
+        question.setdefault('expected_answer', '')
+        question.setdefault('expected_citation', '')
+        for contract in dict.fromkeys(contracts):
+            pairs.append(dict(question, contract_file=contract))
+    return pairs
+
+
+def pair_key(question: Dict) -> str:
+    """Stable identifier of a (question, contract) pair."""
+    return f"{question['qa_id']}::{question['contract_file']}"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a "--shard i/n" argument (0 <= i < n).
+
+    Raises:
+        ValueError: If the value is malformed
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}: expected i/n, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}: need 0 <= i < n")
+    return index, count
+
+
+def shard_pairs(pairs: Iterable[Dict], index: int, count: int) -> List[Dict]:
+    """
+    Keep the pairs belonging to shard `index` of `count`.
+
+    Assignment hashes the pair key, so a pair stays on the same shard when the
+    matrix grows or is reordered.
+    """
+    return [q for q in pairs if zlib.crc32(pair_key(q).encode('utf-8')) % count == index]
+
+
+def result_summary(result: Dict) -> Dict:
+    """The fields of a result that resume and change detection need (no answers)."""
+    summary = {key: result[key] for key in ('qa_id', 'contract_file', 'inputs', 'fingerprint') if key in result}
+    if 'responses' in result:
+        summary['responses'] = {model: {'error': (response or {}).get('error')}
+                                for model, response in result['responses'].items()}
+    else:
+        summary['response'] = {'error': (result.get('response') or {}).get('error')}
+    return summary
+
+
+class JsonlCheckpoint:
+    """Append-only JSONL result log that doubles as the resume checkpoint."""
+
+    def __init__(self, path: Path, resume: bool = True, keep_results: bool = True):
+        """
+        Open a checkpoint file.
+
+        Args:
+            path: JSONL file; created if missing
+            resume: Load results already in the file (False truncates it)
+            keep_results: Hold full results in `results`; False keeps only
+                result_summary() per pair and reads full results back from the
+                file on demand, so memory does not grow with answer size
+        """
+        self.path = Path(path)
+        self.keep_results = keep_results
+        self._lock = threading.Lock()
+        self.results: Dict[str, Dict] = {}
+        # pair key -> byte offset of its latest line
+        self._offsets: Dict[str, int] = {}
+
+        if resume and self.path.exists():
+            offset = 0
+            with open(self.path, 'rb') as f:
+                for raw in f:
+                    line_offset, offset = offset, offset + len(raw)
+                    if not raw.strip():
+                        continue
+                    try:
+                        result = json.loads(raw)
+                    except json.JSONDecodeError:
+                        # Torn last line from a crash mid-write; the pair is simply re-run
+                        continue
+                    self._store(pair_key(result), result, line_offset)
+        elif self.path.exists():
+            self.path.unlink()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+
+    def _store(self, key: str, result: Dict, offset: int) -> None:
+        self.results[key] = result if self.keep_results else result_summary(result)
+        self._offsets[key] = offset
+
+    def is_done(self, question: Dict) -> bool:
+        """True if the pair already has a successful result (every response, for comparison records)."""
+        result = self.results.get(pair_key(question))
+        if not result:
+            return False
+        responses = result['responses'].values() if 'responses' in result else [result.get('response')]
+        return not any((response or {}).get('error') for response in responses)
+
+    def pending(self, pairs: Iterable[Dict]) -> List[Dict]:
+        """Pairs that still need to run."""
+        return [q for q in pairs if not self.is_done(q)]
+
+    def append(self, question: Dict, result: Dict) -> None:
+        """Persist one result immediately (flushed before returning)."""
+        line = (json.dumps(result, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._store(pair_key(question), result, offset)
+
+    def iter_ordered(self, pairs: Iterable[Dict]) -> Iterator[Dict]:
+        """Full latest result for each pair, in matrix order, read one at a time."""
+        if self.keep_results:
+            for q in pairs:
+                if pair_key(q) in self.results:
+                    yield self.results[pair_key(q)]
+            return
+        with open(self.path, 'rb') as f:
+            for q in pairs:
+                offset = self._offsets.get(pair_key(q))
+                if offset is not None:
+                    f.seek(offset)
+                    yield json.loads(f.readline())
+
+    def ordered(self, pairs: Iterable[Dict]) -> List[Dict]:
+        """Latest result for each pair, in matrix order (pairs without results are skipped)."""
+        return list(self.iter_ordered(pairs))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_result_file(spec: str) -> Tuple[str, Iterable[Dict]]:
+    """
+    Read the records of a harness, comparison or JSONL checkpoint file, or a result sink.
+
+    Sink directories, manifests, shards and JSONL files are streamed lazily,
+    so iterate the records once.
+
+    Args:
+        spec: Path, optionally prefixed with "label=" to name the model of a harness file
+
+    Returns:
+        (model label: the prefix, the run's test_type or the path's stem, records)
+    """
+    from .result_sink import iter_results, read_manifest
+
+    label, _, path = spec.rpartition('=') if '=' in spec else ('', '', spec)
+    path = Path(path)
+    if path.suffix == '.json' and path.name != 'manifest.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return label or data.get('test_type') or path.stem, data.get('results', [])
+    manifest = read_manifest(path) or {}
+    stem = path.parent.name if path.name == 'manifest.json' else path.name.split('.')[0]
+    return label or (manifest.get('metadata') or {}).get('test_type') or stem, iter_results(path)
+
+
+def safe_task(task: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+    """
+    Wrap a test_question-style task so an exception becomes an error result.
+
+    A missing contract or a bug in one pair then costs that pair only, not the
+    whole sweep.
+    """
+    def run(question: Dict) -> Dict:
+        try:
+            return task(question)
+        except Exception as e:
+            return {
+                'qa_id': question['qa_id'],
+                'question_type': question.get('question_type', ''),
+                'regulation_focus': question.get('regulation_focus', ''),
+                'contract_file': question['contract_file'],
+                'question': question.get('question_text', ''),
+                'expected_answer': question.get('expected_answer', ''),
+                'expected_citation': question.get('expected_citation', ''),
+                'response': {'error': f"{type(e).__name__}: {e}", 'answer': None},
+            }
+    return run
@@ -0,0 +1,216 @@
+"""
+Section-aware chunking of CUAD contract text
+
+CUAD contracts are EDGAR text dumps where numbered clauses ("5.", "5.2",
+"12.0 UPGRADES", "ARTICLE IV") often run inline rather than starting new
+lines. The chunker finds those clause boundaries, packs consecutive clauses
+into chunks of bounded size, and falls back to overlapping windows for
+oversize clauses or unstructured text. Every chunk keeps its character
+offsets and an approximate token offset into the original contract.
+"""
+
+import math
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Rough chars-per-token ratio for English legal text
+CHARS_PER_TOKEN = 4
+
+DEFAULT_MAX_CHARS = 4000
+DEFAULT_OVERLAP_CHARS = 400
+
+# "5. Confidentiality", "12.0 UPGRADES", "2.1 The Appointment", "6.1.7 Data"
+_NUMBERED_RE = re.compile(
+    r'(?:(?<=\s)|^)(\d{1,2}(?:\.\d{1,2}){0,2})(\.?)[ \t]+(?=[A-Z(“"])'
+)
+# "ARTICLE IV", "Article 3", "SECTION 2" at the start of a line
+_ARTICLE_RE = re.compile(
+    r'^[ \t]*((?:ARTICLE|Article|SECTION|Section)[ \t]+(?:[IVXLC]+|\d+(?:\.\d+)*))\b',
+    re.MULTILINE
+)
+_SCHEDULE_RE = re.compile(r'^[ \t]*((?:SCHEDULE|EXHIBIT|ANNEX|APPENDIX)[ \t]+[A-Z0-9]+)\b', re.MULTILINE)
+_HEADING_RE = re.compile(r'[A-Z][A-Za-z\-’\']*(?:[ \t]+(?:[A-Z][A-Za-z\-’\']*|of|and|or|the|to|for|in|on|&)){0,7}')
+_ROMAN = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count for `text` (~4 characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class Chunk:
+    """A contiguous slice of a contract, aligned to clause boundaries where possible."""
+
+    chunk_id: int
+    section: Optional[str]          # Number of the first clause in the chunk, e.g. "18" or "5.2"
+    heading: Optional[str]          # Heading text of that clause, if detected
+    start: int                      # Character offset (inclusive) into the contract
+    end: int                        # Character offset (exclusive)
+    token_start: int                # Approximate token offset of `start`
+    token_count: int                # Approximate tokens in the chunk
+    text: str = field(repr=False)
+    sections: List[str] = field(default_factory=list)  # Every clause number covered
+
+    def to_dict(self, include_text: bool = False) -> Dict:
+        """Serializable description of the chunk (text omitted by default)."""
+        data = asdict(self)
+        if not include_text:
+            data.pop('text')
+        return data
+
+
+def _roman_to_int(value: str) -> Optional[int]:
+    total = 0
+    previous = 0
+    for char in reversed(value.upper()):
+        number = _ROMAN.get(char)
+        if number is None:
+            return None
+        total = total - number if number < previous else total + number
+        previous = max(previous, number)
+    return total
+
+
+def find_section_boundaries(text: str) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Locate clause starts in a contract.
+
+    Numbered clauses are accepted only when they continue the running
+    numbering (top-level N follows N-1 or restarts at 1; subsection N.M
+    belongs to the current top-level clause). That filters out amounts,
+    dates and cross-references such as "pursuant to Section 6.3".
+
+    Args:
+        text: Contract text
+
+    Returns:
+        Sorted list of (char_offset, section_number, heading)
+    """
+    boundaries = []
+
+    for match in _ARTICLE_RE.finditer(text):
+        label = match.group(1)
+        boundaries.append((match.start(1), label.upper(), _heading_after(text, match.end(1))))
+    for match in _SCHEDULE_RE.finditer(text):
+        label = match.group(1)
+        boundaries.append((match.start(1), label.upper(), _heading_after(text, match.end(1))))
+
+    current_top = 0
+    for match in _NUMBERED_RE.finditer(text):
+        number, dot = match.group(1), match.group(2)
+        parts = number.split('.')
+        if len(parts) == 2 and parts[1] == '0':
+            # "12.0 UPGRADES" style top-level numbering
+            parts = parts[:1]
+            dot = '.'
+        top = int(parts[0])
+
+        if len(parts) == 1:
+            if not dot:
+                continue
+            if not (top in (current_top + 1, current_top + 2) or (top == 1 and current_top > 1)):
+                continue
+            current_top = top
+        elif top != current_top:
+            continue
+
+        label = '.'.join(parts)
+        boundaries.append((match.start(1), label, _heading_after(text, match.end())))
+
+    boundaries.sort(key=lambda b: b[0])
+    return boundaries
+
+
+def _heading_after(text: str, position: int) -> Optional[str]:
+    """Extract a short capitalized heading that follows a clause number."""
+    match = _HEADING_RE.match(text, position)
+    if not match:
+        remainder = text[position:position + 80].strip().split('\n', 1)[0]
+        return remainder or None
+    heading = match.group(0).strip()
+    return heading[:80] if heading else None
+
+
+def _windows(start: int, end: int, max_chars: int, overlap_chars: int, text: str) -> List[Tuple[int, int]]:
+    """Split [start, end) into overlapping windows, breaking on whitespace."""
+    windows = []
+    position = start
+    while position < end:
+        stop = min(end, position + max_chars)
+        if stop < end:
+            space = text.rfind(' ', position + max_chars // 2, stop)
+            if space > position:
+                stop = space
+        windows.append((position, stop))
+        if stop >= end:
+            break
+        position = max(position + 1, stop - overlap_chars)
+    return windows
+
+
+def chunk_contract(text: str, max_chars: int = DEFAULT_MAX_CHARS,
+                   overlap_chars: int = DEFAULT_OVERLAP_CHARS) -> List[Chunk]:
+    """
+    Split a contract into section-aligned chunks.
+
+    Consecutive clauses are packed together until adding the next one would
+    exceed `max_chars`. A single clause longer than `max_chars` (or a contract
+    without detectable numbering) is split into windows that overlap by
+    `overlap_chars` so no sentence is lost at a boundary.
+
+    Args:
+        text: Full contract text
+        max_chars: Target maximum chunk size in characters
+        overlap_chars: Overlap between consecutive windows of one oversize clause
+
+    Returns:
+        Chunks in document order
+    """
+    boundaries = find_section_boundaries(text)
+    if not boundaries or boundaries[0][0] > 0:
+        boundaries.insert(0, (0, None, None))
+
+    # Clause units: (start, end, number, heading)
+    units = []
+    for i, (start, number, heading) in enumerate(boundaries):
+        end = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+        if end > start:
+            units.append((start, end, number, heading))
+
+    spans = []  # (start, end, first number, first heading, covered numbers)
+    pending = None
+    for start, end, number, heading in units:
+        numbers = [number] if number else []
+        if end - start > max_chars:
+            if pending:
+                spans.append(pending)
+                pending = None
+            for window_start, window_end in _windows(start, end, max_chars, overlap_chars, text):
+                spans.append((window_start, window_end, number, heading, list(numbers)))
+            continue
+        if pending and end - pending[0] <= max_chars:
+            pending = (pending[0], end, pending[2] or number, pending[3] or heading, pending[4] + numbers)
+        else:
+            if pending:
+                spans.append(pending)
+            pending = (start, end, number, heading, numbers)
+    if pending:
+        spans.append(pending)
+
+    chunks = []
+    for chunk_id, (start, end, number, heading, numbers) in enumerate(spans):
+        chunk_text = text[start:end]
+        chunks.append(Chunk(
+            chunk_id=chunk_id,
+            section=number,
+            heading=heading,
+            start=start,
+            end=end,
+            token_start=start // CHARS_PER_TOKEN,
+            token_count=estimate_tokens(chunk_text),
+            text=chunk_text,
+            sections=numbers,
+        ))
+    return chunks
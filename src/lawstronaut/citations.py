@@ -0,0 +1,467 @@
+"""
+Citation extraction and expected_citation scoring
+
+A single compiled grammar recognizes the legal citation forms used by the
+test matrix and the model answers:
+
+    GDPR Article 9(2)(a)             -> GDPR / art 9 2 a
+    Articles 7-8, 15 of the CSDDD    -> CSDDD / art 7, art 8, art 15
+    Directive (EU) 2024/1760         -> CSDDD
+    Regulation (EU) 2024/1689, Annex III, point 5(a)  -> EU AI Act / annex iii 5 a
+    16 CFR § 910.2(a)(1)             -> 16 CFR / 910 2 a 1
+    Cal. Civ. Code § 1798.140(ae)(9) -> Cal. Civ. Code / 1798 140 ae 9
+    Ryan LLC v. FTC                  -> case / ryan llc v ftc
+
+Citations are normalized to (instrument, path) pairs. An expected citation
+counts as found when an answer cites the same instrument at the same or a
+more specific pinpoint ("GDPR Article 9" is found by "GDPR Article 9(2)(a)").
+Scoring many result records is done as one pandas merge/groupby pass over
+long-format citation tables.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .batch import read_result_file
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Mojibake seen in docs/questions.xlsx (UTF-8 decoded as Mac Roman / cp1252)
+_MOJIBAKE = {'¬ß': '§', 'Â§': '§', '‚Ç¨': '€', 'â€“': '–', 'â€™': "'"}
+
+SUB = r'(?:\(\w{1,4}\))*'
+NUM_SUB = r'\d+[a-z]?' + SUB
+LIST_SEP = r'\s*(?:,|and|&|or|-|–|to|through)\s*'
+SECTION_NUM = r'\d+(?:\.\d+)*[a-z]?' + SUB
+
+# (group name, pattern). Order matters: specific forms before generic ones.
+_GRAMMAR: List[Tuple[str, str]] = [
+    ('sep', r'[;\n]'),
+    # Combined instrument + pinpoint forms
+    ('cfr', r'\b(?P<cfr_title>\d+)\s+C\.?\s?F\.?\s?R\.?\s*(?:Part\s*|pt\.\s*|§+\s*)?(?P<cfr_sect>\d+(?:\.\d+)?' + SUB + ')'),
+    ('usc', r'\b(?P<usc_title>\d+)\s+U\.?\s?S\.?\s?C\.?\s*(?:§+\s*)?(?P<usc_sect>\d+[a-z]?' + SUB + ')'),
+    ('ccr_tit', r'\bCal(?:ifornia|\.)?\s*Code\s*(?:of\s*)?Regs?\.?,?\s*tit(?:le|\.)?\s*(?P<ccr_tit_title>\d+),?\s*§+\s*'
+                r'(?P<ccr_tit_sect>\d+(?:\.\d+)?' + SUB + ')'),
+    ('ccr', r'\b(?P<ccr_title>\d+)\s+(?:CCR|C\.C\.R\.|Cal\.?\s*Code\s*(?:of\s*)?Regs?\.?)\s*(?:§+\s*)?'
+            r'(?P<ccr_sect>\d+(?:\.\d+)?' + SUB + ')'),
+    ('cal_code', r'\b(?:Cal(?:ifornia|\.)?\s+)?(?P<cal_code>Civ(?:il|\.)?|Bus(?:iness|\.)?\s*(?:&|and)\s*Prof(?:essions|\.)?'
+                 r'|Lab(?:or|\.)?|Gov(?:ernment|\.|\'t)?)\s+Code\s*(?:§+|[Ss]ections?|[Ss]ec\.)\s*'
+                 r'(?P<cal_sect>\d+(?:\.\d+)?' + SUB + ')'),
+    ('ilcs', r'\b(?P<ilcs_ch>\d+)\s+ILCS\s+(?P<ilcs_act>\d+)/(?P<ilcs_sect>\d+(?:\.\d+)?)'),
+    ('ilo', r'\bILO\s+Conventions?\s+(?:Nos?\.?\s*)?(?P<ilo>\d+(?:\s*(?:/|,|and|&)\s*\d+)*)'),
+    ('fca_ps', r'\b(?:FCA\s+)?(?:Policy\s+Statement\s+)?PS(?P<fca_ps>\d{2}/\d{1,2})\b'),
+    ('case', r'(?P<case>\b[A-Z][\w&\'.-]*(?:\s+[A-Z][\w&\'.-]*){0,3}\s+v\.?\s+[A-Z][\w&\'-]*(?:\s+[A-Z][\w&\'-]*){0,3})'),
+    # Named instruments
+    ('eu_act', r'\b(?:(?:EU|EC)\s+)?(?:Implementing\s+|Delegated\s+)?(?:Regulation|Directive|Decision)\s*'
+               r'(?:\((?:EU|EC|EEC)\)\s*)?(?:No\.?\s*)?(?P<eu_year>(?:19|20)\d{2})/(?P<eu_num>\d{1,4})\b'),
+    ('uk_gdpr', r'\bUK\s+GDPR\b'),
+    ('gdpr', r'\b(?:EU\s+)?GDPR\b|\bGeneral\s+Data\s+Protection\s+Regulation\b'),
+    ('ai_act', r'\b(?:EU\s+)?AI\s+Act\b|\bArtificial\s+Intelligence\s+Act\b'),
+    ('csddd', r'\bCSDDD\b|\bCS3D\b|\bCorporate\s+Sustainability\s+Due\s+Diligence\s+Directive\b'),
+    ('reul', r'\bREUL\s+Act(?:\s+2023)?\b|\bRetained\s+EU\s+Law\s+\(Revocation\s+and\s+Reform\)\s+Act(?:\s+2023)?'),
+    ('uk_dpa', r'\b(?:UK\s+)?Data\s+Protection\s+Act\s+2018\b'),
+    ('uk_mar', r'\bUK\s+MAR\b'),
+    ('wtr', r'\bWorking\s+Time\s+Regulations(?:\s+1998)?\b'),
+    ('ccpa', r'\bCCPA\b|\bCPRA\b|\bCalifornia\s+(?:Consumer\s+Privacy|Privacy\s+Rights)\s+Act\b'),
+    ('cppa', r'\bCPPA\b(?:\s+(?:ADMT\s+)?(?:regulations?|regs\.?|rules?))?'),
+    ('ftc_rule', r'\bFTC\s+(?:Non-?\s?Compete\s+(?:Clause\s+)?)?Rule\b|\bNon-?\s?Compete\s+Clause\s+Rule\b'),
+    ('lksg', r'\bLkSG\b|\bLieferkettensorgfaltspflichtengesetz\b'),
+    ('dodd_frank', r'\bDodd-Frank(?:\s+Act)?\b'),
+    ('uflpa', r'\bUFLPA\b|\bUyghur\s+Forced\s+Labor\s+Prevention\s+Act\b'),
+    ('fadp', r'\b(?:Swiss\s+)?FADP\b'),
+    ('dpf', r'\bEU-U\.?S\.?\s+Data\s+Privacy\s+Framework\b'),
+    # Pinpoints that attach to an instrument
+    ('article', r'\bArt(?:icle)?s?\.?\s+(?P<article>' + NUM_SUB + '(?:' + LIST_SEP + NUM_SUB + ')*)'),
+    ('annex', r'\bAnnex\s+(?P<annex>[IVXL]+)\b(?:,?\s+(?:point|paragraph|para\.?)\s+(?P<annex_point>' + NUM_SUB + '))?'),
+    # List items followed by a capitalized word start a new citation ("§ 910.1, 16 CFR Part 910")
+    ('section', r'§§?\s*(?P<section>' + SECTION_NUM + r'(?:\s*(?:,|and|&)\s*(?:§\s*)?' + SECTION_NUM
+                + r'(?![\d.]|\s+[A-Z]))*)'),
+]
+
+CITATION_RE = re.compile('|'.join(f'(?P<k_{name}>{pattern})' for name, pattern in _GRAMMAR))
+_KINDS = [name for name, _ in _GRAMMAR]
+
+# Fixed instrument names for the named-instrument kinds: kind -> (instrument, base path)
+_NAMED = {
+    'uk_gdpr': ('UK GDPR', ()),
+    'gdpr': ('GDPR', ()),
+    'ai_act': ('EU AI Act', ()),
+    'csddd': ('CSDDD', ()),
+    'reul': ('UK REUL Act 2023', ()),
+    'uk_dpa': ('UK DPA 2018', ()),
+    'uk_mar': ('UK MAR', ()),
+    'wtr': ('UK WTR 1998', ()),
+    'ccpa': ('Cal. Civ. Code', ('1798',)),
+    'cppa': ('11 CCR', ()),
+    'ftc_rule': ('16 CFR', ('910',)),
+    'lksg': ('DE LkSG', ()),
+    'dodd_frank': ('Dodd-Frank', ()),
+    'uflpa': ('UFLPA', ()),
+    'fadp': ('CH FADP', ()),
+    'dpf': ('EU-US DPF', ()),
+}
+
+# Well-known EU acts by (year, number)
+EU_ACT_NAMES = {
+    ('2016', '679'): 'GDPR',
+    ('2024', '1689'): 'EU AI Act',
+    ('2024', '1760'): 'CSDDD',
+}
+
+CAL_CODES = (('civ', 'Cal. Civ. Code'), ('bus', 'Cal. Bus. & Prof. Code'),
+             ('lab', 'Cal. Lab. Code'), ('gov', 'Cal. Gov. Code'))
+
+_CASE_LEADING_WORDS = {'see', 'in', 'cf', 'the', 'also', 'and', 'per', 'under', 'following', 'after'}
+# Text allowed between a pinpoint and a following instrument it belongs to ("Article 9 of the GDPR")
+_CONNECTOR_RE = re.compile(r'^[\s,]*(?:(?:of|under|in)\s+(?:the\s+)?)?(?:\(\s*)?$', re.IGNORECASE)
+# An instrument stops applying to bare pinpoints after this many characters
+SCOPE_CHARS = 250
+MAX_RANGE = 30
+
+
+@dataclass(frozen=True)
+class Citation:
+    """Normalized citation: an instrument and a pinpoint path inside it."""
+
+    instrument: str
+    path: Tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        """Prefix-comparable path key, e.g. "art.9.2.a." ('' for the whole instrument)."""
+        return ''.join(part + '.' for part in self.path)
+
+    def covers(self, other: 'Citation') -> bool:
+        """True if `other` cites this citation or something more specific within it."""
+        return self.instrument == other.instrument and other.path[:len(self.path)] == self.path
+
+    def __str__(self) -> str:
+        if not self.path:
+            return self.instrument
+        if self.instrument == 'case':
+            return self.path[0]
+        head, rest = self.path[0], list(self.path[1:])
+        if head == 'art':
+            return f"{self.instrument} Article {rest[0]}" + ''.join(f'({p})' for p in rest[1:])
+        if head == 'annex':
+            point = f", point {rest[1]}" + ''.join(f'({p})' for p in rest[2:]) if len(rest) > 1 else ''
+            return f"{self.instrument} Annex {rest[0].upper()}{point}"
+        numbers = [head]
+        while rest and rest[0].isdigit() and len(numbers) < 2:
+            numbers.append(rest.pop(0))
+        return f"{self.instrument} § {'.'.join(numbers)}" + ''.join(f'({p})' for p in rest)
+
+
+def normalize_text(text: str) -> str:
+    """Repair common mojibake and unify section signs / dashes before parsing."""
+    for bad, good in _MOJIBAKE.items():
+        text = text.replace(bad, good)
+    return text.replace(' ', ' ')
+
+
+def _split_path(value: str) -> Tuple[str, ...]:
+    """'1798.140(ae)(9)' -> ('1798', '140', 'ae', '9')."""
+    return tuple(re.findall(r'\d+[a-z]?|[a-z]+', value.lower()))
+
+
+def _expand_list(value: str) -> List[str]:
+    """'7-8, 15' -> ['7', '8', '15'];  '9(2)(a) and 10' -> ['9(2)(a)', '10']."""
+    items: List[str] = []
+    tokens = re.split(r'\s*(,|and|&|or|-|–|to|through)\s*', value.strip())
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token and token not in (',', 'and', '&', 'or', '-', '–', 'to', 'through'):
+            items.append(token)
+        elif token in ('-', '–', 'to', 'through') and items and i + 1 < len(tokens):
+            low, high = items[-1], tokens[i + 1]
+            if low.isdigit() and high.isdigit() and 0 < int(high) - int(low) <= MAX_RANGE:
+                items.extend(str(n) for n in range(int(low) + 1, int(high) + 1))
+                i += 2
+                continue
+        i += 1
+    return items
+
+
+def _case_name(value: str) -> str:
+    words = value.replace('.', ' ').split()
+    while words and words[0].lower() in _CASE_LEADING_WORDS:
+        words.pop(0)
+    return ' '.join(words).lower()
+
+
+def _anchor(kind: str, m: 're.Match') -> Tuple[List[Citation], Optional[Tuple[str, Tuple[str, ...]]]]:
+    """Citations emitted by an instrument match, and the instrument bare pinpoints inherit."""
+    if kind in _NAMED:
+        instrument, base = _NAMED[kind]
+        return [Citation(instrument, base)], (instrument, ())
+    if kind == 'eu_act':
+        year, number = m.group('eu_year'), m.group('eu_num')
+        instrument = EU_ACT_NAMES.get((year, number), f"EU {year}/{number}")
+        return [Citation(instrument)], (instrument, ())
+    if kind == 'cfr':
+        instrument = f"{m.group('cfr_title')} CFR"
+        return [Citation(instrument, _split_path(m.group('cfr_sect')))], (instrument, ())
+    if kind == 'usc':
+        instrument = f"{m.group('usc_title')} USC"
+        return [Citation(instrument, _split_path(m.group('usc_sect')))], (instrument, ())
+    if kind in ('ccr', 'ccr_tit'):
+        instrument = f"{m.group(kind + '_title')} CCR"
+        return [Citation(instrument, _split_path(m.group(kind + '_sect')))], (instrument, ())
+    if kind == 'cal_code':
+        code = m.group('cal_code').lower()
+        instrument = next(name for prefix, name in CAL_CODES if code.startswith(prefix))
+        return [Citation(instrument, _split_path(m.group('cal_sect')))], (instrument, ())
+    if kind == 'ilcs':
+        instrument = f"{m.group('ilcs_ch')} ILCS {m.group('ilcs_act')}"
+        return [Citation(instrument, _split_path(m.group('ilcs_sect')))], (instrument, ())
+    if kind == 'ilo':
+        numbers = re.findall(r'\d+', m.group('ilo'))
+        return [Citation(f"ILO C{n}") for n in numbers], None
+    if kind == 'fca_ps':
+        return [Citation(f"FCA PS{m.group('fca_ps')}")], None
+    if kind == 'case':
+        name = _case_name(m.group('case'))
+        return ([Citation('case', (name,))] if ' v ' in f' {name} ' else []), None
+    raise ValueError(kind)
+
+
+def _pinpoints(kind: str, m: 're.Match') -> List[Tuple[str, ...]]:
+    if kind == 'article':
+        return [('art',) + _split_path(item) for item in _expand_list(m.group('article'))]
+    if kind == 'annex':
+        point = _split_path(m.group('annex_point')) if m.group('annex_point') else ()
+        return [('annex', m.group('annex').lower()) + point]
+    # section
+    items = re.split(r'\s*(?:,|and|&)\s*(?:§\s*)?', m.group('section'))
+    return [_split_path(item) for item in items if item]
+
+
+def extract_citations(text: Optional[str]) -> List[Citation]:
+    """
+    Extract normalized citations from free text, in order of first appearance.
+
+    Article/Annex/§ pinpoints attach to the instrument named right after them
+    ("Article 9 of the GDPR") or else to the most recent instrument in the same
+    clause (up to the next ';' or line break). A whole-instrument citation is
+    dropped when the same text also cites a pinpoint inside it.
+
+    Args:
+        text: Answer or expected_citation text
+
+    Returns:
+        Unique citations
+    """
+    if not text:
+        return []
+    text = normalize_text(text)
+    found: List[Citation] = []
+    current: Optional[Tuple[str, Tuple[str, ...]]] = None
+    current_end = -1
+    pending: List[Tuple[Tuple[str, ...], Optional[Tuple[str, Tuple[str, ...]]], int]] = []
+
+    def flush(target: Optional[Tuple[str, Tuple[str, ...]]] = None) -> None:
+        for path, fallback, _ in pending:
+            anchor = target or fallback
+            if anchor is not None:
+                found.append(Citation(anchor[0], anchor[1] + path))
+            elif path and path[0] != 'art' and path[0] != 'annex':
+                # Bare section: CCPA sections are unambiguous, anything else stays unattributed
+                found.append(Citation('Cal. Civ. Code' if path[0] == '1798' else '§', path))
+        pending.clear()
+
+    for m in CITATION_RE.finditer(text):
+        kind = next(k for k in _KINDS if m.group('k_' + k) is not None)
+        if current is not None and m.start() - current_end > SCOPE_CHARS:
+            current = None
+
+        if kind == 'sep':
+            flush()
+            current = None
+            continue
+
+        if kind in ('article', 'annex', 'section'):
+            for path in _pinpoints(kind, m):
+                pending.append((path, current, m.end()))
+            continue
+
+        citations, inherit = _anchor(kind, m)
+        # Pinpoints directly followed by this instrument belong to it
+        if pending and inherit and _CONNECTOR_RE.match(text[pending[-1][2]:m.start()]):
+            flush(inherit)
+        else:
+            flush()
+        found.extend(citations)
+        if inherit is not None:
+            current, current_end = inherit, m.end()
+    flush()
+
+    unique = list(dict.fromkeys(found))
+    return [c for c in unique
+            if not any(o is not c and o.instrument == c.instrument and len(o.path) > len(c.path)
+                       and o.path[:len(c.path)] == c.path for o in unique)]
+
+
+def load_result_records(paths: Sequence[str]) -> List[Dict]:
+    """
+    Flatten harness, comparison and JSONL checkpoint files or result sinks into scoring rows.
+
+    Records are streamed (batch.read_result_file), so only the rows are held
+    in memory, not the full responses.
+
+    A path may be prefixed with "label=" to name the model for harness files
+    (default: the file's test_type, or its stem). Comparison files contribute
+    one row per model in each record's "responses".
+
+    Returns:
+        Dicts with model, qa_id, contract_file, expected_citation, answer
+    """
+    rows = []
+    for spec in paths:
+        default_label, records = read_result_file(spec)
+        for record in records:
+            if 'responses' in record:
+                responses = record['responses'].items()
+            else:
+                responses = [(default_label, record.get('response') or {})]
+            for model, response in responses:
+                rows.append({
+                    'model': model,
+                    'qa_id': record.get('qa_id'),
+                    'contract_file': record.get('contract_file'),
+                    'expected_citation': record.get('expected_citation') or '',
+                    'answer': response.get('answer') or '',
+                    'error': bool(response.get('error')),
+                })
+    return rows
+
+
+def score_records(rows: Sequence[Dict]) -> Tuple['pd.DataFrame', 'pd.DataFrame']:
+    """
+    Score citation precision/recall for many answers at once.
+
+    Citations are extracted once per distinct text, then expected and extracted citations are joined as long
+    tables on (row, instrument), and matches are aggregated with groupby.
+
+    Args:
+        rows: Output of load_result_records() (or dicts with the same keys)
+
+    Returns:
+        (per-question scoreboard, per-model scoreboard) DataFrames
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame(list(rows), columns=['model', 'qa_id', 'contract_file', 'expected_citation',
+                                              'answer', 'error'])
+    frame['row'] = np.arange(len(frame))
+
+    # Each distinct text is parsed once (expected citations repeat per model, replayed answers repeat per run)
+    parsed: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    def citations_of(text: str) -> List[Tuple[str, str, str]]:
+        if text not in parsed:
+            parsed[text] = [(c.instrument, c.key, str(c)) for c in extract_citations(text)]
+        return parsed[text]
+
+    expected_long, extracted_long = [], []
+    for row, expected_text, answer in zip(frame['row'], frame['expected_citation'], frame['answer']):
+        expected_long.extend((row,) + c for c in citations_of(expected_text))
+        extracted_long.extend((row,) + c for c in citations_of(answer))
+
+    columns = ['row', 'instrument', 'key', 'label']
+    expected = pd.DataFrame(expected_long, columns=columns)
+    extracted = pd.DataFrame(extracted_long, columns=columns)
+
+    pairs = expected.merge(extracted, on=['row', 'instrument'], suffixes=('_exp', '_ext'))
+    exp_keys = pairs['key_exp'].to_numpy(dtype=object)
+    ext_keys = pairs['key_ext'].to_numpy(dtype=object)
+    covers = np.fromiter((x.startswith(e) for x, e in zip(ext_keys, exp_keys)), dtype=bool, count=len(pairs))
+    related = covers | np.fromiter((e.startswith(x) for x, e in zip(ext_keys, exp_keys)), dtype=bool,
+                                   count=len(pairs))
+
+    found_ids = pd.MultiIndex.from_frame(pairs.loc[covers, ['row', 'label_exp']]).unique()
+    relevant_ids = pd.MultiIndex.from_frame(pairs.loc[related, ['row', 'label_ext']]).unique()
+
+    expected['found'] = pd.MultiIndex.from_frame(expected[['row', 'label']]).isin(found_ids)
+    extracted['relevant'] = pd.MultiIndex.from_frame(extracted[['row', 'label']]).isin(relevant_ids)
+
+    exp_stats = expected.groupby('row').agg(n_expected=('label', 'size'), n_found=('found', 'sum'))
+    ext_stats = extracted.groupby('row').agg(n_extracted=('label', 'size'), n_relevant=('relevant', 'sum'))
+    missing = expected.loc[~expected['found']].groupby('row')['label'].agg('; '.join).rename('missing')
+
+    board = frame.drop(columns=['answer']).join(exp_stats, on='row').join(ext_stats, on='row').join(missing, on='row')
+    for column in ('n_expected', 'n_found', 'n_extracted', 'n_relevant'):
+        board[column] = board[column].fillna(0).astype(int)
+    board['missing'] = board['missing'].fillna('')
+    board['recall'] = (board['n_found'] / board['n_expected']).where(board['n_expected'] > 0)
+    board['precision'] = (board['n_relevant'] / board['n_extracted']).where(board['n_extracted'] > 0)
+    board.loc[(board['n_extracted'] == 0) & (board['n_expected'] > 0), 'precision'] = 0.0
+    board['f1'] = (2 * board['precision'] * board['recall'] / (board['precision'] + board['recall'])).where(
+        (board['precision'] + board['recall']) > 0, 0.0).where(board['recall'].notna())
+
+    by_model = board.groupby('model', sort=False).agg(
+        questions=('qa_id', 'size'),
+        errors=('error', 'sum'),
+        mean_recall=('recall', 'mean'),
+        mean_precision=('precision', 'mean'),
+        mean_f1=('f1', 'mean'),
+        expected=('n_expected', 'sum'),
+        found=('n_found', 'sum'),
+        extracted=('n_extracted', 'sum'),
+        relevant=('n_relevant', 'sum'),
+    )
+    by_model['micro_recall'] = by_model['found'] / by_model['expected'].where(by_model['expected'] > 0)
+    by_model['micro_precision'] = by_model['relevant'] / by_model['extracted'].where(by_model['extracted'] > 0)
+
+    board = board.drop(columns=['row'])[['model', 'qa_id', 'contract_file', 'n_expected', 'n_found', 'n_extracted',
+                                         'n_relevant', 'recall', 'precision', 'f1', 'missing', 'error',
+                                         'expected_citation']]
+    return board, by_model.reset_index()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut score."""
+    import argparse
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(prog='lawstronaut score',
+                                     description='Score cited law against expected_citation')
+    parser.add_argument('results', nargs='+',
+                        help='Result files (.json / .jsonl) or result directories; prefix with "label=" to name a harness file')
+    parser.add_argument('--csv', type=Path, help='Write the per-question scoreboard as CSV')
+    parser.add_argument('--json', type=Path, help='Write both scoreboards as JSON')
+    parser.add_argument('--show-missing', action='store_true', help='List missed citations per question')
+    args = parser.parse_args(argv)
+
+    rows = load_result_records(args.results)
+    if not rows:
+        print("No result records found")
+        return 1
+    board, by_model = score_records(rows)
+
+    with pd.option_context('display.width', 160, 'display.max_colwidth', 60, 'display.float_format', '{:.2f}'.format):
+        columns = ['model', 'qa_id', 'n_expected', 'n_found', 'n_extracted', 'recall', 'precision']
+        if args.show_missing:
+            columns.append('missing')
+        print(board[columns].to_string(index=False))
+        print()
+        print(by_model[['model', 'questions', 'errors', 'mean_recall', 'micro_recall', 'mean_precision',
+                        'micro_precision', 'mean_f1']].to_string(index=False))
+
+    if args.csv:
+        board.to_csv(args.csv, index=False)
+        print(f"\nPer-question scoreboard: {args.csv}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'questions': json.loads(board.to_json(orient='records')),
+                'models': json.loads(by_model.to_json(orient='records')),
+            }, f, indent=2)
+        print(f"Scoreboards: {args.json}")
+    return 0
@@ -0,0 +1,307 @@
+"""
+Typed, indexed access to CUAD master_clauses.csv
+
+The CSV (510 contracts x 41 clause categories, each with a context column and
+an "-Answer" column) is parsed once into pyarrow-backed string columns with
+categorical jurisdictions, cached as Parquet, and indexed by contract file
+name, governing law and a boolean clause-presence matrix. Cohort filters such
+as "UK governing law with a non-compete" are vectorized mask operations.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .paths import CACHE_DIR, DATA_DIR
+
+DEFAULT_CSV_PATH = DATA_DIR / 'master_clauses.csv'
+DEFAULT_PARQUET_PATH = CACHE_DIR / 'master_clauses.parquet'
+
+# Context cells for absent clauses are empty or an empty Python list literal
+_EMPTY_CONTEXT = {'', '[]', 'nan'}
+
+# Jurisdiction groups used by the test matrix cohorts (matched as whole words, see law_mentions)
+JURISDICTION_GROUPS = {
+    'UK': ('england', 'wales', 'scotland', 'northern ireland', 'united kingdom', 'english'),
+    'EU': ('germany', 'france', 'netherlands', 'ireland', 'luxembourg', 'belgium', 'spain', 'italy',
+           'sweden', 'denmark', 'austria', 'finland', 'european union'),
+    'California': ('california',),
+}
+
+
+# Words that turn a member name into a different jurisdiction ("New South Wales" is not UK,
+# "Northern Ireland" is not EU, "New England" is a US region)
+JURISDICTION_EXCLUSIONS = {
+    'wales': ('new south',),
+    'ireland': ('northern',),
+    'england': ('new',),
+}
+
+
+def _jurisdiction_pattern(name: str) -> str:
+    exclusions = ''.join(f'(?<!{re.escape(prefix)} )' for prefix in JURISDICTION_EXCLUSIONS.get(name, ()))
+    return exclusions + r'\b' + re.escape(name) + r'\b'
+
+
+def law_mentions(governing_law: Optional[str], *jurisdictions: str) -> bool:
+    """
+    True if a governing law names any of `jurisdictions` as whole words (case-insensitive).
+
+    Group names from JURISDICTION_GROUPS ("UK", "EU", "California") expand to
+    their member jurisdictions.
+    """
+    if not governing_law:
+        return False
+    names = [name for jurisdiction in jurisdictions
+             for name in JURISDICTION_GROUPS.get(jurisdiction, (jurisdiction.lower(),))]
+    law = ' '.join(governing_law.lower().split())
+    return any(re.search(_jurisdiction_pattern(name), law) for name in names)
+
+
+def _slug(category: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', category.lower()).strip('_')
+
+
+def _source_stamp(csv_path: Path) -> Dict:
+    """Identity of a CSV as stored in its Parquet cache."""
+    stat = csv_path.stat()
+    return {'path': str(csv_path.resolve()), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def normalize_governing_law(value: Optional[str]) -> Optional[str]:
+    """Collapse whitespace/case variants of a Governing Law answer ("new york " -> "New York")."""
+    if value is None or pd.isna(value):
+        return None
+    value = ' '.join(str(value).split()).strip(' .;,')
+    if not value or value.lower() in _EMPTY_CONTEXT:
+        return None
+    return value.title() if value.islower() or value.isupper() else value
+
+
+def parse_master_clauses(csv_path: Path = DEFAULT_CSV_PATH) -> pd.DataFrame:
+    """
+    Parse master_clauses.csv into a typed frame indexed by contract file name.
+
+    Columns:
+        document_name        string[pyarrow]
+        governing_law        category (normalized Governing Law answer)
+        <slug>_context       string[pyarrow] clause context, one per CUAD category
+        <slug>_answer        string[pyarrow] CUAD answer, one per CUAD category
+        has_<slug>           bool clause presence, one per CUAD category
+
+    Args:
+        csv_path: Path to master_clauses.csv
+
+    Returns:
+        DataFrame indexed by "contract" (the full_contract_txt file name)
+    """
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    categories = [c[:-len('-Answer')] for c in raw.columns if c.endswith('-Answer')]
+
+    frame = pd.DataFrame(index=pd.Index(
+        raw['Filename'].map(lambda name: Path(name).stem + '.txt'), name='contract'
+    ))
+    frame['document_name'] = raw.get('Document Name-Answer', raw['Filename']).astype('string[pyarrow]').values
+    frame['governing_law'] = pd.Categorical(
+        raw.get('Governing Law-Answer', pd.Series([''] * len(raw))).map(normalize_governing_law).values
+    )
+
+    for category in categories:
+        slug = _slug(category)
+        context = raw[category].str.strip()
+        frame[f'{slug}_context'] = context.astype('string[pyarrow]').values
+        frame[f'{slug}_answer'] = raw[f'{category}-Answer'].astype('string[pyarrow]').values
+        frame[f'has_{slug}'] = (~context.str.lower().isin(_EMPTY_CONTEXT)).values
+
+    frame.attrs['categories'] = categories
+    return frame
+
+
+class ClauseTable:
+    """master_clauses.csv with prebuilt indexes for cohort selection."""
+
+    def __init__(self, frame: pd.DataFrame, categories: Optional[List[str]] = None):
+        """
+        Wrap a frame produced by parse_master_clauses().
+
+        Args:
+            frame: Parsed master clauses frame
+            categories: CUAD category names (default: taken from frame.attrs or has_* columns)
+        """
+        self.frame = frame
+        self.categories = categories or frame.attrs.get('categories') or [
+            c[len('has_'):] for c in frame.columns if c.startswith('has_')
+        ]
+        self._slugs = {category: _slug(category) for category in self.categories}
+
+        # Document-name index: contract file name -> row, and normalized title -> row
+        self.contracts = frame.index.to_numpy()
+        self._rows = {name: i for i, name in enumerate(self.contracts)}
+        self._titles = {
+            str(title).strip().lower(): i
+            for i, title in enumerate(frame['document_name'].to_numpy())
+            if isinstance(title, str)
+        }
+
+        # Governing-law index: categorical codes, so jurisdiction filters compare small ints
+        governing_law = frame['governing_law'].astype('category')
+        self._law_codes = governing_law.cat.codes.to_numpy()
+        self._law_categories = [str(c).lower() for c in governing_law.cat.categories]
+
+        # Clause-presence index: contracts x categories boolean matrix
+        self._presence = np.column_stack([
+            frame[f'has_{self._slugs[category]}'].to_numpy(dtype=bool) for category in self.categories
+        ]) if self.categories else np.zeros((len(frame), 0), dtype=bool)
+        self._category_columns = {category: i for i, category in enumerate(self.categories)}
+
+    @classmethod
+    def load(cls, csv_path: Path = DEFAULT_CSV_PATH,
+             parquet_path: Path = DEFAULT_PARQUET_PATH) -> 'ClauseTable':
+        """
+        Load the clause table, using the Parquet cache when it was built from this CSV.
+
+        The cache records the resolved path, size and mtime of the CSV it was
+        parsed from and is rebuilt when any of them differ.
+
+        Args:
+            csv_path: Path to master_clauses.csv
+            parquet_path: Parquet cache location
+
+        Raises:
+            FileNotFoundError: If the CSV does not exist
+        """
+        csv_path = Path(csv_path)
+        parquet_path = Path(parquet_path)
+
+        if not csv_path.exists():
+            raise FileNotFoundError(
+                f"master_clauses.csv not found: {csv_path}\n"
+                f"See data/README.md for download instructions"
+            )
+        source = _source_stamp(csv_path)
+
+        if parquet_path.exists():
+            frame = pd.read_parquet(parquet_path)
+            if frame.attrs.get('source') == source:
+                categories = [c for c in frame.attrs.get('categories', [])] or None
+                return cls(frame, categories)
+
+        frame = parse_master_clauses(csv_path)
+        frame.attrs['source'] = source
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        frame.to_parquet(parquet_path)
+        return cls(frame, frame.attrs['categories'])
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def row(self, contract: str) -> pd.Series:
+        """
+        Look up one contract by file name (with or without .txt/.pdf) or document title.
+
+        Raises:
+            KeyError: If the contract is unknown
+        """
+        name = contract if contract.endswith('.txt') else Path(contract).stem + '.txt'
+        if name in self._rows:
+            return self.frame.iloc[self._rows[name]]
+        title = contract.strip().lower()
+        if title in self._titles:
+            return self.frame.iloc[self._titles[title]]
+        raise KeyError(f"Contract not in master_clauses.csv: {contract}")
+
+    def _category_index(self, category: str) -> int:
+        if category in self._category_columns:
+            return self._category_columns[category]
+        for name, index in self._category_columns.items():
+            if _slug(name) == _slug(category):
+                return index
+        raise KeyError(f"Unknown CUAD category: {category}")
+
+    def governing_law_mask(self, *jurisdictions: str) -> np.ndarray:
+        """
+        Rows whose governing law names any of `jurisdictions` (see law_mentions).
+
+        Group names from JURISDICTION_GROUPS ("UK", "EU", "California") expand to
+        their member jurisdictions.
+        """
+        codes = [i for i, law in enumerate(self._law_categories) if law_mentions(law, *jurisdictions)]
+        return np.isin(self._law_codes, codes)
+
+    def presence_mask(self, categories: Iterable[str], require_all: bool = True) -> np.ndarray:
+        """Rows that contain all (or any) of the given clause categories."""
+        columns = [self._category_index(category) for category in categories]
+        if not columns:
+            return np.ones(len(self.contracts), dtype=bool)
+        subset = self._presence[:, columns]
+        return subset.all(axis=1) if require_all else subset.any(axis=1)
+
+    def select(self, governing_law: Iterable[str] = (), has: Iterable[str] = (),
+               has_any: Iterable[str] = (), lacks: Iterable[str] = ()) -> List[str]:
+        """
+        Select a contract cohort.
+
+        Args:
+            governing_law: Jurisdictions or groups ("UK", "England", "New York", ...); any may match
+            has: Clause categories that must all be present
+            has_any: Clause categories of which at least one must be present
+            lacks: Clause categories that must all be absent
+
+        Returns:
+            Contract file names (as used in full_contract_txt)
+        """
+        mask = np.ones(len(self.contracts), dtype=bool)
+        governing_law = list(governing_law)
+        if governing_law:
+            mask &= self.governing_law_mask(*governing_law)
+        has = list(has)
+        if has:
+            mask &= self.presence_mask(has, require_all=True)
+        has_any = list(has_any)
+        if has_any:
+            mask &= self.presence_mask(has_any, require_all=False)
+        lacks = list(lacks)
+        if lacks:
+            mask &= ~self.presence_mask(lacks, require_all=False)
+        return self.contracts[mask].tolist()
+
+    def governing_law_counts(self) -> Dict[str, int]:
+        """Number of contracts per normalized governing law, most common first."""
+        return self.frame['governing_law'].value_counts().to_dict()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut clauses."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(prog='lawstronaut clauses',
+                                     description='Select CUAD contract cohorts from master_clauses.csv')
+    parser.add_argument('--csv', type=Path, default=DEFAULT_CSV_PATH, help='Path to master_clauses.csv')
+    parser.add_argument('--governing-law', action='append', default=[],
+                        help='Jurisdiction or group (UK, EU, California); repeatable, any may match')
+    parser.add_argument('--has', action='append', default=[], help='Clause category that must be present')
+    parser.add_argument('--has-any', action='append', default=[], help='At least one of these categories')
+    parser.add_argument('--lacks', action='append', default=[], help='Clause category that must be absent')
+    parser.add_argument('--count', action='store_true', help='Only print the cohort size')
+    args = parser.parse_args(argv)
+
+    table = ClauseTable.load(csv_path=args.csv)
+    start = time.perf_counter()
+    try:
+        cohort = table.select(governing_law=args.governing_law, has=args.has,
+                              has_any=args.has_any, lacks=args.lacks)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        print(f"Categories: {', '.join(table.categories)}")
+        return 2
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not args.count:
+        for contract in cohort:
+            print(contract)
+    print(f"\n{len(cohort)} of {len(table)} contracts ({elapsed_ms:.3f} ms)")
+    return 0
@@ -0,0 +1,332 @@
+"""
+Fan-out comparison of several models on the same prompts
+
+For every (question, contract) pair the contract is read and the prompt is
+built once, then every model configuration is queried concurrently through
+the provider registry. The answers are merged into one record per pair:
+
+    {"qa_id", "contract_file", "question", ..., "prompt_sha256",
+     "responses": {"perplexity": {...}, "gemini-simple": {...}, ...},
+     "wall_seconds", "model_seconds"}
+
+so an N-way comparison takes about as long as its slowest model rather than
+the sum of all of them.
+"""
+
+import hashlib
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .chunking import chunk_contract
+from .prompts import SYSTEM_INSTRUCTION, build_prompt
+from .providers import ModelConfig, get_provider, parse_model_spec
+from .response_cache import ResponseCache
+from .retrieval import format_sections, select_sections
+from .runner import is_rate_limited
+
+# Configurations of THREE_WAY_COMPARISON.md
+COMPARISON_PRESETS = {
+    'perplexity': ModelConfig(provider='perplexity', model='sonar-pro', max_output_tokens=6000,
+                              label='perplexity'),
+    'gemini-simple': ModelConfig(provider='vertex', model='gemini-2.0-flash-exp', max_output_tokens=6000,
+                                 top_k=40, label='gemini-simple'),
+    'gemini-enhanced': ModelConfig(provider='vertex', model='gemini-2.0-flash-exp', max_output_tokens=32000,
+                                   top_k=40, label='gemini-enhanced'),
+}
+DEFAULT_MODELS = ('perplexity', 'gemini-simple', 'gemini-enhanced')
+
+
+def resolve_models(specs: Sequence[str]) -> List[ModelConfig]:
+    """
+    Turn model specs into ModelConfigs.
+
+    A spec is a preset name (see COMPARISON_PRESETS), "provider:model" or a
+    bare model name, optionally followed by "@<max output tokens>", e.g.
+    "openai:gpt-4o@6000".
+
+    Raises:
+        ValueError: If a spec cannot be resolved or two specs share a name
+    """
+    configs = []
+    for spec in specs:
+        spec, _, max_tokens = spec.partition('@')
+        config = COMPARISON_PRESETS.get(spec) or parse_model_spec(spec)
+        if max_tokens:
+            config = replace(config, max_output_tokens=int(max_tokens),
+                             label=f"{config.name}@{max_tokens}")
+        configs.append(config)
+
+    names = [config.name for config in configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate model names: {', '.join(duplicates)} (set distinct labels)")
+    return configs
+
+
+def load_model_configs(path: Path) -> List[ModelConfig]:
+    """Load a JSON or YAML list of ModelConfig field dicts."""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML model lists requires PyYAML: pip install pyyaml")
+            entries = yaml.safe_load(f)
+        else:
+            entries = json.load(f)
+    return [ModelConfig(**entry) for entry in entries]
+
+
+class ComparisonRunner:
+    """Queries every model configuration for a pair concurrently and merges the results."""
+
+    def __init__(self, configs: Sequence[ModelConfig], read_contract: Callable[[str], str],
+                 retrieval: Optional[Dict] = None, cache: Optional[ResponseCache] = None,
+                 pairs_in_flight: int = 2, max_retries: int = 3):
+        """
+        Args:
+            configs: Model configurations to compare
+            read_contract: Returns the text of a contract file name
+            retrieval: select_sections() settings (top_k, token_budget); None sends the full contract
+            cache: Optional response cache shared by all models
+            pairs_in_flight: Pairs processed at once (sizes the variant thread pool)
+            max_retries: Retries per model after rate-limited responses
+        """
+        self.configs = list(configs)
+        self.read_contract = read_contract
+        self.retrieval = retrieval
+        self.cache = cache
+        self.max_retries = max_retries
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.configs) * pairs_in_flight))
+
+    def _query(self, config: ModelConfig, prompt: str) -> Dict:
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(config.model, SYSTEM_INSTRUCTION, prompt, config.to_dict())
+            cached = self.cache.get(cache_key)
+            if cached:
+                cached['cache_hit'] = True
+                return cached
+
+        provider = get_provider(config.provider)
+        retries = 0
+        while True:
+            result = provider.generate(SYSTEM_INSTRUCTION, prompt, config)
+            if not is_rate_limited({'response': result}) or retries >= self.max_retries:
+                break
+            # Back off this model only; the other variants of the pair keep running
+            retries += 1
+            time.sleep(2.0 ** retries * random.uniform(1.0, 1.5))
+
+        if cache_key and not result.get('error'):
+            self.cache.put(cache_key, result)
+        return result
+
+    def run_pair(self, question: Dict) -> Dict:
+        """
+        Build the prompt for one pair once and query every model concurrently.
+
+        Args:
+            question: Question dict with qa_id, contract_file, question_text, ...
+
+        Returns:
+            Merged comparison record
+        """
+        start_time = time.time()
+        full_contract = self.read_contract(question['contract_file'])
+        question_text = question['question_text']
+
+        contract_text = full_contract
+        record_extra = {}
+        if self.retrieval:
+            chunks = chunk_contract(full_contract)
+            selected = select_sections(chunks, question_text, question.get('regulation_focus', ''),
+                                       **self.retrieval)
+            contract_text = format_sections(selected)
+            record_extra['sections_sent'] = [chunk.to_dict() for chunk in selected]
+        prompt = build_prompt(contract_text, question_text, excerpts=bool(self.retrieval))
+
+        futures = {config.name: self._pool.submit(self._query, config, prompt) for config in self.configs}
+        responses = {name: future.result() for name, future in futures.items()}
+
+        record = {
+            "qa_id": question['qa_id'],
+            "question_type": question.get('question_type', ''),
+            "regulation_focus": question.get('regulation_focus', ''),
+            "contract_file": question['contract_file'],
+            "contract_size_chars": len(full_contract),
+            "question": question_text,
+            "expected_answer": question.get('expected_answer', ''),
+            "expected_citation": question.get('expected_citation', ''),
+            "prompt_sha256": hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+            "prompt_chars": len(prompt),
+            **record_extra,
+            "responses": responses,
+            "wall_seconds": time.time() - start_time,
+            "model_seconds": sum(r.get('elapsed_seconds') or 0.0 for r in responses.values()),
+        }
+        return record
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def contract_reader(data_dir: Path) -> Callable[[str], str]:
+    """read_contract() for a directory: served from the packed store, falling back to files."""
+    from .contract_store import ContractStore
+
+    data_dir = Path(data_dir)
+    try:
+        store = ContractStore.open_or_build(data_dir)
+    except OSError:
+        store = None
+
+    def read(name: str) -> str:
+        for candidate in (name, f"{name}.txt"):
+            if store and candidate in store and store.is_current(candidate):
+                return store.text(candidate)
+            path = data_dir / candidate
+            if path.exists():
+                return path.read_text(encoding='utf-8', errors='ignore')
+        raise FileNotFoundError(f"Contract file not found: {name}\nLooked in: {data_dir}")
+
+    return read
+
+
+def summarize(records: List[Dict], configs: Sequence[ModelConfig]) -> Dict[str, Dict]:
+    """Per-model success count, mean latency and token totals."""
+    summary = {}
+    for config in configs:
+        results = [r['responses'][config.name] for r in records if config.name in r.get('responses', {})]
+        ok = [r for r in results if not r.get('error')]
+        summary[config.name] = {
+            'ok': len(ok),
+            'errors': len(results) - len(ok),
+            'mean_seconds': sum(r.get('elapsed_seconds') or 0.0 for r in ok) / len(ok) if ok else None,
+            'total_tokens': sum((r.get('tokens_used') or {}).get('total') or 0 for r in ok),
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut compare."""
+    import argparse
+
+    from .batch import JsonlCheckpoint, load_matrix, pair_key, parse_shard, safe_task, shard_pairs
+    from .paths import FULL_CONTRACT_DIR, TEST_CONTRACT_DIR
+    from .questions import DEFAULT_QUESTIONS
+    from .response_cache import CACHE_MODES
+    from .runner import TokenBucketLimiter, run_in_order
+
+    parser = argparse.ArgumentParser(prog='lawstronaut compare',
+                                     description='Ask several models the same questions concurrently')
+    parser.add_argument('--models', nargs='+', default=list(DEFAULT_MODELS),
+                        help=f"Presets ({', '.join(COMPARISON_PRESETS)}), provider:model or model, "
+                             f"optionally @max_tokens (default: {' '.join(DEFAULT_MODELS)})")
+    parser.add_argument('--models-file', type=Path, help='JSON/YAML list of ModelConfig dicts (overrides --models)')
+    parser.add_argument('--questions', default='all', help='"all" or comma-separated IDs like "1A,5A"')
+    parser.add_argument('--matrix', type=Path, help='Question x contract matrix (see lawstronaut.batch)')
+    parser.add_argument('--data-dir', type=Path, help='Contract directory (default: data/test_contracts)')
+    parser.add_argument('--retrieval', choices=['full', 'sections'], default='full')
+    parser.add_argument('--top-k', type=int, default=8)
+    parser.add_argument('--context-tokens', type=int, default=30000)
+    parser.add_argument('--cache', choices=CACHE_MODES, default='off', help='Response cache mode')
+    parser.add_argument('--concurrency', type=int, default=2, help='Pairs in flight (each fans out to every model)')
+    parser.add_argument('--rpm', type=float, default=30.0, help='Pairs started per minute')
+    parser.add_argument('--offline', action='store_true', help='Send every model to the deterministic fake provider')
+    parser.add_argument('--output', type=Path, default=Path('comparison_results.json'))
+    parser.add_argument('--checkpoint', type=Path, help='JSONL checkpoint (default: --output with .jsonl)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+    parser.add_argument('--shard', help='Run only shard i of n, e.g. 0/4')
+    args = parser.parse_args(argv)
+
+    try:
+        configs = load_model_configs(args.models_file) if args.models_file else resolve_models(args.models)
+    except (ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 2
+    if args.offline:
+        configs = [replace(config, provider='fake', label=config.name) for config in configs]
+
+    questions = load_matrix(args.matrix) if args.matrix else [dict(q) for q in DEFAULT_QUESTIONS]
+    if args.questions != 'all':
+        wanted = {q.strip() for q in args.questions.split(',')}
+        questions = [q for q in questions if q['qa_id'] in wanted]
+    if args.shard:
+        questions = shard_pairs(questions, *parse_shard(args.shard))
+    if not questions:
+        print("Error: no questions selected")
+        return 2
+
+    checkpoint = JsonlCheckpoint(args.checkpoint or args.output.with_suffix('.jsonl'), resume=not args.restart)
+    # A pair is re-run if it errored or was last compared against a different model set
+    names = {config.name for config in configs}
+    pending = checkpoint.pending(questions)
+    pending += [q for q in questions if q not in pending
+                and not names <= set(checkpoint.results[pair_key(q)].get('responses', {}))]
+    data_dir = args.data_dir or (TEST_CONTRACT_DIR if TEST_CONTRACT_DIR.exists() else FULL_CONTRACT_DIR)
+
+    print(f"Comparing {len(configs)} model(s): {', '.join(c.name for c in configs)}")
+    print(f"{len(pending)} of {len(questions)} pair(s) to run, {args.concurrency} in flight\n")
+
+    runner = ComparisonRunner(
+        configs,
+        contract_reader(data_dir),
+        retrieval={'top_k': args.top_k, 'token_budget': args.context_tokens} if args.retrieval == 'sections' else None,
+        cache=ResponseCache(mode=args.cache) if args.cache != 'off' else None,
+        pairs_in_flight=args.concurrency,
+    )
+
+    def report(question: Dict, record: Dict) -> None:
+        checkpoint.append(question, record)
+        if 'responses' not in record:
+            print(f"✗ {question['qa_id']}: {record['response']['error']}")
+            return
+        timings = ', '.join(
+            f"{name} ✗" if r.get('error') else f"{name} {r.get('elapsed_seconds') or 0.0:.1f}s"
+            for name, r in record['responses'].items()
+        )
+        print(f"✓ {question['qa_id']} ({record['wall_seconds']:.1f}s wall): {timings}")
+
+    start = time.time()
+    try:
+        run_in_order(
+            safe_task(runner.run_pair),
+            pending,
+            concurrency=args.concurrency,
+            limiter=TokenBucketLimiter(requests_per_minute=args.rpm, burst=args.concurrency),
+            retry_if=lambda record: False,  # rate limits are retried per model inside run_pair
+            on_result=report,
+        )
+    finally:
+        runner.close()
+    elapsed = time.time() - start
+    records = checkpoint.ordered(questions)
+    checkpoint.close()
+
+    summary = summarize(records, configs)
+    output_data = {
+        "test_date": datetime.now().isoformat(),
+        "test_type": "model_comparison",
+        "models": [config.to_dict() for config in configs],
+        "summary": summary,
+        "total_questions": len(records),
+        "results": records,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+
+    model_seconds = sum(r.get('model_seconds', 0.0) for r in records)
+    print(f"\nWall time {elapsed:.1f}s for {model_seconds:.1f}s of model time")
+    for name, stats in summary.items():
+        mean = f"{stats['mean_seconds']:.1f}s" if stats['mean_seconds'] is not None else '-'
+        print(f"  {name:24} ok={stats['ok']} errors={stats['errors']} mean={mean} tokens={stats['total_tokens']:,}")
+    print(f"Results saved to: {args.output}")
+    return 0
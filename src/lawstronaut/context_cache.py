@@ -0,0 +1,269 @@
+"""
+Registry of server-side cached-content handles for prompt prefixes
+
+Every question about a contract repeats the same system instruction and the
+same contract text. Gemini can cache that prefix server-side
+(client.caches.create) and bill later requests only for the question suffix.
+This registry maps a hash of (model, system instruction, prefix, tools) to
+the cached-content handle, tracks each handle's expiry, and persists the map
+so handles are reused across runs until they expire.
+
+Several processes (e.g. shards of one sweep) may share the registry file:
+every write merges with the file under an exclusive lock, so one process
+never drops another's handles. Handles are billed for storage until their
+TTL runs out; delete_created() removes the ones a run made when it ends.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are still atomic, but concurrent merges may race
+    fcntl = None
+
+from .chunking import estimate_tokens
+from .paths import CACHE_DIR
+from .response_cache import to_jsonable
+
+DEFAULT_REGISTRY_PATH = CACHE_DIR / 'context_caches.json'
+DEFAULT_TTL_SECONDS = 3600
+# Gemini rejects cached contents below a model-specific minimum size
+DEFAULT_MIN_TOKENS = 4096
+# Handles this close to expiry are replaced rather than used
+EXPIRY_MARGIN_SECONDS = 60
+
+NOT_FOUND_MARKERS = ('404', 'NOT_FOUND', 'not found', 'expired')
+
+
+def is_missing_cache_error(error: Any) -> bool:
+    """True if an API error means a cached-content handle no longer exists."""
+    error = str(error)
+    return 'cache' in error.lower() and any(marker in error for marker in NOT_FOUND_MARKERS)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive inter-process lock on a sidecar .lock file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(path.suffix + '.lock'), 'a') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _expiry_epoch(handle: Any, fallback: float) -> float:
+    expire_time = getattr(handle, 'expire_time', None)
+    if expire_time is not None and hasattr(expire_time, 'timestamp'):
+        return expire_time.timestamp()
+    return fallback
+
+
+class ContextCacheRegistry:
+    """Thread-safe get-or-create of cached-content handles, persisted as JSON."""
+
+    def __init__(self, client: Any, model_name: str, path: Optional[Path] = DEFAULT_REGISTRY_PATH,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS, min_tokens: int = DEFAULT_MIN_TOKENS):
+        """
+        Initialize the registry.
+
+        Args:
+            client: genai.Client (or FakeGenaiClient) exposing client.caches
+            model_name: Model the cached contents are created for
+            path: JSON registry file (None keeps the registry in memory only)
+            ttl_seconds: Lifetime requested for new handles
+            min_tokens: Prefixes estimated below this size are not cached
+        """
+        self.client = client
+        self.model_name = model_name
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.entries: Dict[str, Dict] = self._read()
+        self.created = 0
+        self.reused = 0
+        # Handle names created by this registry instance (delete_created)
+        self.created_names: List[str] = []
+
+    @staticmethod
+    def make_key(model_name: str, system_instruction: str, prefix: str,
+                 tools: Optional[List[Any]] = None) -> str:
+        """Content address of a cacheable prefix."""
+        payload = json.dumps(
+            {'model': model_name, 'system_instruction': system_instruction,
+             'prefix': prefix, 'tools': tools or []},
+            sort_keys=True, ensure_ascii=False, default=to_jsonable
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _read(self) -> Dict[str, Dict]:
+        if not (self.path and self.path.exists()):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    def _update(self, put: Optional[Dict[str, Dict]] = None, remove: Iterable[str] = ()) -> None:
+        """
+        Apply changes to the registry, merged with the file (caller holds self._lock).
+
+        Args:
+            put: Entries to add or replace, by key
+            remove: Handle names to forget
+        """
+        remove = set(remove)
+
+        def apply(entries: Dict[str, Dict]) -> Dict[str, Dict]:
+            entries.update(put or {})
+            return {key: entry for key, entry in entries.items() if entry['name'] not in remove}
+
+        if not self.path:
+            self.entries = apply(self.entries)
+            return
+        with _file_lock(self.path):
+            # Start from the file, so handles other processes added since our last read are kept
+            entries = apply(self._read())
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=1)
+            os.replace(tmp, self.path)
+        self.entries = entries
+
+    def refresh(self) -> None:
+        """Pick up handles other processes recorded since this registry was read."""
+        if self.path:
+            with self._lock:
+                self.entries = self._read()
+
+    def _live_entry(self, key: str, now: float) -> Optional[Dict]:
+        entry = self.entries.get(key)
+        if entry and entry['model'] == self.model_name and entry['expires_at'] - EXPIRY_MARGIN_SECONDS > now:
+            return entry
+        return None
+
+    def get_or_create(self, system_instruction: str, prefix: str,
+                      tools: Optional[List[Any]] = None, label: str = '') -> Optional[str]:
+        """
+        Return a live cached-content name for the prefix, creating one if needed.
+
+        Concurrent callers for the same prefix (e.g. Q1A and Q1B on one
+        contract) wait for a single create call instead of racing.
+
+        Args:
+            system_instruction: System instruction stored in the cache
+            prefix: Prompt prefix (contract block) stored in the cache
+            tools: Tools stored in the cache (cached requests cannot add tools)
+            label: Display name, e.g. the contract file name
+
+        Returns:
+            Cached-content name, or None if the prefix is too small to cache
+        """
+        if estimate_tokens(system_instruction) + estimate_tokens(prefix) < self.min_tokens:
+            return None
+
+        key = self.make_key(self.model_name, system_instruction, prefix, tools)
+        with self._lock:
+            entry = self._live_entry(key, time.time())
+            if entry:
+                self.reused += 1
+                return entry['name']
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another process (e.g. a parallel shard) may have created it meanwhile
+            self.refresh()
+            with self._lock:
+                entry = self._live_entry(key, time.time())
+                if entry:
+                    self.reused += 1
+                    return entry['name']
+
+            requested_at = time.time()
+            handle = self.client.caches.create(
+                model=self.model_name,
+                config={
+                    'contents': [{'role': 'user', 'parts': [{'text': prefix}]}],
+                    'system_instruction': system_instruction,
+                    'tools': tools or None,
+                    'ttl': f'{int(self.ttl_seconds)}s',
+                    'display_name': f'lawstronaut {label}'[:120].strip(),
+                }
+            )
+            usage = getattr(handle, 'usage_metadata', None)
+            entry = {
+                'name': handle.name,
+                'model': self.model_name,
+                'label': label,
+                'prefix_sha256': hashlib.sha256(prefix.encode('utf-8')).hexdigest(),
+                'created_at': requested_at,
+                'expires_at': _expiry_epoch(handle, requested_at + self.ttl_seconds),
+                'tokens': getattr(usage, 'total_token_count', None) if usage else None,
+            }
+            with self._lock:
+                self._update(put={key: entry})
+                self.created += 1
+                self.created_names.append(entry['name'])
+            return entry['name']
+
+    def invalidate(self, name: str) -> None:
+        """Forget a handle the server no longer knows (deleted or expired early)."""
+        with self._lock:
+            self._update(remove=[name])
+
+    def purge_expired(self) -> int:
+        """Drop expired handles from the registry; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            self.entries = self._read() if self.path else self.entries
+            expired = [entry['name'] for entry in self.entries.values() if entry['expires_at'] <= now]
+            if expired:
+                self._update(remove=expired)
+        return len(expired)
+
+    def _delete(self, entries: List[Dict]) -> int:
+        with self._lock:
+            self._update(remove=[entry['name'] for entry in entries])
+        deleted = 0
+        now = time.time()
+        for entry in entries:
+            if entry['expires_at'] <= now:
+                continue
+            try:
+                self.client.caches.delete(name=entry['name'])
+                deleted += 1
+            except Exception as e:
+                print(f"  Could not delete cached content {entry['name']}: {e}")
+        return deleted
+
+    def delete_all(self) -> int:
+        """Delete every live handle in the registry server-side (stops storage billing); returns the count."""
+        self.refresh()
+        return self._delete(list(self.entries.values()))
+
+    def delete_created(self) -> int:
+        """
+        Delete the handles this registry created (e.g. at the end of a run); returns the count.
+
+        Other processes still using one of them get a not-found error, drop it
+        and create a fresh handle.
+        """
+        self.refresh()
+        created = set(self.created_names)
+        self.created_names = []
+        return self._delete([entry for entry in self.entries.values() if entry['name'] in created])
@@ -0,0 +1,282 @@
+"""
+Memory-mapped contract store
+
+Packs every contract text of a directory into one normalized UTF-8 blob plus
+a small JSON offset table. Opening the store only reads the offset table; the
+blob is memory-mapped, contracts are handed out as zero-copy memoryviews, and
+decoded strings are kept in an LRU so repeated questions against the same
+contract never touch the disk or the decoder again.
+
+Each pack writes a new content-named blob and then atomically replaces the
+offset table that points to it, so a store opened before a re-pack keeps
+reading the blob its table describes.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .paths import CACHE_DIR
+
+DEFAULT_STORE_DIR = CACHE_DIR / 'contract_store'
+
+BLOB_NAME = 'contracts.blob'  # Blob of tables written before blobs were versioned
+BLOB_GLOB = 'contracts*.blob'
+TABLE_NAME = 'contracts.json'
+
+
+def store_path_for(data_dir: Path) -> Path:
+    """Default store directory for a contract directory (one store per source dir)."""
+    digest = hashlib.sha1(str(Path(data_dir).resolve()).encode('utf-8')).hexdigest()[:10]
+    return DEFAULT_STORE_DIR / digest
+
+
+def pack_contracts(data_dir: Path, store_dir: Path) -> int:
+    """
+    Pack all *.txt contracts in `data_dir` into a store.
+
+    Text is decoded with errors='ignore' (as read_contract always did) and
+    re-encoded, so the blob is guaranteed valid UTF-8.
+
+    Args:
+        data_dir: Directory of contract .txt files
+        store_dir: Output directory for the blob and offset table
+
+    Returns:
+        Number of contracts packed
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    table = {'data_dir': str(Path(data_dir).resolve()), 'contracts': {}}
+
+    # Unique temp names, so concurrent packers of one store never write the same file
+    fd, tmp_blob = tempfile.mkstemp(dir=store_dir, prefix=BLOB_NAME + '.', suffix='.tmp')
+    digest = hashlib.sha1()
+    offset = 0
+    with os.fdopen(fd, 'wb') as blob:
+        for path in sorted(Path(data_dir).glob('*.txt')):
+            stat = path.stat()
+            data = path.read_bytes().decode('utf-8', errors='ignore').encode('utf-8')
+            blob.write(data)
+            digest.update(data)
+            table['contracts'][path.name] = {
+                'offset': offset,
+                'length': len(data),
+                'sha1': hashlib.sha1(data).hexdigest(),
+                'source_size': stat.st_size,
+                'source_mtime': stat.st_mtime,
+            }
+            offset += len(data)
+
+    # Same content, same name: replacing an identical blob is harmless to open readers
+    table['blob'] = f"contracts-{digest.hexdigest()[:16]}.blob"
+    table['blob_size'] = offset
+    os.replace(tmp_blob, store_dir / table['blob'])
+
+    # Swapping the table is what publishes the new blob
+    fd, tmp_table = tempfile.mkstemp(dir=store_dir, prefix=TABLE_NAME + '.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(table, f)
+    os.replace(tmp_table, store_dir / TABLE_NAME)
+
+    for old in store_dir.glob(BLOB_GLOB):
+        if old.name != table['blob']:
+            try:
+                # Stores that already opened it keep their handle (POSIX)
+                old.unlink()
+            except OSError:
+                # Still open on Windows; the next pack removes it
+                pass
+    return len(table['contracts'])
+
+
+class ContractStore:
+    """Read-only view over a packed contract blob."""
+
+    def __init__(self, store_dir: Path, max_cached: int = 32):
+        """
+        Open a store created by pack_contracts().
+
+        Args:
+            store_dir: Store directory
+            max_cached: Number of decoded contract strings kept in the LRU
+        """
+        self.store_dir = Path(store_dir)
+        self.max_cached = max_cached
+
+        self._lock = threading.Lock()
+        self._decoded: 'OrderedDict[str, str]' = OrderedDict()
+        self._file = None
+        self._mmap = None
+        self._view = None
+
+        # Open the blob together with its table: a concurrent re-pack then cannot
+        # swap different bytes in underneath the offsets read here
+        for attempt in range(3):
+            with open(self.store_dir / TABLE_NAME, encoding='utf-8') as f:
+                table = json.load(f)
+            blob_path = self.store_dir / table.get('blob', BLOB_NAME)
+            try:
+                self._file = open(blob_path, 'rb')
+            except FileNotFoundError:
+                # Re-packed between reading the table and opening its blob
+                if attempt == 2:
+                    raise
+                continue
+            expected = table.get('blob_size', sum(entry['length'] for entry in table['contracts'].values()))
+            size = os.fstat(self._file.fileno()).st_size
+            if size == expected:
+                break
+            self._file.close()
+            self._file = None
+            if attempt == 2:
+                raise ValueError(f"Contract store {self.store_dir} is inconsistent: {blob_path.name} has "
+                                 f"{size} bytes, its table expects {expected} (re-pack it)")
+        self.data_dir = Path(table['data_dir'])
+        self.contracts: Dict[str, Dict] = table['contracts']
+
+    @classmethod
+    def open_or_build(cls, data_dir: Path, store_dir: Optional[Path] = None, refresh: bool = False,
+                      **kwargs) -> 'ContractStore':
+        """
+        Open the store for `data_dir`, packing it first if it does not exist.
+
+        Args:
+            data_dir: Directory of contract .txt files
+            store_dir: Store location (default: derived from data_dir under the cache dir)
+            refresh: Re-pack if contracts were added, removed or modified since packing
+
+        Returns:
+            Opened ContractStore
+        """
+        store_dir = Path(store_dir) if store_dir else store_path_for(data_dir)
+        if not (store_dir / TABLE_NAME).exists():
+            pack_contracts(data_dir, store_dir)
+        store = cls(store_dir, **kwargs)
+        if refresh and store.is_stale():
+            store.close()
+            pack_contracts(data_dir, store_dir)
+            store = cls(store_dir, **kwargs)
+        return store
+
+    def _blob(self) -> memoryview:
+        # Map lazily so opening a store costs only the offset table and a file handle
+        if self._view is None:
+            if self._file is None:
+                raise ValueError("ContractStore is closed")
+            if os.fstat(self._file.fileno()).st_size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._view = memoryview(b'')
+        return self._view
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.contracts
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def names(self) -> List[str]:
+        """Contract file names in the store."""
+        return list(self.contracts)
+
+    def is_current(self, name: str) -> bool:
+        """True if the source file still matches what was packed (size and mtime)."""
+        entry = self.contracts.get(name)
+        if entry is None:
+            return False
+        try:
+            stat = (self.data_dir / name).stat()
+        except FileNotFoundError:
+            # Source removed after packing; the packed copy is still valid
+            return True
+        return stat.st_size == entry['source_size'] and stat.st_mtime == entry['source_mtime']
+
+    def is_stale(self) -> bool:
+        """True if the source directory no longer matches the packed contracts."""
+        names = {path.name for path in self.data_dir.glob('*.txt')}
+        return names != set(self.contracts) or not all(self.is_current(name) for name in names)
+
+    def view(self, name: str) -> memoryview:
+        """
+        Zero-copy UTF-8 bytes of a contract.
+
+        Raises:
+            KeyError: If the contract is not in the store
+        """
+        entry = self.contracts[name]
+        return self._blob()[entry['offset']:entry['offset'] + entry['length']]
+
+    def text(self, name: str) -> str:
+        """
+        Decoded contract text, served from the LRU after the first access.
+
+        Raises:
+            KeyError: If the contract is not in the store
+        """
+        with self._lock:
+            if name in self._decoded:
+                self._decoded.move_to_end(name)
+                return self._decoded[name]
+
+        text = str(self.view(name), 'utf-8')
+
+        with self._lock:
+            self._decoded[name] = text
+            self._decoded.move_to_end(name)
+            while len(self._decoded) > self.max_cached:
+                self._decoded.popitem(last=False)
+        return text
+
+    def section(self, name: str, start: int, end: int) -> str:
+        """Character range of a contract, e.g. a Chunk's start/end."""
+        return self.text(name)[start:end]
+
+    def byte_range(self, name: str, start: int, end: int) -> memoryview:
+        """Zero-copy byte range of a contract, e.g. a search match."""
+        return self.view(name)[start:end]
+
+    def iter_texts(self) -> Iterator[Tuple[str, str]]:
+        """Yield (name, text) for every contract without filling the LRU."""
+        for name in self.contracts:
+            yield name, str(self.view(name), 'utf-8')
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut pack."""
+    import argparse
+    import time
+
+    from .paths import default_contract_dir
+
+    parser = argparse.ArgumentParser(prog='lawstronaut pack',
+                                     description='Pack contract texts into a memory-mapped store')
+    parser.add_argument('--data-dir', type=Path, help='Contract text directory (default: full_contract_txt)')
+    parser.add_argument('--store-dir', type=Path, help='Store directory (default: derived from --data-dir)')
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or default_contract_dir()
+    store_dir = args.store_dir or store_path_for(data_dir)
+    start = time.perf_counter()
+    count = pack_contracts(data_dir, store_dir)
+    print(f"Packed {count} contracts from {data_dir} into {store_dir} ({time.perf_counter() - start:.1f}s)")
+    return 0
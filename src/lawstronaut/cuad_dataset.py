@@ -0,0 +1,354 @@
+"""
+Streaming loader and columnar cache for CUAD_v1.json (SQuAD 2.0 format)
+
+json.load() on the 40 MB file materializes hundreds of thousands of dicts.
+Instead, the "data" array is decoded one contract at a time, and the
+paragraphs, questions and answer spans are written once into flat columns:
+
+    strings.bin / string_offsets.bin   UTF-8 string table (titles, contexts, answer texts)
+    contract_*.bin                     one row per contract
+    qa_*.bin                           one row per question (contract x clause category)
+    answer_*.bin                       one row per gold answer span
+
+Columns are native int32/uint32 arrays (NumPy-compatible raw layout) that are
+memory-mapped on open, so later runs answer "every gold span for contract X
+and category Y" without parsing JSON at all.
+"""
+
+import json
+import mmap
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .paths import CACHE_DIR, DATA_DIR
+
+DEFAULT_JSON_PATH = DATA_DIR / 'CUAD_v1.json'
+DEFAULT_CACHE_DIR = CACHE_DIR / 'cuad_columns'
+
+READ_SIZE = 1 << 20
+
+COLUMNS = {
+    # name: typecode
+    'string_offsets': 'I',
+    'contract_title': 'i',
+    'contract_context': 'i',
+    'contract_qa_start': 'i',
+    'contract_qa_count': 'i',
+    'qa_contract': 'i',
+    'qa_category': 'i',
+    'qa_impossible': 'b',
+    'qa_answer_start': 'i',
+    'qa_answer_count': 'i',
+    'answer_start': 'i',
+    'answer_end': 'i',
+    'answer_text': 'i',
+}
+
+
+def category_from_qa_id(qa_id: str) -> str:
+    """CUAD question ids look like "<contract title>__<Category>"."""
+    return qa_id.rsplit('__', 1)[-1]
+
+
+def iter_contracts(json_path: Path, read_size: int = READ_SIZE) -> Iterator[Dict]:
+    """
+    Stream the entries of the top-level "data" array one at a time.
+
+    Only one contract entry (its context plus ~41 questions) is held in
+    memory at once, whatever the size of the file.
+
+    Args:
+        json_path: Path to CUAD_v1.json
+        read_size: Bytes to read per refill
+
+    Returns:
+        Iterator of {"title": ..., "paragraphs": [...]} dicts
+    """
+    decoder = json.JSONDecoder()
+    with open(json_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+
+        def refill() -> bool:
+            nonlocal buffer, position
+            data = f.read(read_size)
+            if not data:
+                return False
+            buffer = buffer[position:] + data
+            position = 0
+            return True
+
+        # Seek to the opening bracket of "data": [
+        while True:
+            key = buffer.find('"data"', position)
+            if key != -1:
+                bracket = buffer.find('[', key)
+                if bracket != -1:
+                    position = bracket + 1
+                    break
+            if not refill():
+                raise ValueError(f"No \"data\" array found in {json_path}")
+
+        while True:
+            # Skip whitespace and separators between entries
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position < len(buffer) or not refill():
+                    break
+            if position >= len(buffer) or buffer[position] == ']':
+                return
+
+            while True:
+                try:
+                    entry, end = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError:
+                    if not refill():
+                        raise
+            position = end
+            yield entry
+
+
+def _open_column(path: Path, typecode: str):
+    """Memory-map one column file; returns (file, mmap or None, memoryview)."""
+    f = open(path, 'rb')
+    if path.stat().st_size:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f, mapped, memoryview(mapped).cast(typecode)
+    return f, None, memoryview(array(typecode))
+
+
+def build_cache(json_path: Path = DEFAULT_JSON_PATH, cache_dir: Path = DEFAULT_CACHE_DIR) -> Dict:
+    """
+    Convert CUAD_v1.json into the columnar cache in a single streaming pass.
+
+    Args:
+        json_path: Path to CUAD_v1.json
+        cache_dir: Output directory
+
+    Returns:
+        The cache metadata (counts, category list, source fingerprint)
+    """
+    json_path = Path(json_path)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    columns = {name: array(code) for name, code in COLUMNS.items()}
+    columns['string_offsets'].append(0)
+    categories: List[str] = []
+    category_ids: Dict[str, int] = {}
+    string_bytes = 0
+
+    strings_file = open(cache_dir / 'strings.bin.tmp', 'wb')
+
+    def add_string(value: str) -> int:
+        nonlocal string_bytes
+        data = value.encode('utf-8')
+        strings_file.write(data)
+        string_bytes += len(data)
+        columns['string_offsets'].append(string_bytes)
+        return len(columns['string_offsets']) - 2
+
+    with strings_file:
+        for contract_id, entry in enumerate(iter_contracts(json_path)):
+            columns['contract_title'].append(add_string(entry.get('title', '')))
+            columns['contract_qa_start'].append(len(columns['qa_contract']))
+
+            # CUAD has one paragraph (the whole contract) per entry; keep the first context
+            paragraphs = entry.get('paragraphs', [])
+            context = paragraphs[0]['context'] if paragraphs else ''
+            columns['contract_context'].append(add_string(context))
+
+            for paragraph in paragraphs:
+                for qa in paragraph.get('qas', []):
+                    category = category_from_qa_id(qa.get('id', ''))
+                    if category not in category_ids:
+                        category_ids[category] = len(categories)
+                        categories.append(category)
+
+                    answers = qa.get('answers', [])
+                    columns['qa_contract'].append(contract_id)
+                    columns['qa_category'].append(category_ids[category])
+                    columns['qa_impossible'].append(1 if qa.get('is_impossible') else 0)
+                    columns['qa_answer_start'].append(len(columns['answer_start']))
+                    columns['qa_answer_count'].append(len(answers))
+
+                    for answer in answers:
+                        start = int(answer['answer_start'])
+                        columns['answer_start'].append(start)
+                        columns['answer_end'].append(start + len(answer['text']))
+                        columns['answer_text'].append(add_string(answer['text']))
+
+            columns['contract_qa_count'].append(
+                len(columns['qa_contract']) - columns['contract_qa_start'][-1]
+            )
+
+    (cache_dir / 'strings.bin.tmp').replace(cache_dir / 'strings.bin')
+    for name, values in columns.items():
+        with open(cache_dir / f'{name}.bin', 'wb') as f:
+            values.tofile(f)
+
+    stat = json_path.stat()
+    meta = {
+        'source': str(json_path.resolve()),
+        'source_size': stat.st_size,
+        'source_mtime': stat.st_mtime,
+        'contracts': len(columns['contract_title']),
+        'questions': len(columns['qa_contract']),
+        'answers': len(columns['answer_start']),
+        'categories': categories,
+    }
+    with open(cache_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    return meta
+
+
+class CuadDataset:
+    """Memory-mapped, read-only view over the CUAD columnar cache."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        """
+        Open an existing cache (see build_cache() / CuadDataset.load()).
+
+        Args:
+            cache_dir: Cache directory
+        """
+        self.cache_dir = Path(cache_dir)
+        with open(self.cache_dir / 'meta.json', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.categories: List[str] = self.meta['categories']
+        self._category_ids = {name: i for i, name in enumerate(self.categories)}
+
+        self._handles = []
+        self._columns: Dict[str, memoryview] = {}
+        for name, code in COLUMNS.items():
+            f, mapped, view = _open_column(self.cache_dir / f'{name}.bin', code)
+            self._handles.append((f, mapped))
+            self._columns[name] = view
+        f, mapped, view = _open_column(self.cache_dir / 'strings.bin', 'B')
+        self._handles.append((f, mapped))
+        self._strings = view
+
+        self._titles: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def load(cls, json_path: Path = DEFAULT_JSON_PATH,
+             cache_dir: Path = DEFAULT_CACHE_DIR) -> 'CuadDataset':
+        """
+        Open the cache, (re)building it if it is missing or CUAD_v1.json changed.
+
+        Args:
+            json_path: Path to CUAD_v1.json
+            cache_dir: Cache directory
+
+        Raises:
+            FileNotFoundError: If neither the cache nor CUAD_v1.json exists
+        """
+        json_path = Path(json_path)
+        cache_dir = Path(cache_dir)
+        meta_path = cache_dir / 'meta.json'
+
+        if meta_path.exists():
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if not json_path.exists():
+                return cls(cache_dir)
+            stat = json_path.stat()
+            if stat.st_size == meta['source_size'] and stat.st_mtime == meta['source_mtime']:
+                return cls(cache_dir)
+
+        if not json_path.exists():
+            raise FileNotFoundError(
+                f"CUAD dataset not found: {json_path}\n"
+                f"See data/README.md for download instructions"
+            )
+        build_cache(json_path, cache_dir)
+        return cls(cache_dir)
+
+    def string(self, string_id: int) -> str:
+        """Decode one entry of the string table."""
+        offsets = self._columns['string_offsets']
+        return str(self._strings[offsets[string_id]:offsets[string_id + 1]], 'utf-8')
+
+    @property
+    def contracts(self) -> List[str]:
+        """Contract titles in file order."""
+        return [self.string(i) for i in self._columns['contract_title']]
+
+    def contract_id(self, contract: str) -> int:
+        """
+        Resolve a contract title (or a full_contract_txt file name) to its row.
+
+        Raises:
+            KeyError: If the contract is not in the dataset
+        """
+        if self._titles is None:
+            self._titles = {title: i for i, title in enumerate(self.contracts)}
+        if contract in self._titles:
+            return self._titles[contract]
+        if contract.endswith('.txt') and contract[:-4] in self._titles:
+            return self._titles[contract[:-4]]
+        raise KeyError(f"Contract not in CUAD dataset: {contract}")
+
+    def context(self, contract: str) -> str:
+        """Full contract text as stored in the dataset."""
+        return self.string(self._columns['contract_context'][self.contract_id(contract)])
+
+    def answers(self, contract: str, category: str) -> List[Dict]:
+        """
+        Every gold answer span for one contract and clause category.
+
+        Args:
+            contract: Contract title or .txt file name
+            category: One of self.categories, e.g. "Governing Law"
+
+        Returns:
+            List of {"text", "start", "end"} (character offsets into context())
+
+        Raises:
+            KeyError: If the contract or category is unknown
+        """
+        if category not in self._category_ids:
+            raise KeyError(f"Unknown CUAD category: {category}")
+        category_id = self._category_ids[category]
+        row = self.contract_id(contract)
+
+        cols = self._columns
+        qa_start = cols['contract_qa_start'][row]
+        for qa in range(qa_start, qa_start + cols['contract_qa_count'][row]):
+            if cols['qa_category'][qa] != category_id:
+                continue
+            first = cols['qa_answer_start'][qa]
+            return [
+                {
+                    'text': self.string(cols['answer_text'][i]),
+                    'start': cols['answer_start'][i],
+                    'end': cols['answer_end'][i],
+                }
+                for i in range(first, first + cols['qa_answer_count'][qa])
+            ]
+        return []
+
+    def contracts_with(self, category: str) -> List[str]:
+        """Titles of contracts that have at least one gold span for `category`."""
+        if category not in self._category_ids:
+            raise KeyError(f"Unknown CUAD category: {category}")
+        category_id = self._category_ids[category]
+        cols = self._columns
+        titles = cols['contract_title']
+        return [
+            self.string(titles[cols['qa_contract'][qa]])
+            for qa in range(len(cols['qa_contract']))
+            if cols['qa_category'][qa] == category_id and cols['qa_answer_count'][qa]
+        ]
+
+    def close(self) -> None:
+        """Release the memory maps."""
+        for view in list(self._columns.values()) + [self._strings]:
+            view.release()
+        for f, mapped in self._handles:
+            if mapped is not None:
+                mapped.close()
+            f.close()
@@ -0,0 +1,398 @@
+"""
+Text embedders and the chunk embedding pipeline
+
+An embedder has a stable `name` (recorded with every index and vector so
+mixed models are never compared), a `dimensions` count and an
+`embed(texts) -> float32 array` method returning L2-normalized rows.
+Backends, selected by name:
+
+    hashing-384                  signed feature hashing, no model download
+    st:all-MiniLM-L6-v2          sentence-transformers model on the CPU
+    onnx:all-MiniLM-L6-v2        the same model through its ONNX Runtime backend
+    openai:text-embedding-3-small  OpenAI embeddings API (the Supabase schema's model)
+
+The built-in hashing embedder is purely lexical, but deterministic, CPU-cheap
+and good enough to run the vector index, its benchmarks and offline tests.
+
+EmbeddingPipeline wraps a backend with an on-disk cache keyed by (model,
+SHA-256 of the chunk text), so re-chunking or adding contracts only embeds
+text that was never embedded before. Cache misses are sorted by length and
+packed into batches under a padded token budget; local CPU backends run the
+batches in a pool of worker processes, each loading the model once.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .chunking import estimate_tokens
+from .paths import CACHE_DIR
+from .retrieval import tokenize
+
+DEFAULT_EMBEDDER = 'hashing-384'
+DEFAULT_EMBEDDING_CACHE_PATH = CACHE_DIR / 'embeddings.sqlite3'
+
+# Padded tokens (batch size x longest text) per model call
+DEFAULT_BATCH_TOKENS = 32_768
+MAX_BATCH_ITEMS = 256
+
+OPENAI_EMBEDDING_URL = 'https://api.openai.com/v1/embeddings'
+OPENAI_DIMENSIONS = {
+    'text-embedding-3-small': 1536,
+    'text-embedding-3-large': 3072,
+    'text-embedding-ada-002': 1536,
+}
+OPENAI_MAX_BATCH_TOKENS = 250_000   # per-request input limit is 300k tokens
+OPENAI_MAX_BATCH_ITEMS = 2048
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def text_hash(text: str) -> str:
+    """Cache key for a chunk's text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams, log-scaled and L2-normalized."""
+
+    local = True
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimensions)
+        """
+        out = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features),
+                                 dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            out[i] = np.bincount(hashes % self.dimensions, weights=signs, minlength=self.dimensions)
+        np.copysign(np.log1p(np.abs(out)), out, out=out)
+        return normalize_rows(out)
+
+
+class SentenceTransformerEmbedder:
+    """A sentence-transformers model on the CPU (PyTorch or ONNX Runtime backend)."""
+
+    local = True
+
+    def __init__(self, model: str, backend: str = 'torch'):
+        """
+        Initialize the embedder; the model is loaded on first use.
+
+        Args:
+            model: Hugging Face model ID, e.g. "all-MiniLM-L6-v2"
+            backend: 'torch' or 'onnx'
+        """
+        self.model_name = model
+        self.backend = backend
+        self.name = f"{'st' if backend == 'torch' else backend}:{model}"
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                extra = '[onnx]' if self.backend == 'onnx' else ''
+                raise ImportError(
+                    f"sentence-transformers is required for {self.name}: "
+                    f"pip install 'sentence-transformers{extra}'"
+                )
+            options = {'backend': self.backend} if self.backend != 'torch' else {}
+            self._model = SentenceTransformer(self.model_name, device='cpu', **options)
+        return self._model
+
+    @property
+    def dimensions(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts (one forward pass per batch)."""
+        vectors = self.model.encode(list(texts), batch_size=max(len(texts), 1),
+                                    normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API over the shared HTTP connection pool."""
+
+    local = False
+    max_batch_tokens = OPENAI_MAX_BATCH_TOKENS
+    max_batch_items = OPENAI_MAX_BATCH_ITEMS
+
+    def __init__(self, model: str = 'text-embedding-3-small', api_key: Optional[str] = None):
+        if model not in OPENAI_DIMENSIONS:
+            raise ValueError(f"Unknown OpenAI embedding model: {model}")
+        self.model_name = model
+        self.name = f"openai:{model}"
+        self.dimensions = OPENAI_DIMENSIONS[model]
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts with one API request."""
+        from .providers import shared_http_client
+
+        if not self.api_key:
+            raise RuntimeError(f"{self.name} not configured (set OPENAI_API_KEY)")
+        response = shared_http_client().post(
+            OPENAI_EMBEDDING_URL,
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            json={'model': self.model_name, 'input': list(texts)},
+        )
+        response.raise_for_status()
+        data = sorted(response.json()['data'], key=lambda item: item['index'])
+        return normalize_rows(np.array([item['embedding'] for item in data], dtype=np.float32))
+
+
+def get_embedder(name: str = DEFAULT_EMBEDDER):
+    """
+    Build an embedder from its name.
+
+    Args:
+        name: e.g. "hashing-384", "st:all-MiniLM-L6-v2", "onnx:all-MiniLM-L6-v2",
+            "openai:text-embedding-3-small"
+
+    Raises:
+        ValueError: If the name is not a known embedder
+    """
+    match = re.fullmatch(r'hashing-(\d+)', name)
+    if match:
+        return HashingEmbedder(int(match.group(1)))
+    backend, _, model = name.partition(':')
+    if model and backend in ('st', 'onnx'):
+        return SentenceTransformerEmbedder(model, backend='torch' if backend == 'st' else backend)
+    if model and backend == 'openai':
+        return OpenAIEmbedder(model)
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+def token_batches(texts: Sequence[str], batch_tokens: int = DEFAULT_BATCH_TOKENS,
+                  max_items: int = MAX_BATCH_ITEMS) -> List[List[int]]:
+    """
+    Group texts into batches whose padded size stays under a token budget.
+
+    Texts are taken in length order, so each batch holds texts of similar
+    length and little of the budget is spent on padding.
+
+    Args:
+        texts: Texts to batch
+        batch_tokens: Maximum of (texts in batch x tokens of the longest one)
+        max_items: Maximum texts per batch
+
+    Returns:
+        Lists of indexes into `texts`
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        tokens = max(estimate_tokens(texts[i]), 1)
+        # Sorted ascending, so this text is the longest in the batch so far
+        if current and ((len(current) + 1) * tokens > batch_tokens or len(current) >= max_items):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingCache:
+    """SQLite store of embeddings keyed by (model, text hash)."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (or create) an embedding cache.
+
+        Args:
+            path: SQLite database file (default: .cache/lawstronaut/embeddings.sqlite3)
+        """
+        self.path = Path(path) if path else DEFAULT_EMBEDDING_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            ' model TEXT NOT NULL,'
+            ' hash TEXT NOT NULL,'
+            ' vector BLOB NOT NULL,'
+            ' PRIMARY KEY (model, hash)) WITHOUT ROWID'
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the given text hashes (misses are absent)."""
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, np.ndarray]) -> None:
+        """Store vectors by text hash."""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)',
+                [(model, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Cached vectors per model."""
+        with self._lock:
+            return dict(self._conn.execute('SELECT model, count(*) FROM embeddings GROUP BY model').fetchall())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Per-process embedder for pool workers (loaded once by the initializer)
+_worker_embedder = None
+
+
+def _init_worker(name: str, threads: int) -> None:
+    global _worker_embedder
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_embedder = get_embedder(name)
+
+
+def _embed_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_embedder.embed(texts)
+
+
+class EmbeddingPipeline:
+    """Cached, token-batched embedding of chunk texts, with a process pool for local models."""
+
+    def __init__(self, embedder: Union[str, object] = DEFAULT_EMBEDDER,
+                 cache: Union[EmbeddingCache, Path, None, bool] = True,
+                 batch_tokens: int = DEFAULT_BATCH_TOKENS, workers: Optional[int] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            embedder: Embedder name or instance
+            cache: EmbeddingCache, a cache file path, True for the default cache, or False/None for none
+            batch_tokens: Padded token budget per model call
+            workers: Worker processes for local backends (default: CPU count, capped at 8; 1 embeds in-process)
+        """
+        self.embedder = get_embedder(embedder) if isinstance(embedder, str) else embedder
+        self.name = self.embedder.name
+        if cache is True:
+            cache = EmbeddingCache()
+        elif isinstance(cache, (str, Path)):
+            cache = EmbeddingCache(cache)
+        self.cache: Optional[EmbeddingCache] = cache or None
+        self.batch_tokens = min(batch_tokens, getattr(self.embedder, 'max_batch_tokens', batch_tokens))
+        self.max_items = getattr(self.embedder, 'max_batch_items', MAX_BATCH_ITEMS)
+        self.workers = workers if workers is not None else min(os.cpu_count() or 1, 8)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {'texts': 0, 'cached': 0, 'embedded': 0, 'batches': 0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # spawn: forking a parent that already holds torch/BLAS threads can deadlock
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(self.name, threads),
+            )
+        return self._pool
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            float32 array with one normalized row per text
+        """
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.name, hashes) if self.cache else {}
+        hits = sum(1 for key in hashes if key in vectors)
+
+        missing = list({key: text for key, text in zip(hashes, texts) if key not in vectors}.items())
+        batches = [[missing[i] for i in batch]
+                   for batch in token_batches([text for _, text in missing], self.batch_tokens, self.max_items)]
+        if batches:
+            payloads = [[text for _, text in batch] for batch in batches]
+            if self.embedder.local and self.workers > 1 and len(batches) > 1:
+                results = self._executor().map(_embed_in_worker, payloads)
+            else:
+                results = map(self.embedder.embed, payloads)
+            for batch, result in zip(batches, results):
+                embedded = {key: row for (key, _), row in zip(batch, np.asarray(result, dtype=np.float32))}
+                if self.cache:
+                    # Commit per batch so an interrupted run keeps its progress
+                    self.cache.put_many(self.name, embedded)
+                vectors.update(embedded)
+
+        self.stats['texts'] += len(texts)
+        self.stats['cached'] += hits
+        self.stats['embedded'] += len(missing)
+        self.stats['batches'] += len(batches)
+        if not texts:
+            return np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+        return np.stack([vectors[key] for key in hashes])
+
+    __call__ = embed
+
+    def close(self) -> None:
+        """Shut down worker processes and close the cache."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self) -> 'EmbeddingPipeline':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
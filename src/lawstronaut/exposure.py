@@ -0,0 +1,554 @@
+"""
+Precomputed contract x regulation exposure matrix
+
+Answers "which contracts are hit by the EU AI Act?" from a materialized
+matrix instead of the static LAWSTRONAUT_TEST_MATRIX.md. The job runs in
+three cheap-to-expensive stages:
+
+1. Features, once per contract text: governing law (master_clauses.csv, else
+   the governing-law sentence), CUAD clause presence, and keyword group
+   counts with the first matching excerpt.
+2. Rules, per (contract, regulation): the regulation's weighted signals give
+   a score that is "exposed", "ambiguous" or "not_applicable"; risk level
+   follows the score, capped by the regulation's status (a blocked rule
+   is never more than "low").
+3. LLM, only for ambiguous pairs and only with --llm: a short prompt with the
+   regulation record and the matching excerpts settles the pair. Verdicts are
+   kept until the regulation record or the contract changes.
+
+update() is incremental. A new or edited contract is re-classified against
+every regulation; a regulation whose rules changed is re-classified against
+every contract; a regulation whose record changed otherwise (status, dates,
+summary) is re-assessed only for the contracts currently exposed to it and
+the pairs an LLM settled, which are escalated again.
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .clauses import JURISDICTION_EXCLUSIONS, JURISDICTION_GROUPS, law_mentions
+from .paths import CACHE_DIR, default_contract_dir
+from .regulations import RISK_LEVELS, TERM_GROUPS, Regulation, load_regulations, term_matches
+
+DEFAULT_EXPOSURE_PATH = CACHE_DIR / 'exposure.json'
+
+DECISIONS = ('exposed', 'ambiguous', 'not_applicable')
+EXCERPT_CHARS = 240
+
+# "governed by the laws of the State of New York" / "governed by ... English law"
+_GOVERNING_LAW_RE = re.compile(
+    r'govern(?:ed|s)\b[^.]{0,120}?(?:\b[Ll]aws?\s+of\s+(?:the\s+)?(?:State\s+of\s+|Commonwealth\s+of\s+|Province\s+of\s+)?'
+    r'(?P<place>[A-Z][A-Za-z]+(?:\s+(?:and\s+)?[A-Z][A-Za-z]+){0,3})|\b(?P<adjective>[A-Z][a-z]+)\s+law\b)'
+)
+
+ESCALATION_SYSTEM_INSTRUCTION = (
+    "You assess whether a regulation applies to a commercial contract. "
+    "Answer only with a JSON object."
+)
+
+ESCALATION_PROMPT = """Regulation: {name} ({citation})
+Jurisdiction: {jurisdiction}
+Status: {status}. {status_detail}
+Effective: {effective_date}
+Summary: {summary}
+
+Contract: {contract}
+Governing law: {governing_law}
+CUAD clauses present: {clauses}
+Relevant excerpts:
+{excerpts}
+
+Does this regulation apply to the contract or the activities it governs?
+Reply with JSON: {{"applies": true or false, "risk_level": "low" | "medium" | "high" | "critical", "reason": "one sentence"}}"""
+
+
+def law_matches(governing_law: Optional[str], jurisdiction: str) -> bool:
+    """True if a governing law names `jurisdiction` (a JURISDICTION_GROUPS name expands to its members)."""
+    return law_mentions(governing_law, jurisdiction)
+
+
+def _excerpt(text: str, offset: int) -> str:
+    start = max(0, offset - EXCERPT_CHARS // 3)
+    return ' '.join(text[start:start + EXCERPT_CHARS].split())
+
+
+def contract_features(name: str, text: str, text_hash: str, clause_table=None) -> Dict[str, Any]:
+    """
+    Rule inputs for one contract.
+
+    Args:
+        name: Contract file name
+        text: Contract text
+        text_hash: Hash of `text` and the extractor (stored so unchanged contracts are skipped)
+        clause_table: Optional ClauseTable for governing law and clause presence
+
+    Returns:
+        {"hash", "governing_law", "clauses", "terms": {group: [count, offset, excerpt]}}
+    """
+    governing_law, clauses = None, []
+    if clause_table is not None:
+        try:
+            row = clause_table.row(name)
+        except KeyError:
+            row = None
+        if row is not None:
+            law = row.get('governing_law')
+            governing_law = None if law is None or str(law) in ('', 'nan') else str(law)
+            clauses = [category for category in clause_table.categories
+                       if bool(row.get(f"has_{_slug(category)}"))]
+    if governing_law is None:
+        match = _GOVERNING_LAW_RE.search(text)
+        governing_law = (match.group('place') or match.group('adjective')) if match else None
+
+    terms = {group: [count, offset, _excerpt(text, offset)]
+             for group, (count, offset) in term_matches(text).items()}
+    return {'hash': text_hash, 'governing_law': governing_law, 'clauses': clauses, 'terms': terms}
+
+
+def active_signals(features: Dict[str, Any], regulation: Regulation) -> List[str]:
+    """The regulation's signals that a contract's features satisfy."""
+    clause_slugs = {_slug(category) for category in features['clauses']}
+    active = []
+    for signal in regulation.signals:
+        kind, _, value = signal.partition(':')
+        if kind == 'law':
+            hit = law_matches(features['governing_law'], value)
+        elif kind == 'clause':
+            hit = _slug(value) in clause_slugs
+        elif kind == 'terms':
+            hit = value in features['terms']
+        else:
+            raise ValueError(f"Unknown signal {signal!r} in regulation {regulation.regulation_id}")
+        if hit:
+            active.append(signal)
+    return active
+
+
+def _slug(value: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', value.lower()).strip('_')
+
+
+def _cap(risk: str, cap: str) -> str:
+    return RISK_LEVELS[min(RISK_LEVELS.index(risk), RISK_LEVELS.index(cap))]
+
+
+def classify(features: Dict[str, Any], regulation: Regulation) -> Dict[str, Any]:
+    """
+    Rule-based assessment of one (contract, regulation) pair.
+
+    Returns:
+        {"decision", "score", "risk_level", "applicability_confidence",
+         "signals", "affected_provisions", "compliance_gaps", "method"}
+    """
+    signals = active_signals(features, regulation)
+    score = round(sum(regulation.signals[signal] for signal in signals), 3)
+    if regulation.requires and not any(signal in signals for signal in regulation.requires):
+        score = 0.0
+
+    if score >= regulation.exposed_at:
+        decision, confidence = 'exposed', 'high'
+    elif score >= regulation.ambiguous_at:
+        decision, confidence = 'ambiguous', 'low'
+    else:
+        decision, confidence = 'not_applicable', 'high'
+
+    ratio = score / regulation.exposed_at if regulation.exposed_at else 0.0
+    risk = 'critical' if ratio >= 2.5 else 'high' if ratio >= 1.5 else 'medium' if ratio >= 1.0 else 'low'
+
+    provisions, gaps = [], []
+    if decision != 'not_applicable':
+        for signal in signals:
+            kind, _, value = signal.partition(':')
+            if kind == 'terms':
+                count, offset, excerpt = features['terms'][value]
+                provisions.append({'signal': signal, 'matches': count, 'offset': offset, 'excerpt': excerpt})
+            else:
+                provisions.append({'signal': signal})
+        gaps = [gap for group, gap in regulation.gaps.items() if group not in features['terms']]
+
+    return {
+        'decision': decision,
+        'score': score,
+        'risk_level': _cap(risk, regulation.risk_cap) if decision != 'not_applicable' else None,
+        'applicability_confidence': confidence,
+        'signals': signals,
+        'affected_provisions': provisions,
+        'compliance_gaps': gaps,
+        'method': 'rules',
+    }
+
+
+def escalation_prompt(contract: str, features: Dict[str, Any], regulation: Regulation,
+                      assessment: Dict[str, Any]) -> str:
+    """Prompt asking an LLM to settle an ambiguous pair."""
+    excerpts = '\n'.join(f"- [{p['signal']}] \"{p['excerpt']}\"" for p in assessment['affected_provisions']
+                         if p.get('excerpt')) or '- (none)'
+    return ESCALATION_PROMPT.format(
+        name=regulation.regulation_name, citation=regulation.official_citation,
+        jurisdiction=regulation.jurisdiction, status=regulation.status,
+        status_detail=regulation.current_status_detail, effective_date=regulation.effective_date or 'unknown',
+        summary=regulation.summary, contract=contract, governing_law=features['governing_law'] or 'unknown',
+        clauses=', '.join(features['clauses']) or 'unknown', excerpts=excerpts,
+    )
+
+
+def parse_verdict(answer: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Read {"applies", "risk_level", "reason"} from an LLM answer.
+
+    Returns:
+        The verdict, or None if the answer holds no usable JSON
+    """
+    if not answer:
+        return None
+    match = re.search(r'\{.*\}', answer, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('applies'), bool):
+        return None
+    risk = str(data.get('risk_level', '')).lower()
+    return {'applies': data['applies'], 'risk_level': risk if risk in RISK_LEVELS else None,
+            'reason': str(data.get('reason', ''))[:500]}
+
+
+class ExposureMatrix:
+    """Materialized contract x regulation assessments with a per-regulation index."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open a matrix (created on the first update()).
+
+        Args:
+            path: JSON state file (default: .cache/lawstronaut/exposure.json)
+        """
+        self.path = Path(path) if path else DEFAULT_EXPOSURE_PATH
+        self.state: Dict[str, Any] = {'regulations': {}, 'features': {}, 'pairs': {}}
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        self._build_index()
+
+    @staticmethod
+    def _key(contract: str, regulation_id: str) -> str:
+        return f"{contract}\x1f{regulation_id}"
+
+    def _build_index(self) -> None:
+        # regulation_id -> contracts with a non-"not_applicable" decision, highest risk first
+        self.by_regulation: Dict[str, List[str]] = {}
+        for key, record in self.state['pairs'].items():
+            if record['decision'] == 'not_applicable':
+                continue
+            contract, regulation_id = key.split('\x1f')
+            self.by_regulation.setdefault(regulation_id, []).append(contract)
+        for regulation_id, contracts in self.by_regulation.items():
+            contracts.sort(key=lambda c: self._rank(self.state['pairs'][self._key(c, regulation_id)]))
+
+    @staticmethod
+    def _rank(record: Dict[str, Any]) -> Tuple:
+        risk = RISK_LEVELS.index(record['risk_level']) if record['risk_level'] else -1
+        return (DECISIONS.index(record['decision']), -risk, -record['score'])
+
+    def get(self, contract: str, regulation_id: str) -> Optional[Dict[str, Any]]:
+        """Assessment of one pair (None if never computed)."""
+        return self.state['pairs'].get(self._key(contract, regulation_id))
+
+    def contracts_for(self, regulation_id: str, min_risk: Optional[str] = None,
+                      include_ambiguous: bool = True) -> List[Dict[str, Any]]:
+        """
+        Contracts exposed to a regulation, highest risk first.
+
+        Args:
+            regulation_id: Regulation to look up
+            min_risk: Drop assessments below this RISK_LEVELS entry
+            include_ambiguous: Keep pairs the rules could not settle (and no LLM did)
+
+        Returns:
+            Assessment records with "contract" added
+        """
+        floor = RISK_LEVELS.index(min_risk) if min_risk else 0
+        results = []
+        for contract in self.by_regulation.get(regulation_id, []):
+            record = self.get(contract, regulation_id)
+            if record['decision'] == 'ambiguous' and not include_ambiguous:
+                continue
+            if RISK_LEVELS.index(record['risk_level']) < floor:
+                continue
+            results.append(dict(record, contract=contract))
+        return results
+
+    def regulations_for(self, contract: str) -> Dict[str, Dict[str, Any]]:
+        """Every assessed regulation for one contract."""
+        return {regulation_id: self.get(contract, regulation_id) for regulation_id in self.state['regulations']
+                if self.get(contract, regulation_id)}
+
+    def update(self, store, regulations: Dict[str, Regulation], clause_table=None,
+               llm=None, llm_workers: int = 4) -> Dict[str, int]:
+        """
+        Recompute the pairs whose inputs changed.
+
+        Args:
+            store: Opened ContractStore
+            regulations: Records keyed by regulation_id
+            clause_table: Optional ClauseTable for governing law and clause presence
+            llm: Optional ModelConfig used to settle ambiguous pairs
+            llm_workers: Concurrent escalation requests (the provider's own limit also applies)
+
+        Returns:
+            Counts: contracts featurized, pairs classified, escalated, settled by LLM, removed
+        """
+        from .ingest import content_hash
+
+        stats = {'featurized': 0, 'classified': 0, 'escalated': 0, 'llm_settled': 0, 'llm_errors': 0, 'removed': 0}
+        features = self.state['features']
+        pairs = self.state['pairs']
+
+        # 1. Features for new or edited contracts
+        names = store.names()
+        changed_contracts = set()
+        # Keyword groups, jurisdiction matching and the clause source are feature inputs too
+        extractor = content_hash(
+            json.dumps([TERM_GROUPS, JURISDICTION_GROUPS, JURISDICTION_EXCLUSIONS], sort_keys=True),
+            clause_table is not None
+        )
+        for name in names:
+            text = store.text(name)
+            text_hash = content_hash(text, extractor)
+            if features.get(name, {}).get('hash') != text_hash:
+                features[name] = contract_features(name, text, text_hash, clause_table)
+                changed_contracts.add(name)
+                stats['featurized'] += 1
+        for name in set(features) - set(names):
+            del features[name]
+        for key in [key for key in pairs if key.split('\x1f')[0] not in features
+                    or key.split('\x1f')[1] not in regulations]:
+            del pairs[key]
+            stats['removed'] += 1
+
+        # 2. Rules for the pairs whose inputs changed
+        for regulation_id, regulation in regulations.items():
+            known = self.state['regulations'].get(regulation_id, {})
+            record_fingerprint = regulation.fingerprint()
+            if known.get('rules') != regulation.rules_fingerprint():
+                targets = names
+            elif known.get('record') != record_fingerprint:
+                # Status/summary changed: contracts currently exposed need re-assessment, and so
+                # does every LLM verdict (including "not_applicable" ones), which quoted the old record
+                settled = {key.split('\x1f')[0] for key, record in pairs.items()
+                           if record['method'] == 'llm' and key.split('\x1f')[1] == regulation_id}
+                targets = set(self.by_regulation.get(regulation_id, [])) | settled | changed_contracts
+            else:
+                targets = changed_contracts
+            for name in targets:
+                assessment = classify(features[name], regulation)
+                key = self._key(name, regulation_id)
+                previous = pairs.get(key)
+                if assessment['decision'] == 'ambiguous':
+                    fingerprint = content_hash(record_fingerprint, features[name]['hash'])
+                    if previous and previous.get('llm', {}).get('fingerprint') == fingerprint:
+                        # Same regulation record and contract text: keep the verdict
+                        assessment = previous
+                assessment['assessed_at'] = time.time()
+                pairs[key] = assessment
+                stats['classified'] += 1
+            self.state['regulations'][regulation_id] = {'rules': regulation.rules_fingerprint(),
+                                                         'record': record_fingerprint}
+        for regulation_id in set(self.state['regulations']) - set(regulations):
+            del self.state['regulations'][regulation_id]
+
+        # 3. LLM for the ambiguous pairs only (including ones left over from runs without --llm)
+        escalate: List[Tuple[str, Regulation, str]] = []
+        if llm is not None:
+            record_fingerprints = {regulation_id: regulation.fingerprint()
+                                   for regulation_id, regulation in regulations.items()}
+            for key, record in pairs.items():
+                if record['decision'] == 'ambiguous' and record['method'] == 'rules':
+                    name, regulation_id = key.split('\x1f')
+                    escalate.append((name, regulations[regulation_id],
+                                     content_hash(record_fingerprints[regulation_id], features[name]['hash'])))
+        if escalate:
+            stats['escalated'] = len(escalate)
+            for (name, regulation, fingerprint), result in zip(escalate, self._escalate(escalate, llm, llm_workers)):
+                record = pairs[self._key(name, regulation.regulation_id)]
+                verdict = parse_verdict(result.get('answer')) if not result.get('error') else None
+                if verdict is None:
+                    stats['llm_errors'] += 1
+                    continue
+                stats['llm_settled'] += 1
+                record['llm'] = dict(verdict, fingerprint=fingerprint, model=llm.name)
+                record['method'] = 'llm'
+                record['applicability_confidence'] = 'medium'
+                if verdict['applies']:
+                    record['decision'] = 'exposed'
+                    record['risk_level'] = _cap(verdict['risk_level'] or record['risk_level'], regulation.risk_cap)
+                else:
+                    record.update(decision='not_applicable', risk_level=None,
+                                  affected_provisions=[], compliance_gaps=[])
+                record['recommended_actions'] = verdict['reason']
+
+        self._build_index()
+        self.save()
+        return stats
+
+    def _escalate(self, pairs: List[Tuple[str, Regulation, str]], llm, workers: int) -> Iterator[Dict]:
+        from .providers import get_provider
+
+        provider = get_provider(llm.provider)
+
+        def ask(item: Tuple[str, Regulation, str]) -> Dict:
+            name, regulation, _ = item
+            features = self.state['features'][name]
+            prompt = escalation_prompt(name, features, regulation,
+                                       self.get(name, regulation.regulation_id))
+            return provider.generate(ESCALATION_SYSTEM_INSTRUCTION, prompt, llm)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(ask, pairs)
+
+    def save(self) -> None:
+        """Persist the matrix (atomic replace)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        tmp.replace(self.path)
+
+    def summary(self, regulations: Dict[str, Regulation]) -> List[Dict[str, Any]]:
+        """Per-regulation counts of exposed / ambiguous contracts and risk levels."""
+        rows = []
+        for regulation_id, regulation in regulations.items():
+            records = [self.get(c, regulation_id) for c in self.by_regulation.get(regulation_id, [])]
+            row = {'regulation': regulation_id, 'status': regulation.status,
+                   'exposed': sum(1 for r in records if r['decision'] == 'exposed'),
+                   'ambiguous': sum(1 for r in records if r['decision'] == 'ambiguous'),
+                   'llm': sum(1 for r in records if r['method'] == 'llm')}
+            for level in RISK_LEVELS:
+                row[level] = sum(1 for r in records if r['risk_level'] == level)
+            rows.append(row)
+        return rows
+
+
+def exposure_rows(matrix: ExposureMatrix, regulations: Dict[str, Regulation],
+                  contracts: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """
+    Stream `regulatory_exposure` rows for the ingest loader, grouped by contract.
+
+    A contract exposed to nothing still yields one row with a NULL
+    regulation_name: the merge's join drops it, but it stages the contract so
+    the loader's cleanup deletes its stale exposure rows.
+
+    Args:
+        matrix: Updated ExposureMatrix
+        regulations: Records keyed by regulation_id
+        contracts: Contract file names (default: every assessed contract)
+    """
+    from .ingest import content_hash, document_name
+
+    for name in (contracts if contracts is not None else sorted(matrix.state['features'])):
+        exposed = False
+        for regulation_id, regulation in regulations.items():
+            record = matrix.get(name, regulation_id)
+            if not record or record['decision'] == 'not_applicable':
+                continue
+            row = {
+                'document_name': document_name(name),
+                'regulation_name': regulation.regulation_name,
+                'risk_level': record['risk_level'],
+                'applicability_confidence': record['applicability_confidence'],
+                'affected_provisions': record['affected_provisions'],
+                'compliance_gaps': record['compliance_gaps'],
+                'recommended_actions': record.get('recommended_actions'),
+            }
+            row['content_hash'] = content_hash(json.dumps(row, sort_keys=True))
+            exposed = True
+            yield row
+        if not exposed:
+            yield {'document_name': document_name(name), 'regulation_name': None, 'risk_level': None,
+                   'applicability_confidence': None, 'affected_provisions': None, 'compliance_gaps': None,
+                   'recommended_actions': None, 'content_hash': None}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut exposure."""
+    import argparse
+
+    from .contract_store import ContractStore
+    from .regulations import DEFAULT_REGULATIONS_PATH, save_regulations
+
+    parser = argparse.ArgumentParser(prog='lawstronaut exposure',
+                                     description='Precompute which contracts each regulation affects')
+    parser.add_argument('--data-dir', type=Path, help='Contract text directory (default: full_contract_txt)')
+    parser.add_argument('--regulations', type=Path,
+                        help=f'Regulation records JSON (default: {DEFAULT_REGULATIONS_PATH} if present, else seeds)')
+    parser.add_argument('--matrix', type=Path, help=f'Matrix state file (default: {DEFAULT_EXPOSURE_PATH})')
+    parser.add_argument('--llm', metavar='MODEL', help='Settle ambiguous pairs with this model, e.g. vertex:gemini-2.0-flash')
+    parser.add_argument('--llm-workers', type=int, default=4, help='Concurrent escalation requests (default: 4)')
+    parser.add_argument('--regulation', help='List the contracts exposed to this regulation_id')
+    parser.add_argument('--contract', help='List the regulations assessed for this contract file')
+    parser.add_argument('--min-risk', choices=RISK_LEVELS, help='With --regulation: minimum risk level')
+    parser.add_argument('--no-update', action='store_true', help='Query the stored matrix without recomputing')
+    parser.add_argument('--write-regulations', action='store_true',
+                        help='Write the current records to --regulations (or data/regulations.json) for editing')
+    args = parser.parse_args(argv)
+
+    regulations = load_regulations(args.regulations)
+    if args.write_regulations:
+        print(f"Wrote {len(regulations)} regulations to {save_regulations(regulations, args.regulations)}")
+        return 0
+
+    matrix = ExposureMatrix(args.matrix)
+    if not args.no_update:
+        llm = None
+        if args.llm:
+            from .providers import parse_model_spec
+            llm = parse_model_spec(args.llm)
+            llm.grounding = False
+            llm.max_output_tokens = 300
+            llm.temperature = 0.0
+
+        clause_table = None
+        try:
+            from .clauses import ClauseTable
+            clause_table = ClauseTable.load()
+        except FileNotFoundError:
+            print("master_clauses.csv not found; governing law and clauses are read from the contract text")
+
+        store = ContractStore.open_or_build(args.data_dir or default_contract_dir(), refresh=True)
+        start = time.perf_counter()
+        try:
+            stats = matrix.update(store, regulations, clause_table, llm=llm, llm_workers=args.llm_workers)
+        finally:
+            store.close()
+        print(f"{stats['featurized']} contracts featurized, {stats['classified']} pairs classified, "
+              f"{stats['escalated']} escalated ({stats['llm_settled']} settled, {stats['llm_errors']} failed), "
+              f"{stats['removed']} removed ({time.perf_counter() - start:.2f}s)")
+
+    if args.regulation:
+        if args.regulation not in regulations:
+            print(f"Error: unknown regulation {args.regulation} (known: {', '.join(regulations)})")
+            return 1
+        for record in matrix.contracts_for(args.regulation, min_risk=args.min_risk):
+            print(f"{record['risk_level']:8s} {record['decision']:9s} {record['score']:5.2f} "
+                  f"{record['method']:5s} {record['contract']}")
+            for gap in record['compliance_gaps']:
+                print(f"{'':30s}gap: {gap}")
+        return 0
+    if args.contract:
+        for regulation_id, record in matrix.regulations_for(args.contract).items():
+            print(f"{regulation_id:16s} {record['decision']:14s} {record['risk_level'] or '-':8s} "
+                  f"{record['score']:5.2f}  {', '.join(record['signals'])}")
+        return 0
+
+    print(f"\n{'Regulation':16s} {'Status':9s} {'Exposed':>8s} {'Ambig.':>7s} {'LLM':>5s} "
+          + ' '.join(f"{level:>8s}" for level in RISK_LEVELS))
+    for row in matrix.summary(regulations):
+        print(f"{row['regulation']:16s} {row['status']:9s} {row['exposed']:>8d} {row['ambiguous']:>7d} "
+              f"{row['llm']:>5d} " + ' '.join(f"{row[level]:>8d}" for level in RISK_LEVELS))
+    return 0
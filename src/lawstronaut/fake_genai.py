@@ -0,0 +1,287 @@
+"""
+Deterministic, offline stand-in for the google-genai client
+
+Implements the subset of `genai.Client` the harnesses use:
+client.models.generate_content / generate_content_stream and
+client.caches.create / get / update / delete. Answers are derived from a hash
+of the request, token counts follow the ~4 chars/token heuristic, and cached
+prefix tokens are reported as `cached_content_token_count`, so context
+caching, streaming and the runner can be exercised without credentials.
+Requests with `response_mime_type="application/json"` get a JSON answer in
+the shape of structured.RESPONSE_SCHEMA; requests with tools get grounding
+metadata (queries, official-looking sources and supported spans) on the
+candidate, laid out like the SDK's.
+
+Latency (fixed time to first token, per-chunk generation time, prompt
+processing time) and 429 RESOURCE_EXHAUSTED errors on every Nth call can be
+simulated, so benchmarks measure the harness under realistic waits and
+rate-limit retries.
+"""
+
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List
+
+from .chunking import estimate_tokens
+
+
+def _get(config: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a pydantic config object or a plain dict."""
+    if config is None:
+        return default
+    if isinstance(config, dict):
+        return config.get(name, default)
+    return getattr(config, name, default)
+
+
+def _contents_text(contents: Any) -> str:
+    """Flatten str / Content / dict contents into plain text."""
+    if contents is None:
+        return ''
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return '\n'.join(_contents_text(item) for item in contents)
+    parts = _get(contents, 'parts')
+    if parts is not None:
+        return '\n'.join(_get(part, 'text', '') or '' for part in parts)
+    return _get(contents, 'text', '') or str(contents)
+
+
+def _parse_ttl(ttl: Any, default: float) -> float:
+    if ttl is None:
+        return default
+    if isinstance(ttl, (int, float)):
+        return float(ttl)
+    return float(str(ttl).rstrip('s'))
+
+
+def _structured_answer(seed: str, prompt: str) -> str:
+    """Deterministic JSON answer in the structured.RESPONSE_SCHEMA shape."""
+    levels = ('low', 'medium', 'high', 'critical')
+    statuses = ('compliant', 'partially_compliant', 'non_compliant', 'unclear')
+    sections = list(dict.fromkeys(re.findall(r'\b(\d{1,2}\.\d{1,2})\b', prompt)))[:3] or ['1.1']
+    pick = int(seed[:8], 16)
+    return json.dumps({
+        'compliance_status': statuses[pick % len(statuses)],
+        'risk_level': levels[(pick >> 4) % len(levels)],
+        'summary': f"Fake structured analysis {seed[:12]}.",
+        'regulations': [{'name': 'General Data Protection Regulation', 'citation': 'Regulation (EU) 2016/679',
+                         'status': 'in_force', 'effective_date': '2018-05-25',
+                         'url': 'https://eur-lex.europa.eu/eli/reg/2016/679/oj'}],
+        'provisions': [{'section': section, 'title': '', 'excerpt': '', 'assessment': 'partial'}
+                       for section in sections],
+        'gaps': [{'description': f"Gap {seed[i:i + 6]}", 'severity': levels[int(seed[i], 16) % len(levels)],
+                  'regulation': 'Regulation (EU) 2016/679', 'section': sections[0], 'remediation': ''}
+                 for i in range(pick % 3)],
+        'recommendations': [f"Recommendation {seed[12:18]}"],
+    })
+
+
+FAKE_SOURCES = (
+    ('https://www.ecfr.gov/current/title-16/part-910', 'ecfr.gov'),
+    ('https://eur-lex.europa.eu/eli/reg/2016/679/oj', 'eur-lex.europa.eu'),
+    ('https://eur-lex.europa.eu/eli/reg/2024/1689/oj', 'eur-lex.europa.eu'),
+    ('https://www.legislation.gov.uk/ukpga/2023/28', 'legislation.gov.uk'),
+    ('https://www.ftc.gov/legal-library/browse/rules/noncompete-rule', 'ftc.gov'),
+    ('https://www.lexology.com/library/detail.aspx?g=fake', 'lexology.com'),
+)
+
+
+def _grounding(seed: str, text: str) -> SimpleNamespace:
+    """Deterministic GroundingMetadata-like object for an answer."""
+    picks = sorted({int(seed[i:i + 2], 16) % len(FAKE_SOURCES) for i in range(0, 6, 2)})
+    chunks = [SimpleNamespace(web=SimpleNamespace(uri=FAKE_SOURCES[i][0], title=FAKE_SOURCES[i][1], domain=None),
+                              retrieved_context=None) for i in picks]
+    size = len(text.encode('utf-8'))
+    step = max(1, size // (len(chunks) + 1))
+    supports = [SimpleNamespace(segment=SimpleNamespace(start_index=n * step, end_index=min(size, (n + 1) * step),
+                                                        text=None),
+                                grounding_chunk_indices=[n], confidence_scores=[0.9])
+                for n in range(len(chunks))]
+    return SimpleNamespace(web_search_queries=[f"fake query {seed[:6]}", f"fake query {seed[6:12]}"],
+                           grounding_chunks=chunks, grounding_supports=supports, search_entry_point=None)
+
+
+class FakeRateLimitError(Exception):
+    """Raised for simulated quota errors; the message matches runner.RATE_LIMIT_MARKERS."""
+
+    code = 429
+
+
+class FakeResponse:
+    """Minimal GenerateContentResponse: text, usage_metadata, candidates."""
+
+    def __init__(self, text: str, usage_metadata: Any, grounding_metadata: Any = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.candidates = [SimpleNamespace(content=None, grounding_metadata=grounding_metadata,
+                                           finish_reason='STOP')]
+
+
+class FakeCaches:
+    """In-memory client.caches with real TTL expiry."""
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._ids = itertools.count(1)
+        self.created = 0
+
+    def _expire_time(self, expires_at: float) -> datetime:
+        return datetime.fromtimestamp(expires_at, tz=timezone.utc)
+
+    def _handle(self, name: str, entry: Dict) -> SimpleNamespace:
+        return SimpleNamespace(
+            name=name,
+            model=entry['model'],
+            display_name=entry['display_name'],
+            expire_time=self._expire_time(entry['expires_at']),
+            usage_metadata=SimpleNamespace(total_token_count=entry['tokens']),
+        )
+
+    def create(self, model: str, config: Any = None) -> SimpleNamespace:
+        text = _contents_text(_get(config, 'contents'))
+        system_instruction = _contents_text(_get(config, 'system_instruction'))
+        with self._lock:
+            name = f"cachedContents/fake-{next(self._ids)}"
+            self._entries[name] = {
+                'model': model,
+                'display_name': _get(config, 'display_name'),
+                'text': system_instruction + '\n' + text,
+                'tokens': estimate_tokens(system_instruction) + estimate_tokens(text),
+                'expires_at': self._clock() + _parse_ttl(_get(config, 'ttl'), 3600.0),
+            }
+            self.created += 1
+            return self._handle(name, self._entries[name])
+
+    def _live(self, name: str) -> Dict:
+        entry = self._entries.get(name)
+        if entry is None or entry['expires_at'] <= self._clock():
+            self._entries.pop(name, None)
+            raise LookupError(f"404 NOT_FOUND: cached content {name} not found or expired")
+        return entry
+
+    def get(self, name: str, config: Any = None) -> SimpleNamespace:
+        with self._lock:
+            return self._handle(name, self._live(name))
+
+    def update(self, name: str, config: Any = None) -> SimpleNamespace:
+        with self._lock:
+            entry = self._live(name)
+            entry['expires_at'] = self._clock() + _parse_ttl(_get(config, 'ttl'), 3600.0)
+            return self._handle(name, entry)
+
+    def delete(self, name: str, config: Any = None) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def list(self, config: Any = None) -> List[SimpleNamespace]:
+        with self._lock:
+            return [self._handle(name, entry) for name, entry in self._entries.items()
+                    if entry['expires_at'] > self._clock()]
+
+
+class FakeModels:
+    """client.models with deterministic answers, simulated latency and injected rate limits."""
+
+    def __init__(self, caches: FakeCaches, seconds_per_1k_prompt_tokens: float = 0.0,
+                 answer_words: int = 200, chunk_words: int = 20, latency_seconds: float = 0.0,
+                 seconds_per_chunk: float = 0.0, rate_limit_every: int = 0):
+        self._caches = caches
+        self.seconds_per_1k_prompt_tokens = seconds_per_1k_prompt_tokens
+        self.answer_words = answer_words
+        self.chunk_words = chunk_words
+        self.latency_seconds = latency_seconds
+        self.seconds_per_chunk = seconds_per_chunk
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def _pieces(self, text: str) -> List[str]:
+        words = text.split(' ')
+        return [' '.join(words[i:i + self.chunk_words]) + ' ' for i in range(0, len(words), self.chunk_words)]
+
+    def _prepare(self, model: str, contents: Any, config: Any):
+        with self._lock:
+            self.calls += 1
+            limited = bool(self.rate_limit_every) and self.calls % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+        if limited:
+            raise FakeRateLimitError("429 RESOURCE_EXHAUSTED: Resource has been exhausted (simulated quota)")
+        prompt = _contents_text(contents)
+        system_instruction = _contents_text(_get(config, 'system_instruction'))
+        cached_name = _get(config, 'cached_content')
+
+        cached_tokens = 0
+        cached_text = ''
+        if cached_name:
+            with self._caches._lock:
+                entry = self._caches._live(cached_name)
+            cached_tokens = entry['tokens']
+            cached_text = entry['text']
+
+        new_tokens = estimate_tokens(system_instruction) + estimate_tokens(prompt)
+        # Cached prefix tokens are already processed server-side; only new tokens cost time
+        delay = self.latency_seconds + new_tokens / 1000.0 * self.seconds_per_1k_prompt_tokens
+        if delay:
+            time.sleep(delay)
+
+        digest = hashlib.sha256('\0'.join((model, cached_text, system_instruction, prompt)).encode('utf-8'))
+        seed = digest.hexdigest()
+        if _get(config, 'response_mime_type') == 'application/json':
+            text = _structured_answer(seed, prompt)
+        else:
+            words = [f"{seed[i % 64:i % 64 + 6]}" for i in range(self.answer_words)]
+            text = f"Fake analysis {seed[:12]}: " + ' '.join(words)
+        grounding = _grounding(seed, text) if _get(config, 'tools') or cached_name else None
+        completion_tokens = estimate_tokens(text)
+        usage = SimpleNamespace(
+            prompt_token_count=new_tokens + cached_tokens,
+            cached_content_token_count=cached_tokens or None,
+            candidates_token_count=completion_tokens,
+            total_token_count=new_tokens + cached_tokens + completion_tokens,
+        )
+        return text, usage, grounding
+
+    def generate_content(self, model: str, contents: Any, config: Any = None) -> FakeResponse:
+        text, usage, grounding = self._prepare(model, contents, config)
+        if self.seconds_per_chunk:
+            # The whole answer is generated before a blocking call returns
+            time.sleep(self.seconds_per_chunk * len(self._pieces(text)))
+        return FakeResponse(text, usage, grounding)
+
+    def generate_content_stream(self, model: str, contents: Any, config: Any = None) -> Iterator[FakeResponse]:
+        text, usage, grounding = self._prepare(model, contents, config)
+        pieces = self._pieces(text)
+        for i, piece in enumerate(pieces):
+            if i and self.seconds_per_chunk:
+                time.sleep(self.seconds_per_chunk)
+            # Only the final chunk carries the complete usage and grounding metadata, as with the real API
+            last = i == len(pieces) - 1
+            yield FakeResponse(piece, usage if last else None, grounding if last else None)
+
+
+class FakeGenaiClient:
+    """Drop-in replacement for genai.Client(...) in offline runs."""
+
+    def __init__(self, seconds_per_1k_prompt_tokens: float = 0.0, clock=time.time, **model_options):
+        """
+        Args:
+            seconds_per_1k_prompt_tokens: Simulated latency per 1,000 uncached prompt tokens
+            clock: Time source for cache expiry (injectable for tests)
+            **model_options: FakeModels options: answer_words, chunk_words, latency_seconds
+                (before the first chunk), seconds_per_chunk, rate_limit_every (every Nth
+                call raises a 429 FakeRateLimitError; 0 disables)
+        """
+        self.caches = FakeCaches(clock=clock)
+        self.models = FakeModels(self.caches, seconds_per_1k_prompt_tokens, **model_options)
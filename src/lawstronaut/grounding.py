@@ -0,0 +1,407 @@
+"""
+Grounding metadata normalization and the cited-source index
+
+Gemini reports search grounding per candidate
+(`response.candidates[i].grounding_metadata`) as SDK objects: search
+queries, grounding chunks (web URI and title) and grounding supports
+(answer byte spans backed by chunk indices, with confidence scores).
+normalize_grounding() turns that, the raw dict form of it, Perplexity's
+search results, and result files written by earlier harness versions into
+one small JSON-safe schema:
+
+    {"web_search_queries": ["ftc non-compete rule 2024", ...],
+     "sources":  [{"uri", "title", "domain"}],          # deduplicated by URL
+     "supports": [{"candidate", "start", "end", "sources": [i, ...], "confidence": [...]}],
+     "candidates": [{"index", "web_search_queries", "sources": [i, ...]}]}
+
+Support spans are UTF-8 byte offsets into the answer (support_text() slices
+them); the rendered search entry point HTML is not kept.
+
+SourceIndex records every source once, keyed by canonical URL, with the
+(question, contract, model) answers it backed, so "which answers cite
+ecfr.gov" or "which official sources did we already find for 5A" is an
+indexed lookup across all runs.
+
+Usage:
+    python -m lawstronaut sources gemini_vertex_results/ run.jsonl
+    python -m lawstronaut sources --official --qa-id 5A
+    python -m lawstronaut sources --domain eur-lex.europa.eu --answers
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .paths import CACHE_DIR
+
+DEFAULT_SOURCE_INDEX_PATH = CACHE_DIR / 'sources.sqlite3'
+
+# Vertex AI returns grounding URIs as redirects through this host; the title carries the site domain
+REDIRECT_HOSTS = ('vertexaisearch.cloud.google.com',)
+
+# Domains (and domain suffixes) treated as official legal sources
+OFFICIAL_DOMAINS = (
+    'ecfr.gov', 'federalregister.gov', 'govinfo.gov', 'uscode.house.gov', 'ftc.gov',
+    'eur-lex.europa.eu', 'europa.eu', 'legislation.gov.uk', 'gov.uk', '.gov',
+)
+
+_TRACKING_PARAMS = re.compile(r'^(?:utm_\w+|fbclid|gclid|mc_\w+)$')
+_REPR_FIELD = re.compile(r"\b(uri|title|domain)='((?:[^'\\]|\\.)*)'")
+
+
+def _field(value: Any, name: str, default: Any = None) -> Any:
+    """Read a field from an SDK object or a plain dict."""
+    if value is None:
+        return default
+    if isinstance(value, dict):
+        return value.get(name, default)
+    return getattr(value, name, default)
+
+
+def canonical_url(uri: str) -> str:
+    """Lowercase scheme and host, drop fragments, tracking parameters and trailing slashes."""
+    parts = urlsplit(uri.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not _TRACKING_PARAMS.match(k)])
+    path = parts.path.rstrip('/') if parts.path not in ('', '/') else ''
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def source_domain(uri: str, title: str = '', domain: str = '') -> str:
+    """Site domain of a source (from the title for Vertex redirect URIs)."""
+    if domain:
+        return domain.lower()
+    host = urlsplit(uri).netloc.lower()
+    if host in REDIRECT_HOSTS or not host:
+        candidate = (title or '').strip().lower()
+        return candidate if re.fullmatch(r'[a-z0-9.-]+\.[a-z]{2,}', candidate) else host
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_official(domain: str) -> bool:
+    """True for government and EU/UK legislation domains (OFFICIAL_DOMAINS)."""
+    domain = (domain or '').lower()
+    return any(domain == d or domain.endswith(d if d.startswith('.') else '.' + d) for d in OFFICIAL_DOMAINS)
+
+
+def _chunk_source(chunk: Any) -> Optional[Dict]:
+    """{"uri", "title", "domain"} of one grounding chunk (SDK object, dict or stringified object)."""
+    if isinstance(chunk, str):
+        # Written by older harness versions through json.dump(default=str)
+        found = {key: value for key, value in _REPR_FIELD.findall(chunk)}
+        web = found if found.get('uri') else None
+    else:
+        web = _field(chunk, 'web') or _field(chunk, 'retrieved_context')
+        if web is None and _field(chunk, 'uri'):
+            web = chunk
+    uri = _field(web, 'uri')
+    if not uri:
+        return None
+    title = _field(web, 'title') or ''
+    return {'uri': uri, 'title': title, 'domain': source_domain(uri, title, _field(web, 'domain') or '')}
+
+
+class _Builder:
+    """Accumulates queries, deduplicated sources and supports across candidates."""
+
+    def __init__(self):
+        self.queries: List[str] = []
+        self.sources: List[Dict] = []
+        self.supports: List[Dict] = []
+        self.candidates: List[Dict] = []
+        self._source_ids: Dict[str, int] = {}
+
+    def add_source(self, source: Dict) -> int:
+        key = canonical_url(source['uri'])
+        if key not in self._source_ids:
+            self._source_ids[key] = len(self.sources)
+            self.sources.append(source)
+        return self._source_ids[key]
+
+    def add_candidate(self, index: int, metadata: Any) -> None:
+        queries = [q for q in _field(metadata, 'web_search_queries') or [] if q]
+        chunk_ids = []
+        for chunk in _field(metadata, 'grounding_chunks') or []:
+            source = _chunk_source(chunk)
+            chunk_ids.append(self.add_source(source) if source else None)
+        for support in _field(metadata, 'grounding_supports') or []:
+            segment = _field(support, 'segment')
+            ids = [chunk_ids[i] for i in _field(support, 'grounding_chunk_indices') or []
+                   if i < len(chunk_ids) and chunk_ids[i] is not None]
+            self.supports.append({
+                'candidate': index,
+                'start': _field(segment, 'start_index') or 0,
+                'end': _field(segment, 'end_index') or 0,
+                'sources': ids,
+                'confidence': [round(float(score), 4) for score in _field(support, 'confidence_scores') or []],
+            })
+        self.queries.extend(q for q in queries if q not in self.queries)
+        self.candidates.append({'index': index, 'web_search_queries': queries,
+                                'sources': sorted({i for i in chunk_ids if i is not None})})
+
+    def result(self) -> Optional[Dict]:
+        if not (self.queries or self.sources):
+            return None
+        return {'web_search_queries': self.queries, 'sources': self.sources,
+                'supports': self.supports, 'candidates': self.candidates}
+
+
+def normalize_grounding(value: Any) -> Optional[Dict]:
+    """
+    Normalize grounding metadata into the module schema.
+
+    Args:
+        value: A GenerateContentResponse (or stream chunk), a GroundingMetadata
+            object or dict, a dict already in the normalized schema, or a
+            stored harness dict with `grounding_chunks`
+
+    Returns:
+        Normalized dict, or None if there is no grounding
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict) and 'sources' in value:
+        return value
+
+    builder = _Builder()
+    if not isinstance(value, dict) and (hasattr(value, 'candidates') or hasattr(value, 'grounding_metadata')):
+        # Response object: metadata lives on each candidate (the top level only proxies candidate 0)
+        for index, candidate in enumerate(_field(value, 'candidates') or []):
+            metadata = _field(candidate, 'grounding_metadata')
+            if metadata is not None:
+                builder.add_candidate(_field(candidate, 'index', index) or index, metadata)
+        if not builder.candidates and _field(value, 'grounding_metadata') is not None:
+            builder.add_candidate(0, _field(value, 'grounding_metadata'))
+    else:
+        builder.add_candidate(0, value)
+    return builder.result()
+
+
+def grounding_from_urls(results: Iterable[Dict]) -> Optional[Dict]:
+    """Normalized grounding for providers that only return a list of {"url", "title"} search results."""
+    builder = _Builder()
+    builder.add_candidate(0, {'grounding_chunks': [{'web': {'uri': item.get('url'), 'title': item.get('title')}}
+                                                   for item in results if item.get('url')]})
+    return builder.result()
+
+
+def support_text(answer: str, support: Dict) -> str:
+    """Answer text of a support span (offsets are UTF-8 byte positions)."""
+    return answer.encode('utf-8')[support['start']:support['end']].decode('utf-8', errors='ignore')
+
+
+class SourceIndex:
+    """SQLite index of grounding sources and the answers they back."""
+
+    def __init__(self, path: Optional[Path] = None, resolve_redirects: bool = False):
+        """
+        Open (or create) a source index.
+
+        Args:
+            path: SQLite database (default: .cache/lawstronaut/sources.sqlite3)
+            resolve_redirects: Follow Vertex redirect URIs once (HEAD request) and index the target URL
+        """
+        self.path = Path(path) if path else DEFAULT_SOURCE_INDEX_PATH
+        self.resolve_redirects = resolve_redirects
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            ' url TEXT PRIMARY KEY, domain TEXT, title TEXT, official INTEGER NOT NULL,'
+            ' first_seen REAL NOT NULL, last_seen REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS answer_sources ('
+            ' url TEXT NOT NULL, qa_id TEXT NOT NULL, contract_file TEXT NOT NULL, model TEXT NOT NULL,'
+            ' supports INTEGER NOT NULL, seen_at REAL NOT NULL,'
+            ' PRIMARY KEY (url, qa_id, contract_file, model));'
+            'CREATE TABLE IF NOT EXISTS redirects (uri TEXT PRIMARY KEY, target TEXT);'
+            'CREATE INDEX IF NOT EXISTS idx_sources_domain ON sources(domain);'
+            'CREATE INDEX IF NOT EXISTS idx_answer_sources_pair ON answer_sources(qa_id, contract_file);'
+        )
+        self._conn.commit()
+
+    def _resolve(self, uri: str) -> str:
+        """Target of a redirect URI, looked up once and remembered (the URI itself on failure)."""
+        if urlsplit(uri).netloc.lower() not in REDIRECT_HOSTS or not self.resolve_redirects:
+            return uri
+        row = self._conn.execute('SELECT target FROM redirects WHERE uri = ?', (uri,)).fetchone()
+        if row:
+            return row[0] or uri
+        from .providers import shared_http_client
+
+        target = None
+        try:
+            response = shared_http_client().head(uri, follow_redirects=False, timeout=15.0)
+            target = response.headers.get('location')
+        except Exception:
+            pass
+        self._conn.execute('INSERT OR REPLACE INTO redirects (uri, target) VALUES (?, ?)', (uri, target))
+        return target or uri
+
+    def add(self, record: Dict, model: Optional[str] = None) -> int:
+        """
+        Index the grounding sources of one harness or comparison record.
+
+        Args:
+            record: Result dict with `response` (or `responses` keyed by model)
+            model: Model label for a harness record (default: response["model"])
+
+        Returns:
+            Number of sources not seen before
+        """
+        if 'responses' in record:
+            responses = list(record['responses'].items())
+        else:
+            responses = [(model, record.get('response') or {})]
+        added = 0
+        now = time.time()
+        with self._lock:
+            for label, response in responses:
+                grounding = normalize_grounding(response.get('grounding_metadata'))
+                if not grounding:
+                    continue
+                label = label or response.get('model') or ''
+                support_counts = [0] * len(grounding['sources'])
+                for support in grounding['supports']:
+                    for i in support['sources']:
+                        support_counts[i] += 1
+                for source, supports in zip(grounding['sources'], support_counts):
+                    url = canonical_url(self._resolve(source['uri']))
+                    # A resolved redirect names the real site; the recorded domain is the redirect host's
+                    domain = source_domain(url) if url != canonical_url(source['uri']) else source['domain']
+                    cursor = self._conn.execute(
+                        'INSERT OR IGNORE INTO sources (url, domain, title, official, first_seen, last_seen)'
+                        ' VALUES (?, ?, ?, ?, ?, ?)',
+                        (url, domain, source['title'], int(is_official(domain)), now, now))
+                    added += cursor.rowcount
+                    self._conn.execute('UPDATE sources SET last_seen = ? WHERE url = ?', (now, url))
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO answer_sources (url, qa_id, contract_file, model, supports, seen_at)'
+                        ' VALUES (?, ?, ?, ?, ?, ?)',
+                        (url, str(record.get('qa_id', '')), str(record.get('contract_file', '')), label,
+                         supports, now))
+            self._conn.commit()
+        return added
+
+    def add_records(self, records: Iterable[Dict], model: Optional[str] = None) -> int:
+        """Index many records; returns the number of new sources."""
+        return sum(self.add(record, model) for record in records)
+
+    def sources(self, qa_id: Optional[str] = None, contract_file: Optional[str] = None,
+                domain: Optional[str] = None, official: bool = False) -> List[Dict]:
+        """
+        Sources backing matching answers, most-cited first.
+
+        Args:
+            qa_id: Only sources cited for this question
+            contract_file: Only sources cited for this contract
+            domain: Only this domain (and its subdomains)
+            official: Only OFFICIAL_DOMAINS sources
+
+        Returns:
+            Dicts with url, domain, title, official, answers (answers citing it), supports
+        """
+        clauses, params = [], []
+        if qa_id:
+            clauses.append('a.qa_id = ?')
+            params.append(qa_id)
+        if contract_file:
+            clauses.append('a.contract_file = ?')
+            params.append(contract_file)
+        if domain:
+            clauses.append('(s.domain = ? OR s.domain LIKE ?)')
+            params += [domain.lower(), '%.' + domain.lower()]
+        if official:
+            clauses.append('s.official = 1')
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT s.url, s.domain, s.title, s.official, COUNT(*), SUM(a.supports)'
+                ' FROM sources s JOIN answer_sources a ON a.url = s.url ' + where +
+                ' GROUP BY s.url ORDER BY COUNT(*) DESC, SUM(a.supports) DESC, s.url', params).fetchall()
+        return [{'url': url, 'domain': domain_, 'title': title, 'official': bool(flag),
+                 'answers': answers, 'supports': supports or 0}
+                for url, domain_, title, flag, answers, supports in rows]
+
+    def answers(self, url_or_domain: str) -> List[Dict]:
+        """(qa_id, contract_file, model, url) of every answer citing a URL or any URL on a domain."""
+        if '/' in url_or_domain:
+            where, params = 'a.url = ?', [canonical_url(url_or_domain)]
+        else:
+            domain = url_or_domain.lower()
+            where, params = '(s.domain = ? OR s.domain LIKE ?)', [domain, '%.' + domain]
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT a.qa_id, a.contract_file, a.model, a.url, a.supports FROM answer_sources a'
+                ' JOIN sources s ON s.url = a.url WHERE ' + where +
+                ' ORDER BY a.qa_id, a.contract_file, a.model', params).fetchall()
+        return [dict(zip(('qa_id', 'contract_file', 'model', 'url', 'supports'), row)) for row in rows]
+
+    def domains(self, official: bool = False) -> List[Dict]:
+        """Source and answer counts per domain."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT s.domain, MAX(s.official), COUNT(DISTINCT s.url), COUNT(DISTINCT a.qa_id || a.contract_file)'
+                ' FROM sources s JOIN answer_sources a ON a.url = s.url'
+                + (' WHERE s.official = 1' if official else '') +
+                ' GROUP BY s.domain ORDER BY 4 DESC, 3 DESC, s.domain').fetchall()
+        return [{'domain': domain, 'official': bool(flag), 'sources': sources, 'answers': answers}
+                for domain, flag, sources, answers in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut sources."""
+    import argparse
+
+    from .batch import read_result_file
+
+    parser = argparse.ArgumentParser(prog='lawstronaut sources',
+                                     description='Index and query the web sources that ground answers')
+    parser.add_argument('results', nargs='*',
+                        help='Result files (.json / .jsonl) or result directories to add to the index; prefix with "label=" to name the model')
+    parser.add_argument('--index', type=Path, default=DEFAULT_SOURCE_INDEX_PATH,
+                        help='Index database (default: .cache/lawstronaut/sources.sqlite3)')
+    parser.add_argument('--resolve', action='store_true',
+                        help='Resolve Vertex redirect URIs to their target URLs while indexing (network)')
+    parser.add_argument('--qa-id', help='Only sources cited for this question')
+    parser.add_argument('--contract', help='Only sources cited for this contract')
+    parser.add_argument('--domain', help='Only sources on this domain (e.g. ecfr.gov)')
+    parser.add_argument('--official', action='store_true', help='Only official (government / legislation) sources')
+    parser.add_argument('--answers', action='store_true', help='List the answers citing --domain instead of sources')
+    parser.add_argument('--limit', type=int, default=25, help='Rows to print (default: 25)')
+    args = parser.parse_args(argv)
+
+    index = SourceIndex(args.index, resolve_redirects=args.resolve)
+    try:
+        for spec in args.results:
+            label, records = read_result_file(spec)
+            records = list(records)
+            added = index.add_records(records, model=label)
+            print(f"Indexed {spec}: {len(records)} record(s), {added} new source(s)")
+
+        if args.answers:
+            if not args.domain:
+                parser.error('--answers needs --domain (a domain or URL)')
+            for row in index.answers(args.domain)[:args.limit]:
+                print(f"  {row['qa_id']:<6} {row['model']:<28.28} {row['contract_file'][:50]:<50} {row['url']}")
+        elif args.qa_id or args.contract or args.domain:
+            for row in index.sources(args.qa_id, args.contract, args.domain, args.official)[:args.limit]:
+                print(f"  {row['answers']:>4} answer(s) {'*' if row['official'] else ' '} "
+                      f"{row['domain']:<28.28} {row['title'][:40]:<40} {row['url']}")
+        else:
+            rows = index.domains(official=args.official)
+            print(f"\n{len(rows)} domain(s) ('*' = official source)")
+            for row in rows[:args.limit]:
+                print(f"  {'*' if row['official'] else ' '} {row['domain']:<36} "
+                      f"{row['sources']:>5} source(s) {row['answers']:>5} answer(s)")
+    finally:
+        index.close()
+    return 0
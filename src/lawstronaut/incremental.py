@@ -0,0 +1,136 @@
+"""
+Change detection for incremental re-analysis
+
+A (question, contract) result depends on four inputs: the contract text, the
+prompt (system instruction, template and the question itself), the model
+configuration, and the `regulations` rows the question is about. Each is
+hashed separately and the hashes are stored on the result as `inputs`, with
+their combination as `fingerprint`. On the next sweep a pair is re-run only
+if one of those hashes changed; every other result is carried forward from
+the checkpoint unchanged.
+
+A question is tied to the regulations its `regulation_focus` or
+`expected_citation` names (by type, name, acronym or official citation), so
+the FTC rule moving to `blocked` re-runs 5A and nothing else. Applicability
+rules (`Regulation.RULE_FIELDS`) are not part of the fingerprint; they only
+drive the exposure matrix.
+"""
+
+import hashlib
+import json
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .batch import pair_key
+from .prompts import prompt_templates
+from .regulations import Regulation, relevant_regulations
+
+INPUTS = ('contract', 'prompt', 'model', 'regulations')
+
+# Question fields that reach the prompt or decide which regulations apply
+QUESTION_FIELDS = ('question_text', 'question_type', 'regulation_focus', 'expected_citation')
+
+
+def _hash(value) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class ChangeTracker:
+    """Fingerprints the inputs of each pair and decides which pairs must re-run."""
+
+    def __init__(self, read_contract: Callable[[str], str], model: Dict,
+                 regulations: Optional[Dict[str, Regulation]] = None,
+                 prompt: Optional[Sequence[str]] = None):
+        """
+        Args:
+            read_contract: Contract name -> full text (e.g. LawstronautTester.read_contract)
+            model: Everything about the request that can change an answer: model name,
+                generation settings, retrieval and budget options (JSON-serializable)
+            regulations: Regulation records keyed by id (None ignores regulations)
+            prompt: Prompt templates the answer depends on (default: the Google Search
+                prose prompt, prompts.prompt_templates())
+        """
+        self.read_contract = read_contract
+        self.regulations = regulations or {}
+        self.model_hash = _hash(model)
+        self.prompt_hash = _hash(list(prompt if prompt is not None else prompt_templates()))
+        self._contract_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def contract_hash(self, contract_file: str) -> str:
+        """Hash of a contract's text, read once per run ("missing" if it cannot be read)."""
+        with self._lock:
+            if contract_file not in self._contract_hashes:
+                try:
+                    self._contract_hashes[contract_file] = _hash(self.read_contract(contract_file))
+                except OSError:
+                    self._contract_hashes[contract_file] = 'missing'
+            return self._contract_hashes[contract_file]
+
+    def inputs(self, question: Dict) -> Dict[str, str]:
+        """Per-input hashes for one pair (keys: INPUTS)."""
+        related = relevant_regulations(question, self.regulations)
+        return {
+            'contract': self.contract_hash(question['contract_file']),
+            'prompt': _hash([self.prompt_hash] + [question.get(key) or '' for key in QUESTION_FIELDS]),
+            'model': self.model_hash,
+            'regulations': _hash({regulation.regulation_id: regulation.record_fingerprint()
+                                  for regulation in related}),
+        }
+
+    def fingerprint(self, question: Dict) -> str:
+        """Combined hash of every input of a pair."""
+        inputs = self.inputs(question)
+        return _hash([inputs[name] for name in INPUTS])
+
+    def stamp(self, question: Dict, result: Dict) -> Dict:
+        """Record the pair's inputs and fingerprint on its result (returns the result)."""
+        inputs = self.inputs(question)
+        result['inputs'] = inputs
+        result['fingerprint'] = _hash([inputs[name] for name in INPUTS])
+        return result
+
+    def changes(self, question: Dict, result: Optional[Dict]) -> List[str]:
+        """
+        Why a pair has to run again.
+
+        Returns:
+            Changed input names, ["new"] without a previous result, ["unknown"]
+            if the previous result predates fingerprinting; empty if unchanged
+        """
+        if not result:
+            return ['new']
+        previous = result.get('inputs')
+        if not previous:
+            return ['unknown']
+        current = self.inputs(question)
+        return [name for name in INPUTS if previous.get(name) != current[name]]
+
+    def plan(self, pairs: Iterable[Dict], checkpoint) -> Tuple[List[Dict], Counter]:
+        """
+        Split pairs into the ones to run and the ones to carry forward.
+
+        A pair runs if it has no successful result in `checkpoint` or if any of
+        its inputs changed since that result was produced.
+
+        Args:
+            pairs: Question dicts with contract_file set
+            checkpoint: JsonlCheckpoint holding the previous results
+
+        Returns:
+            (pairs to run, Counter of reasons: "new", "failed", "unknown" or an input name)
+        """
+        to_run, reasons = [], Counter()
+        for question in pairs:
+            result = checkpoint.results.get(pair_key(question))
+            if result and not checkpoint.is_done(question):
+                changed = ['failed']
+            else:
+                changed = self.changes(question, result)
+            if changed:
+                to_run.append(question)
+                reasons.update(changed)
+        return to_run, reasons
@@ -0,0 +1,433 @@
+"""
+Latency, token and cost telemetry
+
+Each harness result carries `response.timings`, the seconds spent in every
+stage of the pair:
+
+    contract_read   reading the contract text
+    prompt_build    section / passage selection and prompt assembly
+    request         the model call (including context-cache setup)
+    ttft            time to first token (streaming runs only)
+    grounding       normalizing grounding metadata
+    json_write      appending the result to the checkpoint (and the final dump)
+
+MetricsRecorder folds results into HDR-style histograms per model and per
+question, so p50/p95/p99 stay accurate to ~1% without keeping every sample,
+and adds token counts, tokens/sec and estimated $ cost from PRICES. It
+exports Prometheus text exposition format and a JSON summary.
+
+Usage:
+    python -m lawstronaut metrics gemini_vertex_results/
+    python -m lawstronaut metrics run.jsonl --by question --prom metrics.prom --json metrics.json
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+STAGES = ('contract_read', 'prompt_build', 'request', 'ttft', 'grounding', 'json_write')
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class Price:
+    """List price in USD per million tokens (plus a per-request grounding fee)."""
+
+    input: float
+    output: float
+    cached: Optional[float] = None      # Context-cached prompt tokens (default: input price)
+    grounded_request: float = 0.0       # Per request that used search grounding
+
+
+# Longest matching prefix wins; override with --prices FILE ({"prefix": {"input": ..., "output": ...}})
+PRICES: Dict[str, Price] = {
+    'gemini-2.0-flash': Price(input=0.10, output=0.40, cached=0.025, grounded_request=0.035),
+    'gemini-2.5-flash': Price(input=0.30, output=2.50, cached=0.075, grounded_request=0.035),
+    'gemini-2.5-pro': Price(input=1.25, output=10.00, cached=0.31, grounded_request=0.035),
+    'gemini-1.5-pro': Price(input=1.25, output=5.00, cached=0.3125, grounded_request=0.035),
+    'gpt-4o': Price(input=2.50, output=10.00, cached=1.25),
+    'claude-sonnet-4': Price(input=3.00, output=15.00, cached=0.30),
+    'sonar-pro': Price(input=3.00, output=15.00),
+    'sonar': Price(input=1.00, output=1.00),
+}
+
+
+def load_prices(path: Optional[Path] = None) -> Dict[str, Price]:
+    """PRICES, updated with the entries of a JSON price file if given."""
+    prices = dict(PRICES)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for prefix, entry in json.load(f).items():
+                prices[prefix] = Price(**entry)
+    return prices
+
+
+def price_for(model: str, prices: Optional[Dict[str, Price]] = None) -> Optional[Price]:
+    """Price of a model name (longest matching prefix), or None if unknown."""
+    prices = PRICES if prices is None else prices
+    for prefix in sorted(prices, key=len, reverse=True):
+        if (model or '').startswith(prefix):
+            return prices[prefix]
+    return None
+
+
+def request_cost(model: str, tokens: Dict, grounded: bool = False,
+                 prices: Optional[Dict[str, Price]] = None) -> Optional[float]:
+    """
+    Estimated USD cost of one request.
+
+    Args:
+        model: Model name
+        tokens: `tokens_used` of a response (prompt, completion, cached)
+        grounded: Whether the request used search grounding
+        prices: Price table (default: PRICES)
+
+    Returns:
+        Cost in USD, or None for unknown models or missing token counts
+    """
+    price = price_for(model, prices)
+    if price is None or not tokens or tokens.get('prompt') is None:
+        return None
+    cached = tokens.get('cached') or 0
+    cached_price = price.input if price.cached is None else price.cached
+    cost = ((tokens['prompt'] - cached) * price.input + cached * cached_price
+            + (tokens.get('completion') or 0) * price.output) / 1_000_000
+    return cost + (price.grounded_request if grounded else 0.0)
+
+
+class Histogram:
+    """
+    Log-linear (HDR-style) histogram.
+
+    Values are scaled to integers and bucketed by their top `precision_bits`
+    significant bits, so each bucket spans at most 1 / 2**(precision_bits - 1)
+    of its value (under 1% for the default 8 bits) at any magnitude, and
+    histograms merge by adding bucket counts.
+    """
+
+    def __init__(self, scale: float = 1_000_000, precision_bits: int = 8):
+        """
+        Args:
+            scale: Multiplier applied before bucketing (1e6 records seconds at microsecond resolution)
+            precision_bits: Significant bits kept per bucket
+        """
+        self.scale = scale
+        self.precision_bits = precision_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, scaled: int) -> int:
+        shift = max(0, scaled.bit_length() - self.precision_bits)
+        return (scaled >> shift) << shift
+
+    def _highest(self, bucket: int) -> int:
+        shift = max(0, bucket.bit_length() - self.precision_bits)
+        return bucket + (1 << shift) - 1
+
+    def record(self, value: float, count: int = 1) -> None:
+        value = max(0.0, float(value))
+        bucket = self._bucket(int(round(value * self.scale)))
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'Histogram') -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0-1): the highest value of the bucket holding that rank."""
+        if not self.count:
+            return None
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._highest(bucket) / self.scale, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> Dict:
+        summary = {'count': self.count, 'mean': self.mean, 'min': self.min, 'max': self.max}
+        for q in QUANTILES:
+            summary[f'p{round(q * 100)}'] = self.percentile(q)
+        return summary
+
+
+def _responses(record: Dict) -> Iterator[Tuple[str, Dict]]:
+    """(model, response) pairs of a harness record or a compare record."""
+    if 'responses' in record:
+        for label, response in (record['responses'] or {}).items():
+            yield (response or {}).get('model') or label, response or {}
+    else:
+        response = record.get('response') or {}
+        yield response.get('model') or 'unknown', response
+
+
+class MetricsRecorder:
+    """Thread-safe collector of stage timings, tokens and cost per model and per question."""
+
+    def __init__(self, prices: Optional[Dict[str, Price]] = None):
+        self.prices = PRICES if prices is None else prices
+        self._lock = threading.Lock()
+        # (metric, "model" | "qa_id", label value) -> Histogram
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        # (model, status) -> requests
+        self._requests: Dict[Tuple[str, str], int] = {}
+        # (model, kind) -> tokens
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        # ("model" | "qa_id", label value) -> USD
+        self._cost: Dict[Tuple[str, str], float] = {}
+
+    def observe(self, metric: str, value: Optional[float], model: Optional[str] = None,
+                qa_id: Optional[str] = None) -> None:
+        """Add a value (a stage in seconds, tokens_per_second, ...) to the model and question histograms."""
+        if value is None:
+            return
+        scale = 1e9 if metric == 'cost_usd' else 1e6 if metric in STAGES else 1e3
+        with self._lock:
+            for dimension, label in (('model', model), ('qa_id', qa_id)):
+                if label is not None:
+                    key = (metric, dimension, str(label))
+                    if key not in self._histograms:
+                        self._histograms[key] = Histogram(scale=scale)
+                    self._histograms[key].record(value)
+
+    @contextmanager
+    def time(self, stage: str, model: Optional[str] = None, qa_id: Optional[str] = None):
+        """Time a block as one observation of `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, model, qa_id)
+
+    def record_result(self, record: Dict) -> None:
+        """Add the timings, tokens and cost of one harness (or compare) record."""
+        qa_id = record.get('qa_id')
+        for model, response in _responses(record):
+            if response.get('error'):
+                status = 'error'
+            elif response.get('cache_hit'):
+                status = 'cache_hit'
+            else:
+                status = 'ok'
+
+            timings = dict(response.get('timings') or {})
+            if 'request' not in timings and status == 'ok' and response.get('elapsed_seconds') is not None:
+                # Results written before per-stage timings only have the total
+                timings['request'] = response['elapsed_seconds']
+            for stage in STAGES:
+                self.observe(stage, timings.get(stage), model, qa_id)
+
+            tokens = response.get('tokens_used') or {}
+            cost = None
+            if status == 'ok':
+                streaming = response.get('streaming') or {}
+                tokens_per_second = streaming.get('tokens_per_second')
+                if tokens_per_second is None and tokens.get('completion') and timings.get('request'):
+                    tokens_per_second = tokens['completion'] / timings['request']
+                self.observe('tokens_per_second', tokens_per_second, model, qa_id)
+                grounding = response.get('grounding_metadata') or {}
+                grounded = bool(grounding.get('web_search_queries') or grounding.get('sources'))
+                cost = request_cost(model, tokens, grounded, self.prices)
+                self.observe('cost_usd', cost, model, qa_id)
+
+            with self._lock:
+                self._requests[(model, status)] = self._requests.get((model, status), 0) + 1
+                if status == 'ok':
+                    for kind in ('prompt', 'completion', 'cached'):
+                        if tokens.get(kind):
+                            self._tokens[(model, kind)] = self._tokens.get((model, kind), 0) + tokens[kind]
+                if cost is not None:
+                    for key in (('model', model), ('qa_id', str(qa_id))):
+                        self._cost[key] = self._cost.get(key, 0.0) + cost
+
+    def record_results(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.record_result(record)
+
+    def histogram(self, metric: str, model: Optional[str] = None, qa_id: Optional[str] = None) -> Histogram:
+        """One histogram, or all models / questions merged when neither is given."""
+        with self._lock:
+            if model is not None:
+                return self._histograms.get((metric, 'model', model)) or Histogram()
+            if qa_id is not None:
+                return self._histograms.get((metric, 'qa_id', qa_id)) or Histogram()
+            merged = Histogram()
+            for (name, dimension, _label), histogram in self._histograms.items():
+                if name == metric and dimension == 'model':
+                    merged.merge(histogram)
+            return merged
+
+    def summary(self) -> Dict:
+        """JSON-safe summary: per model and per question histograms, tokens, requests and cost."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            requests, tokens, cost = dict(self._requests), dict(self._tokens), dict(self._cost)
+
+        def section(dimension: str) -> Dict:
+            out: Dict[str, Dict] = {}
+            for (metric, dim, label), histogram in sorted(histograms.items()):
+                if dim == dimension:
+                    entry = out.setdefault(label, {'stages': {}})
+                    if metric in STAGES:
+                        entry['stages'][metric] = histogram.to_dict()
+                    else:
+                        entry[metric] = histogram.to_dict()
+            for (dim, label), usd in cost.items():
+                if dim == dimension:
+                    out.setdefault(label, {'stages': {}})['total_cost_usd'] = round(usd, 6)
+            return out
+
+        models = section('model')
+        for (model, status), count in requests.items():
+            models.setdefault(model, {'stages': {}}).setdefault('requests', {})[status] = count
+        for (model, kind), count in tokens.items():
+            models.setdefault(model, {'stages': {}}).setdefault('tokens', {})[kind] = count
+        return {
+            'models': models,
+            'questions': section('qa_id'),
+            'total_cost_usd': round(sum(usd for (dim, _), usd in cost.items() if dim == 'model'), 6),
+        }
+
+    def prometheus_text(self, prefix: str = 'lawstronaut') -> str:
+        """Prometheus text exposition format (summaries with p50/p95/p99, counters)."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            requests, tokens, cost = dict(self._requests), dict(self._tokens), dict(self._cost)
+
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        def summary(name: str, help_text: str, entries: Sequence[Tuple[Dict[str, str], Histogram]]) -> None:
+            if not entries:
+                return
+            metric = family(name, 'summary', help_text)
+            for labels, histogram in entries:
+                for q in QUANTILES:
+                    lines.append(f"{metric}{_labels(dict(labels, quantile=str(q)))} "
+                                 f"{_number(histogram.percentile(q))}")
+                lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.total)}")
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+
+        for dimension, name in (('model', 'stage_seconds'), ('qa_id', 'question_stage_seconds')):
+            summary(name, f"Seconds per pipeline stage, by {dimension.replace('qa_id', 'question')}",
+                    [({dimension: label, 'stage': metric}, histogram)
+                     for (metric, dim, label), histogram in sorted(histograms.items())
+                     if dim == dimension and metric in STAGES])
+        for metric, help_text in (('tokens_per_second', 'Completion tokens per second of request time'),
+                                  ('cost_usd', 'Estimated USD cost per request')):
+            summary(metric, help_text, [({'model': label}, histogram)
+                                        for (name, dim, label), histogram in sorted(histograms.items())
+                                        if name == metric and dim == 'model'])
+
+        if requests:
+            metric = family('requests_total', 'counter', 'Requests by model and status (ok, error, cache_hit)')
+            for (model, status), count in sorted(requests.items()):
+                lines.append(f"{metric}{_labels({'model': model, 'status': status})} {count}")
+        if tokens:
+            metric = family('tokens_total', 'counter', 'Tokens by model and kind (prompt, completion, cached)')
+            for (model, kind), count in sorted(tokens.items()):
+                lines.append(f"{metric}{_labels({'model': model, 'kind': kind})} {count}")
+        for dimension, name in (('model', 'cost_usd_total'), ('qa_id', 'question_cost_usd_total')):
+            entries = sorted((label, usd) for (dim, label), usd in cost.items() if dim == dimension)
+            if entries:
+                metric = family(name, 'counter', f"Estimated USD cost by {dimension.replace('qa_id', 'question')}")
+                for label, usd in entries:
+                    lines.append(f"{metric}{_labels({dimension: label})} {_number(usd)}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path: Optional[Path] = None, prom_path: Optional[Path] = None) -> None:
+        """Write the JSON summary and/or Prometheus text to files."""
+        if json_path:
+            Path(json_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.summary(), f, indent=2)
+        if prom_path:
+            Path(prom_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(prom_path).write_text(self.prometheus_text(), encoding='utf-8')
+
+    def print_table(self, by: str = 'model') -> None:
+        """Print p50/p95/p99 per stage, tokens/sec and cost, per model or per question."""
+        summary = self.summary()
+        groups = summary['models'] if by == 'model' else summary['questions']
+        for label, entry in sorted(groups.items()):
+            requests = entry.get('requests')
+            print(f"\n{label}" + (' (' + ', '.join(f"{n} {status}" for status, n in sorted(requests.items())) + ')'
+                                  if requests else ''))
+            print(f"  {'stage':<16} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+            for stage in STAGES:
+                stats = entry['stages'].get(stage)
+                if stats:
+                    print(f"  {stage:<16} {stats['count']:>6} " + ' '.join(
+                        f"{stats[key]:>8.3f}s" for key in ('p50', 'p95', 'p99', 'max')))
+            tokens_per_second = entry.get('tokens_per_second')
+            if tokens_per_second:
+                print(f"  tokens/sec: p50 {tokens_per_second['p50']:.0f}, p95 {tokens_per_second['p95']:.0f}")
+            if entry.get('total_cost_usd') is not None:
+                print(f"  estimated cost: ${entry['total_cost_usd']:.4f}")
+        print(f"\nEstimated total cost: ${summary['total_cost_usd']:.4f}")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Prometheus label set, with backslashes, quotes and newlines escaped."""
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: Optional[float]) -> str:
+    return 'NaN' if value is None else repr(float(value))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut metrics."""
+    import argparse
+
+    from .batch import read_result_file
+
+    parser = argparse.ArgumentParser(prog='lawstronaut metrics',
+                                     description='Stage latency, token and cost summary of result files')
+    parser.add_argument('results', nargs='+', help='Result files (.json / .jsonl) or result directories')
+    parser.add_argument('--by', choices=['model', 'question'], default='model',
+                        help='Group the table by model or question (default: model)')
+    parser.add_argument('--prices', type=Path, help='JSON price table overriding the built-in prices')
+    parser.add_argument('--json', type=Path, help='Write the JSON summary here')
+    parser.add_argument('--prom', type=Path, help='Write Prometheus text format here')
+    args = parser.parse_args(argv)
+
+    recorder = MetricsRecorder(load_prices(args.prices))
+    for spec in args.results:
+        _label, records = read_result_file(spec)
+        recorder.record_results(records)
+    recorder.print_table(args.by)
+    recorder.write(args.json, args.prom)
+    for path in (args.json, args.prom):
+        if path:
+            print(f"Wrote {path}")
+    return 0
@@ -0,0 +1,20 @@
+"""
+Well-known filesystem locations for the Lawstronaut project
+"""
+
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = PROJECT_ROOT / 'data'
+TEST_CONTRACT_DIR = DATA_DIR / 'test_contracts'
+# scripts/setup_test_contracts.sh expects the full CUAD text corpus at the project root
+FULL_CONTRACT_DIR = PROJECT_ROOT / 'full_contract_txt'
+
+# Local caches and indexes; override with LAWSTRONAUT_CACHE_DIR
+CACHE_DIR = Path(os.getenv('LAWSTRONAUT_CACHE_DIR', PROJECT_ROOT / '.cache' / 'lawstronaut'))
+
+
+def default_contract_dir() -> Path:
+    """Full CUAD text corpus if present, otherwise the bundled test contracts."""
+    return FULL_CONTRACT_DIR if FULL_CONTRACT_DIR.exists() else TEST_CONTRACT_DIR
@@ -0,0 +1,401 @@
+"""
+Prompt templates shared by the Gemini test harnesses
+"""
+
+from typing import Optional, Tuple
+
+SYSTEM_INSTRUCTION = """You are a senior legal research AI assistant with real-time Google Search capabilities, specializing in contract analysis and regulatory compliance.
+
+Your task is to provide COMPREHENSIVE, well-cited legal analysis. You MUST:
+
+1. **Find ALL current, applicable law** - Use Google Search extensively to locate:
+   - Federal regulations, statutes, and recent rules (as of November 5, 2025)
+   - State-specific laws and recent amendments
+   - Recent court decisions and injunctions
+   - Agency guidance and interpretations
+   - International regulations if applicable (EU, UK, etc.)
+
+2. **Provide COMPLETE analysis with pinpoint citations** - For every legal requirement:
+   - Exact citation: "GDPR Article 9(2)(a)", "16 CFR § 910.2(a)(1)", "Cal. Civ. Code § 1798.140(ag)(1)"
+   - Effective date and status (active, enjoined, amended)
+   - Direct quote from the legal text (not summaries)
+   - Official source URL
+
+3. **Include ALL relevant context** - Your analysis should cover:
+   - Historical context (previous versions of law, amendments)
+   - Current legal status (in effect, enjoined, challenged)
+   - Exceptions and exemptions
+   - Industry-specific applications
+   - Conflicting regulations and how to resolve them
+   - Pending legislation that may affect compliance
+
+4. **Thorough contract analysis** - For each provision:
+   - Quote the exact contract language (with section numbers)
+   - Compare against legal requirements point-by-point
+   - Identify compliance status: compliant, partially compliant, non-compliant, unclear
+   - List ALL missing provisions or gaps
+   - Note ambiguous language that could create risk
+
+5. **Structure your answer comprehensively**:
+   a) Executive Summary (2-3 sentences)
+   b) Applicable Regulations (with full citations, dates, URLs)
+   c) Key Legal Requirements (direct quotes from each regulation)
+   d) Detailed Contract Analysis (quote and analyze each relevant section)
+   e) Compliance Assessment (comprehensive evaluation)
+   f) Identified Gaps and Missing Provisions
+   g) Recommendations (what needs to be added/changed)
+   h) Risk Assessment (potential consequences of non-compliance)
+
+6. **Use Google Search extensively** - Search multiple times for:
+   - Primary sources of law
+   - Recent amendments and updates
+   - Court cases and injunctions
+   - Regulatory guidance
+   - Cross-references and related regulations
+
+Your answers should be THOROUGH, not brief. Legal analysis requires comprehensive coverage. Include ALL relevant information, not just highlights."""
+
+# System instruction for requests sent without the Google Search tool
+# (structured output, or passages from the local regulation corpus)
+SEARCH_FREE_SYSTEM_INSTRUCTION = SYSTEM_INSTRUCTION.replace(
+    " with real-time Google Search capabilities", ""
+).replace(
+    "Use Google Search extensively to locate:",
+    "Using the regulatory material provided and your own knowledge, identify:"
+).replace(
+    """6. **Use Google Search extensively** - Search multiple times for:
+   - Primary sources of law
+   - Recent amendments and updates
+   - Court cases and injunctions
+   - Regulatory guidance
+   - Cross-references and related regulations""",
+    """6. **Work without web search** - Google Search is not available for this request:
+   - Rely on the regulation records and passages provided with the question, if any
+   - Treat the status they record as current
+   - Cite only primary sources you can identify precisely
+   - Say when a point is not covered by the material and needs verification"""
+)
+
+FULL_CONTRACT_HEADING = "FULL CONTRACT TEXT (READ CAREFULLY):"
+EXCERPT_HEADING = "RELEVANT CONTRACT SECTIONS (EXCERPTS - CITE THE SECTION NUMBERS SHOWN):"
+
+PROMPT_TEMPLATE = """You are analyzing a legal contract for regulatory compliance. Provide a COMPREHENSIVE legal analysis.
+
+═══════════════════════════════════════════════════════════════════════════════
+{contract_heading}
+═══════════════════════════════════════════════════════════════════════════════
+
+{contract_text}
+
+═══════════════════════════════════════════════════════════════════════════════
+LEGAL QUESTION TO ANALYZE:
+═══════════════════════════════════════════════════════════════════════════════
+
+{question}
+
+═══════════════════════════════════════════════════════════════════════════════
+MANDATORY REQUIREMENTS FOR YOUR ANALYSIS:
+═══════════════════════════════════════════════════════════════════════════════
+
+1. **COMPREHENSIVE LEGAL RESEARCH (as of November 5, 2025):**
+
+   Use Google Search EXTENSIVELY to find:
+
+   a) ALL applicable federal regulations
+      - Search: "[topic] federal regulations 2025"
+      - Search: "FTC [topic] rule 2024 2025"
+      - Search: "[agency] final rule [topic]"
+
+   b) ALL applicable state laws
+      - Search: "[state] [topic] law 2025"
+      - Search: "[state] code section [topic]"
+
+   c) Recent amendments and changes
+      - Search: "[regulation name] amended 2024 2025"
+      - Search: "[regulation] effective date"
+
+   d) Court challenges and injunctions
+      - Search: "[regulation name] court injunction 2024"
+      - Search: "[regulation name] enjoined stayed"
+
+   e) International regulations (if applicable)
+      - Search: "EU [topic] regulation 2024"
+      - Search: "GDPR AI Act 2024"
+
+2. **DETAILED CITATIONS WITH COMPLETE CONTEXT:**
+
+   For EVERY regulation mentioned, provide:
+   - Full citation: "Title, CFR Part, Section, Subsection"
+   - Effective date: "Effective [date]" or "Finalized [date], currently enjoined"
+   - Current status: "In force", "Enjoined", "Under review"
+   - Direct quote: The actual text from the regulation (3-5 sentences minimum)
+   - Official URL: Link to ecfr.gov, eur-lex.europa.eu, state .gov sites
+
+   Example format:
+   ```
+   **FTC Non-Compete Clause Rule (16 CFR Part 910)**
+   - Finalized: August 20, 2024
+   - Status: Currently enjoined nationwide by U.S. District Court (Ryan LLC v. FTC, August 2024)
+   - Scheduled effective date: September 4, 2024 (not in effect)
+   - URL: https://www.ecfr.gov/current/title-16/part-910
+
+   The rule states:
+   "It is an unfair method of competition for an employer to enter into or attempt to
+   enter into a non-compete clause with a worker; to enforce or attempt to enforce a
+   non-compete clause with a worker; or to represent to a worker that the worker is
+   subject to a non-compete clause where the employer has no good faith basis to
+   believe that the worker is subject to an enforceable non-compete clause."
+
+   Exception under 16 CFR § 910.3(a):
+   "This rule does not apply to a non-compete clause that is entered into by a person
+   pursuant to a bona fide sale of a business entity, of the person's ownership interest
+   in a business entity, or of all or substantially all of a business entity's operating assets."
+
+   Senior executive exception under 16 CFR § 910.3(b):
+   [Include if applicable]
+   ```
+
+3. **THOROUGH CONTRACT ANALYSIS:**
+
+   For EACH relevant contract provision:
+
+   a) Quote the exact contract language:
+      "Section [X.X] states: '[exact text from contract]'"
+
+   b) Identify which legal requirement it addresses:
+      "This provision relates to [specific regulation, citation]"
+
+   c) Analyze compliance in detail:
+      - Does it fully comply? Why or why not?
+      - What specific elements are present/missing?
+      - How does the language compare to the legal requirement?
+
+   d) Assess gaps:
+      - What additional provisions are required by law but missing?
+      - What provisions are present but inadequate?
+      - What provisions conflict with legal requirements?
+
+4. **STRUCTURE YOUR COMPLETE ANSWER:**
+
+   **A. EXECUTIVE SUMMARY** (3-5 sentences)
+   Brief overview of findings and overall compliance status.
+
+   **B. APPLICABLE REGULATIONS** (Comprehensive list with full details)
+   List ALL relevant regulations with:
+   - Full citation
+   - Effective date and current status
+   - Primary source URL
+   - Brief description of what it covers
+
+   **C. KEY LEGAL REQUIREMENTS** (Quote extensively from each regulation)
+   For each major regulation:
+   - Quote the key provisions (full text, not summaries)
+   - Explain what compliance requires
+   - Note any exceptions or safe harbors
+
+   **D. DETAILED CONTRACT ANALYSIS** (Section by section)
+   For each relevant contract section:
+   - Quote the contract provision
+   - Identify which legal requirement it addresses
+   - Analyze compliance status
+   - Note strengths and weaknesses
+
+   **E. COMPLIANCE ASSESSMENT** (Overall evaluation)
+   - What is compliant?
+   - What is partially compliant? (explain the gap)
+   - What is non-compliant? (explain the violation)
+   - What is unclear or ambiguous?
+
+   **F. IDENTIFIED GAPS AND MISSING PROVISIONS** (Complete list)
+   List ALL missing requirements:
+   - What provisions are required by law but absent?
+   - What disclosures are required but missing?
+   - What procedures are required but not documented?
+
+   **G. RECOMMENDATIONS** (Specific, actionable)
+   - What specific language should be added?
+   - What provisions should be modified?
+   - What additional agreements or notices are needed?
+
+   **H. RISK ASSESSMENT** (Consequences of non-compliance)
+   - Legal risks
+   - Regulatory enforcement risks
+   - Financial penalties
+   - Business impact
+
+5. **QUALITY REQUIREMENTS:**
+
+   - Minimum 2,000 words for comprehensive analysis
+   - Use Google Search at least 5-10 times
+   - Cite at least 5-10 specific legal sources
+   - Quote actual legal text (not summaries) for each key requirement
+   - Provide official URLs for ALL major regulations cited
+   - Reference specific contract sections by number
+   - Be thorough, not brief - legal analysis requires detail
+
+6. **VERIFICATION:**
+
+   Before submitting your answer, verify:
+   - [ ] Have I searched for ALL applicable laws and regulations?
+   - [ ] Have I included the current status (effective, enjoined, etc.)?
+   - [ ] Have I quoted the actual legal text (not paraphrased)?
+   - [ ] Have I provided official URLs for sources?
+   - [ ] Have I analyzed EACH relevant contract provision?
+   - [ ] Have I identified ALL gaps and missing provisions?
+   - [ ] Is my analysis comprehensive (2,000+ words)?
+
+═══════════════════════════════════════════════════════════════════════════════
+BEGIN YOUR COMPREHENSIVE ANALYSIS:
+═══════════════════════════════════════════════════════════════════════════════"""
+
+
+# Split point for context caching: everything up to and including the contract
+# is the reusable prefix, the question and requirements are the per-call suffix
+_PREFIX_END = PROMPT_TEMPLATE.index('{contract_text}') + len('{contract_text}')
+PROMPT_PREFIX_TEMPLATE = PROMPT_TEMPLATE[:_PREFIX_END]
+PROMPT_SUFFIX_TEMPLATE = PROMPT_TEMPLATE[_PREFIX_END:]
+
+# Suffix used when the Google Search tool is not sent (local regulation corpus):
+# the same requirements, with the search instructions replaced
+_RESEARCH_START = PROMPT_SUFFIX_TEMPLATE.index("   Use Google Search EXTENSIVELY to find:")
+_RESEARCH_END = PROMPT_SUFFIX_TEMPLATE.index("2. **DETAILED CITATIONS WITH COMPLETE CONTEXT:**")
+SEARCH_FREE_SUFFIX_TEMPLATE = (
+    PROMPT_SUFFIX_TEMPLATE[:_RESEARCH_START]
+    + """   Using the regulatory text provided (no web search is available), identify:
+
+   a) ALL applicable federal regulations
+   b) ALL applicable state laws
+   c) Recent amendments and changes
+   d) Court challenges and injunctions
+   e) International regulations (if applicable)
+
+"""
+    + PROMPT_SUFFIX_TEMPLATE[_RESEARCH_END:]
+).replace(
+    "   - Use Google Search at least 5-10 times\n", ""
+).replace(
+    "Have I searched for ALL applicable laws and regulations?",
+    "Have I covered ALL applicable laws and regulations?"
+)
+
+# Suffix used in structured-output mode: same contract prefix (so context caches
+# are shared), but the answer is a JSON object matching structured.RESPONSE_SCHEMA
+STRUCTURED_SUFFIX_TEMPLATE = """
+
+═══════════════════════════════════════════════════════════════════════════════
+LEGAL QUESTION TO ANALYZE:
+═══════════════════════════════════════════════════════════════════════════════
+
+{question}
+
+═══════════════════════════════════════════════════════════════════════════════
+ANSWER FORMAT:
+═══════════════════════════════════════════════════════════════════════════════
+
+Return ONE JSON object matching the response schema instead of prose sections:
+
+- compliance_status: overall status of the contract against the regulations in scope
+- risk_level: low, medium, high or critical
+- summary: 2-4 sentences answering the question
+- regulations: every regulation relied on, with its full official citation,
+  current status (proposed, enacted, in_force, amended, blocked - enjoined or
+  stayed by a court - or repealed), effective date (YYYY-MM-DD) and official
+  URL (ecfr.gov, eur-lex.europa.eu, legislation.gov.uk, state .gov sites)
+- provisions: each relevant contract provision, with its section number as
+  written in the contract, a short verbatim excerpt and how it fares
+- gaps: each missing or deficient provision, with the regulation and article it
+  falls short of, its severity and the recommended remediation
+- recommendations: concrete drafting or compliance actions, most urgent first
+
+Cite section numbers exactly as they appear in the contract text. Use an empty
+list rather than inventing provisions or regulations."""
+
+
+# Inserted before the question when regulatory passages come from the local
+# corpus (regulation_corpus) instead of Google Search
+AUTHORITIES_TEMPLATE = """
+
+═══════════════════════════════════════════════════════════════════════════════
+REGULATORY TEXT (LOCAL CORPUS - GOOGLE SEARCH IS NOT AVAILABLE):
+═══════════════════════════════════════════════════════════════════════════════
+
+Rely on the regulation records and statutory passages below instead of web
+searches. Cite them by the article or section shown, treat the status in each
+record as current, and say so when a point is not covered by them.
+
+{authorities}"""
+
+
+def prompt_templates(structured: bool = False, authorities: bool = False,
+                     search: bool = True) -> Tuple[str, ...]:
+    """
+    Templates behind one request mode, for fingerprinting (incremental.ChangeTracker).
+
+    Args:
+        structured: JSON answer suffix instead of the prose one
+        authorities: Local corpus passages are inserted (AUTHORITIES_TEMPLATE)
+        search: False when the Google Search tool is not sent
+
+    Returns:
+        (system instruction, prefix template, suffix template[, authorities template])
+    """
+    if structured:
+        suffix = STRUCTURED_SUFFIX_TEMPLATE
+    else:
+        suffix = PROMPT_SUFFIX_TEMPLATE if search else SEARCH_FREE_SUFFIX_TEMPLATE
+    templates = (SYSTEM_INSTRUCTION if search else SEARCH_FREE_SYSTEM_INSTRUCTION, PROMPT_PREFIX_TEMPLATE, suffix)
+    return templates + (AUTHORITIES_TEMPLATE,) if authorities else templates
+
+
+def build_prompt(contract_text: str, question: str, excerpts: bool = False, structured: bool = False,
+                 authorities: Optional[str] = None, search: bool = True) -> str:
+    """
+    Build the full analysis prompt for one contract and question.
+
+    Args:
+        contract_text: Contract text to inline into the prompt
+        question: Legal question to analyze
+        excerpts: True when contract_text holds retrieved sections rather than the whole contract
+        structured: Ask for a JSON answer (structured.RESPONSE_SCHEMA) instead of the A-H prose sections
+        authorities: Regulatory passages to ground the answer in (regulation_corpus.format_authorities)
+        search: False when the request is sent without the Google Search tool
+
+    Returns:
+        Prompt string sent as the request contents
+    """
+    return ''.join(build_prompt_parts(contract_text, question, excerpts, structured, authorities, search))
+
+
+def build_prompt_parts(contract_text: str, question: str, excerpts: bool = False,
+                       structured: bool = False, authorities: Optional[str] = None,
+                       search: bool = True) -> Tuple[str, str]:
+    """
+    Build the prompt as a (contract prefix, question suffix) pair.
+
+    prefix + suffix == build_prompt(contract_text, question, excerpts); the
+    prefix depends only on the contract, so it can be cached server-side and
+    shared by every question asked about that contract.
+
+    Args:
+        contract_text: Contract text to inline into the prompt
+        question: Legal question to analyze
+        excerpts: True when contract_text holds retrieved sections rather than the whole contract
+        structured: Use the JSON answer suffix (STRUCTURED_SUFFIX_TEMPLATE)
+        authorities: Regulatory passages, placed at the start of the suffix (AUTHORITIES_TEMPLATE)
+        search: False to drop the Google Search instructions (SEARCH_FREE_SUFFIX_TEMPLATE)
+
+    Returns:
+        (prefix, suffix) strings
+    """
+    prefix = PROMPT_PREFIX_TEMPLATE.format(
+        contract_heading=EXCERPT_HEADING if excerpts else FULL_CONTRACT_HEADING,
+        contract_text=contract_text
+    )
+    if structured:
+        suffix_template = STRUCTURED_SUFFIX_TEMPLATE
+    else:
+        suffix_template = PROMPT_SUFFIX_TEMPLATE if search else SEARCH_FREE_SUFFIX_TEMPLATE
+    suffix = suffix_template.format(question=question)
+    if authorities:
+        suffix = AUTHORITIES_TEMPLATE.format(authorities=authorities) + suffix
+    return prefix, suffix
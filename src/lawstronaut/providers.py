@@ -0,0 +1,464 @@
+"""
+LLM provider registry with shared connection pools and concurrency limits
+
+Every backend (Vertex AI Gemini, OpenAI, Anthropic, Perplexity and a local
+deterministic fake) takes the same (system instruction, prompt, ModelConfig)
+request and returns the result dict query_gemini() produces:
+
+    {"answer", "model", "provider", "elapsed_seconds", "grounding_metadata",
+     "tokens_used": {"prompt", "completion", "total", "cached"}}
+
+or {"error", "error_trace", "answer": None, "model", "provider"} on failure.
+
+Provider instances are shared process-wide through get_provider(), so all
+testers and threads reuse one keep-alive httpx connection pool, and each
+provider's semaphore caps the requests in flight against that API.
+"""
+
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from .grounding import grounding_from_urls, normalize_grounding
+
+HTTP_TIMEOUT_SECONDS = 300.0
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+_http_client = None
+_http_lock = threading.Lock()
+
+PROVIDERS: Dict[str, Type['Provider']] = {}
+_instances: Dict[str, 'Provider'] = {}
+_instances_lock = threading.Lock()
+
+
+@dataclass
+class ModelConfig:
+    """One provider/model/generation-settings combination to query."""
+
+    provider: str
+    model: str
+    max_output_tokens: int = 6000
+    temperature: float = 0.2
+    top_p: Optional[float] = 0.8
+    top_k: Optional[int] = None
+    # Web search grounding (Vertex Google Search; Perplexity always searches)
+    grounding: bool = True
+    label: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        """Display name used as the result key, e.g. "vertex:gemini-2.0-flash-exp"."""
+        return self.label or f"{self.provider}:{self.model}"
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def shared_http_client() -> 'httpx.Client':
+    """Process-wide keep-alive connection pool used by every HTTP provider."""
+    global _http_client
+    if not HTTPX_AVAILABLE:
+        raise ImportError("httpx is required for HTTP providers: pip install httpx")
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=15.0),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                                    keepalive_expiry=120.0),
+            )
+        return _http_client
+
+
+def register_provider(name: str) -> Callable[[Type['Provider']], Type['Provider']]:
+    """Class decorator adding a Provider subclass to PROVIDERS."""
+    def register(cls: Type['Provider']) -> Type['Provider']:
+        cls.name = name
+        PROVIDERS[name] = cls
+        return cls
+    return register
+
+
+def _error_result(error: Exception, model: str, provider: str) -> Dict:
+    return {
+        "error": str(error),
+        "error_trace": traceback.format_exc(),
+        "answer": None,
+        "model": model,
+        "provider": provider,
+    }
+
+
+class Provider:
+    """Base class: concurrency limiting, timing and error normalization."""
+
+    name = ''
+    default_model = ''
+    default_concurrency = 4
+    api_key_env: Optional[str] = None
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: Optional[int] = None, **options):
+        """
+        Args:
+            api_key: API key (default: read from api_key_env)
+            max_concurrency: Requests allowed in flight against this provider
+            **options: Provider-specific settings
+        """
+        self.api_key = api_key or (os.getenv(self.api_key_env) if self.api_key_env else None)
+        self.max_concurrency = max_concurrency or self.default_concurrency
+        self.options = options
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def available(self) -> bool:
+        """True if the provider has the credentials it needs."""
+        return bool(self.api_key)
+
+    def generate(self, system_instruction: str, prompt: str, config: ModelConfig) -> Dict:
+        """
+        Send one request and return the normalized result dict (never raises).
+
+        Args:
+            system_instruction: System prompt
+            prompt: User prompt
+            config: Model and generation settings
+
+        Returns:
+            Result dict in the query_gemini() schema, with "provider" added
+        """
+        model = config.model or self.default_model
+        if not self.available():
+            return {
+                "error": f"{self.name} not configured (set {self.api_key_env})",
+                "answer": None,
+                "model": model,
+                "provider": self.name,
+            }
+        with self.slot():
+            start_time = time.time()
+            try:
+                result = self._generate(system_instruction, prompt, config, model)
+            except Exception as e:
+                return _error_result(e, model, self.name)
+        result.setdefault("grounding_metadata", None)
+        result.update(model=model, provider=self.name, elapsed_seconds=time.time() - start_time)
+        return result
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold one of this provider's concurrency slots.
+
+        For callers that use the provider's client directly (streaming,
+        context caching), so they share the limit generate() enforces.
+        """
+        with self._semaphore:
+            yield
+
+    def _generate(self, system_instruction: str, prompt: str, config: ModelConfig, model: str) -> Dict:
+        """Provider-specific call; returns at least answer and tokens_used."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release provider resources (the shared HTTP pool is closed by close_providers())."""
+
+
+def _usage(prompt: Optional[int], completion: Optional[int], total: Optional[int] = None,
+           cached: Optional[int] = None) -> Dict:
+    if total is None and prompt is not None and completion is not None:
+        total = prompt + completion
+    return {"prompt": prompt, "completion": completion, "total": total, "cached": cached}
+
+
+@register_provider('vertex')
+class VertexProvider(Provider):
+    """Gemini on Vertex AI through google-genai, optionally with Google Search grounding."""
+
+    default_model = 'gemini-2.0-flash-exp'
+    default_concurrency = 8
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 project_id: Optional[str] = None, location: Optional[str] = None,
+                 client: Any = None, **options):
+        """
+        Args:
+            project_id: Google Cloud project (default: GOOGLE_CLOUD_PROJECT)
+            location: Vertex AI region (default: GOOGLE_CLOUD_LOCATION or us-central1)
+            client: Pre-built genai client (e.g. FakeGenaiClient); built lazily otherwise
+        """
+        super().__init__(api_key, max_concurrency, **options)
+        self.project_id = project_id or os.getenv('GOOGLE_CLOUD_PROJECT')
+        self.location = location or os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self._client is not None or bool(self.project_id)
+
+    @property
+    def client(self) -> Any:
+        """The shared genai.Client, created on first use over the shared HTTP pool."""
+        with self._client_lock:
+            if self._client is None:
+                from google import genai
+                from google.genai.types import HttpOptions
+
+                http_options = {'api_version': 'v1'}
+                if HTTPX_AVAILABLE and 'httpx_client' in HttpOptions.model_fields:
+                    http_options['httpx_client'] = shared_http_client()
+                self._client = genai.Client(
+                    vertexai=True,
+                    project=self.project_id,
+                    location=self.location,
+                    http_options=HttpOptions(**http_options),
+                )
+            return self._client
+
+    def generation_config(self, system_instruction: str, config: ModelConfig) -> Any:
+        """GenerateContentConfig for a ModelConfig."""
+        from google.genai.types import GenerateContentConfig, GoogleSearch, Tool
+
+        return GenerateContentConfig(
+            tools=[Tool(google_search=GoogleSearch())] if config.grounding else None,
+            temperature=config.temperature,
+            top_p=config.top_p,
+            top_k=config.top_k,
+            max_output_tokens=config.max_output_tokens,
+            system_instruction=system_instruction,
+            **config.options
+        )
+
+    def _generate(self, system_instruction: str, prompt: str, config: ModelConfig, model: str) -> Dict:
+        response = self.client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=self.generation_config(system_instruction, config)
+        )
+        return normalize_genai_response(response)
+
+
+def normalize_genai_response(response: Any) -> Dict:
+    """Answer, grounding metadata (grounding.normalize_grounding schema) and token usage of a GenerateContentResponse."""
+    usage = getattr(response, 'usage_metadata', None)
+    return {
+        "answer": response.text,
+        "grounding_metadata": normalize_grounding(response),
+        "tokens_used": _usage(
+            getattr(usage, 'prompt_token_count', None),
+            getattr(usage, 'candidates_token_count', None),
+            getattr(usage, 'total_token_count', None),
+            getattr(usage, 'cached_content_token_count', None),
+        ),
+    }
+
+
+@register_provider('fake')
+class FakeProvider(VertexProvider):
+    """Deterministic offline provider backed by FakeGenaiClient."""
+
+    default_model = 'fake-gemini'
+    default_concurrency = 16
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: Optional[int] = None, **options):
+        from .fake_genai import FakeGenaiClient
+
+        client_options = {k: options.pop(k) for k in ('seconds_per_1k_prompt_tokens', 'answer_words')
+                          if k in options}
+        super().__init__(api_key, max_concurrency, client=FakeGenaiClient(**client_options), **options)
+
+    def generation_config(self, system_instruction: str, config: ModelConfig) -> Dict:
+        return {
+            'system_instruction': system_instruction,
+            'temperature': config.temperature,
+            'max_output_tokens': config.max_output_tokens,
+        }
+
+
+class ChatCompletionsProvider(Provider):
+    """OpenAI-compatible /chat/completions over the shared HTTP pool."""
+
+    base_url = ''
+    max_tokens_field = 'max_tokens'
+
+    def request_body(self, system_instruction: str, prompt: str, config: ModelConfig, model: str) -> Dict:
+        body = {
+            'model': model,
+            'messages': [
+                {'role': 'system', 'content': system_instruction},
+                {'role': 'user', 'content': prompt},
+            ],
+            self.max_tokens_field: config.max_output_tokens,
+            'temperature': config.temperature,
+        }
+        if config.top_p is not None:
+            body['top_p'] = config.top_p
+        body.update(config.options)
+        return body
+
+    def _generate(self, system_instruction: str, prompt: str, config: ModelConfig, model: str) -> Dict:
+        response = shared_http_client().post(
+            self.options.get('base_url', self.base_url) + '/chat/completions',
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            json=self.request_body(system_instruction, prompt, config, model),
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get('usage') or {}
+        cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+        return {
+            "answer": data['choices'][0]['message']['content'],
+            "grounding_metadata": self.grounding(data),
+            "tokens_used": _usage(usage.get('prompt_tokens'), usage.get('completion_tokens'),
+                                  usage.get('total_tokens'), cached),
+        }
+
+    def grounding(self, data: Dict) -> Optional[Dict]:
+        return None
+
+
+@register_provider('openai')
+class OpenAIProvider(ChatCompletionsProvider):
+    """OpenAI Chat Completions API."""
+
+    default_model = 'gpt-4o'
+    default_concurrency = 8
+    api_key_env = 'OPENAI_API_KEY'
+    base_url = 'https://api.openai.com/v1'
+    max_tokens_field = 'max_completion_tokens'
+
+
+@register_provider('perplexity')
+class PerplexityProvider(ChatCompletionsProvider):
+    """Perplexity Sonar (OpenAI-compatible, with built-in web search)."""
+
+    default_model = 'sonar-pro'
+    default_concurrency = 4
+    api_key_env = 'PERPLEXITY_API_KEY'
+    base_url = 'https://api.perplexity.ai'
+
+    def grounding(self, data: Dict) -> Optional[Dict]:
+        # Map Perplexity's citations onto the normalized grounding schema
+        results = data.get('search_results') or [{'url': url} for url in data.get('citations') or []]
+        return grounding_from_urls(results)
+
+
+@register_provider('anthropic')
+class AnthropicProvider(Provider):
+    """Anthropic Messages API."""
+
+    default_model = 'claude-sonnet-4-5'
+    default_concurrency = 4
+    api_key_env = 'ANTHROPIC_API_KEY'
+    base_url = 'https://api.anthropic.com/v1'
+    api_version = '2023-06-01'
+
+    def _generate(self, system_instruction: str, prompt: str, config: ModelConfig, model: str) -> Dict:
+        body = {
+            'model': model,
+            'system': system_instruction,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': config.max_output_tokens,
+            'temperature': config.temperature,
+        }
+        body.update(config.options)
+        response = shared_http_client().post(
+            self.options.get('base_url', self.base_url) + '/messages',
+            headers={'x-api-key': self.api_key, 'anthropic-version': self.api_version},
+            json=body,
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get('usage') or {}
+        prompt_tokens = usage.get('input_tokens')
+        cached = usage.get('cache_read_input_tokens')
+        if prompt_tokens is not None and cached:
+            prompt_tokens += cached
+        return {
+            "answer": ''.join(block.get('text', '') for block in data.get('content', [])
+                              if block.get('type') == 'text'),
+            "tokens_used": _usage(prompt_tokens, usage.get('output_tokens'), cached=cached),
+        }
+
+
+def get_provider(name: str, **kwargs) -> Provider:
+    """
+    Return the shared instance of a provider, creating it on first use.
+
+    Keyword arguments only apply when the instance is created; later calls
+    get the same instance (and therefore the same concurrency limit).
+
+    Raises:
+        KeyError: If the provider name is unknown
+    """
+    if name not in PROVIDERS:
+        raise KeyError(f"Unknown provider: {name} (available: {', '.join(sorted(PROVIDERS))})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = PROVIDERS[name](**kwargs)
+        return _instances[name]
+
+
+# Model-name prefixes used to infer the provider of a bare model name
+MODEL_PREFIXES = (
+    ('gemini', 'vertex'),
+    ('gpt', 'openai'),
+    ('o1', 'openai'),
+    ('o3', 'openai'),
+    ('o4', 'openai'),
+    ('claude', 'anthropic'),
+    ('sonar', 'perplexity'),
+    ('fake', 'fake'),
+)
+
+
+def parse_model_spec(spec: str) -> ModelConfig:
+    """
+    Parse "provider:model" or a bare model name into a ModelConfig.
+
+    Examples: "openai:gpt-4o", "claude-sonnet-4-5", "perplexity", "fake".
+
+    Raises:
+        ValueError: If the provider cannot be determined
+    """
+    if ':' in spec:
+        provider, model = spec.split(':', 1)
+    elif spec in PROVIDERS:
+        provider, model = spec, ''
+    else:
+        provider = next((p for prefix, p in MODEL_PREFIXES if spec.lower().startswith(prefix)), None)
+        model = spec
+        if provider is None:
+            raise ValueError(f"Cannot infer provider for model {spec!r}; use provider:model")
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {provider} (available: {', '.join(sorted(PROVIDERS))})")
+    return ModelConfig(provider=provider, model=model or PROVIDERS[provider].default_model)
+
+
+def available_providers() -> List[str]:
+    """Names of providers whose credentials are configured."""
+    return [name for name in PROVIDERS if get_provider(name).available()]
+
+
+def close_providers() -> None:
+    """Close every provider and the shared HTTP pool."""
+    global _http_client
+    with _instances_lock:
+        for provider in _instances.values():
+            provider.close()
+        _instances.clear()
+    with _http_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
@@ -0,0 +1,65 @@
+"""
+Built-in test questions for the Lawstronaut harnesses
+
+The six questions from TEST_QUESTIONS.md, each paired with its test contract.
+Larger question x contract matrices are loaded with lawstronaut.batch.load_matrix().
+"""
+
+from typing import Dict, List
+
+DEFAULT_QUESTIONS: List[Dict[str, str]] = [
+    {
+        "qa_id": "1A",
+        "question_type": "Data Processing Permissions",
+        "regulation_focus": "GDPR, EU AI Act, Data Protection",
+        "contract_file": "FOUNDATIONMEDICINE,INC_02_02_2015-EX-10.2-Collaboration Agreement.txt",
+        "question_text": "Are we permitted to process the genomic data of our customers?",
+        "expected_answer": "Analysis should cover GDPR Article 6 and Article 9 (special category data), consent requirements, data processing agreements, cross-border transfer mechanisms",
+        "expected_citation": "GDPR Articles 6, 9; Contract data processing clauses"
+    },
+    {
+        "qa_id": "1B",
+        "question_type": "Data Governance Compliance",
+        "regulation_focus": "GDPR, EU AI Act Article 10",
+        "contract_file": "FOUNDATIONMEDICINE,INC_02_02_2015-EX-10.2-Collaboration Agreement.txt",
+        "question_text": "Is this contract compliant with current data governance rules? If not, what is missing?",
+        "expected_answer": "Should assess GDPR data governance requirements, EU AI Act Article 10, data quality standards, bias detection/mitigation, record-keeping obligations",
+        "expected_citation": "GDPR; Regulation (EU) 2024/1689, Article 10"
+    },
+    {
+        "qa_id": "2A",
+        "question_type": "Brexit Amendments",
+        "regulation_focus": "UK REUL Act 2023, Post-Brexit Regulatory Divergence",
+        "contract_file": "WPPPLC_04_30_2020-EX-4.28-SERVICE AGREEMENT.txt",
+        "question_text": "Do any amendments need to be made on account of Brexit?",
+        "expected_answer": "Should identify references to EU regulations that are now UK-retained law, GDPR vs UK GDPR differences, data transfer mechanisms between UK and EU",
+        "expected_citation": "UK REUL Act 2023; UK GDPR; FCA guidance on retained EU law"
+    },
+    {
+        "qa_id": "3A",
+        "question_type": "California Data Protection Compliance",
+        "regulation_focus": "California CPRA, CPPA ADMT Regulations",
+        "contract_file": "CardlyticsInc_20180112_S-1_EX-10.16_11002987_EX-10.16_Maintenance Agreement1.txt",
+        "question_text": "Is this contract compliant with data protection laws in California?",
+        "expected_answer": "Should assess CPRA compliance, ADMT regulations (Nov 2024), risk assessment obligations, consumer opt-out rights, service provider requirements",
+        "expected_citation": "California CPRA (Civil Code § 1798.100 et seq.); CPPA ADMT regulations (Nov 2024)"
+    },
+    {
+        "qa_id": "4A",
+        "question_type": "ESG Compliance Assessment",
+        "regulation_focus": "EU CSDDD, ESG Standards",
+        "contract_file": "UpjohnInc_20200121_10-12G_EX-2.6_11948692_EX-2.6_Manufacturing Agreement_ Supply Agreement.txt",
+        "question_text": "Assess this agreement for ESG compliance.",
+        "expected_answer": "Should evaluate EU CSDDD compliance (Directive 2024/1760), supply chain monitoring, labor standards enforcement, environmental impact, grievance mechanisms, Scope 3 emissions tracking",
+        "expected_citation": "Directive (EU) 2024/1760 (CSDDD), Articles 7-8, 15; ISO ESG standards"
+    },
+    {
+        "qa_id": "5A",
+        "question_type": "Non-Compete Validity",
+        "regulation_focus": "FTC Non-Compete Ban, State Law",
+        "contract_file": "MEDALISTDIVERSIFIEDREIT,INC_05_18_2020-EX-10.1-CONSULTING AGREEMENT.txt",
+        "question_text": "Is the non-compete clause valid?",
+        "expected_answer": "Should analyze FTC non-compete ban status (finalized August 2024, currently enjoined), senior executive exception, contractor vs employee status, applicable state law, reasonableness of scope/duration/geography",
+        "expected_citation": "FTC Rule 16 CFR § 910; Ryan LLC v. FTC (August 2024 injunction); Virginia state law on non-competes"
+    }
+]
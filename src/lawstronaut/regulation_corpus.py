@@ -0,0 +1,369 @@
+"""
+Local regulation corpus and statutory-passage retrieval
+
+An offline alternative to Google Search grounding. The corpus holds two
+kinds of passages per regulation:
+
+    record     the `regulations` row itself (name, citation, status and
+               status detail, dates, summary, key provisions), always present
+    statute    the official text, one passage per Article / § / section, read
+               from data/regulations/<regulation_id>.txt
+
+Statute files are plain text and can be written by hand or downloaded once
+from the official sources in OFFICIAL_TEXT_URLS with
+`python -m lawstronaut corpus fetch` (EUR-Lex, eCFR / Federal Register,
+legislation.gov.uk, California leginfo). After that, runs need no network.
+
+select_passages() restricts retrieval to the regulations a question names
+(regulations.relevant_regulations), always includes their record passages so
+the current status is in front of the model, and fills the rest of the token
+budget with BM25-ranked statute passages.
+
+Usage:
+    python -m lawstronaut corpus                      # coverage per regulation
+    python -m lawstronaut corpus fetch --regulation eu_ai_act
+    python -m lawstronaut corpus search "prohibited AI practices" --regulation eu_ai_act
+"""
+
+import hashlib
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .chunking import estimate_tokens
+from .paths import DATA_DIR
+from .regulations import Regulation, load_regulations, relevant_regulations
+from .retrieval import BM25Index, expand_query, tokenize
+
+DEFAULT_CORPUS_DIR = DATA_DIR / 'regulations'
+
+DEFAULT_MAX_CHARS = 3000
+
+# Official full-text sources, tried in order by `corpus fetch`
+OFFICIAL_TEXT_URLS: Dict[str, List[str]] = {
+    'eu_ai_act': ['https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:32024R1689'],
+    'eu_gdpr': ['https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:32016R0679'],
+    'eu_csddd': ['https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:32024L1760'],
+    'uk_reul': ['https://www.legislation.gov.uk/ukpga/2023/28/enacted/data.xml'],
+    'ftc_noncompete': ['https://www.ecfr.gov/api/renderer/v1/content/enhanced/current/title-16?part=910',
+                       'https://www.federalregister.gov/documents/full_text/html/2024/05/07/2024-09171.html'],
+    'us_cpra': ['https://leginfo.legislature.ca.gov/faces/codes_displayText.xhtml'
+                '?lawCode=CIV&division=3.&title=1.81.5.&part=4.&chapter=&article='],
+}
+
+# One provision per heading line: "Article 5", "§ 910.2", "1798.100.", "Section 3", "ANNEX III", "1 Revocation of ..."
+_PROVISION_RE = re.compile(
+    r'^[ \t]*(?P<provision>'
+    r'Article[ \t]+\d+[a-z]?'
+    r'|§+[ \t]*\d+(?:[.-]\d+)*'
+    r'|\d{4}\.\d{1,3}(?:\.\d+)?(?=\.)'
+    r'|(?:Section|SECTION)[ \t]+\d+[A-Z]?'
+    r'|(?:ANNEX|Annex)[ \t]+[IVXLC]+'
+    r'|\d{1,3}[A-Z]?(?=[ \t]+[A-Z][a-z]+(?:[ \t]+[\w,()-]+){0,12}[ \t]*$)'
+    r')\b',
+    re.MULTILINE
+)
+
+
+@dataclass
+class Passage:
+    """One retrievable unit of regulatory text."""
+
+    passage_id: int
+    regulation_id: str
+    kind: str                       # "record" or "statute"
+    provision: Optional[str]        # "Article 5", "§ 910.2", ... (None for records and preambles)
+    citation: str                   # Official citation, with the provision if any
+    text: str = field(repr=False)
+    token_count: int = 0
+
+    def to_dict(self, include_text: bool = False) -> Dict:
+        data = asdict(self)
+        if not include_text:
+            data.pop('text')
+        return data
+
+
+def record_text(regulation: Regulation) -> str:
+    """Record passage of a regulation: everything the `regulations` row says about it."""
+    lines = [
+        f"{regulation.regulation_name} ({regulation.official_citation})",
+        f"Jurisdiction: {regulation.jurisdiction}",
+        f"Status: {regulation.status.replace('_', ' ')}"
+        + (f" - {regulation.current_status_detail}" if regulation.current_status_detail else ''),
+    ]
+    if regulation.enacted_date:
+        lines.append(f"Enacted: {regulation.enacted_date}")
+    if regulation.effective_date:
+        lines.append(f"Effective: {regulation.effective_date}")
+    if regulation.summary:
+        lines.append(f"Summary: {regulation.summary}")
+    if regulation.key_provisions:
+        lines.append("Key provisions: " + '; '.join(regulation.key_provisions))
+    if regulation.url:
+        lines.append(f"Official source: {regulation.url}")
+    return '\n'.join(lines)
+
+
+def split_provisions(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[Tuple[Optional[str], str]]:
+    """
+    Split statute text into (provision, text) passages.
+
+    Text before the first heading is kept as a preamble (provision None).
+    Provisions longer than max_chars are split at paragraph breaks, each part
+    keeping the provision label.
+    """
+    starts = [(m.start(), m.group('provision').strip()) for m in _PROVISION_RE.finditer(text)]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, None))
+
+    passages = []
+    for i, (start, provision) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(text)
+        body = text[start:end].strip()
+        if not body:
+            continue
+        part = ''
+        for paragraph in re.split(r'\n\s*\n', body):
+            if part and len(part) + len(paragraph) + 2 > max_chars:
+                passages.append((provision, part))
+                part = ''
+            while len(paragraph) > max_chars:
+                passages.append((provision, paragraph[:max_chars]))
+                paragraph = paragraph[max_chars:]
+            part = f"{part}\n\n{paragraph}" if part else paragraph
+        if part.strip():
+            passages.append((provision, part))
+    return passages
+
+
+class RegulationCorpus:
+    """Record and statute passages for a set of regulations, with a BM25 index over them."""
+
+    def __init__(self, regulations: Optional[Dict[str, Regulation]] = None,
+                 corpus_dir: Path = DEFAULT_CORPUS_DIR, max_chars: int = DEFAULT_MAX_CHARS):
+        """
+        Load the corpus.
+
+        Args:
+            regulations: Records keyed by regulation_id (default: load_regulations())
+            corpus_dir: Directory of <regulation_id>.txt statute files (missing files are fine)
+            max_chars: Target maximum passage size
+        """
+        self.regulations = regulations if regulations is not None else load_regulations()
+        self.corpus_dir = Path(corpus_dir)
+        self.passages: List[Passage] = []
+        digest = hashlib.sha256()
+
+        for regulation_id, regulation in self.regulations.items():
+            self._add(regulation_id, 'record', None, regulation.official_citation, record_text(regulation))
+            digest.update(regulation.record_fingerprint().encode('utf-8'))
+            path = self.statute_path(regulation_id)
+            if path.exists():
+                text = path.read_text(encoding='utf-8')
+                digest.update(hashlib.sha256(text.encode('utf-8')).digest())
+                for provision, body in split_provisions(text, max_chars):
+                    citation = regulation.official_citation + (f", {provision}" if provision else '')
+                    self._add(regulation_id, 'statute', provision, citation, body)
+
+        self.fingerprint = digest.hexdigest()
+        self.index = BM25Index(self.passages)
+
+    def _add(self, regulation_id: str, kind: str, provision: Optional[str], citation: str, text: str) -> None:
+        self.passages.append(Passage(len(self.passages), regulation_id, kind, provision, citation, text,
+                                     estimate_tokens(text)))
+
+    def statute_path(self, regulation_id: str) -> Path:
+        return self.corpus_dir / f'{regulation_id}.txt'
+
+    def coverage(self) -> Dict[str, Dict]:
+        """Per regulation: whether statute text is present, its passages and tokens."""
+        stats = {regulation_id: {'statute_text': False, 'passages': 0, 'tokens': 0}
+                 for regulation_id in self.regulations}
+        for passage in self.passages:
+            if passage.kind == 'statute':
+                entry = stats[passage.regulation_id]
+                entry['statute_text'] = True
+                entry['passages'] += 1
+                entry['tokens'] += passage.token_count
+        return stats
+
+    def search(self, query: str, regulation_ids: Optional[Sequence[str]] = None, top_k: int = 10) -> List:
+        """(passage, score) pairs for a free-text query, optionally within some regulations."""
+        allowed = set(regulation_ids) if regulation_ids else None
+        ranked = self.index.search(tokenize(query))
+        return [(p, score) for p, score in ranked if allowed is None or p.regulation_id in allowed][:top_k]
+
+    def select_passages(self, question_text: str, regulation_focus: Optional[str] = None,
+                        expected_citation: Optional[str] = None, top_k: int = 6,
+                        token_budget: int = 6000) -> List[Passage]:
+        """
+        Choose the regulatory passages to put in front of the model for one question.
+
+        Args:
+            question_text: The legal question
+            regulation_focus: Regulation focus string from the question matrix
+            expected_citation: Expected citation, also used to find the regulations in scope
+            top_k: Maximum statute passages
+            token_budget: Maximum approximate tokens of passages, records included
+
+        Returns:
+            Record passages of the regulations in scope, then statute passages best first
+        """
+        question = {'regulation_focus': regulation_focus or '', 'expected_citation': expected_citation or ''}
+        in_scope = [r.regulation_id for r in relevant_regulations(question, self.regulations)]
+
+        selected, used = [], 0
+        for passage in self.passages:
+            if passage.kind == 'record' and passage.regulation_id in in_scope:
+                selected.append(passage)
+                used += passage.token_count
+
+        allowed = set(in_scope) if in_scope else None
+        ranked = 0
+        for passage, _score in self.index.search(expand_query(question_text, regulation_focus)):
+            if ranked >= top_k:
+                break
+            if passage.kind != 'statute' or (allowed is not None and passage.regulation_id not in allowed):
+                continue
+            if used + passage.token_count > token_budget:
+                continue
+            selected.append(passage)
+            used += passage.token_count
+            ranked += 1
+        return selected
+
+
+def format_authorities(passages: Sequence[Passage]) -> str:
+    """Render passages for the prompt, each labelled with its citation."""
+    parts = []
+    for passage in passages:
+        label = f"{passage.citation} - current record" if passage.kind == 'record' else passage.citation
+        parts.append(f"[{label}]\n{passage.text.strip()}")
+    return "\n\n".join(parts)
+
+
+class _TextExtractor(HTMLParser):
+    """HTML/XML to plain text, one line per block element."""
+
+    BLOCKS = {'p', 'div', 'br', 'tr', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'section', 'article',
+              'title', 'pnumber', 'p1', 'p2', 'p3', 'p1group', 'text'}
+    SKIP = {'script', 'style', 'head', 'nav', 'footer'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCKS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        text = ''.join(self.parts).replace('\xa0', ' ')
+        lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.split('\n')]
+        return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def html_to_text(markup: str) -> str:
+    """Plain text of an HTML or XML document."""
+    extractor = _TextExtractor()
+    extractor.feed(markup)
+    extractor.close()
+    return extractor.text()
+
+
+def fetch_statute(regulation_id: str, corpus_dir: Path = DEFAULT_CORPUS_DIR) -> Path:
+    """
+    Download the official text of a regulation into the corpus directory.
+
+    Raises:
+        KeyError: If no official source is known for the regulation
+        RuntimeError: If every source failed
+    """
+    from .providers import shared_http_client
+
+    urls = OFFICIAL_TEXT_URLS[regulation_id]
+    errors = []
+    for url in urls:
+        try:
+            response = shared_http_client().get(url, follow_redirects=True)
+            response.raise_for_status()
+            text = html_to_text(response.text)
+        except Exception as e:
+            errors.append(f"{url}: {e}")
+            continue
+        if len(text) < 1000:
+            errors.append(f"{url}: only {len(text)} characters of text")
+            continue
+        path = Path(corpus_dir) / f'{regulation_id}.txt'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"Source: {url}\nRetrieved: {date.today().isoformat()}\n\n{text}\n", encoding='utf-8')
+        return path
+    raise RuntimeError('; '.join(errors))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut corpus."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='lawstronaut corpus', description='Local regulation corpus')
+    parser.add_argument('action', nargs='?', choices=['stats', 'fetch', 'search'], default='stats')
+    parser.add_argument('query', nargs='?', help='Search query (search)')
+    parser.add_argument('--regulation', action='append',
+                        help='Regulation id to fetch or search (repeatable; default: all)')
+    parser.add_argument('--regulations', type=Path,
+                        help='Regulation records (default: data/regulations.json or built-in)')
+    parser.add_argument('--corpus-dir', type=Path, default=DEFAULT_CORPUS_DIR,
+                        help='Statute text directory (default: data/regulations)')
+    parser.add_argument('--top-k', type=int, default=5, help='Search results to show (default: 5)')
+    args = parser.parse_args(argv)
+
+    regulations = load_regulations(args.regulations)
+
+    if args.action == 'fetch':
+        failed = 0
+        for regulation_id in args.regulation or list(OFFICIAL_TEXT_URLS):
+            try:
+                path = fetch_statute(regulation_id, args.corpus_dir)
+                print(f"✓ {regulation_id}: {path} ({path.stat().st_size:,} bytes)")
+            except KeyError:
+                print(f"✗ {regulation_id}: no official source known; add {regulation_id}.txt by hand")
+                failed += 1
+            except RuntimeError as e:
+                print(f"✗ {regulation_id}: {e}")
+                failed += 1
+        return 1 if failed else 0
+
+    corpus = RegulationCorpus(regulations, args.corpus_dir)
+    if args.action == 'search':
+        if not args.query:
+            parser.error('search needs a query')
+        for passage, score in corpus.search(args.query, args.regulation, args.top_k):
+            print(f"\n[{score:.2f}] {passage.citation} ({passage.kind}, ~{passage.token_count:,} tokens)")
+            print('  ' + passage.text.strip()[:400].replace('\n', '\n  '))
+        return 0
+
+    print(f"Corpus: {args.corpus_dir} ({len(corpus.passages)} passages)")
+    for regulation_id, entry in corpus.coverage().items():
+        if entry['statute_text']:
+            print(f"  ✓ {regulation_id:<16} {entry['passages']:>5} statute passages, ~{entry['tokens']:,} tokens")
+        else:
+            hint = 'corpus fetch' if regulation_id in OFFICIAL_TEXT_URLS else 'add the text by hand'
+            print(f"  - {regulation_id:<16} record only ({hint})")
+    return 0
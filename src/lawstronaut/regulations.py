@@ -0,0 +1,416 @@
+"""
+Regulation records and their applicability rules
+
+Each record mirrors a row of the `regulations` table in
+docs/SUPABASE_SETUP.md (name, type, jurisdiction, dates, status, citation)
+and adds the cheap rules the exposure job uses to decide whether a contract
+is affected: weighted signals over governing law, CUAD clause presence and
+keyword groups, the signals at least one of which must be present, and the
+score thresholds for "exposed" and "ambiguous".
+
+The seed records cover the regimes of docs/LAWSTRONAUT_TEST_MATRIX.md.
+Editing data/regulations.json (written by `python -m lawstronaut exposure
+--write-regulations`) overrides them; a changed status or summary only
+re-assesses contracts already exposed to that regulation, a changed rule
+re-classifies the corpus for that regulation alone.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .paths import DATA_DIR
+
+DEFAULT_REGULATIONS_PATH = DATA_DIR / 'regulations.json'
+
+# Lowest to highest
+RISK_LEVELS = ('low', 'medium', 'high', 'critical')
+
+# Highest risk a regulation can carry in each status
+STATUS_RISK_CAP = {
+    'proposed': 'medium',
+    'enacted': 'high',
+    'in_force': 'critical',
+    'amended': 'critical',
+    'blocked': 'low',
+    'repealed': 'low',
+}
+
+# Keyword groups, matched case-insensitively against contract text ("terms:<group>" signals)
+TERM_GROUPS: Dict[str, List[str]] = {
+    'ai': [
+        r'artificial intelligence', r'machine[- ]learning', r'algorithm(?:s|ic)?', r'neural networks?',
+        r'deep learning', r'predictive (?:model|analytic)s?', r'natural language processing',
+        r'(?:speech|voice) recognition', r'computer vision',
+    ],
+    'automated_decisions': [
+        r'automated decision', r'profiling', r'credit ?scor(?:e|es|ing)', r'creditworthiness',
+        r'underwriting', r'consumer (?:data|information)', r'eligibility determination',
+    ],
+    'personal_data': [
+        r'personal (?:data|information)', r'data protection', r'GDPR', r'data subjects?',
+        r'protected health information', r'privacy (?:law|policy|polic(?:y|ies)|rights)',
+    ],
+    'eu_connection': [
+        r'European (?:Union|Economic Area|Commission)', r'member states?', r'Germany', r'France',
+        r'Netherlands', r'Ireland', r'Switzerland', r'GmbH', r'B\.V\.', r'N\.V\.',
+    ],
+    'uk_connection': [
+        r'England and Wales', r'United Kingdom', r'English', r'registered in England', r'Companies Act 2006',
+        r'English law', r'laws of England',
+    ],
+    'retained_eu_law': [
+        r'Market Abuse Regulation', r'Working Time Regulations', r'Data Protection Act 2018', r'UK GDPR',
+        r'Transfer of Undertakings', r'TUPE', r'Directive \d{2,4}/\d+',
+    ],
+    'supply_chain': [
+        r'supply chain', r'raw materials?', r'sub-?contractors?', r'manufactur(?:e|er|ers|ing)',
+        r'procurement', r'components? suppl(?:y|ier)',
+    ],
+    'human_rights': [
+        r'human rights', r'forced labou?r', r'child labou?r', r'modern slavery', r'conflict minerals',
+        r'supplier code of conduct', r'environmental (?:due diligence|standards)',
+    ],
+    'restrictive_covenant': [
+        r'non-?compet(?:e|ition)', r'covenant not to compete', r'not (?:to )?(?:directly or indirectly )?compete',
+        r'non-?solicit(?:ation)?', r'restrictive covenants?', r'Restricted (?:Period|Territory)',
+    ],
+    'employment': [r'employment agreement', r'service agreement', r'the Executive', r'termination of employment'],
+    'franchise': [r'franchis(?:e|ee|or)'],
+    'human_oversight': [r'human (?:oversight|review|intervention)'],
+    'transparency': [r'transparen(?:cy|t)', r'disclos(?:e|ure) (?:that|of) (?:the use of )?(?:AI|automated)'],
+    'audit': [r'audit(?:s|ing)? rights?', r'right to audit', r'(?:may|shall) audit'],
+}
+
+TERM_PATTERNS: Dict[str, 're.Pattern'] = {
+    group: re.compile(r'\b(?:' + '|'.join(patterns) + r')\b', re.IGNORECASE)
+    for group, patterns in TERM_GROUPS.items()
+}
+
+
+def _json_hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Regulation:
+    """A `regulations` row plus the rules that classify contracts against it."""
+
+    regulation_id: str
+    regulation_name: str
+    regulation_type: str
+    jurisdiction: str
+    status: str                              # key of STATUS_RISK_CAP
+    effective_date: Optional[str] = None     # ISO dates
+    enacted_date: Optional[str] = None
+    current_status_detail: str = ''
+    official_citation: str = ''
+    url: str = ''
+    summary: str = ''
+    key_provisions: List[str] = field(default_factory=list)
+    # Applicability rules: "law:<jurisdiction or group>", "clause:<CUAD category>", "terms:<TERM_GROUPS key>"
+    signals: Dict[str, float] = field(default_factory=dict)
+    requires: List[str] = field(default_factory=list)     # at least one must be present
+    exposed_at: float = 1.5
+    ambiguous_at: float = 1.0
+    # TERM_GROUPS key -> gap reported when an exposed contract has no match
+    gaps: Dict[str, str] = field(default_factory=dict)
+
+    RULE_FIELDS = ('signals', 'requires', 'exposed_at', 'ambiguous_at', 'gaps')
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Regulation':
+        return cls(**data)
+
+    def fingerprint(self) -> str:
+        """Hash of the whole record; changes whenever anything about the regulation changes."""
+        return _json_hash(self.to_dict())
+
+    def record_fingerprint(self) -> str:
+        """Hash of the `regulations` row fields, leaving out the applicability rules."""
+        data = self.to_dict()
+        return _json_hash({name: value for name, value in data.items() if name not in self.RULE_FIELDS})
+
+    def rules_fingerprint(self) -> str:
+        """Hash of the applicability rules only."""
+        data = self.to_dict()
+        return _json_hash({name: data[name] for name in self.RULE_FIELDS})
+
+    @property
+    def risk_cap(self) -> str:
+        return STATUS_RISK_CAP.get(self.status, 'critical')
+
+
+SEED_REGULATIONS: List[Regulation] = [
+    Regulation(
+        regulation_id='eu_ai_act',
+        regulation_name='EU Artificial Intelligence Act',
+        regulation_type='EU AI Act',
+        jurisdiction='EU',
+        status='in_force',
+        enacted_date='2024-06-13',
+        effective_date='2024-08-01',
+        current_status_detail='In force 1 August 2024; prohibitions apply from 2 February 2025, '
+                              'general-purpose AI obligations from 2 August 2025, most high-risk '
+                              'obligations from 2 August 2026.',
+        official_citation='Regulation (EU) 2024/1689',
+        url='https://eur-lex.europa.eu/eli/reg/2024/1689/oj',
+        summary='Risk-based regulation of AI systems placed on the EU market: prohibited practices (Art. 5), '
+                'high-risk systems (Art. 6, Annex III) with data governance, transparency and human oversight '
+                'duties (Arts. 10, 13, 14), and transparency for systems interacting with people (Art. 50).',
+        key_provisions=['Art. 5 prohibited practices', 'Art. 6 high-risk classification', 'Art. 10 data governance',
+                        'Art. 13 transparency', 'Art. 14 human oversight', 'Art. 50 transparency obligations'],
+        signals={'terms:ai': 1.0, 'terms:automated_decisions': 0.5, 'terms:eu_connection': 0.5,
+                 'law:EU': 0.5, 'terms:personal_data': 0.25},
+        requires=['terms:ai'],
+        exposed_at=1.5,
+        ambiguous_at=1.0,
+        gaps={'human_oversight': 'No human oversight provisions (Art. 14)',
+              'transparency': 'No transparency or disclosure obligations (Arts. 13, 50)',
+              'audit': 'No audit or record-keeping rights over the AI system (Art. 12)'},
+    ),
+    Regulation(
+        regulation_id='uk_reul',
+        regulation_name='Retained EU Law (Revocation and Reform) Act 2023',
+        regulation_type='UK REUL',
+        jurisdiction='UK',
+        status='in_force',
+        enacted_date='2023-06-29',
+        effective_date='2024-01-01',
+        current_status_detail='Sunset and revocation provisions in force from 1 January 2024; retained EU law '
+                              'renamed "assimilated law" and subject to ongoing reform.',
+        official_citation='Retained EU Law (Revocation and Reform) Act 2023 c. 28',
+        url='https://www.legislation.gov.uk/ukpga/2023/28',
+        summary='Ends the supremacy of retained EU law in the UK, revokes listed instruments and lets ministers '
+                'amend or replace assimilated law (e.g. Working Time Regulations, UK MAR, UK GDPR).',
+        key_provisions=['s. 1 revocation of listed instruments', 's. 3 abolition of supremacy of EU law',
+                        's. 5 assimilated law'],
+        signals={'law:UK': 1.5, 'terms:uk_connection': 0.5, 'terms:retained_eu_law': 1.0, 'terms:employment': 0.25},
+        requires=['law:UK', 'terms:uk_connection', 'terms:retained_eu_law'],
+        exposed_at=1.5,
+        ambiguous_at=0.5,
+    ),
+    Regulation(
+        regulation_id='us_state_ai',
+        regulation_name='Colorado Artificial Intelligence Act',
+        regulation_type='US State AI',
+        jurisdiction='Colorado',
+        status='enacted',
+        enacted_date='2024-05-17',
+        effective_date='2026-06-30',
+        current_status_detail='Effective date delayed from 1 February 2026 to 30 June 2026 (SB 25B-004).',
+        official_citation='Colo. Rev. Stat. § 6-1-1701 et seq. (SB 24-205)',
+        url='https://leg.colorado.gov/bills/sb24-205',
+        summary='Duties of developers and deployers of high-risk AI systems making consequential decisions '
+                '(credit, employment, housing, insurance): risk management, impact assessments, consumer notice '
+                'and appeal rights.',
+        key_provisions=['§ 6-1-1702 developer duties', '§ 6-1-1703 deployer duties and impact assessments',
+                        '§ 6-1-1704 consumer disclosure'],
+        signals={'terms:ai': 1.0, 'terms:automated_decisions': 1.0, 'terms:personal_data': 0.5,
+                 'law:Colorado': 0.5, 'law:California': 0.25},
+        requires=['terms:automated_decisions'],
+        exposed_at=2.0,
+        ambiguous_at=1.0,
+        gaps={'transparency': 'No consumer notice of AI-assisted consequential decisions (§ 6-1-1704)',
+              'human_oversight': 'No human review or appeal of adverse decisions (§ 6-1-1703)'},
+    ),
+    Regulation(
+        regulation_id='us_cpra',
+        regulation_name='California Privacy Rights Act',
+        regulation_type='California CPRA',
+        jurisdiction='California',
+        status='in_force',
+        enacted_date='2020-11-03',
+        effective_date='2023-01-01',
+        current_status_detail='CPPA regulations on automated decisionmaking technology, risk assessments and '
+                              'cybersecurity audits were approved in September 2025; ADMT obligations apply '
+                              'from 1 January 2027.',
+        official_citation='Cal. Civ. Code § 1798.100 et seq.',
+        url='https://cppa.ca.gov/regulations/',
+        summary='Amends the CCPA: rights to know, delete, correct and opt out of the sale or sharing of personal '
+                'information, mandatory terms in service provider and contractor contracts, and CPPA rulemaking '
+                'on automated decisionmaking technology.',
+        key_provisions=['§ 1798.100(d) contract terms with third parties, service providers and contractors',
+                        '§ 1798.140(ag) service provider', '§ 1798.185(a)(16) automated decisionmaking technology'],
+        signals={'terms:personal_data': 1.0, 'terms:automated_decisions': 0.75, 'law:California': 1.0},
+        requires=['terms:personal_data'],
+        exposed_at=1.75,
+        ambiguous_at=1.0,
+        gaps={'audit': 'No right to take reasonable steps to ensure compliant use of the data (§ 1798.100(d)(3))'},
+    ),
+    Regulation(
+        regulation_id='eu_csddd',
+        regulation_name='Corporate Sustainability Due Diligence Directive',
+        regulation_type='Supply Chain Due Diligence',
+        jurisdiction='EU',
+        status='enacted',
+        enacted_date='2024-06-13',
+        effective_date='2028-07-26',
+        current_status_detail='Adopted 2024; application postponed by one year to 2028 by Directive (EU) '
+                              '2025/794 ("stop-the-clock"). Germany\'s LkSG already applies to large companies.',
+        official_citation='Directive (EU) 2024/1760',
+        url='https://eur-lex.europa.eu/eli/dir/2024/1760/oj',
+        summary='Human-rights and environmental due diligence across companies\' chains of activities, with '
+                'contractual assurances and verification from business partners.',
+        key_provisions=['Art. 8 identifying adverse impacts', 'Art. 10 preventing potential adverse impacts',
+                        'Art. 10(2)(b) contractual assurances'],
+        signals={'terms:supply_chain': 1.0, 'terms:eu_connection': 0.5, 'law:EU': 0.5,
+                 'terms:human_rights': 0.5, 'clause:Minimum Commitment': 0.25},
+        requires=['terms:supply_chain'],
+        exposed_at=1.5,
+        ambiguous_at=1.0,
+        gaps={'human_rights': 'No human-rights or environmental due diligence clause (Art. 10(2)(b))',
+              'audit': 'No supplier audit or verification rights'},
+    ),
+    Regulation(
+        regulation_id='ftc_noncompete',
+        regulation_name='FTC Non-Compete Clause Rule',
+        regulation_type='FTC Non-Compete Ban',
+        jurisdiction='US Federal',
+        status='blocked',
+        enacted_date='2024-05-07',
+        effective_date='2024-09-04',
+        current_status_detail='Set aside nationwide in Ryan LLC v. FTC (N.D. Tex. 20 August 2024); the FTC '
+                              'dismissed its appeals in September 2025. Case-by-case Section 5 enforcement continues.',
+        official_citation='16 CFR Part 910',
+        url='https://www.federalregister.gov/d/2024-09171',
+        summary='Would have banned most worker non-compete clauses and required notice to workers; now '
+                'unenforceable, but state non-compete law and FTC Section 5 actions still apply.',
+        key_provisions=['16 CFR 910.2 unfair methods of competition', '16 CFR 910.2(b) notice requirement'],
+        signals={'clause:Non-Compete': 1.5, 'clause:No-Solicit Of Employees': 0.5, 'clause:Exclusivity': 0.25,
+                 'terms:restrictive_covenant': 1.0, 'terms:employment': 0.25, 'terms:franchise': 0.25},
+        requires=['clause:Non-Compete', 'terms:restrictive_covenant'],
+        exposed_at=1.0,
+        ambiguous_at=0.5,
+    ),
+    Regulation(
+        regulation_id='eu_gdpr',
+        regulation_name='General Data Protection Regulation',
+        regulation_type='Data Protection',
+        jurisdiction='EU',
+        status='in_force',
+        enacted_date='2016-04-27',
+        effective_date='2018-05-25',
+        current_status_detail='In force; UK GDPR diverging under the Data (Use and Access) Act 2025.',
+        official_citation='Regulation (EU) 2016/679',
+        url='https://eur-lex.europa.eu/eli/reg/2016/679/oj',
+        summary='Processing of personal data of people in the EU: lawful basis, special categories (Art. 9), '
+                'automated decision-making (Art. 22), processor contracts (Art. 28) and transfers (Chapter V).',
+        key_provisions=['Art. 9 special categories', 'Art. 22 automated decisions', 'Art. 28 processors',
+                        'Art. 46 transfer safeguards'],
+        signals={'terms:personal_data': 1.0, 'terms:eu_connection': 0.5, 'law:EU': 0.5, 'law:UK': 0.25,
+                 'terms:automated_decisions': 0.25},
+        requires=['terms:personal_data'],
+        exposed_at=1.5,
+        ambiguous_at=1.0,
+        gaps={'audit': 'No processor audit rights (Art. 28(3)(h))'},
+    ),
+]
+
+
+def load_regulations(path: Optional[Path] = None) -> Dict[str, Regulation]:
+    """
+    Load regulation records, falling back to SEED_REGULATIONS.
+
+    Args:
+        path: JSON list of records (default: data/regulations.json if it exists)
+
+    Returns:
+        Regulations keyed by regulation_id, in file order
+    """
+    path = Path(path) if path else DEFAULT_REGULATIONS_PATH
+    if path.exists():
+        with open(path, encoding='utf-8') as f:
+            records = [Regulation.from_dict(item) for item in json.load(f)]
+    else:
+        records = SEED_REGULATIONS
+    return {record.regulation_id: record for record in records}
+
+
+def save_regulations(regulations: Dict[str, Regulation], path: Optional[Path] = None) -> Path:
+    """Write regulation records as an editable JSON list."""
+    path = Path(path) if path else DEFAULT_REGULATIONS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([record.to_dict() for record in regulations.values()], f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    return path
+
+
+def regulation_rows(regulations: Dict[str, Regulation]) -> Iterator[Dict]:
+    """Stream `regulations` table rows for the ingest loader."""
+    for record in regulations.values():
+        yield {
+            'regulation_name': record.regulation_name,
+            'regulation_type': record.regulation_type,
+            'jurisdiction': record.jurisdiction,
+            'enacted_date': record.enacted_date,
+            'effective_date': record.effective_date,
+            'summary': record.summary,
+            'key_provisions': record.key_provisions,
+            'status': record.status,
+            'current_status_detail': record.current_status_detail,
+            'official_citation': record.official_citation,
+            'url': record.url,
+            'content_hash': record.fingerprint(),
+        }
+
+
+def _acronym(name: str) -> Optional[str]:
+    """"General Data Protection Regulation" -> "GDPR" (None for fewer than three capitals)."""
+    letters = ''.join(word[0] for word in re.findall(r'[A-Z][A-Za-z]*', name))
+    return letters if len(letters) >= 3 else None
+
+
+def regulation_terms(regulation: Regulation) -> List[str]:
+    """Names a question may use for a regulation: type, name, acronym and official citation."""
+    terms = [regulation.regulation_type, regulation.regulation_name, _acronym(regulation.regulation_name),
+             regulation.official_citation]
+    return [term for term in dict.fromkeys(terms) if term]
+
+
+def relevant_regulations(question: Dict, regulations: Dict[str, Regulation]) -> List[Regulation]:
+    """
+    Regulations named by a question's regulation_focus or expected_citation.
+
+    Args:
+        question: Harness question dict
+        regulations: Records keyed by regulation_id (see load_regulations)
+
+    Returns:
+        Matching records in `regulations` order (empty if none is named)
+    """
+    focus = ' '.join(str(question.get(key) or '') for key in ('regulation_focus', 'expected_citation'))
+    matched = []
+    for regulation in regulations.values():
+        for term in regulation_terms(regulation):
+            if re.search(r'(?<!\w)' + re.escape(term) + r'(?!\w)', focus, re.IGNORECASE):
+                matched.append(regulation)
+                break
+    return matched
+
+
+def term_matches(text: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Count TERM_GROUPS matches in a contract.
+
+    Returns:
+        group -> (match count, offset of the first match); groups without a match are absent
+    """
+    found = {}
+    for group, pattern in TERM_PATTERNS.items():
+        first = None
+        count = 0
+        for match in pattern.finditer(text):
+            if first is None:
+                first = match.start()
+            count += 1
+        if count:
+            found[group] = (count, first)
+    return found
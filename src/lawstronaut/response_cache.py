@@ -0,0 +1,189 @@
+"""
+Content-addressed on-disk cache for LLM responses
+
+Entries are keyed by a SHA-256 of (model name, system instruction, prompt,
+generation config) and stored zlib-compressed in SQLite, together with the
+grounding metadata and token usage of the original call. Entries expire after
+a TTL, and the least recently used entries are evicted once the cache grows
+past its size limit.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .paths import CACHE_DIR
+
+CACHE_MODES = ('off', 'read', 'write', 'refresh')
+
+DEFAULT_CACHE_PATH = CACHE_DIR / 'responses.sqlite3'
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    json.dumps() default hook for SDK objects (pydantic models, sets, etc.).
+
+    Args:
+        value: Object json could not serialize natively
+
+    Returns:
+        A JSON-serializable representation of `value`
+    """
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json', exclude_none=True)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with TTL and size-based LRU eviction.
+
+    Modes:
+        off:     never read or write
+        read:    serve hits, never store new responses
+        write:   serve hits and store misses
+        refresh: ignore existing entries and overwrite them with fresh responses
+    """
+
+    def __init__(self, path: Optional[Path] = None, mode: str = 'write',
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Open (or create) a response cache.
+
+        Args:
+            path: SQLite database file (default: .cache/lawstronaut/responses.sqlite3)
+            mode: One of CACHE_MODES
+            ttl_seconds: Entry lifetime; older entries are treated as misses
+            max_bytes: Total compressed payload size before LRU eviction kicks in
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode} (expected one of {', '.join(CACHE_MODES)})")
+
+        self.mode = mode
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        if mode != 'off':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' model TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' payload BLOB NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)')
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, system_instruction: str, prompt: str,
+                 config: Optional[Dict] = None) -> str:
+        """
+        Compute the content address for a request.
+
+        Args:
+            model_name: Model identifier
+            system_instruction: System instruction text
+            prompt: Request contents
+            config: Generation config fields (temperature, top_p, tools, ...)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        material = json.dumps(
+            [model_name, system_instruction, prompt, config or {}],
+            sort_keys=True, ensure_ascii=False, default=to_jsonable
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The cached response dict, or None on a miss (or in write-only modes)
+        """
+        if self.mode not in ('read', 'write'):
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT created_at, payload FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+
+        self.hits += 1
+        return json.loads(zlib.decompress(row[1]).decode('utf-8'))
+
+    def put(self, key: str, response: Dict) -> None:
+        """
+        Store a response (including grounding_metadata and tokens_used).
+
+        Args:
+            key: Key from make_key()
+            response: Response dict as returned by query_gemini()
+        """
+        if self.mode not in ('write', 'refresh'):
+            return
+
+        payload = zlib.compress(
+            json.dumps(response, ensure_ascii=False, default=to_jsonable).encode('utf-8')
+        )
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, created_at, accessed_at, size, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, response.get('model'), now, now, len(payload), payload)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self._conn.execute('DELETE FROM responses WHERE created_at < ?', (time.time() - self.ttl_seconds,))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            'SELECT key, size FROM responses ORDER BY accessed_at ASC'
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
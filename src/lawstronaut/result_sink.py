@@ -0,0 +1,314 @@
+"""
+Streaming, compressed and sharded result output
+
+ResultSink replaces the single pretty-printed results file. Every result is
+written as one compact JSON line the moment it completes, into a compressed
+shard that is rotated once it holds `shard_bytes` of JSON, so neither the
+harness nor the file grows with the size of the sweep:
+
+    gemini_vertex_results/
+        results-00000.jsonl.zst
+        results-00001.jsonl.zst
+        manifest.json           run metadata, shard list, result and error counts
+
+Shards are zstd-compressed when the `zstandard` package is installed and gzip
+otherwise. The manifest is rewritten at every rotation with "complete": false,
+so an interrupted run still lists its finished shards.
+
+iter_results() streams records back one at a time from a sink directory, a
+manifest, a single shard, a JSONL checkpoint or a legacy .json results file.
+
+Usage:
+    python -m lawstronaut results gemini_vertex_results/
+    python -m lawstronaut results gemini_vertex_results/ --json gemini_vertex_results.json
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+COMPRESSIONS = ('zstd', 'gzip', 'none')
+SUFFIXES = {'zstd': '.jsonl.zst', 'gzip': '.jsonl.gz', 'none': '.jsonl'}
+
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 'lawstronaut-results/1'
+SHARD_GLOB = 'results-*.jsonl*'
+
+
+def default_compression() -> str:
+    """zstd if the zstandard package is installed, otherwise gzip."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return 'gzip'
+    return 'zstd'
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd shards need the zstandard package: pip install zstandard "
+                          "(or use --compression gzip)")
+    return zstandard
+
+
+def _open_shard_writer(path: Path, compression: str, level: Optional[int] = None) -> BinaryIO:
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor(level=level or 3).stream_writer(open(path, 'wb'))
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=level or 6)
+    return open(path, 'wb')
+
+
+def _open_shard_reader(path: Path) -> BinaryIO:
+    if path.name.endswith('.zst'):
+        return io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(open(path, 'rb'),
+                                                                                read_across_frames=True))
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def error_count(record: Dict) -> int:
+    """1 if any response of a record failed."""
+    responses = record['responses'].values() if 'responses' in record else [record.get('response')]
+    return int(any((response or {}).get('error') for response in responses))
+
+
+class ResultSink:
+    """Thread-safe, append-only writer of compressed JSONL result shards plus a manifest."""
+
+    def __init__(self, directory: Path, compression: Optional[str] = None,
+                 shard_bytes: int = DEFAULT_SHARD_BYTES, metadata: Optional[Dict] = None,
+                 level: Optional[int] = None):
+        """
+        Start a new result set (shards and manifest of a previous run in `directory` are removed).
+
+        Args:
+            directory: Output directory
+            compression: One of COMPRESSIONS (default: default_compression())
+            shard_bytes: Uncompressed JSON bytes per shard before rotating
+            metadata: Run metadata stored in the manifest (model, platform, test_type, ...)
+            level: Compression level (default: zstd 3, gzip 6)
+        """
+        compression = compression or default_compression()
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression} (expected one of {', '.join(COMPRESSIONS)})")
+        if compression == 'zstd':
+            _zstandard()
+
+        self.directory = Path(directory)
+        self.compression = compression
+        self.shard_bytes = shard_bytes
+        self.level = level
+        self.metadata = dict(metadata or {})
+        self.count = 0
+        self.errors = 0
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self.shards: List[Dict] = []
+
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._closed = False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for old in [*self.directory.glob(SHARD_GLOB), self.directory / MANIFEST_NAME]:
+            if old.exists():
+                old.unlink()
+
+    def _open_shard(self) -> None:
+        name = f"results-{len(self.shards):05d}{SUFFIXES[self.compression]}"
+        self._file = _open_shard_writer(self.directory / name, self.compression, self.level)
+        self.shards.append({'file': name, 'results': 0, 'uncompressed_bytes': 0, 'bytes': None})
+
+    def _close_shard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            shard = self.shards[-1]
+            shard['bytes'] = (self.directory / shard['file']).stat().st_size
+            self._file = None
+
+    def write(self, result: Dict) -> None:
+        """Append one result as a compact JSON line."""
+        line = (json.dumps(result, ensure_ascii=False, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._closed:
+                raise ValueError("ResultSink is closed")
+            if self._file is not None and self.shards[-1]['uncompressed_bytes'] + len(line) > self.shard_bytes:
+                self._close_shard()
+                self._write_manifest(complete=False)
+            if self._file is None:
+                self._open_shard()
+            self._file.write(line)
+            shard = self.shards[-1]
+            shard['results'] += 1
+            shard['uncompressed_bytes'] += len(line)
+            self.count += 1
+            self.errors += error_count(result)
+
+    def write_all(self, results: Iterable[Dict]) -> int:
+        written = 0
+        for result in results:
+            self.write(result)
+            written += 1
+        return written
+
+    def manifest(self, complete: bool) -> Dict:
+        return {
+            'format': MANIFEST_FORMAT,
+            'metadata': self.metadata,
+            'compression': self.compression,
+            'results': self.count,
+            'errors': self.errors,
+            'shards': [dict(shard) for shard in self.shards],
+            'created': self.created,
+            'completed': datetime.now().isoformat(timespec='seconds') if complete else None,
+            'complete': complete,
+        }
+
+    def _write_manifest(self, complete: bool) -> Path:
+        path = self.directory / MANIFEST_NAME
+        temp = path.with_suffix('.json.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest(complete), f, indent=2, ensure_ascii=False)
+        os.replace(temp, path)
+        return path
+
+    def close(self, **metadata: Any) -> Path:
+        """
+        Finish the last shard and write the final manifest.
+
+        Args:
+            **metadata: Extra run metadata known only at the end (e.g. total_questions)
+
+        Returns:
+            Path of manifest.json
+        """
+        with self._lock:
+            self.metadata.update(metadata)
+            self._close_shard()
+            self._closed = True
+            return self._write_manifest(complete=True)
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._closed:
+            self.close()
+
+
+def read_manifest(path: Path) -> Optional[Dict]:
+    """Manifest of a sink directory (or the manifest file itself); None if there is none."""
+    path = Path(path)
+    if path.is_dir():
+        path = path / MANIFEST_NAME
+    if path.name != MANIFEST_NAME or not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _truncation_errors() -> tuple:
+    errors = [EOFError]
+    try:
+        import zstandard
+        errors.append(zstandard.ZstdError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _iter_lines(path: Path) -> Iterator[Dict]:
+    try:
+        with _open_shard_reader(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line of a shard that was being written when the run stopped
+                    continue
+    except _truncation_errors():
+        # Compressed shard cut off mid-stream: every complete line before it was yielded
+        return
+
+
+def iter_results(path: Path) -> Iterator[Dict]:
+    """
+    Stream result records one at a time.
+
+    Args:
+        path: Sink directory, its manifest.json, one shard (.jsonl / .jsonl.gz /
+            .jsonl.zst), a JSONL checkpoint or a legacy .json results file
+    """
+    path = Path(path)
+    if path.name == MANIFEST_NAME:
+        path = path.parent
+    if path.is_dir():
+        for shard in sorted(path.glob(SHARD_GLOB)):
+            yield from _iter_lines(shard)
+    elif path.suffix == '.json':
+        with open(path, encoding='utf-8') as f:
+            yield from json.load(f).get('results', [])
+    else:
+        yield from _iter_lines(path)
+
+
+def write_json(path: Path, metadata: Dict, records: Iterable[Dict]) -> int:
+    """
+    Write records in the legacy single-file layout ({...metadata, "results": [...]}, indent=2).
+
+    Records are streamed, so the file can be produced from a sink without
+    loading it into memory. Returns the number of records written.
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        header = json.dumps(metadata, indent=2, ensure_ascii=False, default=str)
+        f.write(header[:-2] + ',\n' if metadata else '{\n')
+        f.write('  "results": [')
+        for record in records:
+            text = json.dumps(record, indent=2, ensure_ascii=False, default=str).replace('\n', '\n    ')
+            f.write((',\n    ' if count else '\n    ') + text)
+            count += 1
+        f.write('\n  ]\n}\n' if count else ']\n}\n')
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut results."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='lawstronaut results', description='Inspect or export a result sink')
+    parser.add_argument('path', type=Path, help='Sink directory (or manifest.json)')
+    parser.add_argument('--json', type=Path, help='Also export the legacy single-file JSON layout here')
+    args = parser.parse_args(argv)
+
+    manifest = read_manifest(args.path)
+    if manifest is None:
+        print(f"No {MANIFEST_NAME} in {args.path}")
+        return 1
+
+    metadata = manifest.get('metadata') or {}
+    stored = sum(shard.get('bytes') or 0 for shard in manifest['shards'])
+    raw = sum(shard['uncompressed_bytes'] for shard in manifest['shards'])
+    print(f"{args.path}: {metadata.get('test_type', '-')} ({metadata.get('model', '-')}), "
+          f"{'complete' if manifest.get('complete') else 'INCOMPLETE'}")
+    print(f"  {manifest['results']} result(s), {manifest['errors']} with errors, "
+          f"{len(manifest['shards'])} {manifest['compression']} shard(s)")
+    if stored:
+        print(f"  {raw:,} bytes of JSON stored in {stored:,} bytes ({raw / stored:.1f}x)")
+
+    if args.json:
+        count = write_json(args.json, metadata, iter_results(args.path))
+        print(f"Wrote {count} result(s) to {args.json}")
+    return 0
@@ -0,0 +1,186 @@
+"""
+Local lexical retrieval of contract sections (BM25)
+
+Ranks the chunks produced by lawstronaut.chunking against a question and its
+regulation focus, then picks the best sections that fit a token budget so the
+prompt carries only the clauses that matter.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .chunking import Chunk
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have if in into is it its of on or our
+shall should such that the their then there these this those to under was we were what
+which will with any all not no must may being been any if so than
+""".split())
+
+# Regulation shorthand in regulation_focus / questions rarely appears in CUAD
+# contracts themselves; expand it to the vocabulary the relevant clauses use.
+FOCUS_EXPANSIONS = {
+    'gdpr': 'personal data protection privacy processing consent controller processor transfer',
+    'data': 'data information records privacy confidential personal',
+    'ai': 'algorithm software platform model automated analysis',
+    'brexit': 'european union eu england wales united kingdom governing law regulation directive',
+    'reul': 'european union eu retained law regulation directive',
+    'cpra': 'personal information consumer privacy california sell share service provider',
+    'california': 'california governing law personal information consumer',
+    'esg': 'environmental social labor labour health safety ethics compliance supplier audit',
+    'csddd': 'environmental human rights labor labour supplier subcontractor audit compliance',
+    'compete': 'competition competitive restrictive covenant solicit solicitation restricted period territory',
+    'governance': 'records audit access retention security quality compliance',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords removed."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def expand_query(question_text: str, regulation_focus: Optional[str] = None) -> List[str]:
+    """
+    Build query terms from a question and its regulation focus.
+
+    Args:
+        question_text: The legal question
+        regulation_focus: Comma-separated regulations, e.g. "GDPR, EU AI Act"
+
+    Returns:
+        Query tokens, including domain expansions for regulation shorthand
+    """
+    terms = tokenize(question_text)
+    if regulation_focus:
+        terms.extend(tokenize(regulation_focus))
+    expanded = list(terms)
+    for term in terms:
+        if term in FOCUS_EXPANSIONS:
+            expanded.extend(FOCUS_EXPANSIONS[term].split())
+    return expanded
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index of chunks."""
+
+    def __init__(self, chunks: Iterable[Chunk], k1: float = 1.5, b: float = 0.75):
+        """
+        Index chunks.
+
+        Args:
+            chunks: Chunks to index (typically one contract's chunk_contract() output)
+            k1: Term-frequency saturation
+            b: Length normalization strength
+        """
+        self.chunks = list(chunks)
+        self.k1 = k1
+        self.b = b
+
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths: List[int] = []
+        for doc_id, chunk in enumerate(self.chunks):
+            counts = Counter(tokenize(chunk.text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, tf))
+
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (never negative)."""
+        n = len(self.chunks)
+        df = len(self.postings.get(term, ()))
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query_terms: List[str], top_k: Optional[int] = None) -> List[Tuple[Chunk, float]]:
+        """
+        Rank chunks for a query.
+
+        Args:
+            query_terms: Tokens from tokenize() / expand_query()
+            top_k: Maximum results (None for all matching chunks)
+
+        Returns:
+            (chunk, score) pairs, best first
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term, query_tf in Counter(query_terms).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] += query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [(self.chunks[doc_id], score) for doc_id, score in ranked]
+
+
+def select_sections(chunks: List[Chunk], question_text: str,
+                    regulation_focus: Optional[str] = None,
+                    top_k: int = 8, token_budget: int = 30000,
+                    include_preamble: bool = True) -> List[Chunk]:
+    """
+    Choose the most relevant contract sections within a token budget.
+
+    Args:
+        chunks: Output of chunk_contract()
+        question_text: The legal question
+        regulation_focus: Regulation focus string from the question matrix
+        top_k: Maximum number of ranked sections to include
+        token_budget: Maximum approximate tokens of contract text
+        include_preamble: Always include the first chunk (parties and recitals)
+
+    Returns:
+        Selected chunks in document order
+    """
+    selected: Dict[int, Chunk] = {}
+    used = 0
+
+    if include_preamble and chunks and chunks[0].token_count <= token_budget:
+        selected[chunks[0].chunk_id] = chunks[0]
+        used += chunks[0].token_count
+
+    index = BM25Index(chunks)
+    ranked = 0
+    for chunk, _score in index.search(expand_query(question_text, regulation_focus)):
+        if ranked >= top_k:
+            break
+        if chunk.chunk_id in selected:
+            continue
+        if used + chunk.token_count > token_budget:
+            continue
+        selected[chunk.chunk_id] = chunk
+        used += chunk.token_count
+        ranked += 1
+
+    return sorted(selected.values(), key=lambda c: c.start)
+
+
+def format_sections(chunks: List[Chunk]) -> str:
+    """
+    Render selected chunks for the prompt, labelled with section numbers and offsets.
+
+    Args:
+        chunks: Chunks in document order
+
+    Returns:
+        Text block with one labelled excerpt per chunk
+    """
+    parts = []
+    for chunk in chunks:
+        if len(chunk.sections) > 1:
+            label = f"Sections {chunk.sections[0]}-{chunk.sections[-1]}"
+        else:
+            label = f"Section {chunk.section}" if chunk.section else "Preamble"
+        if chunk.heading:
+            label += f" - {chunk.heading}"
+        parts.append(f"[{label} | chars {chunk.start:,}-{chunk.end:,}]\n{chunk.text.strip()}")
+    return "\n\n[...]\n\n".join(parts)
@@ -0,0 +1,284 @@
+"""
+Concurrent question runner for the Lawstronaut test harnesses
+
+Keeps several LLM requests in flight at once, paced by a token-bucket limiter
+expressed in requests-per-minute and tokens-per-minute instead of a fixed
+sleep between questions. Results are always returned in input order.
+With several items in flight, each item's printed output is collected and
+written in one piece when the item finishes, so log lines never interleave.
+"""
+
+import io
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Substrings that identify a quota / rate-limit failure in an error message
+RATE_LIMIT_MARKERS = ('429', 'RESOURCE_EXHAUSTED', 'rate limit', 'quota exceeded')
+
+
+def is_rate_limited(result: Dict) -> bool:
+    """
+    Check whether a test_question() result failed because of rate limiting.
+
+    Args:
+        result: Result dict returned by test_question()
+
+    Returns:
+        True if the response error looks like a 429 / RESOURCE_EXHAUSTED error
+    """
+    error = (result.get('response') or {}).get('error')
+    if not error:
+        return False
+    error = str(error).lower()
+    return any(marker.lower() in error for marker in RATE_LIMIT_MARKERS)
+
+
+def tokens_used(result: Dict) -> Optional[int]:
+    """Return the total tokens billed for a test_question() result, if known."""
+    tokens = (result.get('response') or {}).get('tokens_used') or {}
+    return tokens.get('total')
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe token-bucket limiter for requests/minute and tokens/minute.
+
+    Two buckets are refilled continuously: one holding request slots and one
+    holding LLM tokens. acquire() blocks until both buckets can cover the
+    request. The limiter is adaptive (AIMD): a rate-limited response halves the
+    effective rates, and every successful response adds back a tenth of the
+    configured rate until the configured ceiling is reached again.
+    """
+
+    def __init__(self, requests_per_minute: float = 4.0,
+                 tokens_per_minute: Optional[float] = None,
+                 burst: float = 1.0,
+                 min_fraction: float = 0.1):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum request rate
+            tokens_per_minute: Maximum token rate (None for no token limit)
+            burst: Request bucket capacity, i.e. requests allowed back-to-back
+            min_fraction: Floor for adaptive slow-down, as a fraction of the configured rate
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute) if tokens_per_minute else None
+        self.min_fraction = min_fraction
+
+        self._lock = threading.Lock()
+        self._rate_fraction = 1.0
+        self._request_capacity = max(1.0, float(burst))
+        self._requests = self._request_capacity
+        self._tokens = self.tokens_per_minute or 0.0
+        self._last_refill = time.monotonic()
+
+    @property
+    def current_rpm(self) -> float:
+        """Effective requests-per-minute after adaptive slow-down."""
+        return self.requests_per_minute * self._rate_fraction
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._requests = min(
+            self._request_capacity,
+            self._requests + elapsed * self.requests_per_minute * self._rate_fraction / 60.0
+        )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed * self.tokens_per_minute * self._rate_fraction / 60.0
+            )
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request costing `tokens` may be sent.
+
+        Requests larger than the whole token bucket are let through once the
+        bucket is full, so an oversize prompt is slowed down rather than stuck.
+
+        Args:
+            tokens: Estimated tokens (prompt + completion) for the request
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                need_tokens = 0.0
+                if self.tokens_per_minute:
+                    need_tokens = min(float(tokens), self.tokens_per_minute)
+
+                if self._requests >= 1.0 and self._tokens >= need_tokens:
+                    self._requests -= 1.0
+                    if self.tokens_per_minute:
+                        self._tokens -= float(tokens)
+                    return waited
+
+                request_rate = self.requests_per_minute * self._rate_fraction / 60.0
+                delay = max(0.0, (1.0 - self._requests) / request_rate)
+                if self.tokens_per_minute:
+                    token_rate = self.tokens_per_minute * self._rate_fraction / 60.0
+                    delay = max(delay, (need_tokens - self._tokens) / token_rate)
+
+            delay = max(delay, 0.01)
+            time.sleep(delay)
+            waited += delay
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """
+        Correct the token bucket once the real usage of a request is known.
+
+        Args:
+            estimated: Tokens charged in acquire()
+            actual: Tokens reported by the API (None if unknown)
+        """
+        if not self.tokens_per_minute or actual is None:
+            return
+        with self._lock:
+            self._tokens = min(self.tokens_per_minute, self._tokens + estimated - actual)
+
+    def on_success(self) -> None:
+        """Additively restore the rate after a successful request."""
+        with self._lock:
+            self._rate_fraction = min(1.0, self._rate_fraction + 0.1)
+
+    def on_rate_limited(self) -> float:
+        """
+        Multiplicatively back off after a 429 / RESOURCE_EXHAUSTED response.
+
+        Returns:
+            Suggested seconds to wait before retrying
+        """
+        with self._lock:
+            self._rate_fraction = max(self.min_fraction, self._rate_fraction / 2.0)
+            # Drain the request bucket so other workers also pause
+            self._requests = min(self._requests, 0.0)
+            return 60.0 / (self.requests_per_minute * self._rate_fraction)
+
+
+class _ThreadOutput:
+    """sys.stdout stand-in that diverts the writes of threads with an open buffer."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self.lock:
+            return self.stream.write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def start(self) -> None:
+        self._local.buffer = io.StringIO()
+
+    def finish(self) -> None:
+        """Write the calling thread's collected output in one piece."""
+        buffer, self._local.buffer = self._local.buffer, None
+        if buffer.getvalue():
+            with self.lock:
+                self.stream.write(buffer.getvalue())
+                self.stream.flush()
+
+
+def run_in_order(task: Callable[[T], R],
+                 items: Sequence[T],
+                 concurrency: int = 4,
+                 limiter: Optional[TokenBucketLimiter] = None,
+                 estimate_tokens: Optional[Callable[[T], int]] = None,
+                 retry_if: Callable[[R], bool] = is_rate_limited,
+                 actual_tokens: Callable[[R], Optional[int]] = tokens_used,
+                 max_retries: int = 3,
+                 on_result: Optional[Callable[[T, R], None]] = None) -> List[R]:
+    """
+    Run `task` over `items` with up to `concurrency` calls in flight.
+
+    Args:
+        task: Function called once per item (e.g. a bound test_question wrapper)
+        items: Work items, e.g. question dicts
+        concurrency: Maximum number of tasks running at once
+        limiter: Optional rate limiter consulted before every attempt
+        estimate_tokens: Estimated token cost of an item, charged to the limiter
+        retry_if: Predicate marking a result as rate-limited (retried with backoff)
+        actual_tokens: Extracts real token usage from a result for limiter settlement
+        max_retries: Retries per item after rate-limited responses
+        on_result: Called with (item, result) as soon as each item finishes, from its worker thread
+            (with concurrency > 1, each item's output, on_result's included, is printed when it finishes)
+
+    Returns:
+        Results in the same order as `items`
+    """
+    def run_one(item: T) -> R:
+        result = attempt(item)
+        if on_result:
+            on_result(item, result)
+        return result
+
+    def attempt(item: T) -> R:
+        cost = estimate_tokens(item) if estimate_tokens else 0
+        retries = 0
+        while True:
+            if limiter:
+                limiter.acquire(cost)
+            result = task(item)
+            if limiter:
+                limiter.settle(cost, actual_tokens(result))
+
+            if not retry_if(result):
+                if limiter:
+                    limiter.on_success()
+                return result
+
+            if retries >= max_retries:
+                return result
+            retries += 1
+            backoff = limiter.on_rate_limited() if limiter else 2.0 ** retries
+            backoff *= random.uniform(1.0, 1.5)
+            print(f"  Rate limited - retry {retries}/{max_retries} in {backoff:.1f}s")
+            time.sleep(backoff)
+
+    if concurrency <= 1:
+        return [run_one(item) for item in items]
+
+    output = _ThreadOutput(sys.stdout)
+
+    def run_buffered(item: T) -> R:
+        output.start()
+        try:
+            return run_one(item)
+        finally:
+            output.finish()
+
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # map() yields results in submission order regardless of completion order
+            return list(pool.map(run_buffered, items))
+    finally:
+        sys.stdout = output.stream
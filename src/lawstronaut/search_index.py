@@ -0,0 +1,542 @@
+"""
+Persistent positional inverted index over the CUAD contract texts
+
+The index lives on disk as a set of immutable segments. Each segment holds a
+JSON lexicon and flat uint32 columns of token positions, byte offsets and a
+per-term document directory, all memory-mapped and sliced without copying.
+update() only indexes new or modified contracts into a fresh segment;
+documents superseded by a newer segment are masked out, and the segments are
+merged once there are too many of them.
+
+Query syntax:
+    governing law                 both words anywhere (implicit AND)
+    "governing law England"       exact phrase
+    "non-compete" OR exclusivity  either side
+    NOT "change of control"       exclude documents
+    "governing law" NEAR/5 England  both within 5 tokens of each other
+    ("non-compete" OR "non-solicit") AND "governing law"
+"""
+
+import hashlib
+import json
+import mmap
+import re
+import shutil
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .paths import CACHE_DIR, default_contract_dir
+
+DEFAULT_INDEX_DIR = CACHE_DIR / 'search_index'
+
+# Byte-level tokenizer so every posting carries an exact byte offset into the file
+TERM_RE = re.compile(rb'[A-Za-z0-9]+')
+
+# Merge all segments into one once this many accumulate
+MAX_SEGMENTS = 8
+
+# A match span: (first token position, last token position, byte start, byte end)
+Span = Tuple[int, int, int, int]
+DocKey = Tuple[str, int]
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a search query cannot be parsed."""
+
+
+def iter_terms(data: bytes) -> Iterable[Tuple[int, str, int]]:
+    """
+    Tokenize raw contract bytes.
+
+    Args:
+        data: File contents
+
+    Returns:
+        Iterator of (token position, lowercase term, byte offset)
+    """
+    for position, match in enumerate(TERM_RE.finditer(data)):
+        yield position, match.group(0).lower().decode('ascii'), match.start()
+
+
+class _Segment:
+    """
+    One immutable, memory-mapped index segment.
+
+    Files (all native uint32 arrays, read through zero-copy memoryviews):
+        pos.bin   token positions, grouped by term then document, ascending
+        byte.bin  byte offset of each posting, parallel to pos.bin
+        dir.bin   per-term document directory: (doc, start index, count) triples
+    """
+
+    COLUMNS = ('pos', 'byte', 'dir')
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        with open(path / 'lexicon.json', encoding='utf-8') as f:
+            # term -> [postings offset, postings count, dir offset, doc count]
+            self.lexicon: Dict[str, List[int]] = json.load(f)
+        with open(path / 'docs.json', encoding='utf-8') as f:
+            self.docs: List[str] = json.load(f)
+
+        self._files = []
+        self._mmaps = []
+        views = {}
+        for column in self.COLUMNS:
+            column_path = path / f'{column}.bin'
+            f = open(column_path, 'rb')
+            self._files.append(f)
+            if column_path.stat().st_size:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mmaps.append(mapped)
+                views[column] = memoryview(mapped).cast('I')
+            else:
+                views[column] = memoryview(array('I'))
+        self.pos = views['pos']
+        self.byte = views['byte']
+        self.dir = views['dir']
+
+    def doc_ranges(self, term: str) -> Dict[int, Tuple[int, int]]:
+        """Documents containing `term`: local doc id -> (start index, count) in pos/byte."""
+        entry = self.lexicon.get(term)
+        if not entry:
+            return {}
+        _offset, _count, dir_offset, n_docs = entry
+        directory = self.dir[dir_offset * 3:(dir_offset + n_docs) * 3]
+        return {directory[i]: (directory[i + 1], directory[i + 2]) for i in range(0, len(directory), 3)}
+
+    def close(self) -> None:
+        for view in (self.pos, self.byte, self.dir):
+            view.release()
+        for mapped in self._mmaps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+
+
+def _write_segment(path: Path, files: List[Path]) -> List[Dict]:
+    """Index `files` into a new segment directory and return their doc records."""
+    path.mkdir(parents=True)
+    postings: Dict[str, array] = defaultdict(lambda: array('I'))
+    records = []
+
+    for local_id, file_path in enumerate(files):
+        data = file_path.read_bytes()
+        stat = file_path.stat()
+        records.append({
+            'name': file_path.name,
+            'local_id': local_id,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': hashlib.sha1(data).hexdigest(),
+        })
+        for position, term, byte_start in iter_terms(data):
+            postings[term].extend((local_id, position, byte_start))
+
+    lexicon = {}
+    offset = 0
+    dir_offset = 0
+    with open(path / 'pos.bin', 'wb') as pos_file, \
+            open(path / 'byte.bin', 'wb') as byte_file, \
+            open(path / 'dir.bin', 'wb') as dir_file:
+        for term in sorted(postings):
+            triples = postings.pop(term)
+            docs, positions, offsets = triples[0::3], triples[1::3], triples[2::3]
+            directory = array('I')
+            run_start = 0
+            for i in range(1, len(docs) + 1):
+                if i == len(docs) or docs[i] != docs[run_start]:
+                    directory.extend((docs[run_start], offset + run_start, i - run_start))
+                    run_start = i
+            lexicon[term] = [offset, len(docs), dir_offset, len(directory) // 3]
+            offset += len(docs)
+            dir_offset += len(directory) // 3
+            positions.tofile(pos_file)
+            offsets.tofile(byte_file)
+            directory.tofile(dir_file)
+
+    with open(path / 'lexicon.json', 'w', encoding='utf-8') as f:
+        json.dump(lexicon, f, separators=(',', ':'))
+    with open(path / 'docs.json', 'w', encoding='utf-8') as f:
+        json.dump([r['name'] for r in records], f)
+    return records
+
+
+class ContractIndex:
+    """Corpus-wide positional index with phrase and proximity queries."""
+
+    def __init__(self, index_dir: Optional[Path] = None, data_dir: Optional[Path] = None):
+        """
+        Open an index (it is created on the first update()).
+
+        Args:
+            index_dir: Index location (default: .cache/lawstronaut/search_index)
+            data_dir: Contract text directory (default: full_contract_txt or data/test_contracts)
+        """
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_INDEX_DIR
+        self.data_dir = Path(data_dir) if data_dir else default_contract_dir()
+        self.manifest = {'data_dir': str(self.data_dir), 'next_segment': 1, 'segments': [], 'docs': {}}
+        self._segments: Dict[str, _Segment] = {}
+
+        manifest_path = self.index_dir / 'manifest.json'
+        if manifest_path.exists():
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            if data_dir is None:
+                self.data_dir = Path(self.manifest['data_dir'])
+        self._open_segments()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def update(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the contract directory.
+
+        New and modified contracts (by size and mtime) are indexed into a new
+        segment; deleted contracts are dropped from the manifest.
+
+        An index built from a different directory is rebuilt, and the manifest
+        then records the new data_dir for later runs.
+
+        Args:
+            force: Rebuild everything from scratch
+
+        Returns:
+            Counts of added, updated, removed and unchanged contracts
+        """
+        if Path(self.manifest['data_dir']).resolve() != self.data_dir.resolve():
+            # Documents of another directory say nothing about this one
+            force = True
+        if force:
+            self.close()
+            if self.index_dir.exists():
+                shutil.rmtree(self.index_dir)
+            self.manifest = {'data_dir': str(self.data_dir), 'next_segment': 1, 'segments': [], 'docs': {}}
+
+        docs = self.manifest['docs']
+        files = sorted(self.data_dir.glob('*.txt'))
+        present = {f.name for f in files}
+
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        changed = []
+        for file_path in files:
+            record = docs.get(file_path.name)
+            stat = file_path.stat()
+            if record and record['size'] == stat.st_size and record['mtime'] == stat.st_mtime:
+                stats['unchanged'] += 1
+                continue
+            stats['updated' if record else 'added'] += 1
+            changed.append(file_path)
+
+        for name in list(docs):
+            if name not in present:
+                del docs[name]
+                stats['removed'] += 1
+
+        if changed:
+            segment_name = f"seg_{self.manifest['next_segment']:05d}"
+            self.manifest['next_segment'] += 1
+            for record in _write_segment(self.index_dir / segment_name, changed):
+                name = record.pop('name')
+                docs[name] = dict(record, segment=segment_name)
+            self.manifest['segments'].append(segment_name)
+
+        self._drop_dead_segments()
+        if len(self.manifest['segments']) > MAX_SEGMENTS:
+            self._merge()
+        self._save_manifest()
+        self._open_segments()
+        return stats
+
+    def _drop_dead_segments(self) -> None:
+        live = {record['segment'] for record in self.manifest['docs'].values()}
+        for segment_name in list(self.manifest['segments']):
+            if segment_name not in live:
+                self.manifest['segments'].remove(segment_name)
+                segment = self._segments.pop(segment_name, None)
+                if segment:
+                    segment.close()
+                shutil.rmtree(self.index_dir / segment_name, ignore_errors=True)
+
+    def _merge(self) -> None:
+        """Re-index all live contracts into a single segment."""
+        self.close()
+        old_segments = list(self.manifest['segments'])
+        segment_name = f"seg_{self.manifest['next_segment']:05d}"
+        self.manifest['next_segment'] += 1
+        files = [self.data_dir / name for name in sorted(self.manifest['docs'])]
+        docs = {}
+        for record in _write_segment(self.index_dir / segment_name, files):
+            name = record.pop('name')
+            docs[name] = dict(record, segment=segment_name)
+        self.manifest['docs'] = docs
+        self.manifest['segments'] = [segment_name]
+        for old in old_segments:
+            shutil.rmtree(self.index_dir / old, ignore_errors=True)
+
+    def _save_manifest(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_dir / 'manifest.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1)
+        tmp_path.replace(self.index_dir / 'manifest.json')
+
+    def _open_segments(self) -> None:
+        for segment_name in self.manifest['segments']:
+            if segment_name not in self._segments:
+                self._segments[segment_name] = _Segment(self.index_dir / segment_name)
+        # Live documents, keyed by (segment, local id)
+        self._live: Dict[DocKey, str] = {
+            (record['segment'], record['local_id']): name
+            for name, record in self.manifest['docs'].items()
+        }
+
+    def close(self) -> None:
+        """Release memory maps."""
+        for segment in self._segments.values():
+            segment.close()
+        self._segments = {}
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def phrase(self, text: str) -> Dict[DocKey, List[Span]]:
+        """
+        Find every occurrence of a phrase.
+
+        Candidate documents come from the per-term directories; positions are
+        then verified by anchoring on the rarest term and binary-searching the
+        other terms' sorted position runs, so cost tracks the rarest term.
+
+        Args:
+            text: Phrase text; tokenized like the contracts (so "non-compete" is "non compete")
+
+        Returns:
+            doc -> list of spans
+        """
+        terms = [term for _pos, term, _byte in iter_terms(text.encode('utf-8'))]
+        if not terms:
+            return {}
+
+        matches: Dict[DocKey, List[Span]] = {}
+        for segment_name, segment in self._segments.items():
+            ranges = [segment.doc_ranges(term) for term in terms]
+            candidates = set(ranges[0])
+            for term_ranges in ranges[1:]:
+                candidates &= set(term_ranges)
+
+            for local_id in candidates:
+                key = (segment_name, local_id)
+                if key not in self._live:
+                    continue
+                runs = [term_ranges[local_id] for term_ranges in ranges]
+                rarest = min(range(len(terms)), key=lambda i: runs[i][1])
+                spans = []
+                start, count = runs[rarest]
+                for anchor_index in range(start, start + count):
+                    first = segment.pos[anchor_index] - rarest
+                    found = []
+                    for i, (run_start, run_count) in enumerate(runs):
+                        if i == rarest:
+                            found.append(anchor_index)
+                            continue
+                        j = bisect_left(segment.pos, first + i, run_start, run_start + run_count)
+                        if j == run_start + run_count or segment.pos[j] != first + i:
+                            break
+                        found.append(j)
+                    else:
+                        spans.append((first, first + len(terms) - 1,
+                                      segment.byte[found[0]], segment.byte[found[-1]] + len(terms[-1])))
+                if spans:
+                    matches[key] = spans
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Run a boolean / phrase / proximity query.
+
+        Args:
+            query: Query string (see module docstring for syntax)
+            limit: Maximum number of contracts to return
+
+        Returns:
+            List of {"contract", "match_count", "matches": [(byte_start, byte_end), ...]},
+            most matches first
+        """
+        matches = _QueryParser(query, self).parse()
+        results = []
+        for doc, spans in matches.items():
+            unique = sorted({(span[2], span[3]) for span in spans})
+            results.append({
+                'contract': self._live[doc],
+                'match_count': len(unique),
+                'matches': unique,
+            })
+        results.sort(key=lambda r: (-r['match_count'], r['contract']))
+        return results[:limit] if limit else results
+
+    def all_docs(self) -> Dict[DocKey, List[Span]]:
+        return {doc: [] for doc in self._live}
+
+    def snippet(self, contract: str, byte_start: int, byte_end: int, context: int = 60) -> str:
+        """Text around a match, read straight from the contract file."""
+        with open(self.data_dir / contract, 'rb') as f:
+            f.seek(max(0, byte_start - context))
+            data = f.read(byte_end - byte_start + 2 * context)
+        return ' '.join(data.decode('utf-8', errors='ignore').split())
+
+
+class _QueryParser:
+    """Recursive-descent parser that evaluates a query as it parses."""
+
+    TOKEN_RE = re.compile(r'\s*(?:(")([^"]*)"|(\()|(\))|(NEAR/\d+)|(AND|OR|NOT)(?=[\s("]|$)|([^\s()"]+))')
+
+    def __init__(self, query: str, index: ContractIndex):
+        self.index = index
+        self.tokens = []
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = self.TOKEN_RE.match(query, position)
+            if not match or match.end() == position:
+                raise QuerySyntaxError(f"Cannot parse query near: {query[position:]!r}")
+            position = match.end()
+            if match.group(1):
+                self.tokens.append(('PHRASE', match.group(2)))
+            elif match.group(3):
+                self.tokens.append(('(', None))
+            elif match.group(4):
+                self.tokens.append((')', None))
+            elif match.group(5):
+                self.tokens.append(('NEAR', int(match.group(5).split('/')[1])))
+            elif match.group(6):
+                self.tokens.append((match.group(6), None))
+            elif match.group(7):
+                self.tokens.append(('PHRASE', match.group(7)))
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> Dict[DocKey, List[Span]]:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        result = self._or()
+        if self.pos != len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected token: {self.tokens[self.pos][0]}")
+        return result
+
+    def _or(self):
+        left = self._and()
+        while self._peek() == 'OR':
+            self.pos += 1
+            right = self._and()
+            merged = dict(left)
+            for doc, spans in right.items():
+                merged[doc] = merged.get(doc, []) + spans
+            left = merged
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self._peek() in ('AND', 'NOT', 'PHRASE', '('):
+            if self._peek() == 'AND':
+                self.pos += 1
+            right = self._not()
+            left = {doc: spans + right[doc] for doc, spans in left.items() if doc in right}
+        return left
+
+    def _not(self):
+        if self._peek() == 'NOT':
+            self.pos += 1
+            excluded = self._not()
+            return {doc: [] for doc in self.index.all_docs() if doc not in excluded}
+        return self._near()
+
+    def _near(self):
+        left = self._atom()
+        while self._peek() == 'NEAR':
+            distance = self.tokens[self.pos][1]
+            self.pos += 1
+            right = self._atom()
+            combined = {}
+            for doc in set(left) & set(right):
+                spans = []
+                for a in left[doc]:
+                    for b in right[doc]:
+                        gap = max(b[0] - a[1], a[0] - b[1])
+                        if gap <= distance:
+                            spans.append((min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])))
+                if spans:
+                    combined[doc] = spans
+            left = combined
+        return left
+
+    def _atom(self):
+        kind = self._peek()
+        if kind == 'PHRASE':
+            text = self.tokens[self.pos][1]
+            self.pos += 1
+            return self.index.phrase(text)
+        if kind == '(':
+            self.pos += 1
+            result = self._or()
+            if self._peek() != ')':
+                raise QuerySyntaxError("Missing closing parenthesis")
+            self.pos += 1
+            return result
+        raise QuerySyntaxError(f"Expected a term or phrase, got {kind or 'end of query'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut search QUERY."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='lawstronaut search',
+                                     description='Search CUAD contracts with phrase and proximity queries')
+    parser.add_argument('query', nargs='?', help='Query, e.g. \'"governing law England" AND "non-compete"\'')
+    parser.add_argument('--data-dir', type=Path, help='Contract text directory (default: full_contract_txt)')
+    parser.add_argument('--index-dir', type=Path, help=f'Index directory (default: {DEFAULT_INDEX_DIR})')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from scratch')
+    parser.add_argument('--no-update', action='store_true', help='Skip the incremental update before searching')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum contracts to list (default: 20)')
+    parser.add_argument('--snippets', type=int, default=1, help='Snippets to print per contract (default: 1)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    index = ContractIndex(index_dir=args.index_dir, data_dir=args.data_dir)
+    if args.rebuild or not args.no_update:
+        start = time.perf_counter()
+        stats = index.update(force=args.rebuild)
+        if stats['added'] or stats['updated'] or stats['removed']:
+            print(f"Indexed {index.data_dir}: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed ({time.perf_counter() - start:.1f}s)")
+
+    if not args.query:
+        return 0
+
+    start = time.perf_counter()
+    try:
+        results = index.search(args.query)
+    except QuerySyntaxError as e:
+        print(f"Error: {e}")
+        return 2
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps({'query': args.query, 'elapsed_ms': elapsed_ms, 'results': results[:args.limit]}, indent=2))
+        return 0
+
+    print(f"{len(results)} contract(s) match {args.query!r} ({elapsed_ms:.1f} ms)\n")
+    for result in results[:args.limit]:
+        print(f"{result['match_count']:5d}  {result['contract']}")
+        for byte_start, byte_end in result['matches'][:args.snippets]:
+            print(f"         @{byte_start}-{byte_end}: ...{index.snippet(result['contract'], byte_start, byte_end)}...")
+    return 0
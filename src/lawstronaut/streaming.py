@@ -0,0 +1,173 @@
+"""
+Streaming generation with latency metrics and on-disk partial answers
+
+Consumes a `generate_content_stream` iterator chunk by chunk, recording
+time-to-first-token, inter-chunk gaps and completion throughput. Every chunk's
+text is appended (and flushed) to a per-request partial file as it arrives, so
+a long answer that is cut off by a timeout or crash can be read back, and the
+next identical request continues from where the previous one stopped.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .paths import CACHE_DIR
+
+DEFAULT_STREAM_DIR = CACHE_DIR / 'streams'
+
+PARTIAL_SUFFIX = '.partial.txt'
+DONE_SUFFIX = '.txt'
+
+CONTINUE_INSTRUCTION = (
+    "Your previous answer was cut off. Continue it exactly where it stopped, "
+    "without repeating any text already written and without any preamble."
+)
+
+
+class StreamSink:
+    """Append-only text file holding the chunks received for one request."""
+
+    def __init__(self, stream_dir: Path, key: str):
+        """
+        Args:
+            stream_dir: Directory for partial and completed answers
+            key: Request identifier (e.g. a ResponseCache key)
+        """
+        self.stream_dir = Path(stream_dir)
+        self.partial_path = self.stream_dir / (key + PARTIAL_SUFFIX)
+        self.done_path = self.stream_dir / (key + DONE_SUFFIX)
+        self._file = None
+
+    def previous_text(self) -> str:
+        """Text saved by an earlier interrupted attempt ('' if none)."""
+        if self.partial_path.exists():
+            return self.partial_path.read_text(encoding='utf-8')
+        return ''
+
+    def write(self, text: str) -> None:
+        """Append one chunk and flush it to disk."""
+        if self._file is None:
+            self.stream_dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.partial_path, 'a', encoding='utf-8')
+        self._file.write(text)
+        self._file.flush()
+
+    def close(self, complete: bool) -> Optional[Path]:
+        """
+        Close the file; a complete answer is renamed from *.partial.txt to *.txt.
+
+        Returns:
+            Path of the file holding the answer, or None if nothing was written
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not self.partial_path.exists():
+            return None
+        if complete:
+            self.partial_path.replace(self.done_path)
+            return self.done_path
+        return self.partial_path
+
+
+def continuation_contents(prompt: str, partial_answer: str) -> List[Dict]:
+    """
+    Build a multi-turn request that asks the model to continue a cut-off answer.
+
+    Args:
+        prompt: The original user prompt
+        partial_answer: Text already received
+
+    Returns:
+        `contents` list for generate_content / generate_content_stream
+    """
+    return [
+        {'role': 'user', 'parts': [{'text': prompt}]},
+        {'role': 'model', 'parts': [{'text': partial_answer}]},
+        {'role': 'user', 'parts': [{'text': CONTINUE_INSTRUCTION}]},
+    ]
+
+
+def _chunk_text(chunk: Any) -> str:
+    try:
+        return chunk.text or ''
+    except (AttributeError, ValueError):
+        # Chunks carrying only metadata / function calls have no text
+        return ''
+
+
+class StreamResult:
+    """Accumulated text, final chunk and timing of one streamed response."""
+
+    def __init__(self, text: str, last_chunk: Any, stats: Dict):
+        self.text = text
+        self.last_chunk = last_chunk
+        self.stats = stats
+
+    @property
+    def usage_metadata(self) -> Any:
+        return getattr(self.last_chunk, 'usage_metadata', None)
+
+
+def consume_stream(stream: Iterable[Any], sink: Optional[StreamSink] = None,
+                   start_time: Optional[float] = None, prefix: str = '') -> StreamResult:
+    """
+    Read a response stream to the end, timing every chunk.
+
+    If the stream raises part-way, the text received so far is already on disk
+    in `sink`; the exception propagates with a `partial_answer` attribute set.
+
+    Args:
+        stream: Iterator returned by client.models.generate_content_stream()
+        sink: Optional StreamSink receiving each chunk's text
+        start_time: time.perf_counter() at request start (default: now)
+        prefix: Text from a resumed earlier attempt, prepended to the answer
+
+    Returns:
+        StreamResult with text, last chunk (carrying usage/grounding metadata) and stats:
+        ttft_seconds, total_seconds, chunks, mean_chunk_interval_seconds,
+        completion_tokens, tokens_per_second, resumed_chars
+    """
+    start_time = time.perf_counter() if start_time is None else start_time
+    parts = [prefix] if prefix else []
+    arrivals: List[float] = []
+    last_chunk = None
+
+    try:
+        for chunk in stream:
+            now = time.perf_counter()
+            last_chunk = chunk
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            arrivals.append(now)
+            parts.append(text)
+            if sink:
+                sink.write(text)
+    except Exception as e:
+        e.partial_answer = ''.join(parts)
+        raise
+
+    end_time = time.perf_counter()
+    text = ''.join(parts)
+
+    usage = getattr(last_chunk, 'usage_metadata', None)
+    completion_tokens = getattr(usage, 'candidates_token_count', None) if usage else None
+    if completion_tokens is None:
+        # ~4 chars per token, as in chunking.estimate_tokens
+        completion_tokens = (len(text) - len(prefix)) // 4
+
+    ttft = arrivals[0] - start_time if arrivals else None
+    generation_seconds = arrivals[-1] - arrivals[0] if len(arrivals) > 1 else 0.0
+    stats = {
+        'ttft_seconds': ttft,
+        'total_seconds': end_time - start_time,
+        'chunks': len(arrivals),
+        'mean_chunk_interval_seconds': generation_seconds / (len(arrivals) - 1) if len(arrivals) > 1 else None,
+        'completion_tokens': completion_tokens,
+        # Throughput after the first token, so queueing/prompt processing is excluded
+        'tokens_per_second': completion_tokens / generation_seconds if generation_seconds else None,
+        'resumed_chars': len(prefix),
+    }
+    return StreamResult(text, last_chunk, stats)
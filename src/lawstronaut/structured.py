@@ -0,0 +1,301 @@
+"""
+Structured (JSON) answers and columnar aggregation
+
+In structured-output mode the model is given RESPONSE_SCHEMA as its
+`response_schema` and returns one JSON object per (question, contract) pair
+instead of the eight-section prose answer. The object is parsed into compact
+slotted dataclasses and stored on the result as `response.structured`:
+
+    StructuredAnswer
+        compliance_status, risk_level, summary, recommendations
+        regulations: [RegulationRef(name, citation, status, effective_date, url)]
+        provisions:  [ProvisionRef(section, title, excerpt, assessment)]
+        gaps:        [ComplianceGap(description, severity, regulation, section, remediation)]
+
+structured_tables() flattens many result files into Arrow tables (one row per
+answer, regulation, provision and gap), so questions like "which contracts
+have a critical GDPR gap" are a filter over a column rather than a regex over
+prose.
+
+Usage:
+    python -m lawstronaut structured gemini_vertex_results/
+    python -m lawstronaut structured run.jsonl --group-by regulation --parquet-dir tables/
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .batch import read_result_file
+from .regulations import RISK_LEVELS, STATUS_RISK_CAP
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+COMPLIANCE_STATUSES = ('compliant', 'partially_compliant', 'non_compliant', 'not_applicable', 'unclear')
+# Same vocabulary as Regulation.status, so answers join with the regulation records
+REGULATION_STATUSES = (*STATUS_RISK_CAP, 'unknown')
+PROVISION_ASSESSMENTS = ('adequate', 'partial', 'deficient', 'not_addressed')
+
+_STRING = {'type': 'STRING'}
+
+
+def _enum(values: Sequence[str]) -> Dict:
+    return {'type': 'STRING', 'enum': list(values)}
+
+
+def _array(properties: Dict, required: Sequence[str]) -> Dict:
+    return {'type': 'ARRAY', 'items': {'type': 'OBJECT', 'properties': properties, 'required': list(required)}}
+
+
+# OpenAPI-subset schema accepted by GenerateContentConfig(response_schema=...)
+RESPONSE_SCHEMA: Dict[str, Any] = {
+    'type': 'OBJECT',
+    'properties': {
+        'compliance_status': _enum(COMPLIANCE_STATUSES),
+        'risk_level': _enum(RISK_LEVELS),
+        'summary': _STRING,
+        'regulations': _array({
+            'name': _STRING,
+            'citation': _STRING,
+            'status': _enum(REGULATION_STATUSES),
+            'effective_date': _STRING,
+            'url': _STRING,
+        }, required=('name', 'citation', 'status')),
+        'provisions': _array({
+            'section': _STRING,
+            'title': _STRING,
+            'excerpt': _STRING,
+            'assessment': _enum(PROVISION_ASSESSMENTS),
+        }, required=('section', 'assessment')),
+        'gaps': _array({
+            'description': _STRING,
+            'severity': _enum(RISK_LEVELS),
+            'regulation': _STRING,
+            'section': _STRING,
+            'remediation': _STRING,
+        }, required=('description', 'severity')),
+        'recommendations': {'type': 'ARRAY', 'items': _STRING},
+    },
+    'required': ['compliance_status', 'risk_level', 'summary', 'regulations', 'provisions', 'gaps'],
+}
+
+
+def _from_dict(cls, data: Dict):
+    """Build a flat record dataclass from a dict, ignoring unknown keys and nulls."""
+    names = {f.name for f in fields(cls)}
+    return cls(**{key: str(value) for key, value in (data or {}).items() if key in names and value is not None})
+
+
+@dataclass(slots=True)
+class RegulationRef:
+    """A regulation the answer relies on."""
+
+    name: str
+    citation: str = ''
+    status: str = 'unknown'             # REGULATION_STATUSES
+    effective_date: str = ''            # ISO date, if given
+    url: str = ''
+
+
+@dataclass(slots=True)
+class ProvisionRef:
+    """A contract provision the answer assesses."""
+
+    section: str                        # Section number as written in the contract
+    title: str = ''
+    excerpt: str = ''
+    assessment: str = 'not_addressed'   # PROVISION_ASSESSMENTS
+
+
+@dataclass(slots=True)
+class ComplianceGap:
+    """A missing or deficient provision."""
+
+    description: str
+    severity: str = 'medium'            # RISK_LEVELS
+    regulation: str = ''
+    section: str = ''
+    remediation: str = ''
+
+
+@dataclass(slots=True)
+class StructuredAnswer:
+    """One parsed structured-output answer."""
+
+    compliance_status: str = 'unclear'  # COMPLIANCE_STATUSES
+    risk_level: str = 'medium'          # RISK_LEVELS
+    summary: str = ''
+    regulations: List[RegulationRef] = field(default_factory=list)
+    provisions: List[ProvisionRef] = field(default_factory=list)
+    gaps: List[ComplianceGap] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StructuredAnswer':
+        """Build from a parsed JSON object; unknown enum values fall back to the defaults."""
+        answer = cls(
+            compliance_status=str(data.get('compliance_status') or 'unclear'),
+            risk_level=str(data.get('risk_level') or 'medium'),
+            summary=str(data.get('summary') or ''),
+            regulations=[_from_dict(RegulationRef, item) for item in data.get('regulations') or []
+                         if (item or {}).get('name')],
+            provisions=[_from_dict(ProvisionRef, item) for item in data.get('provisions') or []
+                        if (item or {}).get('section')],
+            gaps=[_from_dict(ComplianceGap, item) for item in data.get('gaps') or []
+                  if (item or {}).get('description')],
+            recommendations=[str(item) for item in data.get('recommendations') or [] if item],
+        )
+        if answer.compliance_status not in COMPLIANCE_STATUSES:
+            answer.compliance_status = 'unclear'
+        if answer.risk_level not in RISK_LEVELS:
+            answer.risk_level = 'medium'
+        for gap in answer.gaps:
+            if gap.severity not in RISK_LEVELS:
+                gap.severity = 'medium'
+        return answer
+
+
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+
+def parse_structured(text: Optional[str]) -> StructuredAnswer:
+    """
+    Parse a structured-output answer.
+
+    Args:
+        text: Model answer (a JSON object, optionally inside a ```json fence)
+
+    Returns:
+        StructuredAnswer
+
+    Raises:
+        ValueError: If the text is not a JSON object
+    """
+    text = (text or '').strip()
+    fenced = _FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Structured answer is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"Structured answer is a JSON {type(data).__name__}, not an object")
+    return StructuredAnswer.from_dict(data)
+
+
+def iter_structured(paths: Sequence[str]) -> Iterator[Tuple[Dict, str, Dict]]:
+    """
+    Yield (record, model, structured dict) for every structured response in result files.
+
+    Responses without `structured` (prose runs, errors) are skipped. A path
+    may be prefixed with "label=" to name the model of a harness file.
+    """
+    for spec in paths:
+        default_label, records = read_result_file(spec)
+        for record in records:
+            if 'responses' in record:
+                responses = record['responses'].items()
+            else:
+                responses = [(default_label, record.get('response') or {})]
+            for model, response in responses:
+                if response.get('structured'):
+                    yield record, model, response['structured']
+
+
+def structured_tables(paths: Sequence[str]) -> Dict[str, 'pa.Table']:
+    """
+    Flatten structured responses into Arrow tables.
+
+    Returns:
+        {"answers", "regulations", "provisions", "gaps"}: each row carries
+        qa_id, contract_file and model, plus the fields of its record type
+    """
+    import pyarrow as pa
+
+    keys = ('qa_id', 'contract_file', 'model')
+    columns = {
+        'answers': keys + ('compliance_status', 'risk_level', 'summary', 'n_regulations', 'n_provisions', 'n_gaps'),
+        'regulations': keys + tuple(f.name for f in fields(RegulationRef)),
+        'provisions': keys + tuple(f.name for f in fields(ProvisionRef)),
+        'gaps': keys + tuple(f.name for f in fields(ComplianceGap)),
+    }
+    data = {table: {column: [] for column in names} for table, names in columns.items()}
+
+    def add(table: str, row: Dict) -> None:
+        for column, values in data[table].items():
+            values.append(row.get(column))
+
+    for record, model, structured in iter_structured(paths):
+        answer = StructuredAnswer.from_dict(structured)
+        base = {'qa_id': record.get('qa_id'), 'contract_file': record.get('contract_file'), 'model': model}
+        add('answers', dict(base, compliance_status=answer.compliance_status, risk_level=answer.risk_level,
+                            summary=answer.summary, n_regulations=len(answer.regulations),
+                            n_provisions=len(answer.provisions), n_gaps=len(answer.gaps)))
+        for table, items in (('regulations', answer.regulations), ('provisions', answer.provisions),
+                             ('gaps', answer.gaps)):
+            for item in items:
+                add(table, dict(base, **asdict(item)))
+
+    counts = {'n_regulations', 'n_provisions', 'n_gaps'}
+    return {
+        table: pa.table({column: pa.array(values, type=pa.int32() if column in counts else pa.string())
+                         for column, values in columns_data.items()})
+        for table, columns_data in data.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut structured."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='lawstronaut structured',
+                                     description='Aggregate structured-output answers across result files')
+    parser.add_argument('results', nargs='+',
+                        help='Result files (.json / .jsonl) or result directories; prefix with "label=" to name a harness file')
+    parser.add_argument('--group-by', choices=['qa_id', 'contract_file', 'model', 'regulation'], default='qa_id',
+                        help='Gap counts per question, contract, model or regulation (default: qa_id)')
+    parser.add_argument('--parquet-dir', type=Path,
+                        help='Write answers/regulations/provisions/gaps tables as Parquet files here')
+    args = parser.parse_args(argv)
+
+    try:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is required: pip install pyarrow")
+        return 1
+
+    tables = structured_tables(args.results)
+    answers, gaps = tables['answers'], tables['gaps']
+    if not answers.num_rows:
+        print("No structured answers found (run the harness with --structured)")
+        return 1
+
+    print(f"{answers.num_rows} structured answer(s), {tables['regulations'].num_rows} regulation reference(s), "
+          f"{tables['provisions'].num_rows} provision(s), {gaps.num_rows} gap(s)\n")
+    print("Compliance status:")
+    for row in answers.group_by('compliance_status').aggregate([('qa_id', 'count')]).to_pylist():
+        print(f"  {row['compliance_status']:<20} {row['qa_id_count']}")
+
+    if gaps.num_rows:
+        print(f"\nGaps by {args.group_by} and severity:")
+        grouped = gaps.group_by([args.group_by, 'severity']).aggregate([('description', 'count')]).to_pylist()
+        grouped.sort(key=lambda row: (row[args.group_by] or '', -RISK_LEVELS.index(row['severity'])))
+        for row in grouped:
+            print(f"  {row[args.group_by] or '-':<40.40} {row['severity']:<9} {row['description_count']}")
+        critical = pc.sum(pc.equal(gaps['severity'], 'critical')).as_py() or 0
+        print(f"\nCritical gaps: {critical}")
+
+    if args.parquet_dir:
+        args.parquet_dir.mkdir(parents=True, exist_ok=True)
+        for name, table in tables.items():
+            pq.write_table(table, args.parquet_dir / f'{name}.parquet')
+        print(f"\nTables written to {args.parquet_dir}/")
+    return 0
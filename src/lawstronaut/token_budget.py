@@ -0,0 +1,268 @@
+"""
+Prompt token estimation and pre-flight budget checks
+
+Estimates prompt size locally before a request is sent, using a word-piece
+approximation of SentencePiece/BPE tokenizers: short words are one token,
+long or all-caps words (common in EDGAR contracts) split into several,
+digits and punctuation count individually. Estimates are cached per text
+hash, so each contract is measured once per run (and once ever, with a
+persistent cache file).
+
+Every real response reports the actual prompt_token_count; recording it
+next to the estimate gives a per-model calibration ratio that is applied to
+later estimates, so the pre-flight check converges on the real tokenizer.
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .chunking import estimate_tokens
+from .paths import CACHE_DIR
+from .prompts import SYSTEM_INSTRUCTION, build_prompt
+
+DEFAULT_ESTIMATES_PATH = CACHE_DIR / 'token_estimates.json'
+DEFAULT_CALIBRATION_PATH = CACHE_DIR / 'token_calibration.jsonl'
+
+# Input context windows (tokens); prefixes match versioned model names
+CONTEXT_WINDOWS = {
+    'gemini-1.5-pro': 2_097_152,
+    'gemini': 1_048_576,
+    'gpt-4o': 128_000,
+    'gpt-4': 128_000,
+    'sonar': 127_000,
+    'claude': 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+OVER_BUDGET_ACTIONS = ('sections', 'refuse')
+
+_PIECE_RE = re.compile(r'[A-Za-z]+|\d+|\n+|[^\w\s]|\s+')
+
+
+def context_window(model_name: str) -> int:
+    """Input context window for a model name (longest matching prefix)."""
+    for prefix in sorted(CONTEXT_WINDOWS, key=len, reverse=True):
+        if model_name.startswith(prefix):
+            return CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def approximate_tokens(text: str) -> int:
+    """
+    Word-piece approximation of a subword tokenizer's count for `text`.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    count = 0
+    for piece in _PIECE_RE.findall(text):
+        first = piece[0]
+        if first.isalpha():
+            length = len(piece)
+            if piece.isupper() and length > 3:
+                # All-caps words are rare in tokenizer vocabularies
+                count += math.ceil(length / 3)
+            elif length <= 7:
+                count += 1
+            else:
+                count += 1 + math.ceil((length - 7) / 4)
+        elif first.isdigit():
+            count += len(piece)
+        elif first == '\n':
+            count += 1
+        elif not first.isspace():
+            count += 1
+    return count
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Preflight:
+    """Outcome of a prompt budget check."""
+
+    estimated_tokens: int       # Calibrated estimate for system instruction + full prompt
+    budget: int                 # Maximum prompt tokens allowed
+    contract_tokens: int        # Calibrated estimate for the contract alone
+    overhead_tokens: int        # System instruction, template and question
+    action: str                 # 'send', 'sections' or 'refuse'
+    section_budget: Optional[int] = None  # Contract budget for section retrieval, in chunker token units
+
+    @property
+    def fits(self) -> bool:
+        return self.action == 'send'
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class TokenEstimator:
+    """Thread-safe, hash-cached prompt token estimates with usage-based calibration."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_ESTIMATES_PATH,
+                 calibration_path: Optional[Path] = DEFAULT_CALIBRATION_PATH):
+        """
+        Initialize the estimator.
+
+        Args:
+            path: JSON file of raw estimates keyed by text SHA-256 (None keeps them in memory)
+            calibration_path: JSONL log of estimated vs actual prompt tokens (None disables it)
+        """
+        self.path = Path(path) if path else None
+        self.calibration_path = Path(calibration_path) if calibration_path else None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.estimates: Dict[str, int] = {}
+        # model -> [sum of raw estimates, sum of actual prompt tokens, samples]
+        self.calibration: Dict[str, list] = {}
+
+        if self.path and self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                self.estimates = json.load(f)
+        if self.calibration_path and self.calibration_path.exists():
+            with open(self.calibration_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        sample = json.loads(line)
+                        self._add_sample(sample['model'], sample['estimated'], sample['actual'])
+
+    def _add_sample(self, model: str, estimated: int, actual: int) -> None:
+        totals = self.calibration.setdefault(model, [0, 0, 0])
+        totals[0] += estimated
+        totals[1] += actual
+        totals[2] += 1
+
+    def raw_tokens(self, text: str) -> int:
+        """Uncalibrated estimate for `text`, computed once per distinct text."""
+        if not text:
+            return 0
+        key = _text_hash(text)
+        with self._lock:
+            cached = self.estimates.get(key)
+        if cached is not None:
+            return cached
+        count = approximate_tokens(text)
+        with self._lock:
+            self.estimates[key] = count
+            self._dirty = True
+        return count
+
+    def ratio(self, model: Optional[str] = None) -> float:
+        """Actual / estimated prompt tokens observed for `model` (1.0 until calibrated)."""
+        with self._lock:
+            totals = self.calibration.get(model) if model else None
+            if totals is None:
+                # Pool all models when this one has no samples yet
+                estimated = sum(t[0] for t in self.calibration.values())
+                actual = sum(t[1] for t in self.calibration.values())
+            else:
+                estimated, actual = totals[0], totals[1]
+        return actual / estimated if estimated else 1.0
+
+    def tokens(self, *texts: str, model: Optional[str] = None) -> int:
+        """Calibrated estimate for the concatenation of `texts`."""
+        return math.ceil(sum(self.raw_tokens(text) for text in texts) * self.ratio(model))
+
+    def record(self, estimated: int, usage_metadata: Any, model: str, label: str = '') -> Optional[Dict]:
+        """
+        Record a raw estimate against the prompt_token_count a response reported.
+
+        Args:
+            estimated: Raw (uncalibrated) estimate that was made for the request
+            usage_metadata: Response usage_metadata (object or dict)
+            model: Model name the request went to
+            label: Free-form label, e.g. the question ID
+
+        Returns:
+            The recorded sample, or None if the response carried no prompt count
+        """
+        if isinstance(usage_metadata, dict):
+            actual = usage_metadata.get('prompt_token_count')
+        else:
+            actual = getattr(usage_metadata, 'prompt_token_count', None)
+        if not actual or not estimated:
+            return None
+
+        sample = {
+            'time': time.time(),
+            'model': model,
+            'label': label,
+            'estimated': int(estimated),
+            'actual': int(actual),
+            'ratio': round(actual / estimated, 4),
+        }
+        with self._lock:
+            self._add_sample(model, sample['estimated'], sample['actual'])
+            if self.calibration_path:
+                self.calibration_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.calibration_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(sample) + '\n')
+        return sample
+
+    def preflight(self, contract_text: str, question: str, budget: int,
+                  on_over_budget: str = 'sections', model: Optional[str] = None,
+                  system_instruction: str = SYSTEM_INSTRUCTION,
+                  prompt_options: Optional[Dict] = None) -> Preflight:
+        """
+        Check whether the full-contract prompt fits the budget before sending it.
+
+        Args:
+            contract_text: Full contract text
+            question: Legal question
+            budget: Maximum prompt tokens (system instruction included)
+            on_over_budget: 'sections' to fall back to section retrieval, 'refuse' to skip the request
+            model: Model name for the calibration ratio
+            system_instruction: System instruction sent with the prompt
+            prompt_options: Other build_prompt() arguments of the request (structured,
+                authorities, search), so their text counts towards the overhead
+
+        Returns:
+            Preflight describing the estimate and the action to take
+        """
+        if on_over_budget not in OVER_BUDGET_ACTIONS:
+            raise ValueError(f"on_over_budget must be one of {OVER_BUDGET_ACTIONS}, got {on_over_budget!r}")
+
+        ratio = self.ratio(model)
+        contract_tokens = math.ceil(self.raw_tokens(contract_text) * ratio)
+        overhead_tokens = math.ceil((self.raw_tokens(system_instruction)
+                                     + self.raw_tokens(build_prompt('', question, **(prompt_options or {})))) * ratio)
+        estimated = contract_tokens + overhead_tokens
+        if estimated <= budget:
+            return Preflight(estimated, budget, contract_tokens, overhead_tokens, 'send')
+
+        section_budget = None
+        if on_over_budget == 'sections':
+            # select_sections() counts ~4 chars/token; convert the remaining budget into its units
+            remaining = max(budget - overhead_tokens, 0)
+            section_budget = int(remaining * estimate_tokens(contract_text) / max(contract_tokens, 1))
+        return Preflight(estimated, budget, contract_tokens, overhead_tokens, on_over_budget, section_budget)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-model calibration: samples, ratio."""
+        with self._lock:
+            return {model: {'samples': t[2], 'ratio': round(t[1] / t[0], 4) if t[0] else None}
+                    for model, t in self.calibration.items()}
+
+    def save(self) -> None:
+        """Persist new estimates (atomic replace)."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.estimates, f)
+            tmp.replace(self.path)
+            self._dirty = False
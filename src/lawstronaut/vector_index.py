@@ -0,0 +1,478 @@
+"""
+Embedded approximate-nearest-neighbour index over contract chunks
+
+A local stand-in for pgvector's ivfflat index on `contract_embeddings`: the
+same chunks the ingestion pipeline loads are embedded and stored as an
+int8 (+ per-row scale) or float16 matrix in .npy files that are
+memory-mapped on open. int8 is the default: a quarter of float32's size
+and several times faster to score, since numpy's float16 conversion is
+slow. Search is IVF: spherical k-means centroids partition the rows into
+inverted lists, a query scores the centroids, then only the rows of the
+`nprobe` closest lists.
+
+update() is incremental. Contracts whose text is unchanged keep their rows
+as they are; a changed contract is re-chunked and only chunks whose content
+hash is new are embedded. New rows join the nearest existing list, and the
+centroids are retrained only when the corpus has grown or churned enough to
+skew the lists.
+"""
+
+import hashlib
+import json
+import math
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .embeddings import DEFAULT_EMBEDDER, EmbeddingPipeline, get_embedder, normalize_rows
+from .paths import CACHE_DIR, default_contract_dir
+
+DEFAULT_VECTOR_DIR = CACHE_DIR / 'vector_index'
+DTYPES = ('int8', 'float16')
+
+# Retrain centroids once this fraction of rows was added or replaced since training
+RETRAIN_FRACTION = 0.5
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE = 50000
+ASSIGN_BLOCK = 8192
+
+ARRAYS = ('vectors', 'scales', 'centroids', 'list_offsets', 'list_rows')
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Store normalized float32 rows as float16, or int8 with a per-row scale.
+
+    Returns:
+        (stored matrix, float32 scales; all ones for float16)
+    """
+    if dtype == 'float16':
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    stored = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return stored, scales.astype(np.float32)
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS,
+                    sample: int = KMEANS_SAMPLE, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means over (a sample of) normalized rows.
+
+    Args:
+        vectors: float32 rows, L2-normalized
+        nlist: Number of centroids
+        iterations: Lloyd iterations
+        sample: Maximum rows used for training
+        seed: RNG seed (training is deterministic)
+
+    Returns:
+        float32 array (nlist, dimensions) of normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    data = vectors if len(vectors) <= sample else vectors[rng.choice(len(vectors), sample, replace=False)]
+    nlist = min(nlist, len(data))
+    centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists with random rows
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid for each row, computed in blocks to bound memory."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        block = np.asarray(vectors[start:start + ASSIGN_BLOCK], dtype=np.float32)
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+class VectorIndex:
+    """Memory-mapped IVF index of contract chunk embeddings."""
+
+    def __init__(self, index_dir: Optional[Path] = None, data_dir: Optional[Path] = None,
+                 embedder: Optional[str] = None, dtype: str = 'int8',
+                 cache: Union[bool, Path] = True, workers: Optional[int] = None):
+        """
+        Open an index (it is created on the first update()).
+
+        Args:
+            index_dir: Index location (default: .cache/lawstronaut/vector_index)
+            data_dir: Contract text directory (default: full_contract_txt or data/test_contracts)
+            embedder: Embedder name (default: the index's own, else DEFAULT_EMBEDDER)
+            dtype: Storage type for new indexes, 'int8' or 'float16'
+            cache: Embedding cache passed to EmbeddingPipeline (True: the default cache, False: none)
+            workers: Embedding worker processes for local models
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_VECTOR_DIR
+        self.data_dir = Path(data_dir) if data_dir else default_contract_dir()
+        self.manifest: Dict = {
+            'data_dir': str(self.data_dir), 'embedder': embedder or DEFAULT_EMBEDDER, 'dtype': dtype,
+            'rows': 0, 'trained_rows': 0, 'changed_since_training': 0, 'contracts': {},
+        }
+        self.chunks: List[Dict] = []
+        self.arrays: Dict[str, np.ndarray] = {}
+
+        manifest_path = self.index_dir / 'manifest.json'
+        if manifest_path.exists():
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            if data_dir is None:
+                self.data_dir = Path(self.manifest['data_dir'])
+            if embedder and embedder != self.manifest['embedder']:
+                raise ValueError(f"Index at {self.index_dir} was built with {self.manifest['embedder']}, "
+                                 f"not {embedder}; rebuild it to switch embedders")
+            self._open()
+        self.embedder = get_embedder(self.manifest['embedder'])
+        self.cache = cache
+        self.workers = workers
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _open(self) -> None:
+        with open(self.index_dir / 'chunks.json', encoding='utf-8') as f:
+            self.chunks = json.load(f)
+        self.arrays = {name: np.load(self.index_dir / f'{name}.npy', mmap_mode='r') for name in ARRAYS}
+        # Contract -> (first row, end row); rows of one contract are contiguous
+        self._ranges = {name: tuple(record['rows']) for name, record in self.manifest['contracts'].items()}
+
+    def _write(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.arrays = {}
+        for name, array in arrays.items():
+            tmp = self.index_dir / f'{name}.tmp.npy'
+            np.save(tmp, array)
+            tmp.replace(self.index_dir / f'{name}.npy')
+        for name, payload in (('chunks.json', self.chunks), ('manifest.json', self.manifest)):
+            tmp = self.index_dir / f'{name}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=None if name == 'chunks.json' else 1)
+            tmp.replace(self.index_dir / name)
+        self._open()
+
+    def __len__(self) -> int:
+        return self.manifest['rows']
+
+    def vectors_f32(self, rows: Union[slice, np.ndarray] = slice(None)) -> np.ndarray:
+        """Dequantized float32 copies of the selected rows."""
+        vectors = np.asarray(self.arrays['vectors'][rows], dtype=np.float32)
+        if self.manifest['dtype'] == 'int8':
+            vectors *= np.asarray(self.arrays['scales'][rows])[:, None]
+        return vectors
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def update(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the contract directory.
+
+        Args:
+            force: Re-embed everything and retrain the centroids
+
+        Returns:
+            Counts of added/updated/removed/unchanged contracts; chunks embedded,
+            taken from the embedding cache or reused from the index; and whether
+            the centroids were retrained
+        """
+        from .contract_store import ContractStore
+        from .ingest import chunk_rows, document_name
+
+        old_contracts = {} if force else self.manifest['contracts']
+        old_vectors = None if force or not len(self) else self.vectors_f32()
+        old_by_hash = {} if old_vectors is None else {c['hash']: i for i, c in enumerate(self.chunks)}
+
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0,
+                 'embedded': 0, 'cached': 0, 'reused': 0, 'retrained': 0}
+        store = ContractStore.open_or_build(self.data_dir, refresh=True)
+        try:
+            store_names = store.names()
+            text_hashes = {name: _text_hash(store.text(name)) for name in store_names}
+            changed = [name for name in store_names
+                       if old_contracts.get(name, {}).get('hash') != text_hashes[name]]
+            stats['removed'] = sum(1 for name in old_contracts if name not in text_hashes)
+
+            # Chunk (but not yet embed) every changed contract with the ingestion chunker
+            changed_set = set(changed)
+            fresh = {doc: list(rows) for doc, rows in
+                     groupby(chunk_rows(store, names=changed), key=lambda row: row['document_name'])}
+        finally:
+            store.close()
+
+        chunks: List[Dict] = []
+        sources: List[Tuple[str, int]] = []   # ('old', row) or ('new', position in to_embed)
+        to_embed: List[str] = []
+        contracts: Dict[str, Dict] = {}
+        for name in store_names:
+            first = len(chunks)
+            if name not in changed_set:
+                start, end = old_contracts[name]['rows']
+                for row in range(start, end):
+                    chunks.append(self.chunks[row])
+                    sources.append(('old', row))
+                stats['unchanged'] += 1
+            else:
+                stats['updated' if name in old_contracts else 'added'] += 1
+                for row in fresh.get(document_name(name), []):
+                    meta = row['metadata']
+                    chunks.append({'contract': name, 'chunk_id': row['chunk_index'], 'section': meta['section'],
+                                   'heading': meta['heading'], 'start': meta['start'], 'end': meta['end'],
+                                   'hash': row['content_hash']})
+                    old_row = old_by_hash.get(row['content_hash'])
+                    if old_row is not None:
+                        sources.append(('old', old_row))
+                        stats['reused'] += 1
+                    else:
+                        sources.append(('new', len(to_embed)))
+                        to_embed.append(row['chunk_text'])
+            contracts[name] = {'hash': text_hashes[name], 'rows': [first, len(chunks)]}
+
+        with EmbeddingPipeline(self.embedder, cache=self.cache, workers=self.workers) as pipeline:
+            embedded = pipeline.embed(to_embed)
+        stats['embedded'] = pipeline.stats['embedded']
+        stats['cached'] = pipeline.stats['cached']
+
+        vectors = np.zeros((len(chunks), self.embedder.dimensions), dtype=np.float32)
+        old_rows = [(i, row) for i, (kind, row) in enumerate(sources) if kind == 'old']
+        new_rows = [(i, row) for i, (kind, row) in enumerate(sources) if kind == 'new']
+        if old_rows:
+            vectors[[i for i, _ in old_rows]] = old_vectors[[row for _, row in old_rows]]
+        if new_rows:
+            vectors[[i for i, _ in new_rows]] = embedded[[row for _, row in new_rows]]
+
+        # Retrain when there are no centroids yet or the lists have drifted
+        removed_rows = sum(record['rows'][1] - record['rows'][0]
+                           for name, record in old_contracts.items() if name not in contracts)
+        changed_rows = (0 if force else self.manifest.get('changed_since_training', 0)) + len(to_embed) + removed_rows
+        centroids = None if force or not len(self) else np.asarray(self.arrays['centroids'])
+        target_lists = max(1, int(math.sqrt(len(chunks))))
+        if len(chunks) and (centroids is None or changed_rows > RETRAIN_FRACTION * max(self.manifest['trained_rows'], 1)):
+            centroids = train_centroids(vectors, target_lists)
+            self.manifest['trained_rows'] = len(chunks)
+            changed_rows = 0
+            stats['retrained'] = 1
+        if centroids is None:
+            centroids = np.zeros((1, self.embedder.dimensions), dtype=np.float32)
+
+        assign = assign_lists(vectors, centroids) if len(chunks) else np.zeros(0, dtype=np.int32)
+        list_rows = np.argsort(assign, kind='stable').astype(np.int32)
+        list_offsets = np.searchsorted(assign[list_rows], np.arange(len(centroids) + 1)).astype(np.int64)
+        stored, scales = quantize(vectors, self.manifest['dtype'])
+
+        self.chunks = chunks
+        self.manifest.update({
+            'data_dir': str(self.data_dir), 'rows': len(chunks), 'dimensions': self.embedder.dimensions,
+            'nlist': int(len(centroids)), 'changed_since_training': changed_rows, 'contracts': contracts,
+            'updated_at': time.time(),
+        })
+        self._write({'vectors': stored, 'scales': scales, 'centroids': centroids,
+                     'list_offsets': list_offsets, 'list_rows': list_rows})
+        return stats
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+
+    def _embed_query(self, query: Union[str, np.ndarray]) -> np.ndarray:
+        if isinstance(query, str):
+            return self.embedder.embed([query])[0]
+        return np.asarray(query, dtype=np.float32)
+
+    def _score(self, rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+        vectors = self.arrays['vectors'][rows]
+        if self.manifest['dtype'] == 'int8':
+            return (vectors.astype(np.float32) @ q) * self.arrays['scales'][rows]
+        return vectors.astype(np.float32) @ q
+
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(rows) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+
+    def search_vector(self, q: np.ndarray, k: int = 8, nprobe: Optional[int] = None,
+                      contracts: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k rows for a normalized query vector.
+
+        Args:
+            q: float32 query vector
+            k: Results to return
+            nprobe: Inverted lists to scan (default: ~1/8 of the lists, at least 4)
+            contracts: Restrict to these contracts (searched exactly)
+
+        Returns:
+            (row ids, cosine scores), best first
+        """
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if contracts is not None:
+            ranges = [self._ranges[name] for name in contracts if name in self._ranges]
+            rows = np.concatenate([np.arange(*r) for r in ranges]) if ranges else np.zeros(0, dtype=np.int64)
+        else:
+            nlist = self.manifest['nlist']
+            nprobe = min(nlist, nprobe or max(4, nlist // 8))
+            centroid_scores = self.arrays['centroids'] @ q
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe] if nprobe < nlist else np.arange(nlist)
+            offsets = self.arrays['list_offsets']
+            rows = np.concatenate([self.arrays['list_rows'][offsets[l]:offsets[l + 1]] for l in probe])
+        if not len(rows):
+            return rows, np.zeros(0, dtype=np.float32)
+        return self._top_k(rows, self._score(rows, q), k)
+
+    def exact_vector(self, q: np.ndarray, k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over every row (ground truth for recall)."""
+        rows = np.arange(len(self))
+        return self._top_k(rows, self._score(slice(None), q) if len(self) else np.zeros(0), k)
+
+    def search(self, query: Union[str, np.ndarray], k: int = 8, nprobe: Optional[int] = None,
+               contracts: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Top-k contract chunks for a question.
+
+        Args:
+            query: Question text or a query vector
+            k: Results to return
+            nprobe: Inverted lists to scan
+            contracts: Restrict to these contract file names
+
+        Returns:
+            Chunk records (contract, chunk_id, section, heading, start, end) with "score"
+        """
+        rows, scores = self.search_vector(self._embed_query(query), k, nprobe, contracts)
+        return [dict(self.chunks[row], score=float(score)) for row, score in zip(rows, scores)]
+
+    def close(self) -> None:
+        """Drop the memory maps."""
+        self.arrays = {}
+
+
+def benchmark(index: VectorIndex, queries: Sequence[Union[str, np.ndarray]], k: int = 10,
+              nprobes: Sequence[int] = (1, 2, 4, 8, 16)) -> List[Dict]:
+    """
+    Recall@k and latency of IVF search against exact brute-force search.
+
+    Args:
+        index: Built index
+        queries: Question texts or query vectors
+        k: Neighbours compared
+        nprobes: nprobe settings to measure
+
+    Returns:
+        One dict per setting (plus "exact"): nprobe, recall, p50_ms, p99_ms
+    """
+    vectors = [index._embed_query(q) for q in queries]
+    truth, exact_times = [], []
+    for q in vectors:
+        start = time.perf_counter()
+        rows, _ = index.exact_vector(q, k)
+        exact_times.append(time.perf_counter() - start)
+        truth.append(set(rows.tolist()))
+
+    def summary(name, times, recall) -> Dict:
+        ms = np.array(times) * 1000
+        return {'nprobe': name, 'recall': round(recall, 4),
+                'p50_ms': round(float(np.percentile(ms, 50)), 4), 'p99_ms': round(float(np.percentile(ms, 99)), 4)}
+
+    results = [summary('exact', exact_times, 1.0)]
+    for nprobe in nprobes:
+        if nprobe > index.manifest['nlist']:
+            continue
+        times, hits, total = [], 0, 0
+        for q, expected in zip(vectors, truth):
+            start = time.perf_counter()
+            rows, _ = index.search_vector(q, k, nprobe)
+            times.append(time.perf_counter() - start)
+            hits += len(expected & set(rows.tolist()))
+            total += len(expected)
+        results.append(summary(nprobe, times, hits / total if total else 1.0))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: python -m lawstronaut vectors [QUERY]."""
+    import argparse
+
+    from .contract_store import ContractStore
+    from .questions import DEFAULT_QUESTIONS
+
+    parser = argparse.ArgumentParser(prog='lawstronaut vectors',
+                                     description='Local ANN search over contract chunks')
+    parser.add_argument('query', nargs='?', help='Question to retrieve clauses for')
+    parser.add_argument('--data-dir', type=Path, help='Contract text directory (default: full_contract_txt)')
+    parser.add_argument('--index-dir', type=Path, help=f'Index directory (default: {DEFAULT_VECTOR_DIR})')
+    parser.add_argument('--embedder', help=f'Embedder for a new index (default: {DEFAULT_EMBEDDER})')
+    parser.add_argument('--dtype', choices=DTYPES, default='int8', help='Vector storage for a new index')
+    parser.add_argument('--workers', type=int, help='Embedding worker processes for local models')
+    parser.add_argument('--no-embedding-cache', action='store_true', help='Do not read or write the embedding cache')
+    parser.add_argument('--rebuild', action='store_true', help='Re-embed everything and retrain')
+    parser.add_argument('--no-update', action='store_true', help='Skip the incremental update')
+    parser.add_argument('--k', type=int, default=8, help='Chunks to return (default: 8)')
+    parser.add_argument('--nprobe', type=int, help='Inverted lists to scan (default: ~1/8 of lists)')
+    parser.add_argument('--contract', action='append', help='Restrict to a contract file (repeatable)')
+    parser.add_argument('--bench', action='store_true', help='Measure recall@k and latency against brute force')
+    parser.add_argument('--bench-queries', type=int, default=200, help='Sampled chunk queries for --bench')
+    args = parser.parse_args(argv)
+
+    index = VectorIndex(index_dir=args.index_dir, data_dir=args.data_dir, embedder=args.embedder, dtype=args.dtype,
+                        cache=not args.no_embedding_cache, workers=args.workers)
+    if args.rebuild or not args.no_update:
+        start = time.perf_counter()
+        stats = index.update(force=args.rebuild)
+        if stats['added'] or stats['updated'] or stats['removed']:
+            print(f"Indexed {index.data_dir}: {stats['added']} added, {stats['updated']} updated, "
+                  f"{stats['removed']} removed; {stats['embedded']} chunks embedded, {stats['cached']} cached, {stats['reused']} reused"
+                  + (", centroids retrained" if stats['retrained'] else "")
+                  + f" ({time.perf_counter() - start:.1f}s)")
+    print(f"{len(index):,} chunks, {index.manifest['nlist']} lists, {index.manifest['dtype']}, "
+          f"{index.manifest['embedder']}")
+
+    if args.bench:
+        rng = np.random.default_rng(0)
+        queries: List[Union[str, np.ndarray]] = [q['question_text'] for q in DEFAULT_QUESTIONS]
+        if len(index):
+            # Perturbed chunk vectors: realistic neighbourhoods without needing more questions
+            sample = rng.choice(len(index), min(args.bench_queries, len(index)), replace=False)
+            noisy = index.vectors_f32(np.sort(sample)) + rng.normal(0, 0.02, (len(sample), index.embedder.dimensions))
+            queries.extend(normalize_rows(noisy.astype(np.float32)))
+        print(f"\nRecall@{args.k} vs brute force over {len(queries)} queries")
+        print(f"{'nprobe':>8} {'recall':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for row in benchmark(index, queries, k=args.k):
+            print(f"{row['nprobe']:>8} {row['recall']:>8.3f} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+
+    if args.query:
+        start = time.perf_counter()
+        results = index.search(args.query, k=args.k, nprobe=args.nprobe, contracts=args.contract)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"\nTop {len(results)} chunks for {args.query!r} ({elapsed_ms:.2f} ms)\n")
+        store = ContractStore.open_or_build(index.data_dir)
+        try:
+            for result in results:
+                snippet = ' '.join(store.section(result['contract'], result['start'], result['end']).split())[:160]
+                print(f"{result['score']:.3f}  {result['contract']}  §{result['section'] or '-'} "
+                      f"{result['heading'] or ''}\n       {snippet}...")
+        finally:
+            store.close()
+    return 0
@@ -5,7 +5,7 @@ Tests Gemini's ability to provide precise legal analysis with real-time search u
 """
 
 import os
-import json
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -21,16 +21,36 @@ if env_file.exists():
                 key, value = line.split('=', 1)
                 os.environ[key] = value
 
-# Add tests directory to path
+# Add tests directory and src/ to path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 from test_llm_apis import LawstronautTester
+from lawstronaut.batch import JsonlCheckpoint, load_matrix, pair_key, parse_shard, safe_task, shard_pairs
+from lawstronaut.chunking import chunk_contract
+from lawstronaut.context_cache import ContextCacheRegistry, is_missing_cache_error
+from lawstronaut.fake_genai import FakeGenaiClient
+from lawstronaut.grounding import SourceIndex, is_official, normalize_grounding
+from lawstronaut.incremental import ChangeTracker
+from lawstronaut.metrics import STAGES, MetricsRecorder, load_prices
+from lawstronaut.prompts import (
+    SEARCH_FREE_SYSTEM_INSTRUCTION, SYSTEM_INSTRUCTION, build_prompt_parts, prompt_templates
+)
+from lawstronaut.providers import VertexProvider, get_provider
+from lawstronaut.questions import DEFAULT_QUESTIONS
+from lawstronaut.regulation_corpus import DEFAULT_CORPUS_DIR, RegulationCorpus, format_authorities
+from lawstronaut.regulations import load_regulations
+from lawstronaut.response_cache import CACHE_MODES, ResponseCache
+from lawstronaut.result_sink import COMPRESSIONS, ResultSink, default_compression, iter_results, write_json
+from lawstronaut.retrieval import format_sections, select_sections
+from lawstronaut.runner import TokenBucketLimiter, run_in_order
+from lawstronaut.streaming import DEFAULT_STREAM_DIR, StreamSink, consume_stream, continuation_contents
+from lawstronaut.structured import RESPONSE_SCHEMA, parse_structured
+from lawstronaut.token_budget import OVER_BUDGET_ACTIONS, TokenEstimator, context_window
 
 try:
-    from google import genai
     from google.genai.types import (
         GenerateContentConfig,
         GoogleSearch,
-        HttpOptions,
         Tool,
     )
     GEMINI_AVAILABLE = True
@@ -41,48 +61,117 @@ except ImportError:
     sys.exit(1)
 
 
+# Harness variants: test_gemini_vertex.py runs "vertex", test_gemini_simple.py runs "simple"
+VARIANTS = {
+    'vertex': {
+        'title': 'GEMINI VERTEX AI TEST - GOOGLE SEARCH GROUNDING',
+        'header_notes': [],
+        'max_output_tokens': 32000,  # Increased from 8000 for comprehensive legal analysis
+        'output_file': 'gemini_vertex_results.json',
+        'output_metadata': {
+            'test_type': 'gemini_vertex_search_grounding',
+            'description': 'Gemini with Vertex AI Google Search grounding for legal research',
+        },
+        'complete_message': '✓ Gemini Vertex AI Search Grounding Test complete!',
+        'footer_notes': [],
+    },
+    'simple': {
+        'title': 'GEMINI-SIMPLE TEST - MATCHES PERPLEXITY SETUP',
+        'header_notes': ['Config: Same prompt/tokens as Perplexity (6000 tokens)'],
+        'max_output_tokens': 6000,  # Matches Perplexity for fair comparison
+        'output_file': 'gemini_simple_results.json',
+        'output_metadata': {
+            'test_type': 'gemini_simple_perplexity_match',
+            'config': 'Same prompt and 6000 token limit as Perplexity for fair comparison',
+            'description': 'Gemini with Vertex AI Google Search grounding - MATCHES PERPLEXITY SETUP',
+        },
+        'complete_message': '✓ Gemini-Simple Test complete!',
+        'footer_notes': [
+            '\nThis test MATCHES Perplexity setup for fair comparison:',
+            '- Same prompt structure',
+            '- Same token limit (6000)',
+            '- Same temperature (0.2)',
+        ],
+    },
+}
+
+
 class GeminiVertexTester(LawstronautTester):
     """Test Gemini with Vertex AI Google Search grounding for legal research."""
 
-    def __init__(self, project_id=None, location="us-central1"):
+    # Sampling settings sent with every request
+    GENERATION_SETTINGS = {'temperature': 0.2, 'top_p': 0.8, 'top_k': 40}
+
+    def __init__(self, project_id=None, location="us-central1", cache=None, retrieval=None, stream_dir=None,
+                 context_cache=None, client=None, max_output_tokens=32000, token_budget=None, estimator=None,
+                 structured=False, corpus=None):
         super().__init__(openai_key=None, anthropic_key=None)
 
+        # 32000 for comprehensive analysis; test_gemini_simple.py uses 6000 to match Perplexity
+        self.max_output_tokens = max_output_tokens
+
+        # Optional ResponseCache for replaying identical requests
+        self.cache = cache
+        # Optional section retrieval settings (top_k, token_budget); None sends the full contract
+        self.retrieval = retrieval
+        # Directory for streamed partial answers; None uses the blocking generate_content call
+        self.stream_dir = stream_dir
+        # Context caching settings (ttl_seconds, min_tokens); None sends the whole prompt every call
+        self.context_cache = None
+        # Prompt pre-flight (max_prompt_tokens, on_over_budget); None only logs the estimate
+        self.token_budget = token_budget
+        self.estimator = estimator or TokenEstimator()
+        # Ask for a JSON answer matching RESPONSE_SCHEMA instead of the A-H prose sections
+        self.structured = structured
+        # Optional RegulationCorpus; passages from it replace Google Search grounding
+        self.corpus = corpus
+
         # Set up Vertex AI environment
         self.project_id = project_id or os.getenv('GOOGLE_CLOUD_PROJECT')
         self.location = location or os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
 
-        if not self.project_id:
+        # Requests go through the provider's client inside its concurrency slot (Provider.slot)
+        self.provider = None
+        if client is not None:
+            # Injected client, e.g. FakeGenaiClient for offline runs
+            self.provider = VertexProvider(client=client)
+            self.client = client
+            self.model_name = 'gemini-2.0-flash-exp'
+            self.search_tool = Tool(google_search=GoogleSearch())
+        elif not self.project_id:
             print("Error: GOOGLE_CLOUD_PROJECT not set")
             print("Set it in .env file or via environment variable")
             self.client = None
-            return
-
-        # Set environment variables for Vertex AI
-        os.environ['GOOGLE_CLOUD_PROJECT'] = self.project_id
-        os.environ['GOOGLE_CLOUD_LOCATION'] = self.location
-        os.environ['GOOGLE_GENAI_USE_VERTEXAI'] = 'True'
-
-        if GEMINI_AVAILABLE:
-            try:
-                # Create Vertex AI client with search grounding
-                self.client = genai.Client(
-                    http_options=HttpOptions(api_version="v1")
-                )
-                self.model_name = 'gemini-2.0-flash-exp'
-
-                # Create Google Search tool
-                self.search_tool = Tool(google_search=GoogleSearch())
-
-                print(f"✓ Vertex AI initialized: Project={self.project_id}, Location={self.location}")
-            except Exception as e:
-                print(f"✗ Error initializing Vertex AI: {e}")
-                print("\nMake sure you've authenticated with:")
-                print("  gcloud auth application-default login")
-                self.client = None
         else:
-            self.client = None
+            # Set environment variables for Vertex AI
+            os.environ['GOOGLE_CLOUD_PROJECT'] = self.project_id
+            os.environ['GOOGLE_CLOUD_LOCATION'] = self.location
+            os.environ['GOOGLE_GENAI_USE_VERTEXAI'] = 'True'
+
+            if GEMINI_AVAILABLE:
+                try:
+                    # Shared Vertex AI client (one keep-alive connection pool per process)
+                    self.provider = get_provider('vertex', project_id=self.project_id, location=self.location)
+                    self.client = self.provider.client
+                    self.model_name = 'gemini-2.0-flash-exp'
+
+                    # Create Google Search tool
+                    self.search_tool = Tool(google_search=GoogleSearch())
+
+                    print(f"✓ Vertex AI initialized: Project={self.project_id}, Location={self.location}")
+                except Exception as e:
+                    print(f"✗ Error initializing Vertex AI: {e}")
+                    print("\nMake sure you've authenticated with:")
+                    print("  gcloud auth application-default login")
+                    self.client = None
+            else:
+                self.client = None
+
+        if self.client and context_cache is not None:
+            self.context_cache = ContextCacheRegistry(self.client, self.model_name, **context_cache)
 
-    def query_gemini(self, contract_text: str, question: str) -> dict:
+    def query_gemini(self, contract_text: str, question: str, excerpts: bool = False,
+                     authorities: str = None, _cache_retry: bool = True) -> dict:
         """Query Gemini with Google Search grounding for legal analysis."""
         if not self.client:
             return {
@@ -91,273 +180,190 @@ class GeminiVertexTester(LawstronautTester):
                 "model": "gemini-2.0-flash-exp"
             }
 
+        cached_content = None
+        # Seconds per stage (lawstronaut.metrics.STAGES)
+        timings = {}
         try:
             start_time = time.time()
-
-            system_instruction = """You are a senior legal research AI assistant with real-time Google Search capabilities, specializing in contract analysis and regulatory compliance.
-
-Your task is to provide COMPREHENSIVE, well-cited legal analysis. You MUST:
-
-1. **Find ALL current, applicable law** - Use Google Search extensively to locate:
-   - Federal regulations, statutes, and recent rules (as of November 5, 2025)
-   - State-specific laws and recent amendments
-   - Recent court decisions and injunctions
-   - Agency guidance and interpretations
-   - International regulations if applicable (EU, UK, etc.)
-
-2. **Provide COMPLETE analysis with pinpoint citations** - For every legal requirement:
-   - Exact citation: "GDPR Article 9(2)(a)", "16 CFR § 910.2(a)(1)", "Cal. Civ. Code § 1798.140(ag)(1)"
-   - Effective date and status (active, enjoined, amended)
-   - Direct quote from the legal text (not summaries)
-   - Official source URL
-
-3. **Include ALL relevant context** - Your analysis should cover:
-   - Historical context (previous versions of law, amendments)
-   - Current legal status (in effect, enjoined, challenged)
-   - Exceptions and exemptions
-   - Industry-specific applications
-   - Conflicting regulations and how to resolve them
-   - Pending legislation that may affect compliance
-
-4. **Thorough contract analysis** - For each provision:
-   - Quote the exact contract language (with section numbers)
-   - Compare against legal requirements point-by-point
-   - Identify compliance status: compliant, partially compliant, non-compliant, unclear
-   - List ALL missing provisions or gaps
-   - Note ambiguous language that could create risk
-
-5. **Structure your answer comprehensively**:
-   a) Executive Summary (2-3 sentences)
-   b) Applicable Regulations (with full citations, dates, URLs)
-   c) Key Legal Requirements (direct quotes from each regulation)
-   d) Detailed Contract Analysis (quote and analyze each relevant section)
-   e) Compliance Assessment (comprehensive evaluation)
-   f) Identified Gaps and Missing Provisions
-   g) Recommendations (what needs to be added/changed)
-   h) Risk Assessment (potential consequences of non-compliance)
-
-6. **Use Google Search extensively** - Search multiple times for:
-   - Primary sources of law
-   - Recent amendments and updates
-   - Court cases and injunctions
-   - Regulatory guidance
-   - Cross-references and related regulations
-
-Your answers should be THOROUGH, not brief. Legal analysis requires comprehensive coverage. Include ALL relevant information, not just highlights."""
-
-            prompt = f"""You are analyzing a legal contract for regulatory compliance. Provide a COMPREHENSIVE legal analysis.
-
-═══════════════════════════════════════════════════════════════════════════════
-FULL CONTRACT TEXT (READ CAREFULLY):
-═══════════════════════════════════════════════════════════════════════════════
-
-{contract_text}
-
-═══════════════════════════════════════════════════════════════════════════════
-LEGAL QUESTION TO ANALYZE:
-═══════════════════════════════════════════════════════════════════════════════
-
-{question}
-
-═══════════════════════════════════════════════════════════════════════════════
-MANDATORY REQUIREMENTS FOR YOUR ANALYSIS:
-═══════════════════════════════════════════════════════════════════════════════
-
-1. **COMPREHENSIVE LEGAL RESEARCH (as of November 5, 2025):**
-
-   Use Google Search EXTENSIVELY to find:
-
-   a) ALL applicable federal regulations
-      - Search: "[topic] federal regulations 2025"
-      - Search: "FTC [topic] rule 2024 2025"
-      - Search: "[agency] final rule [topic]"
-
-   b) ALL applicable state laws
-      - Search: "[state] [topic] law 2025"
-      - Search: "[state] code section [topic]"
-
-   c) Recent amendments and changes
-      - Search: "[regulation name] amended 2024 2025"
-      - Search: "[regulation] effective date"
-
-   d) Court challenges and injunctions
-      - Search: "[regulation name] court injunction 2024"
-      - Search: "[regulation name] enjoined stayed"
-
-   e) International regulations (if applicable)
-      - Search: "EU [topic] regulation 2024"
-      - Search: "GDPR AI Act 2024"
-
-2. **DETAILED CITATIONS WITH COMPLETE CONTEXT:**
-
-   For EVERY regulation mentioned, provide:
-   - Full citation: "Title, CFR Part, Section, Subsection"
-   - Effective date: "Effective [date]" or "Finalized [date], currently enjoined"
-   - Current status: "In force", "Enjoined", "Under review"
-   - Direct quote: The actual text from the regulation (3-5 sentences minimum)
-   - Official URL: Link to ecfr.gov, eur-lex.europa.eu, state .gov sites
-
-   Example format:
-   ```
-   **FTC Non-Compete Clause Rule (16 CFR Part 910)**
-   - Finalized: August 20, 2024
-   - Status: Currently enjoined nationwide by U.S. District Court (Ryan LLC v. FTC, August 2024)
-   - Scheduled effective date: September 4, 2024 (not in effect)
-   - URL: https://www.ecfr.gov/current/title-16/part-910
-
-   The rule states:
-   "It is an unfair method of competition for an employer to enter into or attempt to
-   enter into a non-compete clause with a worker; to enforce or attempt to enforce a
-   non-compete clause with a worker; or to represent to a worker that the worker is
-   subject to a non-compete clause where the employer has no good faith basis to
-   believe that the worker is subject to an enforceable non-compete clause."
-
-   Exception under 16 CFR § 910.3(a):
-   "This rule does not apply to a non-compete clause that is entered into by a person
-   pursuant to a bona fide sale of a business entity, of the person's ownership interest
-   in a business entity, or of all or substantially all of a business entity's operating assets."
-
-   Senior executive exception under 16 CFR § 910.3(b):
-   [Include if applicable]
-   ```
-
-3. **THOROUGH CONTRACT ANALYSIS:**
-
-   For EACH relevant contract provision:
-
-   a) Quote the exact contract language:
-      "Section [X.X] states: '[exact text from contract]'"
-
-   b) Identify which legal requirement it addresses:
-      "This provision relates to [specific regulation, citation]"
-
-   c) Analyze compliance in detail:
-      - Does it fully comply? Why or why not?
-      - What specific elements are present/missing?
-      - How does the language compare to the legal requirement?
-
-   d) Assess gaps:
-      - What additional provisions are required by law but missing?
-      - What provisions are present but inadequate?
-      - What provisions conflict with legal requirements?
-
-4. **STRUCTURE YOUR COMPLETE ANSWER:**
-
-   **A. EXECUTIVE SUMMARY** (3-5 sentences)
-   Brief overview of findings and overall compliance status.
-
-   **B. APPLICABLE REGULATIONS** (Comprehensive list with full details)
-   List ALL relevant regulations with:
-   - Full citation
-   - Effective date and current status
-   - Primary source URL
-   - Brief description of what it covers
-
-   **C. KEY LEGAL REQUIREMENTS** (Quote extensively from each regulation)
-   For each major regulation:
-   - Quote the key provisions (full text, not summaries)
-   - Explain what compliance requires
-   - Note any exceptions or safe harbors
-
-   **D. DETAILED CONTRACT ANALYSIS** (Section by section)
-   For each relevant contract section:
-   - Quote the contract provision
-   - Identify which legal requirement it addresses
-   - Analyze compliance status
-   - Note strengths and weaknesses
-
-   **E. COMPLIANCE ASSESSMENT** (Overall evaluation)
-   - What is compliant?
-   - What is partially compliant? (explain the gap)
-   - What is non-compliant? (explain the violation)
-   - What is unclear or ambiguous?
-
-   **F. IDENTIFIED GAPS AND MISSING PROVISIONS** (Complete list)
-   List ALL missing requirements:
-   - What provisions are required by law but absent?
-   - What disclosures are required but missing?
-   - What procedures are required but not documented?
-
-   **G. RECOMMENDATIONS** (Specific, actionable)
-   - What specific language should be added?
-   - What provisions should be modified?
-   - What additional agreements or notices are needed?
-
-   **H. RISK ASSESSMENT** (Consequences of non-compliance)
-   - Legal risks
-   - Regulatory enforcement risks
-   - Financial penalties
-   - Business impact
-
-5. **QUALITY REQUIREMENTS:**
-
-   - Minimum 2,000 words for comprehensive analysis
-   - Use Google Search at least 5-10 times
-   - Cite at least 5-10 specific legal sources
-   - Quote actual legal text (not summaries) for each key requirement
-   - Provide official URLs for ALL major regulations cited
-   - Reference specific contract sections by number
-   - Be thorough, not brief - legal analysis requires detail
-
-6. **VERIFICATION:**
-
-   Before submitting your answer, verify:
-   - [ ] Have I searched for ALL applicable laws and regulations?
-   - [ ] Have I included the current status (effective, enjoined, etc.)?
-   - [ ] Have I quoted the actual legal text (not paraphrased)?
-   - [ ] Have I provided official URLs for sources?
-   - [ ] Have I analyzed EACH relevant contract provision?
-   - [ ] Have I identified ALL gaps and missing provisions?
-   - [ ] Is my analysis comprehensive (2,000+ words)?
-
-═══════════════════════════════════════════════════════════════════════════════
-BEGIN YOUR COMPREHENSIVE ANALYSIS:
-═══════════════════════════════════════════════════════════════════════════════"""
+            stage_start = time.perf_counter()
+
+            # Without the search tool, don't instruct the model to search
+            search = self.grounding_mode() == 'google_search'
+            system_instruction = SYSTEM_INSTRUCTION if search else SEARCH_FREE_SYSTEM_INSTRUCTION
+            prompt_prefix, prompt_suffix = build_prompt_parts(contract_text, question, excerpts=excerpts,
+                                                              structured=self.structured, authorities=authorities,
+                                                              search=search)
+            prompt = prompt_prefix + prompt_suffix
+            estimated_raw = sum(self.estimator.raw_tokens(text)
+                                for text in (system_instruction, prompt_prefix, prompt_suffix))
 
             # Generate content with Google Search grounding
+            if self.structured:
+                # Controlled generation cannot be combined with the Google Search tool
+                output = {'response_mime_type': 'application/json', 'response_schema': RESPONSE_SCHEMA}
+            elif self.corpus:
+                # Regulatory passages are already in the prompt
+                output = {}
+            else:
+                output = {'tools': [self.search_tool]}
             config = GenerateContentConfig(
-                tools=[self.search_tool],
-                temperature=0.2,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=32000,  # Increased from 8000 for comprehensive legal analysis
+                **output,
+                **self.GENERATION_SETTINGS,
+                max_output_tokens=self.max_output_tokens,
                 system_instruction=system_instruction
             )
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=config
-            )
-
-            # Extract grounding metadata if available
-            grounding_metadata = None
-            if hasattr(response, 'grounding_metadata') and response.grounding_metadata:
-                grounding_metadata = {
-                    'web_search_queries': getattr(response.grounding_metadata, 'web_search_queries', []),
-                    'grounding_chunks': getattr(response.grounding_metadata, 'grounding_chunks', []),
-                    'search_entry_point': getattr(response.grounding_metadata, 'search_entry_point', None),
-                }
+            timings['prompt_build'] = time.perf_counter() - stage_start
 
-            return {
-                "answer": response.text,
+            # The client type keeps fake (--offline) answers and partial streams apart from real ones
+            request_key = ResponseCache.make_key(
+                self.model_name,
+                system_instruction,
+                prompt,
+                dict(config.model_dump(mode='json', exclude_none=True, exclude={'system_instruction'}),
+                     client=type(self.client).__name__)
+            )
+            cache_key = None
+            if self.cache:
+                cache_key = request_key
+                cached = self.cache.get(cache_key)
+                if cached:
+                    cached['cache_hit'] = True
+                    # Entries written before grounding was normalized hold the raw SDK layout
+                    cached['grounding_metadata'] = normalize_grounding(cached.get('grounding_metadata'))
+                    cached['timings'] = timings
+                    return cached
+
+            # Reuse a server-side cache of system instruction + contract; send only the question.
+            # Excerpts differ per question, so only full-contract prompts are worth caching.
+            cached_content = None
+            contents = prompt
+            stage_start = time.perf_counter()
+            if self.context_cache and not excerpts:
+                cached_content = self.context_cache.get_or_create(
+                    system_instruction, prompt_prefix, tools=config.tools, label=question[:60]
+                )
+                if cached_content:
+                    config = config.model_copy(update={
+                        'cached_content': cached_content, 'system_instruction': None, 'tools': None
+                    })
+                    contents = prompt_suffix
+
+            streaming = None
+            # Shares the Vertex concurrency limit with every other user of the provider in this process
+            with self.provider.slot():
+                if self.stream_dir:
+                    # Stream chunks to disk; a partial answer left by an interrupted run is continued
+                    sink = StreamSink(self.stream_dir, request_key)
+                    previous = sink.previous_text()
+                    stream_start = time.perf_counter()
+                    try:
+                        streamed = consume_stream(
+                            self.client.models.generate_content_stream(
+                                model=self.model_name,
+                                contents=continuation_contents(contents, previous) if previous else contents,
+                                config=config
+                            ),
+                            sink=sink,
+                            start_time=stream_start,
+                            prefix=previous
+                        )
+                    except Exception:
+                        sink.close(complete=False)
+                        raise
+                    stream_file = sink.close(complete=True)
+                    response = streamed.last_chunk
+                    answer = streamed.text
+                    streaming = dict(streamed.stats, stream_file=str(stream_file) if stream_file else None)
+                else:
+                    response = self.client.models.generate_content(
+                        model=self.model_name,
+                        contents=contents,
+                        config=config
+                    )
+                    answer = response.text
+            timings['request'] = time.perf_counter() - stage_start
+            if streaming and streaming.get('ttft_seconds') is not None:
+                timings['ttft'] = streaming['ttft_seconds']
+
+            # Per-candidate search queries, sources and supported spans, as plain JSON
+            stage_start = time.perf_counter()
+            grounding_metadata = normalize_grounding(response)
+            timings['grounding'] = time.perf_counter() - stage_start
+
+            result = {
+                "answer": answer,
                 "model": self.model_name,
                 "elapsed_seconds": time.time() - start_time,
                 "grounding_metadata": grounding_metadata,
+                "timings": timings,
                 "tokens_used": {
                     "prompt": getattr(response.usage_metadata, 'prompt_token_count', None) if hasattr(response, 'usage_metadata') else None,
                     "completion": getattr(response.usage_metadata, 'candidates_token_count', None) if hasattr(response, 'usage_metadata') else None,
-                    "total": getattr(response.usage_metadata, 'total_token_count', None) if hasattr(response, 'usage_metadata') else None
+                    "total": getattr(response.usage_metadata, 'total_token_count', None) if hasattr(response, 'usage_metadata') else None,
+                    "cached": getattr(response.usage_metadata, 'cached_content_token_count', None) if hasattr(response, 'usage_metadata') else None
                 }
             }
+            # Estimated vs reported prompt size, for calibrating the pre-flight estimator
+            result['tokens_used']['estimated_prompt'] = round(estimated_raw * self.estimator.ratio(self.model_name))
+            self.estimator.record(estimated_raw, getattr(response, 'usage_metadata', None),
+                                  model=self.model_name, label=question[:60])
+            if cached_content:
+                result['context_cache'] = cached_content
+            if self.structured:
+                try:
+                    result['structured'] = parse_structured(answer).to_dict()
+                except ValueError as e:
+                    result['structured_error'] = str(e)
+            if streaming:
+                result['streaming'] = streaming
+
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
         except Exception as e:
             import traceback
-            return {
+            if cached_content and is_missing_cache_error(e):
+                # Handle expired or was deleted server-side; retry once with a fresh one
+                self.context_cache.invalidate(cached_content)
+                if _cache_retry:
+                    return self.query_gemini(contract_text, question, excerpts, authorities, _cache_retry=False)
+            error = {
                 "error": str(e),
                 "error_trace": traceback.format_exc(),
                 "answer": None,
-                "model": self.model_name
+                "model": self.model_name,
+                "timings": timings
             }
+            if getattr(e, 'partial_answer', None):
+                # Text streamed before the failure (also kept in the stream dir)
+                error['partial_answer'] = e.partial_answer
+            return error
+
+    def request_settings(self) -> dict:
+        """Everything besides the prompt that can change an answer (fingerprinted for incremental runs)."""
+        return {
+            'model': self.model_name,
+            'client': type(self.client).__name__,
+            'grounding': self.grounding_mode(),
+            'corpus': self.corpus.fingerprint if self.corpus else None,
+            'structured': self.structured,
+            'max_output_tokens': self.max_output_tokens,
+            **self.GENERATION_SETTINGS,
+            'retrieval': self.retrieval,
+            'token_budget': self.token_budget,
+        }
+
+    def prompt_templates(self) -> tuple:
+        """Templates query_gemini builds its prompts from (fingerprinted for incremental runs)."""
+        return prompt_templates(structured=self.structured, authorities=bool(self.corpus),
+                                search=self.grounding_mode() == 'google_search')
+
+    def grounding_mode(self) -> str:
+        """Where regulatory context comes from: "local" corpus, "google_search" or None."""
+        if self.corpus:
+            return 'local'
+        return None if self.structured else 'google_search'
 
     def test_question(self, contract_file: str, question_data: dict) -> dict:
         """Test one question with Gemini."""
@@ -367,10 +373,53 @@ BEGIN YOUR COMPREHENSIVE ANALYSIS:
         print(f"{'='*80}\n")
 
         # Read FULL contract
+        stage_start = time.perf_counter()
         full_contract = self.read_contract(contract_file)
-        print(f"Using FULL contract: {len(full_contract):,} chars\n")
-
+        timings = {'contract_read': time.perf_counter() - stage_start}
         question = question_data['question_text']
+        stage_start = time.perf_counter()
+
+        passages = None
+        authorities = None
+        if self.corpus:
+            # Regulatory passages for the regulations this question names, best first
+            passages = self.corpus.select_passages(question, question_data['regulation_focus'],
+                                                   question_data.get('expected_citation'))
+            authorities = format_authorities(passages)
+            print(f"Using {len(passages)} regulatory passage(s) from the local corpus "
+                  f"(~{sum(p.token_count for p in passages):,} tokens)")
+
+        contract_text = full_contract
+        sections_sent = None
+        retrieval = self.retrieval
+        preflight = None
+        if not retrieval:
+            # Estimate the full-contract prompt before sending it, passages and templates included
+            budget = self.token_budget or {}
+            search = self.grounding_mode() == 'google_search'
+            preflight = self.estimator.preflight(
+                full_contract, question,
+                budget=budget.get('max_prompt_tokens') or context_window(self.model_name) - self.max_output_tokens,
+                on_over_budget=budget.get('on_over_budget', 'sections'),
+                model=self.model_name,
+                system_instruction=SYSTEM_INSTRUCTION if search else SEARCH_FREE_SYSTEM_INSTRUCTION,
+                prompt_options={'structured': self.structured, 'authorities': authorities, 'search': search}
+            )
+            if preflight.action == 'sections':
+                print(f"Full prompt ~{preflight.estimated_tokens:,} tokens exceeds budget of "
+                      f"{preflight.budget:,}; switching to section retrieval")
+                retrieval = {'top_k': 8, 'token_budget': preflight.section_budget}
+
+        if retrieval:
+            # Send only the top-ranked sections for this question
+            chunks = chunk_contract(full_contract)
+            selected = select_sections(chunks, question, question_data['regulation_focus'], **retrieval)
+            contract_text = format_sections(selected)
+            sections_sent = [chunk.to_dict() for chunk in selected]
+            print(f"Using {len(selected)} of {len(chunks)} sections: "
+                  f"{len(contract_text):,} of {len(full_contract):,} chars\n")
+        elif preflight.fits:
+            print(f"Using FULL contract: {len(full_contract):,} chars (~{preflight.estimated_tokens:,} prompt tokens)\n")
 
         result = {
             "qa_id": question_data['qa_id'],
@@ -383,38 +432,144 @@ BEGIN YOUR COMPREHENSIVE ANALYSIS:
             "expected_citation": question_data['expected_citation'],
             "response": {}
         }
+        if sections_sent is not None:
+            result['sections_sent'] = sections_sent
+        if preflight is not None:
+            result['preflight'] = preflight.to_dict()
+        if passages is not None:
+            result['authorities'] = [passage.to_dict() for passage in passages]
+
+        # Section and passage selection count towards prompt_build
+        timings['prompt_build'] = time.perf_counter() - stage_start
+
+        if preflight is not None and preflight.action == 'refuse':
+            message = (f"Prompt of ~{preflight.estimated_tokens:,} tokens exceeds the "
+                       f"{preflight.budget:,}-token budget; not sent")
+            print(f"✗ {message}")
+            result['response'] = {"error": message, "answer": None, "model": self.model_name, "timings": timings}
+            return result
 
         # Test Gemini
         if self.client:
-            print("Querying Gemini with Google Search grounding (Vertex AI)...")
-            result['response'] = self.query_gemini(full_contract, question)
+            print(f"Querying Gemini with {'local regulation corpus' if self.corpus else 'Google Search grounding'} "
+                  f"(Vertex AI)...")
+            result['response'] = self.query_gemini(contract_text, question, excerpts=sections_sent is not None,
+                                                   authorities=authorities)
+            response_timings = result['response'].setdefault('timings', {})
+            response_timings['prompt_build'] = timings['prompt_build'] + response_timings.get('prompt_build', 0.0)
+            response_timings['contract_read'] = timings['contract_read']
             if 'error' in result['response'] and result['response']['error']:
                 print(f"✗ Gemini error: {result['response']['error']}")
                 if 'error_trace' in result['response']:
                     print(f"  Trace: {result['response']['error_trace']}")
             else:
                 print(f"✓ Gemini ({result['response'].get('elapsed_seconds', 0):.1f}s)")
+                if result['response'].get('cache_hit'):
+                    print("  Served from response cache")
+                streaming = result['response'].get('streaming')
+                if streaming and streaming.get('ttft_seconds') is not None:
+                    print(f"  First token: {streaming['ttft_seconds']:.2f}s, "
+                          f"{streaming['chunks']} chunks"
+                          + (f", {streaming['tokens_per_second']:.0f} tokens/s" if streaming.get('tokens_per_second') else ""))
+                    if streaming.get('resumed_chars'):
+                        print(f"  Resumed after {streaming['resumed_chars']:,} chars from an interrupted run")
                 tokens = result['response'].get('tokens_used', {})
                 if tokens and tokens.get('total'):
-                    print(f"  Tokens: {tokens.get('total', 0):,}")
+                    print(f"  Tokens: {tokens.get('total', 0):,}"
+                          + (f" ({tokens['cached']:,} from context cache)" if tokens.get('cached') else ""))
+                timings = result['response'].get('timings') or {}
+                print("  Stages: " + ', '.join(f"{stage} {timings[stage]:.2f}s" for stage in STAGES if stage in timings))
+                structured = result['response'].get('structured')
+                if structured:
+                    print(f"  Structured: {structured['compliance_status']}, {structured['risk_level']} risk, "
+                          f"{len(structured['provisions'])} provision(s), {len(structured['gaps'])} gap(s)")
+                elif result['response'].get('structured_error'):
+                    print(f"  ✗ {result['response']['structured_error']}")
                 grounding = result['response'].get('grounding_metadata')
                 if grounding:
-                    search_queries = grounding.get('web_search_queries', [])
-                    chunks = grounding.get('grounding_chunks', [])
-                    print(f"  Search queries: {len(search_queries)}")
-                    print(f"  Grounding chunks: {len(chunks)}")
+                    official = sum(is_official(source['domain']) for source in grounding['sources'])
+                    print(f"  Search queries: {len(grounding['web_search_queries'])}")
+                    print(f"  Sources: {len(grounding['sources'])} ({official} official), "
+                          f"{len(grounding['supports'])} supported span(s)")
 
         return result
 
 
-def main():
+def main(variant: str = 'vertex'):
     import argparse
 
+    settings = VARIANTS[variant]
+    output_file = Path(settings['output_file'])
+
     parser = argparse.ArgumentParser(description='Gemini Vertex AI Test with Google Search Grounding')
     parser.add_argument('--rate-limit', type=float, default=15.0,
-                        help='Seconds to wait between questions (default: 15.0)')
+                        help='Seconds between request starts, used when --rpm is not given (default: 15.0)')
+    parser.add_argument('--rpm', type=float,
+                        help='Requests per minute (default: 60 / --rate-limit)')
+    parser.add_argument('--tpm', type=float,
+                        help='Tokens per minute (default: no token limit)')
+    parser.add_argument('--cache', choices=CACHE_MODES, default='off',
+                        help='Response cache mode: read, write, off or refresh (default: off)')
+    parser.add_argument('--retrieval', choices=['full', 'sections'], default='full',
+                        help='Send the full contract or only BM25-ranked sections (default: full)')
+    parser.add_argument('--top-k', type=int, default=8,
+                        help='Sections to send in --retrieval=sections mode (default: 8)')
+    parser.add_argument('--context-tokens', type=int, default=30000,
+                        help='Token budget for contract sections in --retrieval=sections mode (default: 30000)')
+    parser.add_argument('--max-prompt-tokens', type=int,
+                        help='Prompt token budget checked before sending (default: context window minus output tokens)')
+    parser.add_argument('--over-budget', choices=OVER_BUDGET_ACTIONS, default='sections',
+                        help='When a full-contract prompt exceeds the budget: fall back to sections or refuse (default: sections)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream responses: record time-to-first-token and write chunks to --stream-dir')
+    parser.add_argument('--stream-dir', type=Path, default=DEFAULT_STREAM_DIR,
+                        help='Where streamed answers are written (default: .cache/lawstronaut/streams)')
+    parser.add_argument('--context-cache', action='store_true',
+                        help='Cache system instruction + contract server-side and send only the question per call')
+    parser.add_argument('--context-cache-ttl', type=int, default=3600,
+                        help='Lifetime of context cache handles in seconds (default: 3600)')
+    parser.add_argument('--keep-context-cache', action='store_true',
+                        help='Keep the context cache handles this run created for later runs (billed until their TTL); '
+                             'by default they are deleted when the run finishes')
+    parser.add_argument('--structured', action='store_true',
+                        help='Request a JSON answer (compliance status, provisions, gaps, citations) via response_schema; '
+                             'disables Google Search grounding')
+    parser.add_argument('--grounding', choices=['search', 'local'], default='search',
+                        help='Regulatory context from Google Search or from the local regulation corpus '
+                             '(python -m lawstronaut corpus; default: search)')
+    parser.add_argument('--corpus-dir', type=Path, default=DEFAULT_CORPUS_DIR,
+                        help='Statute text directory for --grounding local (default: data/regulations)')
+    parser.add_argument('--metrics-dir', type=Path,
+                        help='Write stage timing, token and cost metrics (metrics.json, metrics.prom) here')
+    parser.add_argument('--prices', type=Path,
+                        help='JSON price table overriding the built-in USD per million token prices')
+    parser.add_argument('--offline', action='store_true',
+                        help='Use the deterministic local fake client instead of Vertex AI (no credentials needed)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Maximum requests in flight at once (default: 4)')
     parser.add_argument('--questions', type=str, default='all',
                         help='Which questions to test: "all" or comma-separated IDs like "1A,5A"')
+    parser.add_argument('--matrix', type=Path,
+                        help='Question x contract matrix (.xlsx, .csv, .json, .jsonl, .yaml), e.g. docs/questions.xlsx')
+    parser.add_argument('--output', type=Path, default=output_file.with_suffix(''),
+                        help=f"Result directory: compressed JSONL shards + manifest.json "
+                             f"(default: {output_file.with_suffix('')}/)")
+    parser.add_argument('--compression', choices=COMPRESSIONS, default=default_compression(),
+                        help='Shard compression (default: zstd if installed, else gzip)')
+    parser.add_argument('--shard-mb', type=float, default=64,
+                        help='Uncompressed MB of results per shard before rotating (default: 64)')
+    parser.add_argument('--json', action='store_true',
+                        help=f'Also write the single-file {output_file} layout (streamed from the result directory)')
+    parser.add_argument('--checkpoint', type=Path, default=output_file.with_suffix('.jsonl'),
+                        help='JSONL file each result is appended to; re-runs skip pairs already in it')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore (and overwrite) an existing checkpoint')
+    parser.add_argument('--regulations', type=Path,
+                        help='Regulation records whose changes trigger re-runs (default: data/regulations.json or built-in)')
+    parser.add_argument('--rerun-unchanged', action='store_true',
+                        help='Re-run pairs whose contract, prompt, model settings and regulations are unchanged')
+    parser.add_argument('--shard', type=str,
+                        help='Run only shard i of n, e.g. 0/4 (0-based)')
     parser.add_argument('--project-id', type=str,
                         help='Google Cloud Project ID (or set GOOGLE_CLOUD_PROJECT env var)')
     parser.add_argument('--location', type=str, default='us-central1',
@@ -422,16 +577,42 @@ def main():
     args = parser.parse_args()
 
     print("\n" + "="*80)
-    print("GEMINI VERTEX AI TEST - GOOGLE SEARCH GROUNDING")
+    print(settings['title'])
     print("="*80)
     print("\nModel: Gemini 2.0 Flash (Experimental)")
     print("Platform: Vertex AI")
-    print("Search: Google Search Grounding ENABLED")
-    print(f"Rate limit: {args.rate_limit}s between questions\n")
-
+    if args.grounding == 'local':
+        print(f"Search: disabled, regulatory passages from the local corpus ({args.corpus_dir})")
+    else:
+        print("Search: " + ("disabled (structured output)" if args.structured else "Google Search Grounding ENABLED"))
+    for note in settings['header_notes']:
+        print(note)
+    requests_per_minute = args.rpm or 60.0 / args.rate_limit
+    print(f"Concurrency: {args.concurrency} in flight, {requests_per_minute:g} requests/min"
+          + (f", {args.tpm:g} tokens/min" if args.tpm else "") + "\n")
+
+    context_cache = None
+    if args.context_cache:
+        context_cache = {'ttl_seconds': args.context_cache_ttl}
+        if args.offline:
+            # Fake-client handles only live in this process, so don't persist them
+            context_cache['path'] = None
+
+    regulations = load_regulations(args.regulations)
     tester = GeminiVertexTester(
         project_id=args.project_id,
-        location=args.location
+        location=args.location,
+        cache=ResponseCache(mode=args.cache) if args.cache != 'off' else None,
+        retrieval={'top_k': args.top_k, 'token_budget': args.context_tokens} if args.retrieval == 'sections' else None,
+        stream_dir=args.stream_dir if args.stream else None,
+        context_cache=context_cache,
+        client=FakeGenaiClient() if args.offline else None,
+        max_output_tokens=settings['max_output_tokens'],
+        token_budget={'max_prompt_tokens': args.max_prompt_tokens, 'on_over_budget': args.over_budget},
+        # Fake-client usage says nothing about the real tokenizer, so keep it out of the calibration log
+        estimator=TokenEstimator(calibration_path=None) if args.offline else None,
+        structured=args.structured,
+        corpus=RegulationCorpus(regulations, args.corpus_dir) if args.grounding == 'local' else None
     )
 
     if not tester.client:
@@ -444,63 +625,11 @@ def main():
         print("3. Enable Vertex AI API in your Google Cloud project")
         return
 
-    # All 6 test questions
-    all_questions = [
-        {
-            "qa_id": "1A",
-            "question_type": "Data Processing Permissions",
-            "regulation_focus": "GDPR, EU AI Act, Data Protection",
-            "contract_file": "FOUNDATIONMEDICINE,INC_02_02_2015-EX-10.2-Collaboration Agreement.txt",
-            "question_text": "Are we permitted to process the genomic data of our customers?",
-            "expected_answer": "Analysis should cover GDPR Article 6 and Article 9 (special category data), consent requirements, data processing agreements, cross-border transfer mechanisms",
-            "expected_citation": "GDPR Articles 6, 9; Contract data processing clauses"
-        },
-        {
-            "qa_id": "1B",
-            "question_type": "Data Governance Compliance",
-            "regulation_focus": "GDPR, EU AI Act Article 10",
-            "contract_file": "FOUNDATIONMEDICINE,INC_02_02_2015-EX-10.2-Collaboration Agreement.txt",
-            "question_text": "Is this contract compliant with current data governance rules? If not, what is missing?",
-            "expected_answer": "Should assess GDPR data governance requirements, EU AI Act Article 10, data quality standards, bias detection/mitigation, record-keeping obligations",
-            "expected_citation": "GDPR; Regulation (EU) 2024/1689, Article 10"
-        },
-        {
-            "qa_id": "2A",
-            "question_type": "Brexit Amendments",
-            "regulation_focus": "UK REUL Act 2023, Post-Brexit Regulatory Divergence",
-            "contract_file": "WPPPLC_04_30_2020-EX-4.28-SERVICE AGREEMENT.txt",
-            "question_text": "Do any amendments need to be made on account of Brexit?",
-            "expected_answer": "Should identify references to EU regulations that are now UK-retained law, GDPR vs UK GDPR differences, data transfer mechanisms between UK and EU",
-            "expected_citation": "UK REUL Act 2023; UK GDPR; FCA guidance on retained EU law"
-        },
-        {
-            "qa_id": "3A",
-            "question_type": "California Data Protection Compliance",
-            "regulation_focus": "California CPRA, CPPA ADMT Regulations",
-            "contract_file": "CardlyticsInc_20180112_S-1_EX-10.16_11002987_EX-10.16_Maintenance Agreement1.txt",
-            "question_text": "Is this contract compliant with data protection laws in California?",
-            "expected_answer": "Should assess CPRA compliance, ADMT regulations (Nov 2024), risk assessment obligations, consumer opt-out rights, service provider requirements",
-            "expected_citation": "California CPRA (Civil Code § 1798.100 et seq.); CPPA ADMT regulations (Nov 2024)"
-        },
-        {
-            "qa_id": "4A",
-            "question_type": "ESG Compliance Assessment",
-            "regulation_focus": "EU CSDDD, ESG Standards",
-            "contract_file": "UpjohnInc_20200121_10-12G_EX-2.6_11948692_EX-2.6_Manufacturing Agreement_ Supply Agreement.txt",
-            "question_text": "Assess this agreement for ESG compliance.",
-            "expected_answer": "Should evaluate EU CSDDD compliance (Directive 2024/1760), supply chain monitoring, labor standards enforcement, environmental impact, grievance mechanisms, Scope 3 emissions tracking",
-            "expected_citation": "Directive (EU) 2024/1760 (CSDDD), Articles 7-8, 15; ISO ESG standards"
-        },
-        {
-            "qa_id": "5A",
-            "question_type": "Non-Compete Validity",
-            "regulation_focus": "FTC Non-Compete Ban, State Law",
-            "contract_file": "MEDALISTDIVERSIFIEDREIT,INC_05_18_2020-EX-10.1-CONSULTING AGREEMENT.txt",
-            "question_text": "Is the non-compete clause valid?",
-            "expected_answer": "Should analyze FTC non-compete ban status (finalized August 2024, currently enjoined), senior executive exception, contractor vs employee status, applicable state law, reasonableness of scope/duration/geography",
-            "expected_citation": "FTC Rule 16 CFR § 910; Ryan LLC v. FTC (August 2024 injunction); Virginia state law on non-competes"
-        }
-    ]
+    all_questions = [dict(q) for q in DEFAULT_QUESTIONS]
+
+    if args.matrix:
+        all_questions = load_matrix(args.matrix)
+        print(f"Loaded {len(all_questions)} question/contract pair(s) from {args.matrix}")
 
     # Filter questions if specified
     if args.questions != 'all':
@@ -512,39 +641,140 @@ def main():
     else:
         test_questions = all_questions
 
+    if args.shard:
+        shard_index, shard_count = parse_shard(args.shard)
+        test_questions = shard_pairs(test_questions, shard_index, shard_count)
+        print(f"Shard {shard_index}/{shard_count}: {len(test_questions)} pair(s)")
+
+    # Re-run only pairs that failed or whose inputs changed since their checkpointed result
+    # Only per-pair summaries stay in memory; full results are streamed to disk
+    checkpoint = JsonlCheckpoint(args.checkpoint, resume=not args.restart, keep_results=False)
+    tracker = ChangeTracker(tester.read_contract, tester.request_settings(), regulations,
+                            prompt=tester.prompt_templates())
+    if args.rerun_unchanged:
+        pending = list(test_questions)
+    else:
+        pending, reasons = tracker.plan(test_questions, checkpoint)
+        if len(pending) < len(test_questions):
+            print(f"Resuming from {args.checkpoint}: {len(test_questions) - len(pending)} unchanged pair(s) "
+                  f"carried forward")
+        if reasons:
+            print("Re-running: " + ', '.join(f"{count} {reason}" for reason, count in reasons.most_common()))
+    test_questions, all_pairs = pending, test_questions
+
     print(f"Testing {len(test_questions)} question(s): {', '.join(q['qa_id'] for q in test_questions)}\n")
 
-    results = []
-    for i, question in enumerate(test_questions, 1):
-        print(f"\n[{i}/{len(test_questions)}] Starting test...")
-        result = tester.test_question(question['contract_file'], question)
-        results.append(result)
+    limiter = TokenBucketLimiter(
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=args.tpm
+    )
+
+    def estimate_tokens(question):
+        # Contract estimate (cached per contract), plus prompt template and a typical answer
+        try:
+            return tester.estimator.tokens(tester.read_contract(question['contract_file']),
+                                           model=tester.model_name) + 6000
+        except OSError:
+            return 6000
 
-        if i < len(test_questions):
-            print(f"\nWaiting {args.rate_limit} seconds before next test...")
-            time.sleep(args.rate_limit)
+    metrics = MetricsRecorder(load_prices(args.prices))
 
-    # Save JSON results
-    output_data = {
+    run_metadata = {
         "test_date": datetime.now().isoformat(),
-        "test_type": "gemini_vertex_search_grounding",
+        "test_type": settings['output_metadata']['test_type'],
         "model": "gemini-2.0-flash-exp",
         "platform": "vertex_ai",
         "project_id": tester.project_id,
         "location": tester.location,
-        "description": "Gemini with Vertex AI Google Search grounding for legal research",
-        "total_questions": len(results),
-        "results": results
+        **{k: v for k, v in settings['output_metadata'].items() if k != 'test_type'},
     }
-
-    json_file = "gemini_vertex_results.json"
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    sink = ResultSink(args.output, compression=args.compression, shard_bytes=int(args.shard_mb * 1024 * 1024),
+                      metadata=run_metadata)
+    # The sink receives results in matrix order: carried-forward results are read back from the
+    # checkpoint, new ones are held until every pair before them has finished
+    running = {pair_key(q) for q in test_questions}
+    finished = {}
+    written = 0
+    sink_lock = threading.Lock()
+
+    def flush(final=False):
+        nonlocal written
+        with sink_lock:
+            while written < len(all_pairs):
+                key = pair_key(all_pairs[written])
+                if key in finished:
+                    sink.write(finished.pop(key))
+                elif key not in running or final:
+                    carried = written
+                    while (written + 1 < len(all_pairs) and pair_key(all_pairs[written + 1]) not in finished
+                           and (final or pair_key(all_pairs[written + 1]) not in running)):
+                        written += 1
+                    sink.write_all(checkpoint.iter_ordered(all_pairs[carried:written + 1]))
+                else:
+                    break
+                written += 1
+
+    def on_result(question, result):
+        with metrics.time('json_write', model=tester.model_name, qa_id=question['qa_id']):
+            checkpoint.append(question, result)
+            with sink_lock:
+                finished[pair_key(question)] = result
+            flush()
+        metrics.record_result(result)
+
+    flush()
+
+    # Each result is appended to the checkpoint as soon as it completes
+    run_in_order(
+        safe_task(lambda question: tracker.stamp(question, tester.test_question(question['contract_file'], question))),
+        test_questions,
+        concurrency=args.concurrency,
+        limiter=limiter,
+        estimate_tokens=estimate_tokens,
+        on_result=on_result
+    )
+    with metrics.time('json_write', model=tester.model_name):
+        flush(final=True)
+        checkpoint.close()
+        manifest = sink.close(total_questions=sink.count)
+    tester.estimator.save()
+    context_caches_deleted = None
+    if tester.context_cache:
+        tester.context_cache.purge_expired()
+        if not args.keep_context_cache:
+            # Interrupted runs never get here, so a resumed run can still reuse their handles
+            context_caches_deleted = tester.context_cache.delete_created()
+    new_sources = None
+    if not args.offline:
+        # Fake-client sources are made up, so keep them out of the shared source index
+        source_index = SourceIndex(resolve_redirects=True)
+        new_sources = source_index.add_records(iter_results(args.output), model=tester.model_name)
+        source_index.close()
+    if args.json:
+        with metrics.time('json_write', model=tester.model_name):
+            write_json(output_file, sink.metadata, iter_results(args.output))
 
     print(f"\n{'='*80}")
-    print("✓ Gemini Vertex AI Search Grounding Test complete!")
-    print(f"\nResults saved to: {json_file}")
-    print(f"Tested {len(results)} questions")
+    print(settings['complete_message'])
+    print(f"\nResults saved to: {args.output}/ ({len(sink.shards)} {sink.compression} shard(s), {manifest.name})"
+          + (f" and {output_file}" if args.json else ""))
+    print(f"Checkpoint: {args.checkpoint}")
+    print(f"Tested {sink.count} questions")
+    if new_sources is not None:
+        print(f"Source index: {new_sources} new source(s) (python -m lawstronaut sources)")
+    if tester.context_cache:
+        print(f"Context cache: {tester.context_cache.created} handle(s) created, {tester.context_cache.reused} reused"
+              + (f", {context_caches_deleted} deleted" if context_caches_deleted is not None else ""))
+    for model, calibration in tester.estimator.summary().items():
+        print(f"Token estimate calibration ({model}): actual/estimated = {calibration['ratio']} "
+              f"over {calibration['samples']} response(s)")
+    if test_questions:
+        metrics.print_table()
+    if args.metrics_dir:
+        metrics.write(args.metrics_dir / 'metrics.json', args.metrics_dir / 'metrics.prom')
+        print(f"Metrics written to {args.metrics_dir}/ (metrics.json, metrics.prom)")
+    for note in settings['footer_notes']:
+        print(note)
     print(f"{'='*80}\n")
 
 
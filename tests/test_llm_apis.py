@@ -5,8 +5,15 @@ Provides common functionality for testing different LLM APIs
 """
 
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from lawstronaut.contract_store import ContractStore
+from lawstronaut.prompts import SYSTEM_INSTRUCTION, build_prompt
+from lawstronaut.providers import ModelConfig, get_provider, parse_model_spec
 
 
 class LawstronautTester:
@@ -29,10 +36,34 @@ class LawstronautTester:
             # Fall back to full dataset if test_contracts doesn't exist
             self.data_dir = Path(__file__).parent.parent / 'full_contract_txt'
 
+        # Packed, memory-mapped copy of data_dir (opened on first read_contract)
+        self._store = None
+        self._store_lock = threading.Lock()
+
+    def contract_store(self) -> Optional[ContractStore]:
+        """
+        Return the packed contract store for data_dir, building it on first use.
+
+        Returns:
+            ContractStore, or None if the store cannot be built (e.g. read-only cache dir)
+        """
+        with self._store_lock:
+            if self._store is None:
+                try:
+                    self._store = ContractStore.open_or_build(self.data_dir)
+                except OSError as e:
+                    print(f"Warning: contract store unavailable ({e}); reading files directly")
+                    self._store = False
+        return self._store or None
+
     def read_contract(self, contract_filename: str) -> str:
         """
         Read a contract text file from the data directory.
 
+        Contracts are served from the memory-mapped contract store, so repeat
+        reads of the same contract cost nothing. Files added or modified since
+        the store was packed are read directly.
+
         Args:
             contract_filename: Name of the contract file (e.g., "FOUNDATIONMEDICINE...")
 
@@ -42,6 +73,12 @@ class LawstronautTester:
         Raises:
             FileNotFoundError: If contract file doesn't exist
         """
+        store = self.contract_store()
+        if store:
+            for name in (contract_filename, f"{contract_filename}.txt"):
+                if name in store and store.is_current(name):
+                    return store.text(name)
+
         contract_path = self.data_dir / contract_filename
 
         if not contract_path.exists():
@@ -58,19 +95,29 @@ class LawstronautTester:
         with open(contract_path, 'r', encoding='utf-8', errors='ignore') as f:
             return f.read()
 
-    def query_llm(self, contract_text: str, question: str, model: str = "gpt-4") -> Dict:
+    def query_llm(self, contract_text: str, question: str, model: Union[str, ModelConfig] = "gpt-4",
+                  excerpts: bool = False) -> Dict:
         """
         Query an LLM with a contract and question.
 
+        Requests go through the shared provider registry (lawstronaut.providers),
+        so every tester in the process shares connection pools and per-provider
+        concurrency limits.
+
         Args:
             contract_text: Full contract text
             question: Legal question to ask
-            model: Model identifier (e.g., "gpt-4", "claude-3", "gemini-pro")
+            model: Model identifier ("gpt-4", "claude-sonnet-4-5", "perplexity:sonar-pro",
+                "vertex:gemini-2.0-flash-exp", "fake") or a ModelConfig
+            excerpts: True when contract_text holds retrieved sections
 
         Returns:
-            Dict containing response, model used, tokens, etc.
+            Dict containing response, model used, tokens, etc. (same schema as query_gemini)
         """
-        raise NotImplementedError("Subclasses must implement query_llm()")
+        config = model if isinstance(model, ModelConfig) else parse_model_spec(model)
+        api_key = {'openai': self.openai_key, 'anthropic': self.anthropic_key}.get(config.provider)
+        provider = get_provider(config.provider, **({'api_key': api_key} if api_key else {}))
+        return provider.generate(SYSTEM_INSTRUCTION, build_prompt(contract_text, question, excerpts=excerpts), config)
 
     def test_question(self, contract_file: str, question_data: Dict) -> Dict:
         """